@@ -1,24 +1,31 @@
 """Feature payload caching helpers.
 
 Provides a best-effort cache for the last successful `/v1/features/today`
-payload per user. Redis is preferred when configured via `REDIS_URL`; an
-in-memory LRU cache is used as a fallback so we can still serve data when the
-database is unavailable.
+payload per user. Redis is preferred when configured via `REDIS_URL` and is
+shared by every worker; an in-memory LRU cache is used when Redis is missing or
+a write fails, so we can still serve data when the database is unavailable.
+
+Entries are serialized once (orjson when installed) together with their store
+time. `get_entry` classifies them as fresh, stale (serve and revalidate) or
+expired, and `coalesce`/`revalidate` keep to one refresh per user at a time.
 """
 
 from __future__ import annotations
 
 import asyncio
+import copy
 import json
 import logging
 import time
 from collections import OrderedDict
-from typing import Any, Dict, Optional
+from dataclasses import dataclass
+from typing import Any, Awaitable, Callable, Dict, Optional, TypeVar
 
 from decimal import Decimal
 from uuid import UUID
 
 from .db import settings
+from services.features_cache_invalidation import version_key
 
 try:  # pragma: no cover - exercised in environments with Redis available
     from redis.asyncio import Redis  # type: ignore
@@ -27,11 +34,22 @@ except Exception:  # pragma: no cover - redis package may be optional
     Redis = None  # type: ignore[assignment]
     RedisError = Exception  # type: ignore[assignment]
 
+try:  # pragma: no cover - exercised when orjson is installed
+    import orjson  # type: ignore
+except ModuleNotFoundError:  # pragma: no cover - stdlib json fallback
+    orjson = None  # type: ignore[assignment]
+
 
 logger = logging.getLogger(__name__)
 
 _CACHE_KEY_PREFIX = "features_last_good:"
+_REFRESH_LOCK_PREFIX = "features_refresh:"
 _DEFAULT_CACHE_TTL_SECONDS = 6 * 60 * 60
+_DEFAULT_FRESH_SECONDS = 30
+_DEFAULT_STALE_SECONDS = 5 * 60
+_REFRESH_LOCK_SECONDS = 30
+
+T = TypeVar("T")
 
 
 def _resolve_cache_ttl() -> int:
@@ -66,14 +84,33 @@ def _resolve_cache_ttl() -> int:
 _CACHE_TTL_SECONDS = _resolve_cache_ttl()
 
 
+def _resolve_window(name: str, default: int) -> int:
+    override = getattr(settings, name, None)
+    if override is None:
+        return default
+    try:
+        value = int(override)
+    except (TypeError, ValueError):
+        logger.warning("[CACHE] invalid %s=%r; using default %ss", name, override, default)
+        return default
+    return max(0, value)
+
+
+_CACHE_FRESH_SECONDS = _resolve_window("FEATURES_CACHE_FRESH_SECONDS", _DEFAULT_FRESH_SECONDS)
+_CACHE_STALE_SECONDS = max(
+    _CACHE_FRESH_SECONDS,
+    _resolve_window("FEATURES_CACHE_STALE_SECONDS", _DEFAULT_STALE_SECONDS),
+)
+
+
 class _LRUCache:
     """Simple LRU cache with TTL semantics for async contexts."""
 
     def __init__(self, maxsize: int = 256) -> None:
         self.maxsize = maxsize
-        self._data: "OrderedDict[str, tuple[float, Dict[str, Any]]]" = OrderedDict()
+        self._data: "OrderedDict[str, tuple[float, Any]]" = OrderedDict()
 
-    def get(self, key: str) -> Optional[Dict[str, Any]]:
+    def get(self, key: str) -> Optional[Any]:
         item = self._data.get(key)
         if not item:
             return None
@@ -85,7 +122,7 @@ class _LRUCache:
         self._data.move_to_end(key, last=True)
         return value
 
-    def set(self, key: str, value: Dict[str, Any], ttl: int) -> None:
+    def set(self, key: str, value: Any, ttl: int) -> None:
         expires_at = time.time() + ttl
         if key in self._data:
             self._data.pop(key)
@@ -113,6 +150,28 @@ def _json_default(value: Any) -> Any:
     return value
 
 
+def _encode_entry(payload: Dict[str, Any], stored_at: float) -> bytes:
+    entry = {"stored_at": stored_at, "payload": payload}
+    if orjson is not None:
+        return orjson.dumps(entry, default=_json_default, option=orjson.OPT_NON_STR_KEYS)
+    return json.dumps(entry, default=_json_default, separators=(",", ":")).encode()
+
+
+def _decode_entry(raw: bytes | str) -> tuple[Optional[float], Dict[str, Any]]:
+    data = orjson.loads(raw) if orjson is not None else json.loads(raw)
+    if isinstance(data, dict) and set(data) == {"stored_at", "payload"}:
+        return data["stored_at"], data["payload"]
+    # Entries written before the envelope have no store time; treat them as expired.
+    return None, data
+
+
+@dataclass
+class CachedFeatures:
+    payload: Dict[str, Any]
+    age_seconds: Optional[float]
+    state: str  # "fresh", "stale" or "expired"
+
+
 async def _get_redis_client() -> Optional["Redis"]:
     global _redis_client, _redis_attempted
     if Redis is None:
@@ -151,16 +210,36 @@ async def _get_redis_client() -> Optional["Redis"]:
 
 
 class FeatureCache:
-    def __init__(self, ttl: int = _DEFAULT_CACHE_TTL_SECONDS, maxsize: int = 512) -> None:
+    def __init__(
+        self,
+        ttl: int = _DEFAULT_CACHE_TTL_SECONDS,
+        maxsize: int = 512,
+        *,
+        fresh_seconds: int = _DEFAULT_FRESH_SECONDS,
+        stale_seconds: int = _DEFAULT_STALE_SECONDS,
+    ) -> None:
         self.ttl = ttl
+        self.fresh_seconds = fresh_seconds
+        self.stale_seconds = max(fresh_seconds, stale_seconds)
         self._memory_cache = _LRUCache(maxsize=maxsize)
         self._memory_lock = asyncio.Lock()
-
-    async def get(self, user_id: Optional[str]) -> Optional[Dict[str, Any]]:
-        if not user_id:
-            return None
-        key = f"{_CACHE_KEY_PREFIX}{user_id}"
-
+        self._inflight: Dict[str, "asyncio.Task[Any]"] = {}
+        self._stats: Dict[str, int] = {
+            "hits": 0,
+            "stale": 0,
+            "misses": 0,
+            "coalesced": 0,
+            "refreshes": 0,
+            "refresh_errors": 0,
+        }
+
+    def _count(self, name: str) -> None:
+        self._stats[name] = self._stats.get(name, 0) + 1
+
+    def stats(self) -> Dict[str, int]:
+        return {**self._stats, "inflight": len(self._inflight)}
+
+    async def _get_raw(self, key: str) -> Optional[bytes | str]:
         client = await _get_redis_client()
         if client is not None:
             try:
@@ -169,35 +248,142 @@ class FeatureCache:
                 logger.warning("[CACHE] redis get failed: %s", exc)
             else:
                 if raw:
-                    try:
-                        return json.loads(raw)
-                    except json.JSONDecodeError:  # pragma: no cover - corrupted entry
-                        logger.warning("[CACHE] redis payload corrupted for %s", key)
+                    return raw
 
         async with self._memory_lock:
             return self._memory_cache.get(key)
 
+    async def _read(self, user_id: Optional[str]) -> Optional[tuple[Optional[float], Dict[str, Any]]]:
+        if not user_id:
+            return None
+        key = f"{_CACHE_KEY_PREFIX}{user_id}"
+        raw = await self._get_raw(key)
+        if not raw:
+            return None
+        try:
+            return _decode_entry(raw)
+        except ValueError:  # pragma: no cover - corrupted entry
+            logger.warning("[CACHE] payload corrupted for %s", key)
+            return None
+
+    async def get(self, user_id: Optional[str]) -> Optional[Dict[str, Any]]:
+        entry = await self._read(user_id)
+        return entry[1] if entry else None
+
+    async def get_entry(self, user_id: Optional[str]) -> Optional[CachedFeatures]:
+        """Return the cached payload with its age and freshness, counting hit/stale/miss."""
+        entry = await self._read(user_id)
+        if entry is None:
+            self._count("misses")
+            return None
+        stored_at, payload = entry
+        age = max(0.0, time.time() - stored_at) if isinstance(stored_at, (int, float)) else None
+        if age is not None and age < self.fresh_seconds:
+            state = "fresh"
+            self._count("hits")
+        elif age is not None and age < self.stale_seconds:
+            state = "stale"
+            self._count("stale")
+        else:
+            state = "expired"
+            self._count("misses")
+        return CachedFeatures(payload=payload, age_seconds=age, state=state)
+
     async def set(self, user_id: Optional[str], payload: Dict[str, Any]) -> None:
         if not user_id:
             return
 
         key = f"{_CACHE_KEY_PREFIX}{user_id}"
-        safe_payload = json.loads(json.dumps(payload, default=_json_default))
+        raw = _encode_entry(payload, time.time())
 
         client = await _get_redis_client()
         if client is not None:
             try:
-                await client.set(key, json.dumps(safe_payload), ex=self.ttl)
+                await client.set(key, raw, ex=self.ttl)
             except RedisError as exc:  # pragma: no cover - network failure
                 logger.warning("[CACHE] redis set failed: %s", exc)
+            else:
+                # Redis is shared by every worker; keeping a second copy per
+                # process would only duplicate it.
+                logger.info("[CACHE] updated features:%s", user_id)
+                return
 
         async with self._memory_lock:
-            self._memory_cache.set(key, safe_payload, self.ttl)
+            self._memory_cache.set(key, raw, self.ttl)
 
         logger.info("[CACHE] updated features:%s", user_id)
 
+    async def coalesce(self, key: str, loader: Callable[[], Awaitable[T]]) -> T:
+        """Run `loader` once per key; concurrent callers share (a copy of) its result."""
+        task = self._inflight.get(key)
+        if task is not None:
+            self._count("coalesced")
+            await asyncio.wait({task})
+            if not task.cancelled():
+                return copy.deepcopy(task.result())
+            # The leading request was cancelled; load for this caller instead.
+
+        task = asyncio.ensure_future(loader())
+        self._inflight[key] = task
+
+        def _forget(done: "asyncio.Task[Any]") -> None:
+            if self._inflight.get(key) is done:
+                self._inflight.pop(key, None)
+
+        task.add_done_callback(_forget)
+        self._count("refreshes")
+        return await task
+
+    async def revalidate(self, key: str, loader: Callable[[], Awaitable[Any]]) -> bool:
+        """Start a background refresh unless one is already running for `key`.
+
+        With Redis, a short NX lock also keeps other workers from refreshing the
+        same key. Returns True when this call started the refresh.
+        """
+        if key in self._inflight:
+            self._count("coalesced")
+            return False
+
+        client = await _get_redis_client()
+        if client is not None:
+            try:
+                claimed = await client.set(f"{_REFRESH_LOCK_PREFIX}{key}", b"1", nx=True, ex=_REFRESH_LOCK_SECONDS)
+            except RedisError as exc:  # pragma: no cover - network failure
+                logger.warning("[CACHE] redis refresh lock failed: %s", exc)
+                claimed = True
+            if not claimed:
+                self._count("coalesced")
+                return False
+            if key in self._inflight:  # pragma: no cover - raced while claiming the lock
+                self._count("coalesced")
+                return False
+
+        async def _run() -> None:
+            try:
+                await loader()
+            except asyncio.CancelledError:  # pragma: no cover - shutdown
+                raise
+            except Exception as exc:
+                self._count("refresh_errors")
+                logger.warning("[CACHE] background refresh failed key=%s: %s", key, exc)
+            finally:
+                self._inflight.pop(key, None)
+                if client is not None:
+                    try:
+                        await client.delete(f"{_REFRESH_LOCK_PREFIX}{key}")
+                    except RedisError:  # pragma: no cover - lock expires on its own
+                        pass
 
-_feature_cache = FeatureCache(ttl=_CACHE_TTL_SECONDS)
+        self._count("refreshes")
+        self._inflight[key] = asyncio.ensure_future(_run())
+        return True
+
+
+_feature_cache = FeatureCache(
+    ttl=_CACHE_TTL_SECONDS,
+    fresh_seconds=_CACHE_FRESH_SECONDS,
+    stale_seconds=_CACHE_STALE_SECONDS,
+)
 
 
 async def get_last_good(user_id: Optional[str]) -> Optional[Dict[str, Any]]:
@@ -206,3 +392,36 @@ async def get_last_good(user_id: Optional[str]) -> Optional[Dict[str, Any]]:
 
 async def set_last_good(user_id: Optional[str], payload: Dict[str, Any]) -> None:
     await _feature_cache.set(user_id, payload)
+
+
+async def get_last_good_entry(user_id: Optional[str]) -> Optional[CachedFeatures]:
+    return await _feature_cache.get_entry(user_id)
+
+
+async def coalesce_features(key: str, loader: Callable[[], Awaitable[T]]) -> T:
+    return await _feature_cache.coalesce(key, loader)
+
+
+async def revalidate_features(key: str, loader: Callable[[], Awaitable[Any]]) -> bool:
+    return await _feature_cache.revalidate(key, loader)
+
+
+def feature_cache_stats() -> Dict[str, int]:
+    return _feature_cache.stats()
+
+
+async def global_section_versions(sections: tuple[str, ...]) -> Dict[str, str]:
+    """Current invalidation versions published by ingest jobs (empty without Redis)."""
+    client = await _get_redis_client()
+    if client is None or not sections:
+        return {}
+    try:
+        values = await client.mget([version_key(section) for section in sections])
+    except RedisError as exc:  # pragma: no cover - network failure
+        logger.warning("[CACHE] redis version read failed: %s", exc)
+        return {}
+    out: Dict[str, str] = {}
+    for section, value in zip(sections, values):
+        if value is not None:
+            out[section] = value.decode() if isinstance(value, bytes) else str(value)
+    return out
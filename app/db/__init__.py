@@ -44,6 +44,8 @@ class Settings(BaseSettings):
     BUG_REPORT_SMTP_USE_STARTTLS: bool = True
     REDIS_URL: Optional[str] = None
     FEATURES_CACHE_TTL_SECONDS: Optional[int] = None
+    FEATURES_CACHE_FRESH_SECONDS: Optional[int] = None
+    FEATURES_CACHE_STALE_SECONDS: Optional[int] = None
     SCHUMANN_FUSE_TOMSK: bool = True
     SCHUMANN_TOMSK_MIN_QUALITY_SCORE: float = 0.55
     DB_POOL_MIN_SIZE: int = 2
@@ -588,6 +590,11 @@ async def get_pool() -> AsyncConnectionPool:
     return pool
 
 
+def get_open_pool() -> Optional[AsyncConnectionPool]:
+    """Return the pool only if it is already open; never opens or waits."""
+    return _pool if _pool_open else None
+
+
 async def get_db() -> AsyncGenerator:
     attempts = 0
     while attempts < 3:
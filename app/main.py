@@ -1,3 +1,4 @@
+import asyncio
 import logging
 
 from fastapi import Depends, FastAPI, Request, Header
@@ -51,6 +52,7 @@ except ModuleNotFoundError:
 from .db import get_pool, open_pool, close_pool
 from .db.health import ensure_health_monitor_started, stop_health_monitor
 from .routers.space_visuals import _media_base
+from services.geo.zip_lookup import zip_index
 
 
 logger = logging.getLogger(__name__)
@@ -102,6 +104,12 @@ async def _check_db_ready():
         logger.exception("[DB] startup check failed: %s", exc)
 
 
+@app.on_event("startup")
+async def _warm_zip_index():
+    # Parse the ZIP centroid CSV before the first GPS request instead of during it.
+    await asyncio.to_thread(zip_index)
+
+
 @app.on_event("startup")
 async def _start_health_monitor():
     await ensure_health_monitor_started()
@@ -0,0 +1,253 @@
+"""Debounced, coalescing scheduler for per-(user, day) mart refreshes.
+
+Ingest asks for a refresh after every batch, and phones upload in bursts. Each
+request moves the (user, day) due time to `debounce_seconds` from now, capped at
+`max_latency_seconds` after the first pending request, so a burst becomes one
+refresh. When Redis is available the pending set is a sorted set shared by every
+API and worker process, and due entries are claimed atomically so exactly one
+process runs each refresh. Without Redis the same bookkeeping is kept in memory.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import logging
+import time
+from collections import deque
+from dataclasses import dataclass
+from datetime import date
+from typing import Any, Awaitable, Callable, Deque, Dict, List, Optional, Tuple
+
+try:  # pragma: no cover - redis package may be optional
+    from redis.exceptions import RedisError  # type: ignore
+except Exception:  # pragma: no cover
+    RedisError = Exception  # type: ignore[assignment,misc]
+
+
+logger = logging.getLogger(__name__)
+
+RefreshRunner = Callable[[str, date, str], Awaitable[None]]
+
+# KEYS: due zset, first-seen hash, tz hash. ARGV: member, now, delay, max latency, tz.
+_REQUEST_SCRIPT = """
+local first = redis.call('HGET', KEYS[2], ARGV[1])
+local created = 0
+if not first then
+  first = ARGV[2]
+  created = 1
+  redis.call('HSET', KEYS[2], ARGV[1], first)
+end
+redis.call('HSET', KEYS[3], ARGV[1], ARGV[5])
+local due = math.min(tonumber(ARGV[2]) + tonumber(ARGV[3]), tonumber(first) + tonumber(ARGV[4]))
+redis.call('ZADD', KEYS[1], due, ARGV[1])
+return created
+"""
+
+# KEYS: due zset, first-seen hash, tz hash. ARGV: now, limit. Returns member, first, tz triples.
+_CLAIM_SCRIPT = """
+local members = redis.call('ZRANGEBYSCORE', KEYS[1], '-inf', ARGV[1], 'LIMIT', 0, tonumber(ARGV[2]))
+local out = {}
+for _, member in ipairs(members) do
+  redis.call('ZREM', KEYS[1], member)
+  table.insert(out, member)
+  table.insert(out, redis.call('HGET', KEYS[2], member) or ARGV[1])
+  table.insert(out, redis.call('HGET', KEYS[3], member) or '')
+  redis.call('HDEL', KEYS[2], member)
+  redis.call('HDEL', KEYS[3], member)
+end
+return out
+"""
+
+
+@dataclass
+class _Pending:
+    first_seen: float
+    due: float
+    tz_name: str
+
+
+def _text(value: Any) -> str:
+    return value.decode() if isinstance(value, bytes) else str(value)
+
+
+class RefreshScheduler:
+    """Coalesce refresh requests per (user, day) and run each due refresh once."""
+
+    def __init__(
+        self,
+        runner: RefreshRunner,
+        *,
+        debounce_seconds: float,
+        max_latency_seconds: float,
+        redis_factory: Optional[Callable[[], Awaitable[Any]]] = None,
+        task_factory: Optional[Callable[[Awaitable[None]], Any]] = None,
+        key_prefix: str = "gaia:mart_refresh",
+        poll_seconds: float = 1.0,
+        claim_limit: int = 50,
+    ) -> None:
+        self._runner = runner
+        self.debounce_seconds = max(0.0, debounce_seconds)
+        self.max_latency_seconds = max(self.debounce_seconds, max_latency_seconds)
+        self._redis_factory = redis_factory
+        self._task_factory = task_factory or asyncio.ensure_future
+        self._due_key = f"{key_prefix}:due"
+        self._first_key = f"{key_prefix}:first"
+        self._tz_key = f"{key_prefix}:tz"
+        self._poll_seconds = poll_seconds
+        self._claim_limit = claim_limit
+        self._pending: Dict[Tuple[str, date], _Pending] = {}
+        self._flusher: Optional[asyncio.Task] = None
+        self._latencies: Deque[float] = deque(maxlen=200)
+        self._stats = {"requests": 0, "coalesced": 0, "refreshes": 0, "errors": 0}
+
+    async def _redis(self) -> Any:
+        if self._redis_factory is None:
+            return None
+        try:
+            return await self._redis_factory()
+        except Exception as exc:  # pragma: no cover - defensive
+            logger.warning("[MART] refresh scheduler redis unavailable: %s", exc)
+            return None
+
+    async def request(
+        self,
+        user_id: str,
+        day_local: date,
+        tz_name: str,
+        *,
+        delay: Optional[float] = None,
+    ) -> bool:
+        """Record a refresh request; returns False when it joined one already pending."""
+        now = time.time()
+        delay = self.debounce_seconds if delay is None else max(0.0, delay)
+        self._stats["requests"] += 1
+        created = await self._request_redis(user_id, day_local, tz_name, now, delay)
+        if created is None:
+            created = self._request_local(user_id, day_local, tz_name, now, delay)
+        if not created:
+            self._stats["coalesced"] += 1
+        self._ensure_flusher()
+        return created
+
+    async def _request_redis(
+        self, user_id: str, day_local: date, tz_name: str, now: float, delay: float
+    ) -> Optional[bool]:
+        client = await self._redis()
+        if client is None:
+            return None
+        member = f"{user_id}|{day_local.isoformat()}"
+        try:
+            created = await client.eval(
+                _REQUEST_SCRIPT,
+                3,
+                self._due_key,
+                self._first_key,
+                self._tz_key,
+                member,
+                repr(now),
+                repr(delay),
+                repr(self.max_latency_seconds),
+                tz_name,
+            )
+        except RedisError as exc:
+            logger.warning("[MART] refresh scheduler redis request failed: %s", exc)
+            return None
+        return bool(int(created))
+
+    def _request_local(self, user_id: str, day_local: date, tz_name: str, now: float, delay: float) -> bool:
+        pending = self._pending.get((user_id, day_local))
+        if pending is None:
+            self._pending[(user_id, day_local)] = _Pending(now, min(now + delay, now + self.max_latency_seconds), tz_name)
+            return True
+        pending.due = min(now + delay, pending.first_seen + self.max_latency_seconds)
+        pending.tz_name = tz_name
+        return False
+
+    def _ensure_flusher(self) -> None:
+        loop = asyncio.get_running_loop()
+        flusher = self._flusher
+        if flusher is not None and not flusher.done() and flusher.get_loop() is loop:
+            return
+        self._flusher = loop.create_task(self._flush_loop())
+
+    def _claim_local(self, now: float) -> List[Tuple[str, date, str, float]]:
+        claimed = []
+        for key, pending in list(self._pending.items()):
+            if pending.due <= now:
+                del self._pending[key]
+                claimed.append((key[0], key[1], pending.tz_name, pending.first_seen))
+        return claimed
+
+    async def _claim_redis(self, client: Any, now: float) -> List[Tuple[str, date, str, float]]:
+        raw = await client.eval(_CLAIM_SCRIPT, 3, self._due_key, self._first_key, self._tz_key, repr(now), self._claim_limit)
+        claimed = []
+        for index in range(0, len(raw or []), 3):
+            member, first_seen, tz_name = (_text(value) for value in raw[index : index + 3])
+            user_id, _, day_text = member.rpartition("|")
+            claimed.append((user_id, date.fromisoformat(day_text), tz_name, float(first_seen)))
+        return claimed
+
+    async def _next_due(self, client: Any) -> Optional[float]:
+        candidates = [pending.due for pending in self._pending.values()]
+        if client is not None:
+            try:
+                head = await client.zrange(self._due_key, 0, 0, withscores=True)
+            except RedisError as exc:
+                logger.warning("[MART] refresh scheduler redis peek failed: %s", exc)
+                head = []
+            if head:
+                candidates.append(float(head[0][1]))
+        return min(candidates) if candidates else None
+
+    async def _flush_loop(self) -> None:
+        while True:
+            client = await self._redis()
+            now = time.time()
+            claimed = self._claim_local(now)
+            if client is not None:
+                try:
+                    claimed.extend(await self._claim_redis(client, now))
+                except RedisError as exc:
+                    logger.warning("[MART] refresh scheduler redis claim failed: %s", exc)
+            for user_id, day_local, tz_name, first_seen in claimed:
+                self._task_factory(self._run(user_id, day_local, tz_name, first_seen))
+
+            next_due = await self._next_due(client)
+            if next_due is None:
+                return
+            await asyncio.sleep(min(max(0.0, next_due - time.time()), self._poll_seconds))
+
+    async def _run(self, user_id: str, day_local: date, tz_name: str, first_seen: float) -> None:
+        self._stats["refreshes"] += 1
+        self._latencies.append(max(0.0, time.time() - first_seen))
+        try:
+            await self._runner(user_id, day_local, tz_name)
+        except Exception as exc:
+            self._stats["errors"] += 1
+            logger.warning("[MART] scheduled refresh failed user=%s day=%s error=%s", user_id, day_local, exc)
+
+    async def status(self) -> Dict[str, Any]:
+        depth = len(self._pending)
+        backend = "memory"
+        client = await self._redis()
+        if client is not None:
+            try:
+                depth += int(await client.zcard(self._due_key))
+                backend = "redis"
+            except RedisError as exc:
+                logger.warning("[MART] refresh scheduler redis depth failed: %s", exc)
+        latencies = sorted(self._latencies)
+        requests = self._stats["requests"]
+        return {
+            "backend": backend,
+            "depth": depth,
+            **self._stats,
+            "coalesce_ratio": round(self._stats["coalesced"] / requests, 3) if requests else None,
+            "latency_ms": {
+                "p50": round(latencies[len(latencies) // 2] * 1000.0, 1) if latencies else None,
+                "p95": round(latencies[int(0.95 * (len(latencies) - 1))] * 1000.0, 1) if latencies else None,
+                "max": round(latencies[-1] * 1000.0, 1) if latencies else None,
+            },
+            "debounce_seconds": self.debounce_seconds,
+            "max_latency_seconds": self.max_latency_seconds,
+        }
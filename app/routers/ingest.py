@@ -21,6 +21,8 @@ from ..db import (
     handle_pool_timeout,
 )
 from ..db.health import get_health_monitor
+from ..cache import _get_redis_client
+from ..refresh_scheduler import RefreshScheduler
 from . import summary as _summary_module
 
 from zoneinfo import ZoneInfo
@@ -71,10 +73,13 @@ _redis_queue_client: Any = None
 _redis_queue_lock = asyncio.Lock()
 _ingest_active_writes = 0
 _ingest_active_lock = asyncio.Lock()
-_recent_refresh_requests: Dict[Tuple[str, date], float] = {}
-_recent_refresh_lock = asyncio.Lock()
-_DELAYED_REFRESH_DELAY_SECONDS = max(0.5, _env_float("GAIA_INGEST_REFRESH_DELAY_SECONDS", 5.0))
-_DELAYED_REFRESH_DEBOUNCE_SECONDS = 120.0
+# Quiet period after the latest batch before a user-day refresh runs, and the
+# longest a pending refresh may be pushed back by a continuing upload burst.
+_DELAYED_REFRESH_DELAY_SECONDS = max(0.5, _env_float("GAIA_INGEST_REFRESH_DELAY_SECONDS", 10.0))
+_DELAYED_REFRESH_MAX_LATENCY_SECONDS = max(
+    _DELAYED_REFRESH_DELAY_SECONDS,
+    _env_float("GAIA_INGEST_REFRESH_MAX_LATENCY_SECONDS", 60.0),
+)
 _DELAYED_REFRESH_PRESSURE_RETRY_SECONDS = max(
     5.0,
     _env_float("GAIA_INGEST_REFRESH_PRESSURE_RETRY_SECONDS", 20.0),
@@ -84,10 +89,15 @@ _DELAYED_REFRESH_MAX_PRESSURE_RETRIES = max(
     _env_int("GAIA_INGEST_REFRESH_MAX_PRESSURE_RETRIES", 3),
 )
 _POOL_ACQUIRE_TIMEOUT_SECONDS = 1.0
+# "copy" stages batches of at least INGEST_COPY_MIN_ROWS samples through COPY and
+# inserts them with one statement; "rows" keeps the per-sample insert loop.
+INGEST_INSERT_MODE = getenv("GAIA_INGEST_INSERT_MODE", "copy").strip().lower()
+INGEST_COPY_MIN_ROWS = max(1, _env_int("GAIA_INGEST_COPY_MIN_ROWS", 50))
 
 # Legacy compatibility for tests expecting direct access to the refresh registry
 _refresh_registry = _summary_module._refresh_registry
 _refresh_task_factory = _summary_module._refresh_task_factory
+_refresh_pressure_attempts: Dict[Tuple[str, date], int] = {}
 
 
 async def _execute_refresh(
@@ -200,6 +210,11 @@ async def ingest_queue_status() -> Dict[str, Any]:
         except Exception as exc:
             redis_error = str(exc)[:160] or exc.__class__.__name__
 
+    try:
+        refresh_status: Dict[str, Any] = await _refresh_scheduler.status()
+    except Exception as exc:
+        refresh_status = {"error": str(exc)[:160] or exc.__class__.__name__}
+
     return {
         "enabled": INGEST_QUEUE_ENABLED,
         "redis_enabled": INGEST_REDIS_QUEUE_ENABLED,
@@ -211,6 +226,7 @@ async def ingest_queue_status() -> Dict[str, Any]:
         "backlog_batches": len(_backlog),
         "backlog_max_batches": INGEST_BACKLOG_MAX_BATCHES,
         "draining": _backlog_drain_lock.locked(),
+        "refresh": refresh_status,
     }
 
 
@@ -419,10 +435,9 @@ async def _insert_batch_once(
     pool,
     rows: List[Tuple[SampleIn, int]],
     dev_uid: Optional[str],
+    mode: Optional[str] = None,
 ) -> Tuple[int, int, List[Dict[str, Any]]]:
-    inserted = 0
-    skipped = 0
-    errors: List[Dict[str, Any]] = []
+    mode = (mode or INGEST_INSERT_MODE).lower()
 
     async with _pool_connection(pool) as conn:
         async with conn.cursor() as cur:
@@ -430,43 +445,88 @@ async def _insert_batch_once(
             for user_id in sorted(user_ids):
                 await _ensure_gaia_user(cur, user_id)
 
-            for sample, original_index in rows:
-                values = (
-                    dev_uid or sample.user_id,
-                    sample.device_os,
-                    sample.source,
-                    sample.type,
-                    sample.start_time,
-                    sample.end_time,
-                    sample.value,
-                    sample.unit,
-                    sample.value_text,
-                )
+            result = None
+            if mode == "copy" and len(rows) >= INGEST_COPY_MIN_ROWS:
                 try:
-                    await cur.execute(sql, values, prepare=False)
-                    rowcount = getattr(cur, "rowcount", None)
-                    if rowcount is None:
-                        inserted += 1
-                    else:
-                        inserted += int(rowcount)
-                except pg_errors.UniqueViolation:
-                    skipped += 1
-                except Exception as exc:
-                    skipped += 1
-                    if len(errors) < 10:
-                        errors.append(
-                            {
-                                "index": original_index,
-                                "type": sample.type,
-                                "reason": f"db_error: {type(exc).__name__}",
-                                "message": str(exc)[:200],
-                            }
-                        )
+                    # The savepoint keeps the users upsert when COPY is refused or a
+                    # row is rejected; the per-row loop then reports the bad rows.
+                    async with conn.transaction():
+                        result = (await _copy_insert_rows(cur, rows, dev_uid), 0, [])
+                except OperationalError:
+                    raise
+                except pg_errors.Error as exc:
+                    logger.warning(
+                        "[BATCH] set-based insert failed rows=%d (%s); retrying per row",
+                        len(rows),
+                        type(exc).__name__,
+                    )
+            if result is None:
+                result = await _insert_rows_individually(cur, rows, dev_uid)
             await conn.commit()
 
+    return result
+
+
+def _sample_values(sample: SampleIn, dev_uid: Optional[str]) -> tuple:
+    return (
+        dev_uid or sample.user_id,
+        sample.device_os,
+        sample.source,
+        sample.type,
+        sample.start_time,
+        sample.end_time,
+        sample.value,
+        sample.unit,
+        sample.value_text,
+    )
+
+
+async def _insert_rows_individually(
+    cur,
+    rows: List[Tuple[SampleIn, int]],
+    dev_uid: Optional[str],
+) -> Tuple[int, int, List[Dict[str, Any]]]:
+    inserted = 0
+    skipped = 0
+    errors: List[Dict[str, Any]] = []
+
+    for sample, original_index in rows:
+        try:
+            await cur.execute(sql, _sample_values(sample, dev_uid), prepare=False)
+            rowcount = getattr(cur, "rowcount", None)
+            if rowcount is None:
+                inserted += 1
+            else:
+                inserted += int(rowcount)
+        except pg_errors.UniqueViolation:
+            skipped += 1
+        except Exception as exc:
+            skipped += 1
+            if len(errors) < 10:
+                errors.append(
+                    {
+                        "index": original_index,
+                        "type": sample.type,
+                        "reason": f"db_error: {type(exc).__name__}",
+                        "message": str(exc)[:200],
+                    }
+                )
     return inserted, skipped, errors
 
 
+async def _copy_insert_rows(cur, rows: List[Tuple[SampleIn, int]], dev_uid: Optional[str]) -> int:
+    """COPY the batch into a temp table and insert it in one statement; returns rows inserted."""
+    await cur.execute(_STAGE_DROP_SQL, prepare=False)
+    await cur.execute(_STAGE_CREATE_SQL, prepare=False)
+    async with cur.copy(_STAGE_COPY_SQL) as copy:
+        for sample, original_index in rows:
+            await copy.write_row((original_index, *_sample_values(sample, dev_uid)))
+    await cur.execute(_STAGE_INSERT_SQL, prepare=False)
+    inserted = int(cur.rowcount or 0)
+    await cur.execute(_STAGE_DROP_SQL, prepare=False)
+    return inserted
+
+
 async def _ensure_gaia_user(cur, user_id: str) -> None:
     await cur.execute(
         """
@@ -550,6 +610,20 @@ insert into gaia.samples (
 on conflict (user_id, type, start_time, end_time) do nothing
 """
 
+_SAMPLE_COLUMNS = "user_id, device_os, source, type, start_time, end_time, value, unit, value_text"
+_STAGE_DROP_SQL = "drop table if exists pg_temp.samples_batch_stage"
+_STAGE_CREATE_SQL = f"""
+create temp table samples_batch_stage on commit drop as
+select 0::int as ord, {_SAMPLE_COLUMNS} from gaia.samples with no data
+"""
+_STAGE_COPY_SQL = f"copy samples_batch_stage (ord, {_SAMPLE_COLUMNS}) from stdin"
+# Ordering by the request index keeps the first of any in-batch duplicates, like the row loop.
+_STAGE_INSERT_SQL = f"""
+insert into gaia.samples ({_SAMPLE_COLUMNS})
+select {_SAMPLE_COLUMNS} from samples_batch_stage order by ord
+on conflict (user_id, type, start_time, end_time) do nothing
+"""
+
 
 def _log_batch_summary(user: str, received: int, inserted: int, skipped: int, db_ok: bool) -> None:
     pool_metrics = get_pool_metrics() or {}
@@ -842,70 +916,56 @@ async def samples_batch(
     }
 
 
+async def _run_scheduled_refresh(user_id: str, day_local: date, tz_name: str) -> None:
+    refresh_key = (user_id, day_local)
+    pressure_reason = _summary_module._db_pressure_reason()
+    if pressure_reason:
+        attempt = _refresh_pressure_attempts.get(refresh_key, 0)
+        logger.warning(
+            "[MART] delayed refresh skipped user=%s day=%s reason=%s attempt=%d",
+            user_id,
+            day_local,
+            pressure_reason,
+            attempt,
+        )
+        if attempt < _DELAYED_REFRESH_MAX_PRESSURE_RETRIES:
+            _refresh_pressure_attempts[refresh_key] = attempt + 1
+            await _refresh_scheduler.request(
+                user_id,
+                day_local,
+                tz_name,
+                delay=_DELAYED_REFRESH_PRESSURE_RETRY_SECONDS,
+            )
+        else:
+            _refresh_pressure_attempts.pop(refresh_key, None)
+        return
+    _refresh_pressure_attempts.pop(refresh_key, None)
+    await _execute_refresh(user_id, day_local, tz_name)
+
+
+_refresh_scheduler = RefreshScheduler(
+    _run_scheduled_refresh,
+    debounce_seconds=_DELAYED_REFRESH_DELAY_SECONDS,
+    max_latency_seconds=_DELAYED_REFRESH_MAX_LATENCY_SECONDS,
+    redis_factory=_get_redis_client,
+    task_factory=lambda coro: _refresh_task_factory(coro),
+)
+
+
 async def _maybe_schedule_refresh(
     user_id: str,
     day_local: date,
     inserted: int,
     tz_name: str = DEFAULT_TIMEZONE,
-    *,
-    pressure_attempt: int = 0,
 ) -> bool:
+    """Ask for a debounced mart refresh; returns False when it joined a pending one."""
     if REFRESH_DISABLED or not user_id or inserted <= 0:
         return False
 
-    loop = asyncio.get_running_loop()
-    now = loop.time()
-    refresh_key = (user_id, day_local)
-    async with _recent_refresh_lock:
-        last = _recent_refresh_requests.get(refresh_key)
-        if last and now - last < _DELAYED_REFRESH_DEBOUNCE_SECONDS:
-            logger.debug(
-                "[MART] delayed refresh skipped user=%s day=%s (debounce %.0fs)",
-                user_id,
-                day_local,
-                _DELAYED_REFRESH_DEBOUNCE_SECONDS,
-            )
-            return False
-        _recent_refresh_requests[refresh_key] = now
-
-    delay = _DELAYED_REFRESH_DELAY_SECONDS
-    if pressure_attempt > 0:
-        delay = _DELAYED_REFRESH_PRESSURE_RETRY_SECONDS
-    if getenv("PYTEST_CURRENT_TEST"):
-        delay = 0.0
-
-    async def _runner() -> None:
-        try:
-            if delay > 0:
-                await asyncio.sleep(delay)
-            pressure_reason = _summary_module._db_pressure_reason()
-            if pressure_reason:
-                logger.warning(
-                    "[MART] delayed refresh skipped user=%s day=%s reason=%s",
-                    user_id,
-                    day_local,
-                    pressure_reason,
-                )
-                if pressure_attempt < _DELAYED_REFRESH_MAX_PRESSURE_RETRIES:
-                    async with _recent_refresh_lock:
-                        _recent_refresh_requests.pop(refresh_key, None)
-                    await _maybe_schedule_refresh(
-                        user_id,
-                        day_local,
-                        inserted,
-                        tz_name,
-                        pressure_attempt=pressure_attempt + 1,
-                    )
-                return
-            await _execute_refresh(user_id, day_local, tz_name)
-        except Exception as exc:  # pragma: no cover - defensive logging
-            logger.warning(
-                "[MART] delayed refresh failed user=%s day=%s error=%s",
-                user_id,
-                day_local,
-                exc,
-            )
-
-    _refresh_task_factory(_runner())
-    logger.info("[MART] scheduled refresh (delayed) user=%s day=%s inserted=%d", user_id, day_local, inserted)
-    return True
+    delay = 0.0 if getenv("PYTEST_CURRENT_TEST") else None
+    created = await _refresh_scheduler.request(user_id, day_local, tz_name, delay=delay)
+    if created:
+        logger.info("[MART] scheduled refresh (delayed) user=%s day=%s inserted=%d", user_id, day_local, inserted)
+    else:
+        logger.debug("[MART] refresh coalesced user=%s day=%s inserted=%d", user_id, day_local, inserted)
+    return created
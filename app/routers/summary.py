@@ -1,13 +1,14 @@
 #
 # app/routers/summary.py
 import asyncio
+import copy
 import json
 import logging
 import random
 from contextlib import asynccontextmanager
 from datetime import date, datetime, time, timedelta, timezone
 from decimal import Decimal
-from time import perf_counter
+from time import monotonic, perf_counter
 from typing import Any, Awaitable, Callable, Dict, List, Optional, Tuple, TypeVar
 
 from zoneinfo import ZoneInfo
@@ -17,9 +18,18 @@ from os import getenv
 from psycopg import errors as pg_errors
 from psycopg.rows import dict_row
 from psycopg_pool import PoolTimeout
-from app.cache import get_last_good, set_last_good
+from app.cache import (
+    coalesce_features,
+    feature_cache_stats,
+    get_last_good,
+    get_last_good_entry,
+    global_section_versions,
+    revalidate_features,
+    set_last_good,
+)
 from app.db import (
     get_db,
+    get_open_pool,
     get_pool,
     get_pool_metrics,
     handle_connection_failure,
@@ -27,6 +37,7 @@ from app.db import (
 )
 from app.db import ulf as ulf_db
 from app.db.health import get_health_monitor
+from services.features_cache_invalidation import GLOBAL_SECTIONS
 from services.forecast_outlook import ensure_space_forecast_daily, serialize_space_forecast_rows
 from services.geomagnetic_context import build_ulf_payload
 from services.time.moon import lunar_overlay_windows, moon_context_for_day
@@ -41,6 +52,28 @@ MART_QUERY_TIMEOUT_MS = 5000
 DEBUG_FEATURES_DIAG = getenv("DEBUG_FEATURES_DIAG", "1").lower() not in {"0", "false", "no"}
 
 
+def _env_int(name: str, default: int) -> int:
+    try:
+        return int(getenv(name, str(default)))
+    except ValueError:
+        return default
+
+
+# Extra pooled connections one features request may borrow to run the global
+# enrichment queries concurrently; 0 keeps the sequential single-connection path.
+FEATURES_ENRICH_CONNECTIONS = max(0, _env_int("FEATURES_ENRICH_CONNECTIONS", 3))
+
+# Global (same-for-every-user) enrichment sections are cached per process for
+# this long, and dropped sooner when an ingest job publishes a new version.
+FEATURES_GLOBAL_CACHE_TTL_SECONDS = max(0, _env_int("FEATURES_GLOBAL_CACHE_TTL_SECONDS", 300))
+_GLOBAL_SECTION_TTL_CAPS = {"current_wx": 60, "ulf": 120}
+_GLOBAL_VERSION_POLL_SECONDS = 5.0
+_global_section_cache: Dict[Tuple[str, str], Tuple[float, str, Dict[str, Any]]] = {}
+_global_versions: Dict[str, str] = {}
+_global_versions_checked_at: Optional[float] = None
+_global_cache_stats: Dict[str, int] = {"hits": 0, "misses": 0}
+
+
 logger = logging.getLogger(__name__)
 
 # Helper to rollback connection safely (ignore errors)
@@ -474,6 +507,8 @@ def _init_diag_info(user_id: Optional[str], tz_name: str) -> Dict[str, Any]:
         "cache_updated": False,
         "cache_snapshot_initial": None,
         "cache_snapshot_final": None,
+        "cache_state": None,
+        "cache_revalidating": False,
         "mart_snapshot": None,
         "payload_summary": None,
         "trace": [],
@@ -559,89 +594,161 @@ def _local_bounds(day_local: date, tzinfo: ZoneInfo) -> Tuple[datetime, datetime
     return start_local.astimezone(timezone.utc), end_local.astimezone(timezone.utc)
 
 
+async def _current_global_versions() -> Dict[str, str]:
+    global _global_versions, _global_versions_checked_at
+    now = monotonic()
+    if _global_versions_checked_at is None or now - _global_versions_checked_at >= _GLOBAL_VERSION_POLL_SECONDS:
+        _global_versions_checked_at = now
+        _global_versions = await global_section_versions(GLOBAL_SECTIONS)
+    return _global_versions
+
+
+async def _get_global_section(section: str, day_key: str) -> Optional[Dict[str, Any]]:
+    ttl = min(FEATURES_GLOBAL_CACHE_TTL_SECONDS, _GLOBAL_SECTION_TTL_CAPS.get(section, FEATURES_GLOBAL_CACHE_TTL_SECONDS))
+    if ttl <= 0:
+        return None
+    cached = _global_section_cache.get((section, day_key))
+    version = (await _current_global_versions()).get(section, "")
+    if cached and monotonic() - cached[0] <= ttl and cached[1] == version:
+        _global_cache_stats["hits"] += 1
+        return copy.deepcopy(cached[2])
+    _global_cache_stats["misses"] += 1
+    return None
+
+
+def _set_global_section(section: str, day_key: str, value: Dict[str, Any]) -> None:
+    if FEATURES_GLOBAL_CACHE_TTL_SECONDS <= 0 or not value:
+        return
+    version = _global_versions.get(section, "")
+    # Days roll over, so drop entries for other days of the same section.
+    for key in [key for key in _global_section_cache if key[0] == section and key[1] != day_key]:
+        _global_section_cache.pop(key, None)
+    _global_section_cache[(section, day_key)] = (monotonic(), version, copy.deepcopy(value))
+
+
+def global_section_cache_stats() -> Dict[str, int]:
+    return {**_global_cache_stats, "entries": len(_global_section_cache)}
+
+
+def _idle_pool_connections(pool) -> int:
+    try:
+        stats = pool.get_stats()
+    except Exception:  # pragma: no cover - depends on psycopg internals
+        return 0
+    return int(stats.get("pool_available", 0))
+
+
 async def _gather_enrichment(
     conn,
     user_id: str,
     day_local: date,
     tzinfo: ZoneInfo,
+    timings: Optional[Dict[str, float]] = None,
+    cached_sections: Optional[List[str]] = None,
 ) -> Tuple[Dict[str, Any], List[str]]:
-    """Collect enrichment components with bounded runtime."""
+    """Collect enrichment components with bounded runtime.
+
+    Global sections are served from the process cache when possible (their
+    names are appended to `cached_sections`). Each remaining branch gets its
+    own FRESHEN_TIMEOUT_MS budget. When the API pool is already open and has
+    idle connections, the global branches run concurrently on up to
+    FEATURES_ENRICH_CONNECTIONS borrowed connections while the user's sleep
+    query runs on `conn`; otherwise they run one after another on `conn`.
+    Per-branch wall-clock milliseconds are written to `timings`.
+    """
 
     start_utc, end_utc = _local_bounds(day_local, tzinfo)
-    errors: List[str] = []
+    day_text = day_local.isoformat()
+    # (name, label, fetch, log context, global cache day key or None for user data)
+    all_branches: List[Tuple[str, str, Callable[[Any], Awaitable[Any]], Optional[str], Optional[str]]] = [
+        (
+            "sleep",
+            "sleep aggregate",
+            lambda c: _fetch_sleep_aggregate(c, user_id, start_utc, end_utc),
+            f"user={user_id} day={day_text}",
+            None,
+        ),
+        ("daily_wx", "space weather daily", lambda c: _fetch_space_weather_daily(c, day_local), f"day={day_text}", day_text),
+        ("current_wx", "space weather current", lambda c: _fetch_current_space_weather(c), None, "-"),
+        ("ulf", "ulf context", lambda c: _fetch_latest_ulf_context(c), None, "-"),
+        ("sch", "schumann daily", lambda c: _fetch_schumann_row(c, day_local), f"day={day_text}", day_text),
+        ("post", "daily post", lambda c: _fetch_daily_post(c, day_local), f"day={day_text}", day_text),
+    ]
+    if timings is None:
+        timings = {}
+    if cached_sections is None:
+        cached_sections = []
+
+    components: Dict[str, Any] = {}
+    branches: List[Tuple[str, str, Callable[[Any], Awaitable[Any]], Optional[str]]] = []
+    for name, label, fetch, log_context, day_key in all_branches:
+        cached = await _get_global_section(name, day_key) if day_key is not None else None
+        if cached is not None:
+            components[name] = cached
+            cached_sections.append(name)
+            timings[name] = 0.0
+        else:
+            branches.append((name, label, fetch, log_context))
+    global_day_keys = {name: day_key for name, _l, _f, _c, day_key in all_branches if day_key is not None}
+
+    pool = get_open_pool() if FEATURES_ENRICH_CONNECTIONS else None
+    borrow = min(FEATURES_ENRICH_CONNECTIONS, _idle_pool_connections(pool)) if pool is not None else 0
+
+    async def _run_branch(
+        name: str,
+        label: str,
+        fetch: Callable[[Any], Awaitable[Any]],
+        log_context: Optional[str],
+        slots: Optional[asyncio.Semaphore],
+    ) -> Tuple[Any, Optional[BaseException]]:
+        async def _call() -> Any:
+            if slots is None:
+                return await fetch(conn)
+            async with slots:
+                async with _pool_connection(pool) as branch_conn:
+                    return await fetch(branch_conn)
 
-    async def _recover_enrichment_error(exc: Optional[BaseException]) -> None:
-        if not exc:
-            return
-        errors.append(_describe_error(exc))
-        await _rollback_safely(conn)
+        started = perf_counter()
+        try:
+            return await _timed_call(
+                _call(),
+                label=label,
+                timeout_ms=FRESHEN_TIMEOUT_MS,
+                log_context=log_context,
+            )
+        finally:
+            timings[name] = round((perf_counter() - started) * 1000.0, 1)
 
-    sleep, sleep_exc = await _timed_call(
-        _fetch_sleep_aggregate(conn, user_id, start_utc, end_utc),
-        label="sleep aggregate",
-        timeout_ms=FRESHEN_TIMEOUT_MS,
-        log_context=f"user={user_id} day={day_local.isoformat()}",
-    )
-    if sleep is None:
-        sleep = {}
-    await _recover_enrichment_error(sleep_exc)
-
-    daily_wx, daily_exc = await _timed_call(
-        _fetch_space_weather_daily(conn, day_local),
-        label="space weather daily",
-        timeout_ms=FRESHEN_TIMEOUT_MS,
-        log_context=f"day={day_local.isoformat()}",
-    )
-    if daily_wx is None:
-        daily_wx = {}
-    await _recover_enrichment_error(daily_exc)
-
-    current_wx, current_exc = await _timed_call(
-        _fetch_current_space_weather(conn),
-        label="space weather current",
-        timeout_ms=FRESHEN_TIMEOUT_MS,
-    )
-    if current_wx is None:
-        current_wx = {}
-    await _recover_enrichment_error(current_exc)
-
-    ulf, ulf_exc = await _timed_call(
-        _fetch_latest_ulf_context(conn),
-        label="ulf context",
-        timeout_ms=FRESHEN_TIMEOUT_MS,
-    )
-    if ulf is None:
-        ulf = {}
-    await _recover_enrichment_error(ulf_exc)
-
-    sch, sch_exc = await _timed_call(
-        _fetch_schumann_row(conn, day_local),
-        label="schumann daily",
-        timeout_ms=FRESHEN_TIMEOUT_MS,
-        log_context=f"day={day_local.isoformat()}",
-    )
-    if sch is None:
-        sch = {}
-    await _recover_enrichment_error(sch_exc)
-
-    post, post_exc = await _timed_call(
-        _fetch_daily_post(conn, day_local),
-        label="daily post",
-        timeout_ms=FRESHEN_TIMEOUT_MS,
-        log_context=f"day={day_local.isoformat()}",
+    errors: List[str] = []
+    if borrow <= 0:
+        for name, label, fetch, log_context in branches:
+            result, exc = await _run_branch(name, label, fetch, log_context, None)
+            components[name] = result or {}
+            if exc:
+                errors.append(_describe_error(exc))
+                await _rollback_safely(conn)
+            elif name in global_day_keys:
+                _set_global_section(name, global_day_keys[name], components[name])
+        return components, errors
+
+    # The sleep query is user-scoped and stays on the request connection; the
+    # global branches share `borrow` pooled connections.
+    slots = asyncio.Semaphore(borrow)
+    results = await asyncio.gather(
+        *(
+            _run_branch(name, label, fetch, log_context, None if name == "sleep" else slots)
+            for name, label, fetch, log_context in branches
+        )
     )
-    if post is None:
-        post = {}
-    await _recover_enrichment_error(post_exc)
-
-    return {
-        "sleep": sleep,
-        "daily_wx": daily_wx,
-        "current_wx": current_wx,
-        "ulf": ulf,
-        "sch": sch,
-        "post": post,
-    }, errors
+    for (name, _label, _fetch, _ctx), (result, exc) in zip(branches, results):
+        components[name] = result or {}
+        if exc:
+            errors.append(_describe_error(exc))
+            if name == "sleep":
+                await _rollback_safely(conn)
+        elif name in global_day_keys:
+            _set_global_section(name, global_day_keys[name], components[name])
+    return components, errors
 
 
 async def _fetch_mart_row(conn, user_id: str, day_local: date) -> Optional[Dict[str, Any]]:
@@ -1626,7 +1733,11 @@ async def _freshen_features(
     if summary_error or not summary:
         return None
 
-    components, component_errors = await _gather_enrichment(conn, user_id, day_local, tzinfo)
+    timings: Dict[str, float] = {}
+    cached_sections: List[str] = []
+    components, component_errors = await _gather_enrichment(
+        conn, user_id, day_local, tzinfo, timings=timings, cached_sections=cached_sections
+    )
     sleep = components.get("sleep") or {}
     daily_wx = components.get("daily_wx") or {}
     current_wx = components.get("current_wx") or {}
@@ -1673,6 +1784,8 @@ async def _freshen_features(
     payload.update(post)
     context: Dict[str, Any] = dict(components)
     context["errors"] = component_errors
+    context["timings_ms"] = timings
+    context["cached_sections"] = cached_sections
     return payload, context
 
 
@@ -1801,7 +1914,7 @@ async def _collect_features(
                                 diag_info,
                                 f"snapshot lookup failed: {fallback_error}",
                             )
-                        cached_payload = await get_last_good(user_id)
+                        cached_payload = await get_last_good(_features_cache_key(user_id, tz_name))
                         if cached_payload:
                             response_payload = dict(cached_payload)
                             diag_info["mart_row"] = bool(response_payload)
@@ -1952,13 +2065,21 @@ async def _collect_features(
                             "post": context.get("post") or {},
                         }
                         enrich_errors = list(context.get("errors") or [])
+                        diag_info["enrichment_timings_ms"] = dict(context.get("timings_ms") or {})
+                        diag_info["enrichment_cached"] = list(context.get("cached_sections") or [])
                     else:
+                        enrich_timings: Dict[str, float] = {}
+                        enrich_cached: List[str] = []
                         enrich_components, enrich_errors = await _gather_enrichment(
                             conn,
                             user_id,
                             target_day,
                             tzinfo,
+                            timings=enrich_timings,
+                            cached_sections=enrich_cached,
                         )
+                        diag_info["enrichment_timings_ms"] = enrich_timings
+                        diag_info["enrichment_cached"] = enrich_cached
                     _record_enrichment_errors(diag_info, enrich_errors)
                     sleep = enrich_components.get("sleep") or {}
                     daily_wx = enrich_components.get("daily_wx") or {}
@@ -2001,7 +2122,7 @@ async def _collect_features(
                     and diag_info.get("source") not in {"cache", "empty"}
                     and cacheable_keys
                 ):
-                    await set_last_good(user_id, response_payload)
+                    await set_last_good(_features_cache_key(user_id, tz_name), response_payload)
                     diag_info["cache_updated"] = True
                     cache_summary = _summarize_feature_payload(response_payload)
                     diag_info.setdefault("cache_snapshot_initial", cache_summary)
@@ -2049,7 +2170,8 @@ async def _fallback_from_cache(
         if reason and not diag_info.get("error"):
             diag_info["error"] = reason
 
-    cached_payload = await get_last_good(user_id)
+    tz_name = diag_info.get("tz") or getattr(tzinfo, "key", DEFAULT_TIMEZONE)
+    cached_payload = await get_last_good(_features_cache_key(user_id, tz_name)) if user_id else None
     if cached_payload:
         payload = dict(cached_payload)
         diag_info["mart_row"] = bool(payload)
@@ -2089,6 +2211,47 @@ async def _fallback_from_cache(
     return payload, diag_info, None
 
 
+def _features_cache_key(user_id: str, tz_name: str) -> str:
+    """Cache, coalescing and revalidation key: a snapshot is only valid for one timezone."""
+    return f"{user_id}:{tz_name}"
+
+
+def _serve_cached_features(
+    diag_seed: Dict[str, Any],
+    cached_payload: Dict[str, Any],
+) -> Tuple[Dict[str, Any], Dict[str, Any]]:
+    """Answer from a fresh or stale cache entry without querying the marts."""
+    diag_info = dict(diag_seed)
+    diag_info["enrichment_errors"] = list(diag_info.get("enrichment_errors") or [])
+    payload = dict(cached_payload)
+    diag_info["mart_row"] = bool(payload)
+    diag_info["cache_hit"] = True
+    diag_info["source"] = payload.get("source") or "cache"
+    diag_info["updated_at"] = _coerce_datetime(payload.get("updated_at"))
+    cached_day = _coerce_day(payload.get("day"))
+    if cached_day:
+        diag_info["day_used"] = cached_day
+    payload.setdefault("source", diag_info["source"])
+    diag_info["cache_snapshot_final"] = _summarize_feature_payload(payload)
+    _diag_trace(diag_info, f"served {diag_info.get('cache_state')} cached payload")
+    return payload, diag_info
+
+
+async def _revalidate_cached_features(
+    user_id: str,
+    tz_name: str,
+    tzinfo: ZoneInfo,
+    cached_payload: Optional[Dict[str, Any]],
+) -> bool:
+    """Refresh a stale cache entry in the background (one refresh per user)."""
+
+    async def _load() -> None:
+        async with _acquire_features_conn() as conn:
+            await _collect_features(conn, user_id, tz_name, tzinfo, cached_payload=cached_payload)
+
+    return await revalidate_features(_features_cache_key(user_id, tz_name), _load)
+
+
 async def _maybe_schedule_background_refresh(
     user_id: Optional[str], day_local: Optional[date], *, force: bool = False
 ) -> bool:
@@ -2135,6 +2298,9 @@ def _format_diag_payload(diag_info: Dict[str, Any]) -> Dict[str, Any]:
         "cache_updated": bool(diag_info.get("cache_updated")),
         "cache_snapshot_initial": diag_info.get("cache_snapshot_initial"),
         "cache_snapshot_final": diag_info.get("cache_snapshot_final"),
+        "cache_state": diag_info.get("cache_state"),
+        "cache_revalidating": bool(diag_info.get("cache_revalidating")),
+        "cache_stats": feature_cache_stats(),
         "mart_snapshot": diag_info.get("mart_snapshot"),
         "payload_summary": diag_info.get("payload_summary"),
         "trace": list(diag_info.get("trace") or []),
@@ -2142,6 +2308,9 @@ def _format_diag_payload(diag_info: Dict[str, Any]) -> Dict[str, Any]:
         "error": diag_info.get("error"),
         "last_error": diag_info.get("last_error"),
         "enrichment_errors": list(diag_info.get("enrichment_errors") or []),
+        "enrichment_timings_ms": dict(diag_info.get("enrichment_timings_ms") or {}),
+        "enrichment_cached": list(diag_info.get("enrichment_cached") or []),
+        "global_cache": global_section_cache_stats(),
         "refresh_attempted": bool(diag_info.get("refresh_attempted")),
         "refresh_scheduled": bool(diag_info.get("refresh_scheduled")),
         "refresh_reason": diag_info.get("refresh_reason"),
@@ -2218,8 +2387,16 @@ async def features_today(
 
     cached_payload: Optional[Dict[str, Any]] = None
     cache_age_seconds: Optional[float] = None
+    cache_state = "miss"
     if user_id:
-        cached_payload = await get_last_good(user_id)
+        cache_entry = await get_last_good_entry(_features_cache_key(user_id, tz_name))
+        if cache_entry is not None:
+            cached_payload = cache_entry.payload
+            cache_state = cache_entry.state
+            if _coerce_day(cached_payload.get("day")) != diag_seed["day"]:
+                # Built before local midnight: collect today's snapshot instead of serving it.
+                cache_state = "miss"
+                diag_seed["cache_day_mismatch"] = True
         cached_updated_at = _coerce_datetime((cached_payload or {}).get("updated_at")) if cached_payload else None
         if cached_updated_at:
             cache_age_seconds = max(
@@ -2229,6 +2406,7 @@ async def features_today(
 
     diag_seed["cache_age_seconds"] = cache_age_seconds
     diag_seed["cache_hit"] = bool(cached_payload)
+    diag_seed["cache_state"] = cache_state
     initial_cache_summary = _summarize_feature_payload(cached_payload)
     diag_seed["cache_snapshot_initial"] = initial_cache_summary
     initial_cache_trace = None
@@ -2304,9 +2482,24 @@ async def features_today(
                         tz_name,
                         forced_refresh_error,
                     )
-            response_payload, diag_info, error_text = await _collect_features(
-                conn, user_id, tz_name, tzinfo, cached_payload=cached_payload
-            )
+            if cached_payload and cache_state == "fresh" and not force_requested:
+                response_payload, diag_info = _serve_cached_features(diag_seed, cached_payload)
+            elif cached_payload and cache_state == "stale" and not force_requested:
+                response_payload, diag_info = _serve_cached_features(diag_seed, cached_payload)
+                if not _db_pressure_reason():
+                    diag_info["cache_revalidating"] = await _revalidate_cached_features(
+                        user_id, tz_name, tzinfo, cached_payload
+                    )
+            elif user_id:
+                # Concurrent requests for one user share a single collect.
+                response_payload, diag_info, error_text = await coalesce_features(
+                    _features_cache_key(user_id, tz_name),
+                    lambda: _collect_features(conn, user_id, tz_name, tzinfo, cached_payload=cached_payload),
+                )
+            else:
+                response_payload, diag_info, error_text = await _collect_features(
+                    conn, user_id, tz_name, tzinfo, cached_payload=cached_payload
+                )
         except PoolTimeout as exc:
             primary_failed = True
             error_code = "db_timeout"
@@ -2346,6 +2539,7 @@ async def features_today(
 
     if not diag_info.get("cache_snapshot_initial"):
         diag_info["cache_snapshot_initial"] = initial_cache_summary
+    diag_info["cache_state"] = cache_state
     if force_requested:
         diag_info["refresh_forced"] = True
         day_text = forced_refresh_day.isoformat() if forced_refresh_day else "-"
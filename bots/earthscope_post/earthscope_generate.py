@@ -87,6 +87,7 @@ REPO_ROOT = Path(__file__).resolve().parents[2]
 if str(REPO_ROOT) not in sys.path:
     sys.path.insert(0, str(REPO_ROOT))
 
+from services.features_cache_invalidation import publish_global_invalidation
 from services.openai_models import resolve_openai_model
 from services.voice import VoiceProfile, build_public_earthscope_semantic, render_public_earthscope_post
 
@@ -4196,6 +4197,7 @@ def main():
         "metrics_json": metrics_json,
         "sources_json": sources_json,
     })
+    publish_global_invalidation("post")
 
     print("Earthscope (Supabase) generation complete.")
 
@@ -7,15 +7,16 @@ import json
 import logging
 import math
 import os
+import threading
 from datetime import date, datetime, timedelta, timezone
-from typing import Any, Dict, List, Optional, Tuple
+from typing import Any, Dict, Iterable, List, Optional, Tuple
 from zoneinfo import ZoneInfo
 
 from services.db import pg
 from bots.definitions.load_definition_base import load_definition_base
 from bots.gauges.db_utils import pick_column, table_columns, upsert_row
-from bots.gauges.signal_resolver import resolve_signals
-from bots.gauges.local_payload import get_local_payload
+from bots.gauges.signal_resolver import fetch_global_signal_context, resolve_signals
+from bots.gauges.local_payload import get_local_payload, get_local_payloads
 from services.gauges.alerts import dedupe_alert_pills
 from services.personalization.health_context import (
     build_personalization_profile,
@@ -158,6 +159,13 @@ _EXPOSURE_GAUGE_EFFECTS.update({
     for key in EVERYDAY_EXPOSURE_KEYS
 })
 
+# Part of inputs_hash; bump when scoring logic changes without a definition
+# version bump so unchanged inputs are still recomputed.
+_SCORER_INPUTS_VERSION = 1
+
+_SCORING_COUNTERS: Dict[str, int] = {}
+_SCORING_COUNTERS_LOCK = threading.Lock()
+
 _EXPOSURE_GAUGE_CAPS: Dict[str, float] = {
     "pain": 10.0,
     "focus": 8.0,
@@ -227,10 +235,33 @@ def _hash_inputs(snapshot: Dict[str, Any]) -> str:
     return hashlib.sha256(payload).hexdigest()
 
 
+def _count_scoring(outcome: str) -> None:
+    with _SCORING_COUNTERS_LOCK:
+        _SCORING_COUNTERS[outcome] = _SCORING_COUNTERS.get(outcome, 0) + 1
+
+
+def scoring_counters() -> Dict[str, int]:
+    """Skipped (unchanged inputs_hash) / computed / failed user-days since the last reset."""
+    with _SCORING_COUNTERS_LOCK:
+        return {key: _SCORING_COUNTERS.get(key, 0) for key in ("skipped", "computed", "failed")}
+
+
+def reset_scoring_counters() -> None:
+    with _SCORING_COUNTERS_LOCK:
+        _SCORING_COUNTERS.clear()
+
+
 def fetch_local_payload(user_id: str, day: date) -> Optional[Dict[str, Any]]:
     return get_local_payload(user_id, day)
 
 
+def fetch_local_payloads(
+    user_ids: List[str],
+    day: date,
+) -> Dict[str, Tuple[Optional[str], Optional[Dict[str, Any]]]]:
+    return get_local_payloads(user_ids, day)
+
+
 def fetch_user_tags(user_id: str) -> List[Dict[str, Any]]:
     ut_cols = table_columns("app", "user_tags")
     if not ut_cols:
@@ -874,6 +905,31 @@ def fetch_daily_features_baseline(
     return pg.fetch(sql, user_id, start, day) or []
 
 
+def _hrv_from_camera_row(
+    row: Optional[Dict[str, Any]],
+) -> Optional[Tuple[float, str, Optional[float]]]:
+    if not row:
+        return None
+    quality_label = str(row.get("quality_label") or "").strip().lower()
+    quality_score = _safe_float(row.get("quality_score")) or 0.0
+    quality_ok = (
+        quality_label in _CAMERA_QUALITY_OK and
+        quality_score >= _CAMERA_QUALITY_THRESHOLD
+    )
+    if not quality_ok:
+        return None
+    stress_index = _safe_float(row.get("stress_index"))
+    rmssd = _safe_float(row.get("rmssd_ms"))
+    if rmssd is not None:
+        return rmssd, "marts.camera_health_daily.rmssd_ms", stress_index
+    ln_rmssd = _safe_float(row.get("ln_rmssd"))
+    if ln_rmssd is not None:
+        inferred_rmssd = math.exp(ln_rmssd) if ln_rmssd < 20 else None
+        if inferred_rmssd is not None:
+            return inferred_rmssd, "marts.camera_health_daily.ln_rmssd(exp)", stress_index
+    return None
+
+
 def fetch_hrv_fallback(
     user_id: str,
     day: date,
@@ -909,23 +965,9 @@ def fetch_hrv_fallback(
                 user_id,
                 day,
             )
-            if row:
-                quality_label = str(row.get("quality_label") or "").strip().lower()
-                quality_score = _safe_float(row.get("quality_score")) or 0.0
-                quality_ok = (
-                    quality_label in _CAMERA_QUALITY_OK and
-                    quality_score >= _CAMERA_QUALITY_THRESHOLD
-                )
-                if quality_ok:
-                    stress_index = _safe_float(row.get("stress_index"))
-                    rmssd = _safe_float(row.get("rmssd_ms"))
-                    if rmssd is not None:
-                        return rmssd, "marts.camera_health_daily.rmssd_ms", stress_index
-                    ln_rmssd = _safe_float(row.get("ln_rmssd"))
-                    if ln_rmssd is not None:
-                        inferred_rmssd = math.exp(ln_rmssd) if ln_rmssd < 20 else None
-                        if inferred_rmssd is not None:
-                            return inferred_rmssd, "marts.camera_health_daily.ln_rmssd(exp)", stress_index
+            camera_hrv = _hrv_from_camera_row(row)
+            if camera_hrv is not None:
+                return camera_hrv
 
     cols = table_columns("gaia", "daily_summary")
     if cols:
@@ -1319,7 +1361,15 @@ def _upsert_gauge_delta(user_id: str, day: date, gauge_values: Dict[str, Optiona
         user_id,
         yesterday,
     ) or {}
+    _write_gauge_delta(user_id, day, gauge_values, yesterday_row)
+
 
+def _write_gauge_delta(
+    user_id: str,
+    day: date,
+    gauge_values: Dict[str, Optional[float]],
+    yesterday_row: Dict[str, Any],
+) -> None:
     deltas = {
         key: _as_int_delta(gauge_values.get(key), yesterday_row.get(key))
         for key in [*_GAUGE_KEYS, "health_status"]
@@ -1764,6 +1814,13 @@ def _compute_trend(
         user_id,
         day,
     )
+    return _trend_from_previous(prev, gauge_values)
+
+
+def _trend_from_previous(
+    prev: Optional[Dict[str, Any]],
+    gauge_values: Dict[str, Optional[float]],
+) -> Dict[str, Any]:
     if not prev:
         return {"baseline_day": None, "gauges": {}}
 
@@ -1865,39 +1922,59 @@ def _score_gauges(
     return gauges
 
 
-def score_user_day(
-    user_id: str,
-    day: str | date | None = None,
+def _gauge_inputs(
     *,
-    local_payload: Optional[Dict[str, Any]] = None,
-    force: bool = False,
+    version: Any,
+    day: date,
+    local_payload: Optional[Dict[str, Any]],
+    active_states: List[Dict[str, Any]],
+    tags: List[Dict[str, Any]],
+    symptoms: Dict[str, Any],
+    exposures: Dict[str, Any],
+    daily_checkins: List[Dict[str, Any]],
+    wearable: Optional[Dict[str, Any]],
+    today_features: Dict[str, Any],
+    baseline_rows: List[Dict[str, Any]],
+    hrv: Tuple[Optional[float], Optional[str], Optional[float]],
 ) -> Dict[str, Any]:
-    definition, version = load_definition_base()
-    day = _coerce_day(day)
+    return {
+        "scorer_version": _SCORER_INPUTS_VERSION,
+        "definition_version": version,
+        "day": _iso_day(day),
+        "active_states": active_states,
+        "local_payload": local_payload,
+        "tags": tags,
+        "symptoms": symptoms,
+        "exposures": exposures,
+        "daily_checkins": daily_checkins,
+        "wearable": wearable,
+        "today_features": today_features,
+        "baseline_rows": baseline_rows,
+        "hrv": list(hrv),
+    }
 
-    local_payload = local_payload or fetch_local_payload(user_id, day)
-    active_states = resolve_signals(user_id, day, local_payload=local_payload, definition=definition)
-    tags = fetch_user_tags(user_id)
-    profile = build_personalization_profile(tags)
-    symptoms = fetch_symptom_summary(user_id, day)
-    exposures = fetch_exposure_summary(user_id, day, profile=profile)
-    daily_checkins = fetch_recent_daily_checkins(user_id, day)
-    wearable = fetch_local_health_summary(user_id)
-    today_features = fetch_daily_features(user_id, day)
-    baseline_rows = fetch_daily_features_baseline(user_id, day)
-    hrv_value, hrv_source, camera_stress_index = fetch_hrv_fallback(user_id, day, today_features)
+
+def _evaluate_user_day(
+    definition: Dict[str, Any],
+    inputs: Dict[str, Any],
+    *,
+    profile,
+) -> Dict[str, Any]:
+    active_states = inputs["active_states"]
+    symptoms = inputs["symptoms"]
+    hrv_value, hrv_source, camera_stress_index = inputs["hrv"]
     health_status, health_meta = compute_health_status(
-        today_features,
-        baseline_rows,
+        inputs["today_features"],
+        inputs["baseline_rows"],
         symptoms,
         hrv_value=hrv_value,
         hrv_source=hrv_source,
         camera_stress_index=camera_stress_index,
     )
     gauges = _score_gauges(definition, active_states, profile=profile)
-    gauges, symptom_gauge_meta = apply_symptom_gauge_adjustments(gauges, symptoms)
-    gauges, exposure_gauge_meta = apply_exposure_gauge_adjustments(gauges, exposures)
-    gauges, daily_checkin_energy_meta = apply_daily_check_in_energy_adjustment(gauges, daily_checkins, symptoms)
+    gauges, _ = apply_symptom_gauge_adjustments(gauges, symptoms)
+    gauges, _ = apply_exposure_gauge_adjustments(gauges, inputs["exposures"])
+    gauges, _ = apply_daily_check_in_energy_adjustment(gauges, inputs["daily_checkins"], symptoms)
     if health_status is not None:
         health_adjustment = health_status_contextual_adjustment(profile, active_states)
         if health_adjustment:
@@ -1916,39 +1993,19 @@ def score_user_day(
                 ],
             }
         )
-    trend = _compute_trend(user_id, day, {**gauges, "health_status": health_status})
+    return {"gauges": gauges, "health_status": health_status, "alerts": alerts}
 
-    inputs_snapshot = {
-        "definition_version": version,
-        "day": _iso_day(day),
-        "active_states": active_states,
-        "local_payload": local_payload,
-        "tags": tags,
-        "symptoms": symptoms,
-        "exposures": exposures,
-        "daily_checkins": daily_checkins,
-        "wearable": wearable,
-        "health_status_inputs": health_meta,
-        "symptom_gauge_inputs": symptom_gauge_meta,
-        "exposure_gauge_inputs": exposure_gauge_meta,
-        "daily_checkin_energy_inputs": daily_checkin_energy_meta,
-    }
-    inputs_hash = _hash_inputs(inputs_snapshot)
-
-    existing = pg.fetchrow(
-        """
-        select inputs_hash
-          from marts.user_gauges_day
-         where user_id = %s and day = %s
-         limit 1
-        """,
-        user_id,
-        day,
-    )
-    if existing and existing.get("inputs_hash") == inputs_hash and not force:
-        return {"ok": True, "skipped": True, "user_id": user_id, "day": _iso_day(day)}
 
-    payload: Dict[str, Any] = {
+def _gauge_day_payload(
+    user_id: str,
+    day: date,
+    evaluation: Dict[str, Any],
+    trend: Dict[str, Any],
+    version: Any,
+    inputs_hash: str,
+) -> Dict[str, Any]:
+    gauges = evaluation["gauges"]
+    return {
         "user_id": user_id,
         "day": day,
         "pain": gauges.get("pain"),
@@ -1958,22 +2015,566 @@ def score_user_day(
         "energy": gauges.get("energy"),
         "sleep": gauges.get("sleep"),
         "mood": gauges.get("mood"),
-        "health_status": health_status,
+        "health_status": evaluation["health_status"],
         "trend_json": json.dumps(trend, default=str),
-        "alerts_json": json.dumps(alerts, default=str),
+        "alerts_json": json.dumps(evaluation["alerts"], default=str),
         "inputs_hash": inputs_hash,
         "model_version": version,
         "updated_at": datetime.now(timezone.utc),
     }
 
-    upsert_row("marts", "user_gauges_day", payload, ["user_id", "day"])
+
+def score_user_day(
+    user_id: str,
+    day: str | date | None = None,
+    *,
+    local_payload: Optional[Dict[str, Any]] = None,
+    force: bool = False,
+) -> Dict[str, Any]:
+    definition, version = load_definition_base()
+    day = _coerce_day(day)
+
+    # Input collection: everything the score depends on, hashed before any compute.
+    local_payload = local_payload or fetch_local_payload(user_id, day)
+    active_states = resolve_signals(user_id, day, local_payload=local_payload, definition=definition)
+    tags = fetch_user_tags(user_id)
+    profile = build_personalization_profile(tags)
+    today_features = fetch_daily_features(user_id, day)
+    inputs = _gauge_inputs(
+        version=version,
+        day=day,
+        local_payload=local_payload,
+        active_states=active_states,
+        tags=tags,
+        symptoms=fetch_symptom_summary(user_id, day),
+        exposures=fetch_exposure_summary(user_id, day, profile=profile),
+        daily_checkins=fetch_recent_daily_checkins(user_id, day),
+        wearable=fetch_local_health_summary(user_id),
+        today_features=today_features,
+        baseline_rows=fetch_daily_features_baseline(user_id, day),
+        hrv=fetch_hrv_fallback(user_id, day, today_features),
+    )
+    inputs_hash = _hash_inputs(inputs)
+
+    existing = pg.fetchrow(
+        """
+        select inputs_hash
+          from marts.user_gauges_day
+         where user_id = %s and day = %s
+         limit 1
+        """,
+        user_id,
+        day,
+    )
+    if existing and existing.get("inputs_hash") == inputs_hash and not force:
+        _count_scoring("skipped")
+        return {"ok": True, "skipped": True, "user_id": user_id, "day": _iso_day(day)}
+
+    # Compute stage: only for new or changed inputs.
+    evaluation = _evaluate_user_day(definition, inputs, profile=profile)
+    gauge_values = {**evaluation["gauges"], "health_status": evaluation["health_status"]}
+    trend = _compute_trend(user_id, day, gauge_values)
+    upsert_row(
+        "marts",
+        "user_gauges_day",
+        _gauge_day_payload(user_id, day, evaluation, trend, version, inputs_hash),
+        ["user_id", "day"],
+    )
     try:
-        _upsert_gauge_delta(user_id, day, {**gauges, "health_status": health_status})
+        _upsert_gauge_delta(user_id, day, gauge_values)
     except Exception as exc:
         logger.warning("[gauges] delta refresh failed user=%s day=%s err=%s", user_id, day, exc)
+    _count_scoring("computed")
     return {"ok": True, "skipped": False, "user_id": user_id, "day": _iso_day(day)}
 
 
+def _group_rows(rows: Optional[List[Dict[str, Any]]], key: str = "user_id") -> Dict[str, List[Dict[str, Any]]]:
+    grouped: Dict[str, List[Dict[str, Any]]] = defaultdict(list)
+    for row in rows or []:
+        owner = row.pop(key, None)
+        if owner is not None:
+            grouped[str(owner)].append(row)
+    return grouped
+
+
+def fetch_user_tags_for_users(user_ids: List[str]) -> Dict[str, List[Dict[str, Any]]]:
+    ut_cols = table_columns("app", "user_tags")
+    if not ut_cols or not user_ids:
+        return {}
+    cat_cols = table_columns("dim", "user_tag_catalog")
+
+    join_clause = ""
+    if "tag_id" in ut_cols and "id" in cat_cols:
+        join_clause = "left join dim.user_tag_catalog c on ut.tag_id = c.id"
+    elif "tag_key" in ut_cols and "tag_key" in cat_cols:
+        join_clause = "left join dim.user_tag_catalog c on ut.tag_key = c.tag_key"
+
+    select_cols = ["ut.*"]
+    if "label" in cat_cols:
+        select_cols.append("c.label as tag_label")
+    if "tag_key" in cat_cols and "tag_key" not in ut_cols:
+        select_cols.append("c.tag_key as tag_key")
+    if "section" in cat_cols:
+        select_cols.append("c.section as tag_section")
+    elif "tag_type" in cat_cols:
+        select_cols.append("c.tag_type as tag_section")
+
+    sql = f"""
+        select {', '.join(select_cols)}
+          from app.user_tags ut
+          {join_clause}
+         where ut.user_id = any(%s::uuid[])
+    """
+    try:
+        rows = pg.fetch(sql, user_ids) or []
+    except Exception:
+        return {}
+    # Tag rows keep their user_id column, as in fetch_user_tags.
+    grouped: Dict[str, List[Dict[str, Any]]] = defaultdict(list)
+    for row in rows:
+        grouped[str(row.get("user_id"))].append(row)
+    return grouped
+
+
+def fetch_symptom_summaries(user_ids: List[str], day: date) -> Dict[str, Dict[str, Any]]:
+    start, end = _local_day_bounds(day)
+    episodes_by_user: Dict[str, List[Dict[str, Any]]] = {}
+    if table_columns("raw", "user_symptom_episodes"):
+        try:
+            episodes_by_user = _group_rows(
+                pg.fetch(
+                    """
+                    select user_id,
+                           symptom_code,
+                           coalesce(current_severity, original_severity) as severity,
+                           last_interaction_at as ts_utc,
+                           latest_note_text as free_text,
+                           current_state
+                      from raw.user_symptom_episodes
+                     where user_id = any(%s::uuid[])
+                       and last_interaction_at >= %s
+                       and last_interaction_at < %s
+                       and current_state in ('new', 'ongoing', 'improving')
+                     order by user_id, last_interaction_at desc
+                    """,
+                    user_ids,
+                    start,
+                    end,
+                )
+            )
+        except Exception:
+            episodes_by_user = {}
+
+    try:
+        events_by_user = _group_rows(
+            pg.fetch(
+                """
+                select user_id, symptom_code, severity, ts_utc, free_text, tags
+                  from raw.user_symptom_events
+                 where user_id = any(%s::uuid[])
+                   and ts_utc >= %s
+                   and ts_utc < %s
+                 order by user_id, ts_utc desc
+                """,
+                user_ids,
+                start,
+                end,
+            )
+        )
+    except Exception:
+        events_by_user = {}
+
+    return {
+        uid: _build_symptom_signal_summary([*events_by_user.get(uid, []), *episodes_by_user.get(uid, [])])
+        for uid in user_ids
+    }
+
+
+def fetch_exposure_summaries(
+    user_ids: List[str],
+    day: date,
+    *,
+    profiles: Dict[str, Any],
+) -> Dict[str, Dict[str, Any]]:
+    if not table_columns("raw", "user_exposure_events"):
+        return {uid: {} for uid in user_ids}
+
+    start, end = _local_day_bounds(day)
+    window_start = start - timedelta(hours=72)
+    try:
+        events_by_user = _group_rows(
+            pg.fetch(
+                """
+                select user_id, exposure_key, intensity, event_ts_utc, source, note_text
+                  from raw.user_exposure_events
+                 where user_id = any(%s::uuid[])
+                   and event_ts_utc >= %s
+                   and event_ts_utc < %s
+                 order by user_id, event_ts_utc desc, created_at desc
+                """,
+                user_ids,
+                window_start,
+                end,
+            )
+        )
+    except Exception:
+        events_by_user = {}
+
+    asof = min(datetime.now(timezone.utc), end)
+    return {
+        uid: _build_exposure_signal_summary(
+            events_by_user.get(uid, []),
+            asof=asof,
+            profile=profiles.get(uid) or build_personalization_profile([]),
+        )
+        for uid in user_ids
+    }
+
+
+def fetch_recent_daily_checkins_for_users(
+    user_ids: List[str],
+    day: date,
+    *,
+    limit: int = 4,
+) -> Dict[str, List[Dict[str, Any]]]:
+    if not table_columns("raw", "user_daily_checkins"):
+        return {}
+    try:
+        rows = pg.fetch(
+            """
+            select user_id, day, compared_to_yesterday, energy_level, usable_energy, energy_detail
+              from (
+                select user_id,
+                       day,
+                       compared_to_yesterday,
+                       energy_level,
+                       usable_energy,
+                       energy_detail,
+                       row_number() over (partition by user_id order by day desc) as rn
+                  from raw.user_daily_checkins
+                 where user_id = any(%s::uuid[])
+                   and day <= %s
+              ) ranked
+             where rn <= %s
+             order by user_id, day desc
+            """,
+            user_ids,
+            day,
+            int(limit),
+        )
+    except Exception:
+        return {}
+    return _group_rows(rows)
+
+
+def fetch_local_health_summaries(user_ids: List[str]) -> Dict[str, Dict[str, Any]]:
+    if not table_columns("marts", "local_health_latest"):
+        return {}
+    try:
+        rows = pg.fetch(
+            """
+            select distinct on (user_id) *
+              from marts.local_health_latest
+             where user_id = any(%s::uuid[])
+            """,
+            user_ids,
+        )
+    except Exception:
+        return {}
+    return {str(row["user_id"]): row for row in rows or [] if row.get("user_id")}
+
+
+def fetch_daily_features_for_users(user_ids: List[str], day: date) -> Dict[str, Dict[str, Any]]:
+    cols = table_columns("marts", "daily_features")
+    fields = [m for m in [*list(_METRIC_SPECS.keys()), *_HEALTH_CONTEXT_FIELDS] if m in cols]
+    if not fields:
+        return {}
+    # Latest row <= day per user: the day itself when present, else the same
+    # timezone/day-boundary fallback fetch_daily_features uses.
+    rows = pg.fetch(
+        f"""
+        select distinct on (user_id) user_id, day, {', '.join(fields)}
+          from marts.daily_features
+         where user_id = any(%s::uuid[])
+           and day <= %s
+         order by user_id, day desc
+        """,
+        user_ids,
+        day,
+    )
+    return {uid: group[0] for uid, group in _group_rows(rows).items()}
+
+
+def fetch_daily_features_baselines(
+    user_ids: List[str],
+    day: date,
+    lookback_days: int = 30,
+) -> Dict[str, List[Dict[str, Any]]]:
+    cols = table_columns("marts", "daily_features")
+    metrics = [m for m in _METRIC_SPECS.keys() if m in cols]
+    if not metrics:
+        return {}
+    start = day - timedelta(days=lookback_days)
+    rows = pg.fetch(
+        f"""
+        select user_id, day, {', '.join(metrics)}
+          from marts.daily_features
+         where user_id = any(%s::uuid[])
+           and day >= %s
+           and day < %s
+         order by user_id, day asc
+        """,
+        user_ids,
+        start,
+        day,
+    )
+    return _group_rows(rows)
+
+
+def fetch_hrv_fallbacks(
+    user_ids: List[str],
+    day: date,
+    today_rows: Dict[str, Dict[str, Any]],
+) -> Dict[str, Tuple[Optional[float], Optional[str], Optional[float]]]:
+    out: Dict[str, Tuple[Optional[float], Optional[str], Optional[float]]] = {}
+    pending: List[str] = []
+    for uid in user_ids:
+        today_row = today_rows.get(uid) or {}
+        if today_row.get("hrv_avg") is not None:
+            out[uid] = (_safe_float(today_row.get("hrv_avg")), "marts.daily_features.hrv_avg", None)
+        else:
+            pending.append(uid)
+
+    camera_cols = table_columns("marts", "camera_health_daily") if pending else []
+    if camera_cols:
+        rmssd_col = pick_column(camera_cols, ["rmssd_ms"])
+        ln_rmssd_col = pick_column(camera_cols, ["ln_rmssd"])
+        quality_score_col = pick_column(camera_cols, ["quality_score"])
+        quality_label_col = pick_column(camera_cols, ["quality_label"])
+        stress_col = pick_column(camera_cols, ["stress_index"])
+        ts_col = pick_column(camera_cols, ["latest_ts_utc", "ts_utc"])
+        if rmssd_col and quality_score_col and quality_label_col and ts_col:
+            ln_expr = ln_rmssd_col if ln_rmssd_col else "null"
+            stress_expr = stress_col if stress_col else "null"
+            rows = pg.fetch(
+                f"""
+                select distinct on (user_id)
+                       user_id,
+                       {rmssd_col} as rmssd_ms,
+                       {ln_expr} as ln_rmssd,
+                       {quality_score_col} as quality_score,
+                       {quality_label_col} as quality_label,
+                       {stress_expr} as stress_index
+                  from marts.camera_health_daily
+                 where user_id = any(%s::uuid[])
+                   and day <= %s
+                 order by user_id, day desc, {ts_col} desc
+                """,
+                pending,
+                day,
+            )
+            camera_rows = {uid: group[0] for uid, group in _group_rows(rows).items()}
+            for uid in list(pending):
+                camera_hrv = _hrv_from_camera_row(camera_rows.get(uid))
+                if camera_hrv is not None:
+                    out[uid] = camera_hrv
+                    pending.remove(uid)
+
+    cols = table_columns("gaia", "daily_summary") if pending else []
+    if cols:
+        user_col = pick_column(cols, ["user_id"])
+        day_col = pick_column(cols, _DAY_CANDIDATES)
+        hrv_col = pick_column(cols, _HRV_CANDIDATES)
+        if user_col and day_col and hrv_col:
+            rows = pg.fetch(
+                f"""
+                select distinct on ({user_col}) {user_col} as user_id, {hrv_col} as hrv
+                  from gaia.daily_summary
+                 where {user_col} = any(%s::uuid[]) and {day_col} = %s
+                """,
+                pending,
+                day,
+            )
+            for row in rows or []:
+                uid = str(row.get("user_id"))
+                if uid in pending and row.get("hrv") is not None:
+                    out[uid] = (_safe_float(row.get("hrv")), f"gaia.daily_summary.{hrv_col}", None)
+                    pending.remove(uid)
+
+    cols = table_columns("gaia", "samples") if pending else []
+    if cols:
+        user_col = pick_column(cols, ["user_id"])
+        ts_col = pick_column(cols, _TS_CANDIDATES)
+        hrv_col = pick_column(cols, _HRV_CANDIDATES)
+        if user_col and ts_col and hrv_col:
+            start = datetime.combine(day, datetime.min.time(), tzinfo=timezone.utc)
+            end = start + timedelta(days=1)
+            rows = pg.fetch(
+                f"""
+                select {user_col} as user_id, avg({hrv_col}) as hrv
+                  from gaia.samples
+                 where {user_col} = any(%s::uuid[])
+                   and {ts_col} >= %s
+                   and {ts_col} < %s
+                 group by {user_col}
+                """,
+                pending,
+                start,
+                end,
+            )
+            for row in rows or []:
+                uid = str(row.get("user_id"))
+                if uid in pending and row.get("hrv") is not None:
+                    out[uid] = (_safe_float(row.get("hrv")), f"gaia.samples.{hrv_col}", None)
+                    pending.remove(uid)
+
+    for uid in pending:
+        out[uid] = (None, None, None)
+    return out
+
+
+def _fetch_gauge_rows_for_day(user_ids: List[str], day: date) -> Dict[str, Dict[str, Any]]:
+    rows = pg.fetch(
+        """
+        select user_id, pain, focus, heart, stamina, energy, sleep, mood, health_status, inputs_hash
+          from marts.user_gauges_day
+         where user_id = any(%s::uuid[])
+           and day = %s
+        """,
+        user_ids,
+        day,
+    )
+    return {str(row["user_id"]): row for row in rows or [] if row.get("user_id")}
+
+
+def _fetch_previous_gauge_rows(user_ids: List[str], day: date) -> Dict[str, Dict[str, Any]]:
+    rows = pg.fetch(
+        """
+        select distinct on (user_id)
+               user_id, day, pain, focus, heart, stamina, energy, sleep, mood, health_status
+          from marts.user_gauges_day
+         where user_id = any(%s::uuid[])
+           and day < %s
+         order by user_id, day desc
+        """,
+        user_ids,
+        day,
+    )
+    return {uid: group[0] for uid, group in _group_rows(rows).items()}
+
+
+def score_users_day(
+    user_ids: Iterable[str],
+    day: str | date | None = None,
+    *,
+    force: bool = False,
+) -> Dict[str, Dict[str, Any]]:
+    """Score many users for one day with set-based prefetches.
+
+    Every input family is loaded for the whole cohort in one query, signal
+    resolution is shared by users on the same ZIP payload, and the inputs_hash
+    skip check runs against one bulk read. Returns score_user_day-shaped
+    results keyed by user_id; a failing user gets {"ok": False, "error": ...}.
+    """
+    definition, version = load_definition_base()
+    day = _coerce_day(day)
+    ids = sorted({str(uid) for uid in user_ids if uid})
+    if not ids:
+        return {}
+
+    local_payloads = fetch_local_payloads(ids, day)
+    global_context = fetch_global_signal_context(day, definition=definition)
+    tags_by_user = fetch_user_tags_for_users(ids)
+    profiles = {uid: build_personalization_profile(tags_by_user.get(uid, [])) for uid in ids}
+    symptoms_by_user = fetch_symptom_summaries(ids, day)
+    exposures_by_user = fetch_exposure_summaries(ids, day, profiles=profiles)
+    checkins_by_user = fetch_recent_daily_checkins_for_users(ids, day)
+    wearable_by_user = fetch_local_health_summaries(ids)
+    today_by_user = fetch_daily_features_for_users(ids, day)
+    baseline_by_user = fetch_daily_features_baselines(ids, day)
+    hrv_by_user = fetch_hrv_fallbacks(ids, day, today_by_user)
+    existing_rows = _fetch_gauge_rows_for_day(ids, day)
+
+    # Input collection + hash for every user; only changed user-days move on
+    # to the trend/yesterday reads and the compute stage.
+    states_by_payload: Dict[Any, List[Dict[str, Any]]] = {}
+    results: Dict[str, Dict[str, Any]] = {}
+    pending: Dict[str, Tuple[Dict[str, Any], str]] = {}
+    for uid in ids:
+        try:
+            zip_code, local_payload = local_payloads.get(uid, (None, None))
+            # Users on the same ZIP share the cached payload, so they resolve to
+            # the same signal states.
+            payload_key = zip_code if zip_code is not None else (("user", uid) if local_payload else None)
+            if payload_key not in states_by_payload:
+                states_by_payload[payload_key] = resolve_signals(
+                    uid,
+                    day,
+                    local_payload=local_payload or {},
+                    definition=definition,
+                    global_context=global_context,
+                )
+            active_states = [dict(state) for state in states_by_payload[payload_key]]
+
+            inputs = _gauge_inputs(
+                version=version,
+                day=day,
+                local_payload=local_payload,
+                active_states=active_states,
+                tags=tags_by_user.get(uid, []),
+                symptoms=symptoms_by_user.get(uid) or _build_symptom_signal_summary([]),
+                exposures=exposures_by_user.get(uid, {}),
+                daily_checkins=checkins_by_user.get(uid, []),
+                wearable=wearable_by_user.get(uid),
+                today_features=today_by_user.get(uid, {}),
+                baseline_rows=baseline_by_user.get(uid, []),
+                hrv=hrv_by_user.get(uid, (None, None, None)),
+            )
+            inputs_hash = _hash_inputs(inputs)
+            existing = existing_rows.get(uid)
+            if existing and existing.get("inputs_hash") == inputs_hash and not force:
+                _count_scoring("skipped")
+                results[uid] = {"ok": True, "skipped": True, "user_id": uid, "day": _iso_day(day)}
+                continue
+            pending[uid] = (inputs, inputs_hash)
+        except Exception as exc:
+            logger.exception("[gauges] batch input collection failed user=%s day=%s", uid, day)
+            _count_scoring("failed")
+            results[uid] = {"ok": False, "user_id": uid, "day": _iso_day(day), "error": str(exc)}
+
+    if not pending:
+        return results
+
+    changed = sorted(pending)
+    previous_rows = _fetch_previous_gauge_rows(changed, day)
+    yesterday_rows = _fetch_gauge_rows_for_day(changed, day - timedelta(days=1))
+    write_deltas = bool(table_columns("marts", "user_gauges_delta_day"))
+    for uid in changed:
+        inputs, inputs_hash = pending[uid]
+        try:
+            evaluation = _evaluate_user_day(definition, inputs, profile=profiles[uid])
+            gauge_values = {**evaluation["gauges"], "health_status": evaluation["health_status"]}
+            trend = _trend_from_previous(previous_rows.get(uid), gauge_values)
+            upsert_row(
+                "marts",
+                "user_gauges_day",
+                _gauge_day_payload(uid, day, evaluation, trend, version, inputs_hash),
+                ["user_id", "day"],
+            )
+            try:
+                if write_deltas:
+                    _write_gauge_delta(uid, day, gauge_values, yesterday_rows.get(uid) or {})
+            except Exception as exc:
+                logger.warning("[gauges] delta refresh failed user=%s day=%s err=%s", uid, day, exc)
+            _count_scoring("computed")
+            results[uid] = {"ok": True, "skipped": False, "user_id": uid, "day": _iso_day(day)}
+        except Exception as exc:
+            logger.exception("[gauges] batch scoring failed user=%s day=%s", uid, day)
+            _count_scoring("failed")
+            results[uid] = {"ok": False, "user_id": uid, "day": _iso_day(day), "error": str(exc)}
+    return results
+
+
 if __name__ == "__main__":
     uid = os.getenv("USER_ID")
     day_env = os.getenv("DAY")
@@ -4,13 +4,14 @@ from __future__ import annotations
 import argparse
 import logging
 import os
+from collections import defaultdict
 from concurrent.futures import ThreadPoolExecutor
 from datetime import date, datetime, timedelta, timezone
 from typing import Dict, Iterable, Set, Tuple
 from zoneinfo import ZoneInfo
 
 from services.db import pg
-from bots.gauges.gauge_scorer import score_user_day
+from bots.gauges.gauge_scorer import reset_scoring_counters, score_user_day, score_users_day, scoring_counters
 
 
 LOG_LEVEL = os.getenv("GAIA_LOG_LEVEL", "INFO").upper()
@@ -167,13 +168,37 @@ def _score_chunk(
     force: bool,
 ) -> list[Tuple[Tuple[str, date], dict | None, str | None]]:
     results: list[Tuple[Tuple[str, date], dict | None, str | None]] = []
-    # Keep one connection per worker so concurrency remains bounded and each
-    # user avoids repeated TLS/pool handshakes across the score's small queries.
+    users_by_day: Dict[date, list[str]] = defaultdict(list)
+    for uid, target_day in items:
+        users_by_day[target_day].append(uid)
+
+    # Keep one connection per worker so concurrency remains bounded; each day's
+    # users are scored with one set of cohort prefetches.
     with pg.connection_scope():
-        for uid, target_day in items:
-            key = (uid, target_day)
+        for target_day, uids in users_by_day.items():
             try:
-                result = score_user_day(uid, target_day, force=force)
+                batch = score_users_day(uids, target_day, force=force)
+            except Exception as exc:
+                logger.warning(
+                    "[gauges] batch prefetch failed day=%s users=%d; scoring individually: %s",
+                    target_day,
+                    len(uids),
+                    exc,
+                )
+                batch = {}
+                for uid in uids:
+                    try:
+                        batch[uid] = score_user_day(uid, target_day, force=force)
+                    except Exception as user_exc:
+                        logger.exception("[gauges] user=%s failed: %s", uid, user_exc)
+                        batch[uid] = {"ok": False, "error": str(user_exc)}
+            for uid in uids:
+                key = (uid, target_day)
+                result = batch.get(uid)
+                if result is None or result.get("error"):
+                    error = (result or {}).get("error") or "missing batch result"
+                    results.append((key, None, error))
+                    continue
                 results.append((key, result, None))
                 logger.info(
                     "[gauges] user=%s day=%s ok=%s skipped=%s",
@@ -182,9 +207,6 @@ def _score_chunk(
                     result.get("ok"),
                     result.get("skipped"),
                 )
-            except Exception as exc:
-                results.append((key, None, str(exc)))
-                logger.exception("[gauges] user=%s failed: %s", uid, exc)
     return results
 
 
@@ -206,6 +228,7 @@ def main() -> None:
         user_ids = _fetch_user_ids()
 
     timezones = _fetch_user_timezones(user_ids)
+    reset_scoring_counters()
     started_at = datetime.now(timezone.utc)
     expected: Set[Tuple[str, date]] = set()
     refreshed: Set[Tuple[str, date]] = set()
@@ -250,7 +273,24 @@ def main() -> None:
     if failures:
         logger.error("[gauges] failed count=%d details=%s", len(failures), failures)
         raise SystemExit(1)
-    logger.info("[gauges] done users=%d refreshed=%d", len(expected), len(refreshed))
+    counters = scoring_counters()
+    hashed = counters["skipped"] + counters["computed"]
+    logger.info(
+        "[gauges] done users=%d refreshed=%d skipped=%d computed=%d hash_hit_rate=%.2f",
+        len(expected),
+        len(refreshed),
+        counters["skipped"],
+        counters["computed"],
+        counters["skipped"] / hashed if hashed else 0.0,
+    )
+    for stat in pg.query_stats(top=5):
+        logger.info(
+            "[gauges] slow query total_ms=%.1f calls=%d max_ms=%.1f sql=%s",
+            stat["total_ms"],
+            stat["calls"],
+            stat["max_ms"],
+            stat["query"][:120],
+        )
 
 
 if __name__ == "__main__":
@@ -2,10 +2,10 @@ from __future__ import annotations
 
 import json
 from datetime import date, datetime, timezone
-from typing import Any, Dict, Optional
+from typing import Any, Dict, Iterable, Optional, Tuple
 
 from services.db import pg
-from services.local_signals.cache import latest_for_zip
+from services.local_signals.cache import latest_for_zip, latest_for_zips, normalize_zip
 from bots.gauges.db_utils import pick_column, table_columns
 
 
@@ -17,6 +17,15 @@ def _coerce_day(value: str | date | None) -> date:
     return datetime.now(timezone.utc).date()
 
 
+def _rpc_payload(payload: Any) -> Optional[Dict[str, Any]]:
+    if isinstance(payload, str):
+        try:
+            payload = json.loads(payload)
+        except Exception:
+            return None
+    return payload if isinstance(payload, dict) else None
+
+
 def _try_rpc(user_id: str, day: date) -> Optional[Dict[str, Any]]:
     sqls = [
         ("select app.get_local_signals_for_user(%s::uuid, %s::date) as payload", (user_id, day)),
@@ -42,6 +51,52 @@ def _try_rpc(user_id: str, day: date) -> Optional[Dict[str, Any]]:
     return None
 
 
+# Set-based forms of the _try_rpc signatures, tried in the same order.
+_RPC_BATCH_SQLS = [
+    (
+        """
+        select u.user_id, app.get_local_signals_for_user(u.user_id, %s::date) as payload
+          from unnest(%s::uuid[]) as u(user_id)
+        """,
+        "day_ids",
+    ),
+    (
+        """
+        select u.user_id, app.get_local_signals_for_user(%s::date, u.user_id) as payload
+          from unnest(%s::uuid[]) as u(user_id)
+        """,
+        "day_ids",
+    ),
+    ("select app.get_local_signals_for_user(%s::date) as payload", "day"),
+    (
+        """
+        select u.user_id, app.get_local_signals_for_user(u.user_id) as payload
+          from unnest(%s::uuid[]) as u(user_id)
+        """,
+        "ids",
+    ),
+]
+
+
+def _try_rpc_batch(user_ids: list[str], day: date) -> Optional[Dict[str, Optional[Dict[str, Any]]]]:
+    """Call the local-signals RPC for a cohort in one statement.
+
+    Returns None when no signature works (or one user's call fails the batch),
+    so callers can fall back to the per-user _try_rpc loop.
+    """
+    for sql, shape in _RPC_BATCH_SQLS:
+        params = {"day_ids": (day, user_ids), "day": (day,), "ids": (user_ids,)}[shape]
+        try:
+            rows = pg.fetch(sql, *params)
+        except Exception:
+            continue
+        if shape == "day":
+            payload = _rpc_payload(rows[0].get("payload")) if rows else None
+            return {uid: payload for uid in user_ids}
+        return {str(row["user_id"]): _rpc_payload(row.get("payload")) for row in rows or []}
+    return None
+
+
 def _fetch_zip_from_location_context(user_id: str, day: date) -> Optional[str]:
     cols = table_columns("marts", "user_location_context_day")
     if not cols:
@@ -111,3 +166,94 @@ def get_local_payload(user_id: str, day: str | date | None = None) -> Optional[D
 
     cached = latest_for_zip(zip_code)
     return cached if isinstance(cached, dict) else None
+
+
+def _rpc_available() -> bool:
+    try:
+        row = pg.fetchrow(
+            """
+            select exists (
+              select 1
+                from pg_proc p
+                join pg_namespace n on n.oid = p.pronamespace
+               where n.nspname = 'app'
+                 and p.proname = 'get_local_signals_for_user'
+            ) as present
+            """
+        )
+    except Exception:
+        return False
+    return bool(row and row.get("present"))
+
+
+def _fetch_zips_from_location_context(user_ids: list[str], day: date) -> Dict[str, str]:
+    cols = table_columns("marts", "user_location_context_day")
+    if not user_ids or "zip" not in cols:
+        return {}
+    # Same precedence as the single-user lookup: the day's ZIP, else the latest known ZIP.
+    rows = pg.fetch(
+        """
+        select distinct on (user_id) user_id, zip
+          from marts.user_location_context_day
+         where user_id = any(%s::uuid[])
+           and zip is not null
+         order by user_id, (day = %s) desc, day desc
+        """,
+        user_ids,
+        day,
+    )
+    return {str(row["user_id"]): row["zip"] for row in rows or [] if row.get("zip")}
+
+
+def _fetch_zips_from_user_locations(user_ids: list[str]) -> Dict[str, str]:
+    cols = table_columns("app", "user_locations")
+    zip_col = pick_column(cols, ["zip", "postal_code"]) if cols else None
+    if not user_ids or not zip_col:
+        return {}
+    primary_col = pick_column(cols, ["is_primary", "primary", "is_default"])
+    order_col = pick_column(cols, ["updated_at", "created_at"])
+    where_primary = f"and {primary_col} = true" if primary_col else ""
+    order_by = f", {order_col} desc" if order_col else ""
+    rows = pg.fetch(
+        f"""
+        select distinct on (user_id) user_id, {zip_col} as zip
+          from app.user_locations
+         where user_id = any(%s::uuid[])
+         {where_primary}
+         order by user_id{order_by}
+        """,
+        user_ids,
+    )
+    return {str(row["user_id"]): row["zip"] for row in rows or [] if row.get("zip")}
+
+
+def get_local_payloads(
+    user_ids: Iterable[str],
+    day: str | date | None = None,
+) -> Dict[str, Tuple[Optional[str], Optional[Dict[str, Any]]]]:
+    """Batch form of get_local_payload: user_id -> (zip, payload).
+
+    zip is None when the payload came from the RPC or no ZIP is known. The RPC
+    runs once for the cohort; only if every set-based signature fails does it
+    fall back to one _try_rpc call per user.
+    """
+    day = _coerce_day(day)
+    ids = sorted({str(uid) for uid in user_ids if uid})
+    out: Dict[str, Tuple[Optional[str], Optional[Dict[str, Any]]]] = {}
+
+    if ids and _rpc_available():
+        rpc_payloads = _try_rpc_batch(ids, day)
+        if rpc_payloads is None:
+            rpc_payloads = {uid: _try_rpc(uid, day) for uid in ids}
+        for uid, payload in rpc_payloads.items():
+            if isinstance(payload, dict):
+                out[uid] = (None, payload)
+
+    remaining = [uid for uid in ids if uid not in out]
+    zips = _fetch_zips_from_location_context(remaining, day)
+    zips.update(_fetch_zips_from_user_locations([uid for uid in remaining if uid not in zips]))
+    payloads = latest_for_zips(zips.values())
+    for uid in remaining:
+        zip_code = normalize_zip(zips.get(uid) or "") or None
+        out[uid] = (zip_code, payloads.get(zip_code) if zip_code else None)
+    return out
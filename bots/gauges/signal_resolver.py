@@ -263,18 +263,49 @@ def _full_moon_days_to(dt: datetime) -> float:
     return delta * _SYNODIC_DAYS
 
 
+def _schumann_lookback_days(definition: Dict[str, Any]) -> int:
+    sch_def = next(
+        (s for s in definition.get("signal_definitions", []) if s.get("key") == "schumann.variability_24h"),
+        {},
+    )
+    return int((sch_def.get("activation_params") or {}).get("lookback_days") or 30)
+
+
+def fetch_global_signal_context(
+    day: str | date | None = None,
+    *,
+    definition: Optional[Dict[str, Any]] = None,
+) -> Dict[str, Any]:
+    """Space weather and Schumann inputs that are the same for every user on a day.
+
+    Pass the result to resolve_signals(global_context=...) when resolving many users.
+    """
+    definition = definition or load_definition_base()[0]
+    day = _coerce_day(day)
+    stddev_24h = _fetch_schumann_stddev_24h()
+    series = _fetch_schumann_daily_stddev_series(_schumann_lookback_days(definition)) if stddev_24h is not None else []
+    return {
+        "space": _fetch_space_snapshot(day),
+        "schumann_stddev_24h": stddev_24h,
+        "schumann_series": series,
+    }
+
+
 def resolve_signals(
     user_id: str,
     day: str | date | None = None,
     *,
     local_payload: Optional[Dict[str, Any]] = None,
     definition: Optional[Dict[str, Any]] = None,
+    global_context: Optional[Dict[str, Any]] = None,
 ) -> List[Dict[str, Any]]:
     definition = definition or load_definition_base()[0]
     day = _coerce_day(day)
     sig_defs = {s.get("key"): s for s in definition.get("signal_definitions", [])}
 
-    payload = _normalize_local_payload(local_payload or _fetch_local_payload(user_id, day))
+    payload = _normalize_local_payload(
+        local_payload if local_payload is not None else _fetch_local_payload(user_id, day)
+    )
     weather = payload.get("weather") or {}
     air = payload.get("air") or {}
     allergens = payload.get("allergens") or {}
@@ -456,7 +487,7 @@ def resolve_signals(
         )
 
     # Space weather: KP + Bz
-    space = _fetch_space_snapshot(day)
+    space = global_context["space"] if global_context is not None else _fetch_space_snapshot(day)
     kp_now = _safe_float(space.get("kp_now"))
     kp_max = _safe_float(space.get("kp_max"))
     kp_val = kp_now if kp_now is not None else kp_max
@@ -542,7 +573,10 @@ def resolve_signals(
             )
 
     # Schumann variability (24h stddev) using rolling 30d z-score / percentile thresholds
-    stddev_24h = _fetch_schumann_stddev_24h()
+    if global_context is not None:
+        stddev_24h = global_context.get("schumann_stddev_24h")
+    else:
+        stddev_24h = _fetch_schumann_stddev_24h()
     sch_def = sig_defs.get("schumann.variability_24h") or {}
     params = sch_def.get("activation_params") or {}
     lookback_days = int(params.get("lookback_days") or 30)
@@ -555,7 +589,10 @@ def resolve_signals(
     n_points = 0
 
     if stddev_24h is not None:
-        series = _fetch_schumann_daily_stddev_series(lookback_days)
+        if global_context is not None:
+            series = global_context.get("schumann_series") or []
+        else:
+            series = _fetch_schumann_daily_stddev_series(lookback_days)
         vals = [float(r["stddev_day"]) for r in series if r.get("stddev_day") is not None]
         n_points = len(vals)
 
@@ -1,10 +1,13 @@
 from __future__ import annotations
 
+import argparse
 import asyncio
 import json
 import logging
 import math
 import os
+import time
+from bisect import bisect_left, bisect_right, insort
 from dataclasses import dataclass, field
 from datetime import UTC, datetime, timedelta
 from itertools import combinations
@@ -13,6 +16,11 @@ from typing import Any, Iterable, Sequence
 import asyncpg
 import httpx
 
+try:
+    import numpy as np
+except ModuleNotFoundError:  # pragma: no cover - the pure-Python window builder still works without it.
+    np = None
+
 
 LOG_LEVEL = os.getenv("GAIA_LOG_LEVEL", "INFO").upper()
 logging.basicConfig(level=LOG_LEVEL)
@@ -39,6 +47,8 @@ ULF_ENABLE_LOCALTIME_PERCENTILE = os.getenv("ULF_ENABLE_LOCALTIME_PERCENTILE", "
 }
 ULF_MIN_HISTORY_ROWS = max(24, int(os.getenv("ULF_MIN_HISTORY_ROWS", "72")))
 ULF_BOOTSTRAP_MIN_ROWS = max(8, int(os.getenv("ULF_BOOTSTRAP_MIN_ROWS", "12")))
+ULF_STATION_CONCURRENCY = max(1, int(os.getenv("ULF_STATION_CONCURRENCY", "4")))
+ULF_STATION_TIMEOUT_SECS = max(1.0, float(os.getenv("ULF_STATION_TIMEOUT_SECS", "90")))
 SOURCE = "usgs"
 
 WINDOW_MINUTES = max(1, ULF_WINDOW_SECONDS // 60)
@@ -284,7 +294,41 @@ def compute_band_proxy(values: list[float]) -> float | None:
     return _rms(smoothed)
 
 
-def build_5m_windows(rows: list[dict[str, Any]], component: str) -> list[StationWindow]:
+def _station_window(
+    bucket_start: datetime,
+    points: list[tuple[datetime, float]],
+    segment_values: list[float],
+    component: str,
+    has_gap: bool,
+) -> StationWindow:
+    flags: list[str] = []
+    if len(points) < WINDOW_MINUTES:
+        flags.append("missing_samples")
+    if has_gap:
+        flags.append("missing_samples")
+
+    values = [value for _, value in points]
+    trace = _build_dbdt_trace(points)
+    proxy_input = segment_values if len(segment_values) >= 5 else values
+
+    return StationWindow(
+        station_id="",
+        ts_utc=bucket_start,
+        component_used=component,
+        component_substituted=False,
+        dbdt_rms=_rms(trace),
+        ulf_rms_broad=_rms(trace),
+        ulf_band_proxy=compute_band_proxy(proxy_input),
+        ulf_index_station=None,
+        ulf_index_localtime=None,
+        persistence_30m=None,
+        persistence_90m=None,
+        quality_flags=_sorted_flags(flags),
+        dbdt_trace=tuple(trace),
+    )
+
+
+def _build_5m_windows_python(rows: list[dict[str, Any]], component: str) -> list[StationWindow]:
     buckets: dict[datetime, list[tuple[datetime, float]]] = {}
     valid_points = [
         (row["ts_utc"], row[component])
@@ -301,14 +345,7 @@ def build_5m_windows(rows: list[dict[str, Any]], component: str) -> list[Station
         if len(points) < 4:
             continue
 
-        flags: list[str] = []
-        if len(points) < WINDOW_MINUTES:
-            flags.append("missing_samples")
-        if any((right[0] - left[0]).total_seconds() > 90 for left, right in zip(points, points[1:])):
-            flags.append("missing_samples")
-
-        values = [value for _, value in points]
-        trace = _build_dbdt_trace(points)
+        has_gap = any((right[0] - left[0]).total_seconds() > 90 for left, right in zip(points, points[1:]))
         segment_end = bucket_start + timedelta(minutes=WINDOW_MINUTES)
         segment_start = segment_end - timedelta(minutes=15)
         segment_values = [
@@ -316,29 +353,77 @@ def build_5m_windows(rows: list[dict[str, Any]], component: str) -> list[Station
             for ts_utc, value in valid_points
             if segment_start <= ts_utc < segment_end
         ]
-        proxy_input = segment_values if len(segment_values) >= 5 else values
-
-        windows.append(
-            StationWindow(
-                station_id="",
-                ts_utc=bucket_start,
-                component_used=component,
-                component_substituted=False,
-                dbdt_rms=_rms(trace),
-                ulf_rms_broad=_rms(trace),
-                ulf_band_proxy=compute_band_proxy(proxy_input),
-                ulf_index_station=None,
-                ulf_index_localtime=None,
-                persistence_30m=None,
-                persistence_90m=None,
-                quality_flags=_sorted_flags(flags),
-                dbdt_trace=tuple(trace),
-            )
-        )
+        windows.append(_station_window(bucket_start, points, segment_values, component, has_gap))
+
+    return windows
+
+
+_EPOCH_UTC = datetime(1970, 1, 1, tzinfo=UTC)
+_ONE_MICROSECOND = timedelta(microseconds=1)
+
+
+def _build_5m_windows_numpy(rows: list[dict[str, Any]], component: str) -> list[StationWindow]:
+    """Array-op version of `_build_5m_windows_python` producing identical windows.
+
+    Buckets come from one stable lexsort over (bucket, timestamp), and each trailing
+    15-minute segment is a `searchsorted` slice of the time-ordered points, so the
+    cost is O(n log n) in fetched minutes instead of O(buckets * n).
+    """
+    valid_points = [
+        (row["ts_utc"], row[component])
+        for row in rows
+        if row.get("ts_utc") is not None and row.get(component) is not None
+    ]
+    if not valid_points:
+        return []
+
+    ts_us = np.fromiter(
+        ((ts_utc - _EPOCH_UTC) // _ONE_MICROSECOND for ts_utc, _ in valid_points),
+        dtype=np.int64,
+        count=len(valid_points),
+    )
+    # Mirrors _floor_window on UTC timestamps, which also holds when WINDOW_MINUTES does not divide 60.
+    seconds = ts_us // 1_000_000
+    minute_of_hour = (seconds % 3600) // 60
+    bucket_us = (seconds - seconds % 3600 + (minute_of_hour - minute_of_hour % WINDOW_MINUTES) * 60) * 1_000_000
+
+    order = np.lexsort((ts_us, bucket_us))
+    sorted_buckets = bucket_us[order]
+    gaps = np.diff(ts_us[order]) > 90_000_000
+    starts = np.flatnonzero(np.r_[True, sorted_buckets[1:] != sorted_buckets[:-1]])
+    ends = np.r_[starts[1:], len(order)]
+
+    segment_end_us = sorted_buckets[starts] + WINDOW_MINUTES * 60_000_000
+    segment_start_us = segment_end_us - 15 * 60_000_000
+    time_ordered = bool(np.all(ts_us[1:] >= ts_us[:-1]))
+    if time_ordered:
+        segment_lo = np.searchsorted(ts_us, segment_start_us, side="left")
+        segment_hi = np.searchsorted(ts_us, segment_end_us, side="left")
+
+    windows: list[StationWindow] = []
+    for group, (start, end) in enumerate(zip(starts.tolist(), ends.tolist())):
+        if end - start < 4:
+            continue
+        indices = order[start:end].tolist()
+        points = [(valid_points[index][0], float(valid_points[index][1])) for index in indices]
+        if time_ordered:
+            segment_indices = range(int(segment_lo[group]), int(segment_hi[group]))
+        else:
+            in_segment = (ts_us >= segment_start_us[group]) & (ts_us < segment_end_us[group])
+            segment_indices = np.flatnonzero(in_segment).tolist()
+        segment_values = [valid_points[index][1] for index in segment_indices]
+        has_gap = bool(gaps[start : end - 1].any())
+        windows.append(_station_window(_floor_window(points[0][0]), points, segment_values, component, has_gap))
 
     return windows
 
 
+def build_5m_windows(rows: list[dict[str, Any]], component: str) -> list[StationWindow]:
+    if np is None:
+        return _build_5m_windows_python(rows, component)
+    return _build_5m_windows_numpy(rows, component)
+
+
 async def load_station_history_rows(
     conn: asyncpg.Connection,
     station_id: str,
@@ -365,13 +450,32 @@ def compute_percentile_index(
     *,
     min_history_rows: int = ULF_MIN_HISTORY_ROWS,
 ) -> float | None:
+    valid = sorted(float(item) for item in history if item is not None)
+    return compute_percentile_index_sorted(value, valid, min_history_rows=min_history_rows)
+
+
+def compute_percentile_index_sorted(
+    value: float | None,
+    *sorted_histories: Sequence[float],
+    min_history_rows: int = ULF_MIN_HISTORY_ROWS,
+) -> float | None:
+    """`compute_percentile_index` over already-sorted histories (lists or NumPy arrays).
+
+    Several histories are ranked as if concatenated, so callers can keep a fixed
+    part and a growing part sorted separately instead of re-sorting per window.
+    """
     if value is None:
         return None
-    valid = sorted(float(item) for item in history if item is not None)
-    if len(valid) < min_history_rows:
+    size = sum(len(history) for history in sorted_histories)
+    if size < min_history_rows:
         return None
-    rank = sum(1 for item in valid if item <= value)
-    return round((rank / len(valid)) * 100.0, 2)
+    rank = 0
+    for history in sorted_histories:
+        if np is not None and isinstance(history, np.ndarray):
+            rank += int(np.searchsorted(history, value, side="right"))
+        else:
+            rank += bisect_right(history, value)
+    return round((rank / size) * 100.0, 2)
 
 
 def compute_persistence(recent_values: list[float], minutes: int) -> float | None:
@@ -463,6 +567,12 @@ def compute_context_row(ts_utc: datetime, windows: list[StationWindow]) -> Conte
     )
 
 
+def _sorted_history(values: Iterable[float]) -> Sequence[float]:
+    if np is None:
+        return sorted(values)
+    return np.sort(np.fromiter(values, dtype=np.float64))
+
+
 def _apply_station_history(
     station_id: str,
     component_substituted: bool,
@@ -472,42 +582,56 @@ def _apply_station_history(
     if not windows:
         return []
 
-    history_metrics = [
-        {
-            "ts_utc": row["ts_utc"],
-            "dbdt_rms": row["dbdt_rms"],
-            "ulf_index_station": row["ulf_index_station"],
-        }
+    # History grows by one rounded row per enriched window. The percentile inputs
+    # are kept sorted (binary-search ranks) and the persistence inputs in time
+    # order, so each window costs O(log n) plus its short recent suffix.
+    history_ts: list[datetime] = [row["ts_utc"] for row in history_rows]
+    history_index: list[float | None] = [
+        float(row["ulf_index_station"]) if row["ulf_index_station"] is not None else None
         for row in history_rows
     ]
-    bootstrap_dbdt_history = [
-        float(item["dbdt_rms"])
-        for item in history_metrics
-        if item.get("dbdt_rms") is not None
-    ]
-    bootstrap_dbdt_history.extend(
-        float(window.dbdt_rms)
-        for window in windows
-        if window.dbdt_rms is not None
-    )
+    history_time_ordered = all(left <= right for left, right in zip(history_ts, history_ts[1:]))
+    dbdt_history = sorted(float(row["dbdt_rms"]) for row in history_rows if row["dbdt_rms"] is not None)
+    window_dbdt = [float(window.dbdt_rms) for window in windows if window.dbdt_rms is not None]
+    bootstrap_dbdt_history = _sorted_history([*dbdt_history, *window_dbdt])
+
+    history_by_hour: dict[int, list[float]] = {}
+    windows_by_hour: dict[int, Sequence[float]] = {}
+    if ULF_ENABLE_LOCALTIME_PERCENTILE:
+        for row in history_rows:
+            if row["dbdt_rms"] is not None:
+                history_by_hour.setdefault(row["ts_utc"].hour, []).append(float(row["dbdt_rms"]))
+        for values in history_by_hour.values():
+            values.sort()
+        hour_buckets: dict[int, list[float]] = {}
+        for window in windows:
+            if window.dbdt_rms is not None:
+                hour_buckets.setdefault(window.ts_utc.hour, []).append(float(window.dbdt_rms))
+        windows_by_hour = {hour: _sorted_history(values) for hour, values in hour_buckets.items()}
+
+    def _recent_index(cutoff: datetime) -> list[float]:
+        if history_time_ordered:
+            tail = history_index[bisect_left(history_ts, cutoff):]
+            return [value for value in tail if value is not None]
+        return [
+            value
+            for ts_utc, value in zip(history_ts, history_index)
+            if value is not None and ts_utc >= cutoff
+        ]
+
     enriched: list[StationWindow] = []
     for window in windows:
         flags = list(window.quality_flags)
         if component_substituted:
             flags.append("fallback_component")
 
-        dbdt_history = [
-            float(item["dbdt_rms"])
-            for item in history_metrics
-            if item.get("dbdt_rms") is not None
-        ]
-        ulf_index_station = compute_percentile_index(
+        ulf_index_station = compute_percentile_index_sorted(
             window.dbdt_rms,
             dbdt_history,
             min_history_rows=ULF_MIN_HISTORY_ROWS,
         )
         if ulf_index_station is None:
-            ulf_index_station = compute_percentile_index(
+            ulf_index_station = compute_percentile_index_sorted(
                 window.dbdt_rms,
                 bootstrap_dbdt_history,
                 min_history_rows=ULF_BOOTSTRAP_MIN_ROWS,
@@ -519,36 +643,18 @@ def _apply_station_history(
 
         current_localtime = ulf_index_station
         if ULF_ENABLE_LOCALTIME_PERCENTILE and window.ulf_band_proxy is not None:
-            same_hour_history = [
-                float(item["dbdt_rms"])
-                for item in history_metrics
-                if item.get("dbdt_rms") is not None and item["ts_utc"].hour == window.ts_utc.hour
-            ]
-            same_hour_history.extend(
-                float(candidate.dbdt_rms)
-                for candidate in windows
-                if candidate.dbdt_rms is not None and candidate.ts_utc.hour == window.ts_utc.hour
-            )
-            hour_bucket_index = compute_percentile_index(
+            hour = window.ts_utc.hour
+            hour_bucket_index = compute_percentile_index_sorted(
                 window.dbdt_rms,
-                same_hour_history,
+                history_by_hour.get(hour, []),
+                windows_by_hour.get(hour, []),
                 min_history_rows=ULF_BOOTSTRAP_MIN_ROWS,
             )
             if hour_bucket_index is not None:
                 current_localtime = hour_bucket_index
 
-        recent_30m = [
-            float(item["ulf_index_station"])
-            for item in history_metrics
-            if item.get("ulf_index_station") is not None
-            and item["ts_utc"] >= window.ts_utc - timedelta(minutes=30)
-        ]
-        recent_90m = [
-            float(item["ulf_index_station"])
-            for item in history_metrics
-            if item.get("ulf_index_station") is not None
-            and item["ts_utc"] >= window.ts_utc - timedelta(minutes=90)
-        ]
+        recent_30m = _recent_index(window.ts_utc - timedelta(minutes=30))
+        recent_90m = _recent_index(window.ts_utc - timedelta(minutes=90))
         if ulf_index_station is not None:
             recent_30m.append(ulf_index_station)
             recent_90m.append(ulf_index_station)
@@ -569,13 +675,14 @@ def _apply_station_history(
             dbdt_trace=window.dbdt_trace,
         )
         enriched.append(enriched_window)
-        history_metrics.append(
-            {
-                "ts_utc": enriched_window.ts_utc,
-                "dbdt_rms": enriched_window.dbdt_rms,
-                "ulf_index_station": enriched_window.ulf_index_station,
-            }
-        )
+        if history_ts and enriched_window.ts_utc < history_ts[-1]:
+            history_time_ordered = False
+        history_ts.append(enriched_window.ts_utc)
+        history_index.append(enriched_window.ulf_index_station)
+        if enriched_window.dbdt_rms is not None:
+            insort(dbdt_history, enriched_window.dbdt_rms)
+            if ULF_ENABLE_LOCALTIME_PERCENTILE:
+                insort(history_by_hour.setdefault(enriched_window.ts_utc.hour, []), enriched_window.dbdt_rms)
 
     return enriched
 
@@ -605,6 +712,66 @@ def _require_derived_rows(
     )
 
 
+_STATION_COLUMNS = (
+    "station_id",
+    "ts_utc",
+    "window_seconds",
+    "component_used",
+    "component_substituted",
+    "dbdt_rms",
+    "ulf_rms_broad",
+    "ulf_band_proxy",
+    "ulf_index_station",
+    "ulf_index_localtime",
+    "persistence_30m",
+    "persistence_90m",
+    "quality_flags",
+    "source",
+)
+_CONTEXT_COLUMNS = (
+    "ts_utc",
+    "stations_used",
+    "regional_intensity",
+    "regional_coherence",
+    "regional_persistence",
+    "context_class",
+    "confidence_score",
+    "quality_flags",
+)
+
+
+def _station_record(row: StationWindow) -> tuple[Any, ...]:
+    return (
+        row.station_id,
+        row.ts_utc,
+        ULF_WINDOW_SECONDS,
+        row.component_used,
+        row.component_substituted,
+        row.dbdt_rms,
+        row.ulf_rms_broad,
+        row.ulf_band_proxy,
+        row.ulf_index_station,
+        row.ulf_index_localtime,
+        row.persistence_30m,
+        row.persistence_90m,
+        json.dumps(row.quality_flags),
+        SOURCE,
+    )
+
+
+def _context_record(row: ContextWindow) -> tuple[Any, ...]:
+    return (
+        row.ts_utc,
+        row.stations_used,
+        row.regional_intensity,
+        row.regional_coherence,
+        row.regional_persistence,
+        row.context_class,
+        row.confidence_score,
+        json.dumps(row.quality_flags),
+    )
+
+
 async def upsert_station_rows(conn: asyncpg.Connection, rows: list[StationWindow]) -> int:
     if not rows:
         return 0
@@ -644,27 +811,8 @@ async def upsert_station_rows(conn: asyncpg.Connection, rows: list[StationWindow
             quality_flags = excluded.quality_flags,
             source = excluded.source
     """
-    values = [
-        (
-            row.station_id,
-            row.ts_utc,
-            ULF_WINDOW_SECONDS,
-            row.component_used,
-            row.component_substituted,
-            row.dbdt_rms,
-            row.ulf_rms_broad,
-            row.ulf_band_proxy,
-            row.ulf_index_station,
-            row.ulf_index_localtime,
-            row.persistence_30m,
-            row.persistence_90m,
-            json.dumps(row.quality_flags),
-            SOURCE,
-        )
-        for row in rows
-    ]
     async with conn.transaction():
-        await conn.executemany(sql, values)
+        await conn.executemany(sql, [_station_record(row) for row in rows])
     return len(rows)
 
 
@@ -692,48 +840,78 @@ async def upsert_context_rows(conn: asyncpg.Connection, rows: list[ContextWindow
             confidence_score = excluded.confidence_score,
             quality_flags = excluded.quality_flags
     """
-    values = [
-        (
-            row.ts_utc,
-            row.stations_used,
-            row.regional_intensity,
-            row.regional_coherence,
-            row.regional_persistence,
-            row.context_class,
-            row.confidence_score,
-            json.dumps(row.quality_flags),
-        )
-        for row in rows
-    ]
     async with conn.transaction():
-        await conn.executemany(sql, values)
+        await conn.executemany(sql, [_context_record(row) for row in rows])
     return len(rows)
 
 
-async def _process_station(
+async def copy_upsert_rows(
     conn: asyncpg.Connection,
+    table_name: str,
+    columns: Sequence[str],
+    key_columns: Sequence[str],
+    records: Sequence[tuple[Any, ...]],
+) -> int:
+    """COPY records into a temp staging table, then merge them with one upsert."""
+    if not records:
+        return 0
+    stage = f"{table_name.replace('.', '_')}_stage"
+    column_sql = ", ".join(columns)
+    updates = ", ".join(f"{column} = excluded.{column}" for column in columns if column not in key_columns)
+    async with conn.transaction():
+        await conn.execute(f"drop table if exists pg_temp.{stage}")
+        await conn.execute(f"create temp table {stage} on commit drop as select {column_sql} from {table_name} with no data")
+        await conn.copy_records_to_table(stage, records=records, columns=list(columns))
+        await conn.execute(
+            f"insert into {table_name} ({column_sql}) select {column_sql} from {stage} "
+            f"on conflict ({', '.join(key_columns)}) do update set {updates}"
+        )
+    return len(records)
+
+
+async def _process_station(
+    pool: asyncpg.Pool,
     client: httpx.AsyncClient,
     station_id: str,
     start_utc: datetime,
     end_utc: datetime,
 ) -> list[StationWindow]:
     rows = await fetch_station_series(station_id, start_utc, end_utc, client=client)
+    component_used, component_substituted, base_windows = _station_base_windows(station_id, rows)
+    if not base_windows:
+        return []
+
+    first_ts_utc = min(window.ts_utc for window in base_windows)
+    async with pool.acquire() as conn:
+        history_rows = await load_station_history_rows(conn, station_id, first_ts_utc)
+    windows = _apply_station_history(station_id, component_substituted, base_windows, history_rows)
+    _log_station_processed(station_id, rows, windows, component_used)
+    return windows
+
+
+def _station_base_windows(
+    station_id: str,
+    rows: list[dict[str, Any]],
+) -> tuple[str | None, bool, list[StationWindow]]:
     component_used, component_substituted = choose_component(rows)
     if component_used is None:
         logger.warning("ulf station skipped station=%s reason=no_component", station_id)
-        return []
+        return None, False, []
     if component_substituted:
         logger.warning("ulf station fallback component station=%s component=%s", station_id, component_used)
 
     base_windows = build_5m_windows(rows, component_used)
     if not base_windows:
         logger.warning("ulf station skipped station=%s reason=no_windows", station_id)
-        return []
+    return component_used, component_substituted, base_windows
 
-    first_ts_utc = min(window.ts_utc for window in base_windows)
-    history_rows = await load_station_history_rows(conn, station_id, first_ts_utc)
-    windows = _apply_station_history(station_id, component_substituted, base_windows, history_rows)
 
+def _log_station_processed(
+    station_id: str,
+    rows: list[dict[str, Any]],
+    windows: list[StationWindow],
+    component_used: str | None,
+) -> None:
     low_history_count = sum(1 for window in windows if "low_history" in window.quality_flags)
     missing_count = sum(1 for window in windows if "missing_samples" in window.quality_flags)
     logger.info(
@@ -745,7 +923,32 @@ async def _process_station(
         missing_count,
         component_used,
     )
-    return windows
+
+
+async def _run_station(
+    pool: asyncpg.Pool,
+    client: httpx.AsyncClient,
+    station_id: str,
+    start_utc: datetime,
+    end_utc: datetime,
+    semaphore: asyncio.Semaphore,
+) -> tuple[list[StationWindow], float, str]:
+    """Process one station under the shared concurrency limit; never raises."""
+    async with semaphore:
+        started = time.perf_counter()
+        try:
+            windows = await asyncio.wait_for(
+                _process_station(pool, client, station_id, start_utc, end_utc),
+                timeout=ULF_STATION_TIMEOUT_SECS,
+            )
+            status = "ok"
+        except asyncio.TimeoutError:
+            windows, status = [], "timeout"
+            logger.error("ulf station timed out station=%s timeout_secs=%s", station_id, ULF_STATION_TIMEOUT_SECS)
+        except Exception as exc:
+            windows, status = [], "error"
+            logger.exception("ulf station failed station=%s error=%s", station_id, exc)
+        return windows, time.perf_counter() - started, status
 
 
 async def _run() -> None:
@@ -755,48 +958,265 @@ async def _run() -> None:
 
     timeout = httpx.Timeout(HTTP_TIMEOUT_SECS)
     headers = {"User-Agent": HTTP_USER_AGENT}
+    concurrency = min(ULF_STATION_CONCURRENCY, max(1, len(ULF_STATIONS)))
 
     logger.info(
-        "ulf ingest start stations=%s fetch_minutes=%s window_seconds=%s mode=%s",
+        "ulf ingest start stations=%s fetch_minutes=%s window_seconds=%s mode=%s concurrency=%s",
         ",".join(ULF_STATIONS),
         ULF_FETCH_MINUTES,
         ULF_WINDOW_SECONDS,
         ULF_CONTEXT_MODE,
+        concurrency,
     )
 
     station_rows: list[StationWindow] = []
     station_windows_by_station: dict[str, int] = {}
+    station_timings: list[str] = []
     async with httpx.AsyncClient(timeout=timeout, headers=headers) as client:
-        conn = await asyncpg.connect(dsn)
+        pool = await asyncpg.create_pool(dsn, min_size=1, max_size=concurrency)
         try:
-            for station_id in ULF_STATIONS:
-                try:
-                    station_windows = await _process_station(conn, client, station_id, start_utc, end_utc)
-                    station_windows_by_station[station_id] = len(station_windows)
-                    station_rows.extend(station_windows)
-                except Exception as exc:
-                    station_windows_by_station[station_id] = 0
-                    logger.exception("ulf station failed station=%s error=%s", station_id, exc)
+            semaphore = asyncio.Semaphore(concurrency)
+            results = await asyncio.gather(
+                *(
+                    _run_station(pool, client, station_id, start_utc, end_utc, semaphore)
+                    for station_id in ULF_STATIONS
+                )
+            )
+            for station_id, (station_windows, elapsed, status) in zip(ULF_STATIONS, results):
+                station_windows_by_station[station_id] = len(station_windows)
+                station_rows.extend(station_windows)
+                station_timings.append(f"{station_id}={elapsed:.2f}s:{status}")
 
+            # Stations that timed out or failed are simply absent; the rest are still written.
             context_rows = _build_context_rows(station_rows)
             _require_derived_rows(station_windows_by_station, station_rows, context_rows)
-            station_upserts = await upsert_station_rows(conn, station_rows)
-            context_upserts = await upsert_context_rows(conn, context_rows)
+            async with pool.acquire() as conn:
+                station_upserts = await upsert_station_rows(conn, station_rows)
+                context_upserts = await upsert_context_rows(conn, context_rows)
         finally:
-            await conn.close()
+            await pool.close()
 
     logger.info(
-        "ulf ingest complete station_rows=%s station_upserts=%s context_rows=%s context_upserts=%s",
+        "ulf ingest complete station_rows=%s station_upserts=%s context_rows=%s context_upserts=%s stations=%s",
         len(station_rows),
         station_upserts,
         len(context_rows),
         context_upserts,
+        ",".join(station_timings),
     )
 
 
+# The trailing 15-minute band-proxy segment reaches 10 minutes before a bucket, so
+# each backfill chunk fetches a little lead-in and keeps only its own buckets.
+_BACKFILL_LEAD = timedelta(minutes=15)
+_HISTORY_SPAN = timedelta(days=7)
+
+
+@dataclass(slots=True)
+class BackfillCheckpoint:
+    path: str | None
+    since: datetime
+    until: datetime | None
+    stations: list[str]
+
+    def _key(self) -> dict[str, Any]:
+        return {"since": self.since.isoformat(), "stations": self.stations}
+
+    def load(self) -> datetime | None:
+        """Return where a matching earlier run stopped, or None to start at `since`.
+
+        With no `until` the saved end is adopted, so a rerun without --until resumes
+        the original range instead of restarting against a later "now".
+        """
+        if not self.path or not os.path.exists(self.path):
+            return None
+        with open(self.path, encoding="utf-8") as handle:
+            payload = json.load(handle)
+        saved_until = _parse_dt(payload.get("until"))
+        matches = {key: payload.get(key) for key in ("since", "stations")} == self._key()
+        if not matches or saved_until is None or self.until not in (None, saved_until):
+            logger.warning("ulf backfill checkpoint ignored path=%s reason=range_or_stations_changed", self.path)
+            return None
+        self.until = saved_until
+        return _parse_dt(payload.get("next_start"))
+
+    def save(self, next_start: datetime) -> None:
+        if not self.path or self.until is None:
+            return
+        tmp_path = f"{self.path}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as handle:
+            json.dump({**self._key(), "until": self.until.isoformat(), "next_start": next_start.isoformat()}, handle)
+        os.replace(tmp_path, self.path)
+
+
+def _backfill_chunks(start_utc: datetime, end_utc: datetime, chunk: timedelta) -> list[tuple[datetime, datetime]]:
+    chunks: list[tuple[datetime, datetime]] = []
+    cursor = start_utc
+    while cursor < end_utc:
+        chunk_end = min(cursor + chunk, end_utc)
+        chunks.append((cursor, chunk_end))
+        cursor = chunk_end
+    return chunks
+
+
+def _history_record(window: StationWindow) -> dict[str, Any]:
+    return {"ts_utc": window.ts_utc, "dbdt_rms": window.dbdt_rms, "ulf_index_station": window.ulf_index_station}
+
+
+async def _backfill_station_chunk(
+    client: httpx.AsyncClient,
+    station_id: str,
+    chunk_start: datetime,
+    chunk_end: datetime,
+    history: list[dict[str, Any]],
+) -> list[StationWindow]:
+    rows = await fetch_station_series(station_id, chunk_start - _BACKFILL_LEAD, chunk_end, client=client)
+    component_used, component_substituted, base_windows = _station_base_windows(station_id, rows)
+    base_windows = [window for window in base_windows if chunk_start <= window.ts_utc < chunk_end]
+    if not base_windows:
+        return []
+
+    # Same 7-day slice load_station_history_rows would return once earlier chunks are written.
+    first_ts_utc = base_windows[0].ts_utc
+    history_rows = [row for row in history if first_ts_utc - _HISTORY_SPAN <= row["ts_utc"] < first_ts_utc]
+    windows = _apply_station_history(station_id, component_substituted, base_windows, history_rows)
+    _log_station_processed(station_id, rows, windows, component_used)
+    return windows
+
+
+async def _backfill(
+    since: datetime,
+    until: datetime | None,
+    *,
+    chunk_hours: int = 24,
+    checkpoint_path: str | None = None,
+) -> None:
+    """Rebuild both ULF marts for [since, until) chunk by chunk, resumable via a checkpoint file.
+
+    `until=None` resumes a checkpointed range, or ends at the current minute.
+    """
+    dsn = _resolve_dsn()
+    checkpoint = BackfillCheckpoint(checkpoint_path, since, until, list(ULF_STATIONS))
+    start_utc = checkpoint.load() or since
+    if checkpoint.until is None:
+        checkpoint.until = datetime.now(UTC).replace(second=0, microsecond=0)
+    until = checkpoint.until
+    chunks = _backfill_chunks(start_utc, until, timedelta(hours=max(1, chunk_hours)))
+    concurrency = min(ULF_STATION_CONCURRENCY, max(1, len(ULF_STATIONS)))
+
+    logger.info(
+        "ulf backfill start stations=%s since=%s until=%s resume_from=%s chunks=%s",
+        ",".join(ULF_STATIONS),
+        since.isoformat(),
+        until.isoformat(),
+        start_utc.isoformat(),
+        len(chunks),
+    )
+    if not chunks:
+        return
+
+    totals = {"station_rows": 0, "context_rows": 0}
+    timeout = httpx.Timeout(HTTP_TIMEOUT_SECS)
+    headers = {"User-Agent": HTTP_USER_AGENT}
+    async with httpx.AsyncClient(timeout=timeout, headers=headers) as client:
+        conn = await asyncpg.connect(dsn)
+        try:
+            # History is read once; afterwards each chunk's own windows become the next chunk's history.
+            history: dict[str, list[dict[str, Any]]] = {}
+            for station_id in ULF_STATIONS:
+                rows = await load_station_history_rows(conn, station_id, start_utc)
+                history[station_id] = [dict(row) for row in rows]
+
+            semaphore = asyncio.Semaphore(concurrency)
+
+            async def _station(station_id: str, chunk_start: datetime, chunk_end: datetime) -> list[StationWindow]:
+                async with semaphore:
+                    return await _backfill_station_chunk(
+                        client, station_id, chunk_start, chunk_end, history[station_id]
+                    )
+
+            for chunk_start, chunk_end in chunks:
+                started = time.perf_counter()
+                results = await asyncio.gather(
+                    *(_station(station_id, chunk_start, chunk_end) for station_id in ULF_STATIONS)
+                )
+                station_rows = [window for windows in results for window in windows]
+                context_rows = _build_context_rows(station_rows)
+                await copy_upsert_rows(
+                    conn,
+                    "marts.ulf_activity_5m",
+                    _STATION_COLUMNS,
+                    ("station_id", "ts_utc"),
+                    [_station_record(row) for row in station_rows],
+                )
+                await copy_upsert_rows(
+                    conn,
+                    "marts.ulf_context_5m",
+                    _CONTEXT_COLUMNS,
+                    ("ts_utc",),
+                    [_context_record(row) for row in context_rows],
+                )
+                checkpoint.save(chunk_end)
+
+                history_floor = chunk_end - _HISTORY_SPAN
+                for station_id, windows in zip(ULF_STATIONS, results):
+                    carried = [row for row in history[station_id] if row["ts_utc"] >= history_floor]
+                    carried.extend(_history_record(window) for window in windows)
+                    history[station_id] = carried
+
+                totals["station_rows"] += len(station_rows)
+                totals["context_rows"] += len(context_rows)
+                logger.info(
+                    "ulf backfill chunk start=%s end=%s station_rows=%s context_rows=%s elapsed=%.2fs",
+                    chunk_start.isoformat(),
+                    chunk_end.isoformat(),
+                    len(station_rows),
+                    len(context_rows),
+                    time.perf_counter() - started,
+                )
+        finally:
+            await conn.close()
+
+    logger.info(
+        "ulf backfill complete station_rows=%s context_rows=%s",
+        totals["station_rows"],
+        totals["context_rows"],
+    )
+
+
+def _parse_cli_dt(value: str) -> datetime:
+    parsed = _parse_dt(value)
+    if parsed is None:
+        raise argparse.ArgumentTypeError(f"invalid UTC date/time: {value!r}")
+    return parsed
+
+
+def main(argv: Sequence[str] | None = None) -> None:
+    parser = argparse.ArgumentParser(description="Derive ULF station and context marts from USGS geomag data.")
+    parser.add_argument("--since", type=_parse_cli_dt, help="Backfill start (UTC date or ISO timestamp, inclusive)")
+    parser.add_argument("--until", type=_parse_cli_dt, help="Backfill end (UTC date or ISO timestamp, exclusive; default now)")
+    parser.add_argument("--chunk-hours", type=int, default=24, help="Backfill chunk size in hours (default 24)")
+    parser.add_argument(
+        "--checkpoint",
+        default=os.getenv("ULF_BACKFILL_CHECKPOINT"),
+        help="JSON file recording backfill progress; a rerun with the same --since resumes from it",
+    )
+    args = parser.parse_args(argv)
+
+    if args.since is None:
+        if args.until is not None:
+            parser.error("--until requires --since")
+        asyncio.run(_run())
+        return
+
+    if args.since >= (args.until or datetime.now(UTC)):
+        parser.error("--since must be before --until")
+    asyncio.run(_backfill(args.since, args.until, chunk_hours=args.chunk_hours, checkpoint_path=args.checkpoint))
+
+
 def run() -> None:
     asyncio.run(_run())
 
 
 if __name__ == "__main__":
-    run()
+    main()
@@ -19,7 +19,7 @@ from services.forecast_outlook import (
     summarize_local_forecast_days,
 )
 from services.geo.zip_lookup import zip_to_latlon
-from services.local_signals.aggregator import assemble_for_zip
+from services.local_signals.aggregator import assemble_for_zip, batch_fetch_context
 from services.local_signals.cache import latest_for_zip, upsert_zip_payload
 
 LOG_LEVEL = os.getenv("GAIA_LOG_LEVEL", "INFO").upper()
@@ -281,13 +281,15 @@ async def run(mode: str = "both") -> dict[str, int]:
     }
     if mode == "current":
         semaphore = asyncio.Semaphore(LOCAL_CURRENT_CONCURRENCY)
-        results = await asyncio.gather(
-            *(
-                _refresh_current_location(str(row.get("zip") or "").strip(), semaphore)
-                for row in rows
-                if str(row.get("zip") or "").strip()
+        # One pooled client, cached NWS metadata, and one provider fetch per grid cell for the whole run.
+        async with batch_fetch_context():
+            results = await asyncio.gather(
+                *(
+                    _refresh_current_location(str(row.get("zip") or "").strip(), semaphore)
+                    for row in rows
+                    if str(row.get("zip") or "").strip()
+                )
             )
-        )
         stats["current_updated"] = sum(updated for updated, _, _ in results)
         stats["failures"] = sum(failures for _, failures, _ in results)
         stats["cached_fallbacks"] = sum(cached for _, _, cached in results)
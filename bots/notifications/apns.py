@@ -1,12 +1,48 @@
+"""In-process APNs sender.
+
+`ApnsClient` keeps one multiplexed HTTP/2 connection per APNs environment (prod and
+sandbox), sends many device streams concurrently over it, and signs the provider JWT
+once per refresh window instead of once per push.
+"""
+
 from __future__ import annotations
 
+import asyncio
 import base64
 import json
 import os
 import subprocess
 import tempfile
+import threading
+import time
+from dataclasses import dataclass
 from datetime import datetime, timezone
-from typing import Any, Dict
+from typing import Any, Dict, Iterable, List, Mapping
+
+try:
+    import httpx
+except ModuleNotFoundError:  # pragma: no cover - optional in minimal test environments
+    httpx = None
+
+try:
+    import h2  # noqa: F401  # required by httpx for HTTP/2
+except ModuleNotFoundError:  # pragma: no cover
+    h2 = None
+
+try:
+    from cryptography.hazmat.primitives import hashes, serialization
+    from cryptography.hazmat.primitives.asymmetric import ec
+except ModuleNotFoundError:  # pragma: no cover - falls back to the openssl CLI
+    ec = None
+
+
+APNS_HOSTS = {
+    "prod": "https://api.push.apple.com",
+    "sandbox": "https://api.sandbox.push.apple.com",
+}
+# Apple rejects tokens older than an hour and throttles refreshes more often than every 20 minutes.
+TOKEN_REFRESH_SECONDS = 50 * 60
+DEFAULT_MAX_CONCURRENCY = 100
 
 
 def _b64url(data: bytes) -> str:
@@ -49,17 +85,11 @@ def _normalized_private_key_pem(private_key: str) -> str:
     return private_key.replace("\\n", "\n").strip() + "\n"
 
 
-def create_provider_token(
-    *,
-    team_id: str,
-    key_id: str,
-    private_key_pem: str,
-    issued_at: datetime | None = None,
-) -> str:
-    now = (issued_at or datetime.now(timezone.utc)).astimezone(timezone.utc)
-    header = _b64url(json.dumps({"alg": "ES256", "kid": key_id}, separators=(",", ":")).encode("utf-8"))
-    claims = _b64url(json.dumps({"iss": team_id, "iat": int(now.timestamp())}, separators=(",", ":")).encode("utf-8"))
-    signing_input = f"{header}.{claims}".encode("ascii")
+def _sign_es256(private_key: Any, private_key_pem: str, signing_input: bytes) -> bytes:
+    if ec is not None:
+        if private_key is None:
+            private_key = load_private_key(private_key_pem)
+        return private_key.sign(signing_input, ec.ECDSA(hashes.SHA256()))
 
     key_path = None
     try:
@@ -75,8 +105,7 @@ def create_provider_token(
         if proc.returncode != 0:
             stderr = (proc.stderr or b"").decode("utf-8", errors="replace").strip()
             raise RuntimeError(f"openssl signing failed: {stderr or 'unknown error'}")
-        signature = _der_to_raw_ecdsa_sig(proc.stdout)
-        return f"{header}.{claims}.{_b64url(signature)}"
+        return proc.stdout
     finally:
         if key_path:
             try:
@@ -85,65 +114,202 @@ def create_provider_token(
                 pass
 
 
-def send_apns_notification(
+def load_private_key(private_key_pem: str) -> Any:
+    """Parse the .p8 key once; returns None when `cryptography` is not installed."""
+    if ec is None:
+        return None
+    return serialization.load_pem_private_key(_normalized_private_key_pem(private_key_pem).encode("utf-8"), password=None)
+
+
+def create_provider_token(
     *,
-    device_token: str,
-    body: Dict[str, Any],
-    auth_token: str,
-    topic: str,
-    sandbox: bool = False,
-    collapse_id: str | None = None,
-) -> Dict[str, Any]:
-    host = "api.sandbox.push.apple.com" if sandbox else "api.push.apple.com"
-    url = f"https://{host}/3/device/{device_token}"
-    payload = json.dumps(body, separators=(",", ":"), ensure_ascii=False).encode("utf-8")
-
-    cmd = [
-        "curl",
-        "--silent",
-        "--show-error",
-        "--http2",
-        "--output",
-        "-",
-        "--write-out",
-        "\n%{http_code}",
-        "--header",
-        f"authorization: bearer {auth_token}",
-        "--header",
-        f"apns-topic: {topic}",
-        "--header",
-        "apns-push-type: alert",
-        "--header",
-        "apns-priority: 10",
-        "--header",
-        "content-type: application/json",
-        "--data-binary",
-        "@-",
-        url,
-    ]
-    if collapse_id:
-        cmd.extend(["--header", f"apns-collapse-id: {collapse_id[:64]}"])
-
-    proc = subprocess.run(cmd, input=payload, capture_output=True, check=False)
-    stdout = (proc.stdout or b"").decode("utf-8", errors="replace")
-    stderr = (proc.stderr or b"").decode("utf-8", errors="replace").strip()
-    body_text, _, status_text = stdout.rpartition("\n")
+    team_id: str,
+    key_id: str,
+    private_key_pem: str,
+    issued_at: datetime | None = None,
+    private_key: Any = None,
+) -> str:
+    now = (issued_at or datetime.now(timezone.utc)).astimezone(timezone.utc)
+    header = _b64url(json.dumps({"alg": "ES256", "kid": key_id}, separators=(",", ":")).encode("utf-8"))
+    claims = _b64url(json.dumps({"iss": team_id, "iat": int(now.timestamp())}, separators=(",", ":")).encode("utf-8"))
+    signing_input = f"{header}.{claims}".encode("ascii")
+    signature = _der_to_raw_ecdsa_sig(_sign_es256(private_key, private_key_pem, signing_input))
+    return f"{header}.{claims}.{_b64url(signature)}"
+
+
+class ProviderToken:
+    """Signs the APNs provider JWT and reuses it until `refresh_seconds` have passed."""
+
+    def __init__(
+        self,
+        *,
+        team_id: str,
+        key_id: str,
+        private_key_pem: str,
+        refresh_seconds: float = TOKEN_REFRESH_SECONDS,
+        clock=time.time,
+    ) -> None:
+        self.team_id = team_id
+        self.key_id = key_id
+        self._private_key_pem = private_key_pem
+        self._private_key = load_private_key(private_key_pem)
+        self.refresh_seconds = refresh_seconds
+        self._clock = clock
+        self._lock = threading.Lock()
+        self._token: str | None = None
+        self._issued_at = 0.0
+        self.signed = 0
+
+    def get(self) -> str:
+        with self._lock:
+            now = self._clock()
+            if self._token is None or now - self._issued_at >= self.refresh_seconds:
+                self._token = create_provider_token(
+                    team_id=self.team_id,
+                    key_id=self.key_id,
+                    private_key_pem=self._private_key_pem,
+                    issued_at=datetime.fromtimestamp(now, timezone.utc),
+                    private_key=self._private_key,
+                )
+                self._issued_at = now
+                self.signed += 1
+            return self._token
+
+    def invalidate(self, token: str) -> None:
+        """Drop `token` if it is still the cached one (APNs reported it expired)."""
+        with self._lock:
+            if self._token == token:
+                self._token = None
+
+
+@dataclass(frozen=True)
+class ApnsMessage:
+    device_token: str
+    body: Dict[str, Any]
+    sandbox: bool = False
+    collapse_id: str | None = None
+
+
+class ApnsClient:
+    """Concurrent APNs sender over one HTTP/2 connection per environment.
+
+    Use as an async context manager. `hosts` overrides the APNs base URLs (for a
+    local stand-in server); plain `http://` hosts are spoken as HTTP/2 with prior knowledge.
+    """
+
+    def __init__(
+        self,
+        *,
+        provider_token: ProviderToken,
+        topic: str,
+        max_concurrency: int = DEFAULT_MAX_CONCURRENCY,
+        timeout: float = 10.0,
+        hosts: Mapping[str, str] | None = None,
+    ) -> None:
+        if httpx is None or h2 is None:
+            raise RuntimeError("APNs client requires httpx with HTTP/2 support (pip install 'httpx[http2]')")
+        self.provider_token = provider_token
+        self.topic = topic
+        self.max_concurrency = max(1, max_concurrency)
+        self.timeout = timeout
+        self.hosts = dict(hosts or APNS_HOSTS)
+        self._clients: Dict[str, Any] = {}
+        self._semaphore: asyncio.Semaphore | None = None
+
+    @classmethod
+    def from_environment(cls, **kwargs: Any) -> "ApnsClient":
+        missing = [
+            name
+            for name in ("APNS_TEAM_ID", "APNS_KEY_ID", "APNS_BUNDLE_ID", "APNS_PRIVATE_KEY")
+            if not os.getenv(name, "").strip()
+        ]
+        if missing:
+            raise RuntimeError("missing_apns_env:" + ",".join(missing))
+        kwargs.setdefault("max_concurrency", int(os.getenv("APNS_MAX_CONCURRENCY", str(DEFAULT_MAX_CONCURRENCY))))
+        return cls(
+            provider_token=ProviderToken(
+                team_id=os.environ["APNS_TEAM_ID"].strip(),
+                key_id=os.environ["APNS_KEY_ID"].strip(),
+                private_key_pem=os.environ["APNS_PRIVATE_KEY"].strip(),
+            ),
+            topic=os.environ["APNS_BUNDLE_ID"].strip(),
+            **kwargs,
+        )
+
+    async def __aenter__(self) -> "ApnsClient":
+        return self
+
+    async def __aexit__(self, *exc: Any) -> None:
+        await self.aclose()
+
+    async def aclose(self) -> None:
+        clients, self._clients = self._clients, {}
+        for client in clients.values():
+            await client.aclose()
+
+    def _client(self, environment: str) -> Any:
+        client = self._clients.get(environment)
+        if client is None:
+            client = httpx.AsyncClient(
+                base_url=self.hosts[environment],
+                http1=False,
+                http2=True,
+                timeout=self.timeout,
+                limits=httpx.Limits(max_connections=1, max_keepalive_connections=1),
+            )
+            self._clients[environment] = client
+        return client
+
+    async def _post(self, message: ApnsMessage, auth_token: str) -> Any:
+        headers = {
+            "authorization": f"bearer {auth_token}",
+            "apns-topic": self.topic,
+            "apns-push-type": "alert",
+            "apns-priority": "10",
+            "content-type": "application/json",
+        }
+        if message.collapse_id:
+            headers["apns-collapse-id"] = message.collapse_id[:64]
+        payload = json.dumps(message.body, separators=(",", ":"), ensure_ascii=False).encode("utf-8")
+        client = self._client("sandbox" if message.sandbox else "prod")
+        return await client.post(f"/3/device/{message.device_token}", content=payload, headers=headers)
+
+    async def send(self, message: ApnsMessage) -> Dict[str, Any]:
+        """Send one push; never raises. Retries once when APNs reports an expired provider token."""
+        if self._semaphore is None:
+            self._semaphore = asyncio.Semaphore(self.max_concurrency)
+        async with self._semaphore:
+            try:
+                auth_token = self.provider_token.get()
+                response = await self._post(message, auth_token)
+                if response.status_code == 403 and _reason(response) == "ExpiredProviderToken":
+                    self.provider_token.invalidate(auth_token)
+                    response = await self._post(message, self.provider_token.get())
+            except Exception as exc:
+                return {"ok": False, "status_code": 0, "body": {}, "raw_body": "", "error": str(exc) or type(exc).__name__}
+
+        raw_body = response.text.strip()
+        parsed: Dict[str, Any] = {}
+        if raw_body:
+            try:
+                parsed = json.loads(raw_body)
+            except Exception:
+                parsed = {"raw": raw_body}
+        return {
+            "ok": response.status_code == 200,
+            "status_code": response.status_code,
+            "body": parsed,
+            "raw_body": raw_body,
+            "apns_id": response.headers.get("apns-id"),
+        }
+
+    async def send_many(self, messages: Iterable[ApnsMessage]) -> List[Dict[str, Any]]:
+        """Send all messages concurrently; results are in input order."""
+        return list(await asyncio.gather(*(self.send(message) for message in messages)))
+
+
+def _reason(response: Any) -> str:
     try:
-        status_code = int(status_text.strip())
+        return str((response.json() or {}).get("reason") or "")
     except Exception:
-        status_code = 0
-
-    parsed: Dict[str, Any] = {}
-    if body_text.strip():
-        try:
-            parsed = json.loads(body_text)
-        except Exception:
-            parsed = {"raw": body_text.strip()}
-
-    return {
-        "ok": proc.returncode == 0 and status_code == 200,
-        "status_code": status_code,
-        "body": parsed,
-        "raw_body": body_text.strip(),
-        "stderr": stderr,
-    }
+        return ""
@@ -5,13 +5,16 @@ import argparse
 import json
 import logging
 import os
+import time
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
 from datetime import date, datetime, timedelta, timezone
 from typing import Any, Dict, Iterable, List, Optional
 
 from bots.definitions.load_definition_base import load_definition_base
-from bots.gauges.gauge_scorer import fetch_user_tags
-from bots.gauges.local_payload import get_local_payload
-from bots.gauges.signal_resolver import resolve_signals
+from bots.gauges.gauge_scorer import fetch_user_tags, fetch_user_tags_for_users
+from bots.gauges.local_payload import get_local_payload, get_local_payloads
+from bots.gauges.signal_resolver import fetch_global_signal_context, resolve_signals
 from bots.notifications.push_logic import (
     NotificationCandidate,
     allows_severity,
@@ -38,6 +41,7 @@ LOG_LEVEL = os.getenv("GAIA_LOG_LEVEL", "INFO").upper()
 logging.basicConfig(level=LOG_LEVEL)
 logger = logging.getLogger(__name__)
 
+DEFAULT_WORKERS = min(8, max(1, int(os.getenv("PUSH_EVAL_WORKERS", "4"))))
 _SIGNAL_FAMILIES = {"geomagnetic", "solar_wind", "flare_cme_sep", "schumann"}
 _LOCAL_FAMILIES = {"pressure", "aqi", "temp"}
 _GAUGE_FAMILIES = {"pain", "energy", "sleep", "heart", "health_status"}
@@ -371,7 +375,11 @@ def _fetch_gauge_deltas(user_id: str, day: date) -> Dict[str, int]:
         user_id,
         day,
     )
-    payload = _normalize_json_map((row or {}).get("deltas_json"))
+    return _gauge_deltas_from_json((row or {}).get("deltas_json"))
+
+
+def _gauge_deltas_from_json(raw: Any) -> Dict[str, int]:
+    payload = _normalize_json_map(raw)
     deltas: Dict[str, int] = {}
     for key in _GAUGE_FAMILIES:
         try:
@@ -381,6 +389,39 @@ def _fetch_gauge_deltas(user_id: str, day: date) -> Dict[str, int]:
     return deltas
 
 
+def _fetch_gauges_rows(user_ids: List[str], day: date) -> Dict[str, Dict[str, Any]]:
+    rows = pg.fetch(
+        """
+        select distinct on (user_id)
+               user_id, day, pain, energy, sleep, heart, health_status
+          from marts.user_gauges_day
+         where user_id = any(%s::uuid[])
+           and day <= %s
+         order by user_id, day desc
+        """,
+        user_ids,
+        day,
+    )
+    return {str(row["user_id"]): {k: v for k, v in row.items() if k != "user_id"} for row in rows}
+
+
+def _fetch_gauge_deltas_for_users(user_ids: List[str], day: date) -> Dict[str, Dict[str, int]]:
+    rows = pg.fetch(
+        """
+        select distinct on (user_id)
+               user_id, deltas_json
+          from marts.user_gauges_delta_day
+         where user_id = any(%s::uuid[])
+           and day <= %s
+         order by user_id, day desc
+        """,
+        user_ids,
+        day,
+    )
+    by_user = {str(row["user_id"]): row.get("deltas_json") for row in rows}
+    return {uid: _gauge_deltas_from_json(by_user.get(uid)) for uid in user_ids}
+
+
 def _family_allowed(preferences: Dict[str, Any], family: str, severity: str) -> bool:
     if not preferences.get("enabled"):
         return False
@@ -478,6 +519,30 @@ def _latest_events_by_family(user_id: str) -> Dict[str, Dict[str, Any]]:
     return {str(row.get("family") or ""): row for row in rows if row.get("family")}
 
 
+def _latest_events_for_users(user_ids: List[str]) -> Dict[str, Dict[str, Dict[str, Any]]]:
+    rows = pg.fetch(
+        """
+        select distinct on (user_id, family)
+               user_id,
+               family,
+               severity,
+               status,
+               created_at,
+               event_key
+          from content.push_notification_events
+         where user_id = any(%s::uuid[])
+           and status in ('queued', 'sent', 'skipped')
+         order by user_id, family, created_at desc
+        """,
+        user_ids,
+    )
+    out: Dict[str, Dict[str, Dict[str, Any]]] = {}
+    for row in rows:
+        if row.get("family"):
+            out.setdefault(str(row["user_id"]), {})[str(row["family"])] = row
+    return out
+
+
 def _signal_context(active_states: Iterable[Dict[str, Any]]) -> Dict[str, bool]:
     keys = {str(item.get("signal_key") or "").strip() for item in active_states if item.get("signal_key")}
     pressure_active = bool(keys & _PRESSURE_SIGNAL_KEYS)
@@ -888,13 +953,17 @@ def _build_local_candidates(local_payload: Dict[str, Any]) -> List[NotificationC
     return out
 
 
-def _feedback_prompt_rows(user_id: str, prompt_type: str) -> List[Dict[str, Any]]:
-    extra_filters = ""
+def _prompt_type_filters(prompt_type: str) -> str:
     if prompt_type == "symptom_follow_up":
-        extra_filters = """
+        return """
            and delivered_at is null
            and coalesce(snoozed_until, scheduled_for) >= now() - interval '7 days'
         """
+    return ""
+
+
+def _feedback_prompt_rows(user_id: str, prompt_type: str) -> List[Dict[str, Any]]:
+    extra_filters = _prompt_type_filters(prompt_type)
     return pg.fetch(
         f"""
         select id,
@@ -922,6 +991,48 @@ def _feedback_prompt_rows(user_id: str, prompt_type: str) -> List[Dict[str, Any]
     )
 
 
+def _feedback_prompt_rows_for_users(user_ids: List[str], prompt_type: str) -> Dict[str, List[Dict[str, Any]]]:
+    """_feedback_prompt_rows for a cohort: the first four due prompts per user."""
+    extra_filters = _prompt_type_filters(prompt_type)
+    rows = pg.fetch(
+        f"""
+        select *
+          from (
+            select user_id,
+                   id,
+                   episode_id,
+                   symptom_code,
+                   prompt_day,
+                   question_text,
+                   prompt_payload,
+                   status,
+                   scheduled_for,
+                   delivered_at,
+                   push_delivery_enabled,
+                   row_number() over (
+                     partition by user_id
+                     order by coalesce(snoozed_until, scheduled_for) asc, created_at asc
+                   ) as rn
+              from raw.user_feedback_prompts
+             where user_id = any(%s::uuid[])
+               and prompt_type = %s
+               and status in ('pending', 'snoozed')
+               and push_delivery_enabled = true
+               {extra_filters}
+               and coalesce(snoozed_until, scheduled_for) <= now()
+          ) ranked
+         where rn <= 4
+         order by user_id, rn
+        """,
+        user_ids,
+        prompt_type,
+    )
+    out: Dict[str, List[Dict[str, Any]]] = {}
+    for row in rows:
+        out.setdefault(str(row["user_id"]), []).append(row)
+    return out
+
+
 def _feedback_payload_value(row: Dict[str, Any], key: str, fallback: Any = None) -> Any:
     payload = _normalize_json_map(row.get("prompt_payload"))
     if key in payload:
@@ -944,11 +1055,20 @@ def _symptom_followup_push_candidate_is_fresh(row: Dict[str, Any], now_utc: date
     return scheduled_for >= now_utc - _SYMPTOM_FOLLOWUP_PUSH_MAX_AGE
 
 
-def _build_prompt_candidates(user_id: str) -> List[NotificationCandidate]:
+def _build_prompt_candidates(
+    user_id: str,
+    prompt_rows: Optional[Dict[str, List[Dict[str, Any]]]] = None,
+) -> List[NotificationCandidate]:
+    """Prompt pushes for a user; `prompt_rows` (prompt_type -> rows) skips the per-user reads."""
     candidates: List[NotificationCandidate] = []
     now_utc = utc_now()
 
-    for row in _feedback_prompt_rows(user_id, "symptom_follow_up"):
+    def _rows(prompt_type: str) -> List[Dict[str, Any]]:
+        if prompt_rows is not None:
+            return prompt_rows.get(prompt_type) or []
+        return _feedback_prompt_rows(user_id, prompt_type)
+
+    for row in _rows("symptom_follow_up"):
         if not _symptom_followup_push_candidate_is_fresh(row, now_utc):
             continue
         prompt_id = str(row.get("id") or "")
@@ -977,7 +1097,7 @@ def _build_prompt_candidates(user_id: str) -> List[NotificationCandidate]:
             )
         )
 
-    for row in _feedback_prompt_rows(user_id, "daily_check_in"):
+    for row in _rows("daily_check_in"):
         prompt_id = str(row.get("id") or "")
         prompt_day = str(row.get("prompt_day") or "")
         phase = str(_feedback_payload_value(row, "phase", "") or "")
@@ -1146,21 +1266,82 @@ def _collapse_candidates_by_family(candidates: Iterable[NotificationCandidate])
     return list(chosen.values())
 
 
-def _build_candidates_for_user(user_id: str, day: date, preferences: Dict[str, Any]) -> List[NotificationCandidate]:
-    definition, _ = load_definition_base()
-    local_payload = get_local_payload(user_id, day)
-    active_states = resolve_signals(user_id, day, local_payload=local_payload, definition=definition)
-    active_states = active_states if isinstance(active_states, list) else []
+@dataclass
+class CohortContext:
+    """Evaluation inputs for a whole run, loaded once with set-based queries."""
 
-    space_daily = _fetch_space_weather_daily(day)
-    cme_row = _fetch_next_cme_arrival(utc_now())
-    sep_row = _fetch_latest_sep()
-    gauges_row = _fetch_gauges_row(user_id, day)
-    deltas = _fetch_gauge_deltas(user_id, day)
+    day: date
+    space_daily: Dict[str, Any]
+    cme_row: Dict[str, Any]
+    sep_row: Dict[str, Any]
+    local_payloads: Dict[str, Dict[str, Any]] = field(default_factory=dict)
+    active_states: Dict[str, List[Dict[str, Any]]] = field(default_factory=dict)
+    gauges_rows: Dict[str, Dict[str, Any]] = field(default_factory=dict)
+    deltas: Dict[str, Dict[str, int]] = field(default_factory=dict)
+    profiles: Dict[str, Any] = field(default_factory=dict)
+    latest_events: Dict[str, Dict[str, Dict[str, Any]]] = field(default_factory=dict)
+    prompt_rows: Dict[str, Dict[str, List[Dict[str, Any]]]] = field(default_factory=dict)
 
-    tags = fetch_user_tags(user_id)
-    profile = build_personalization_profile(tags)
 
+def load_cohort_context(user_ids: Iterable[str], day: date) -> CohortContext:
+    """Global rows once, per-user rows in one query per input, signals once per ZIP."""
+    ids = sorted({str(uid) for uid in user_ids if uid})
+    definition, _ = load_definition_base()
+    context = CohortContext(
+        day=day,
+        space_daily=_fetch_space_weather_daily(day),
+        cme_row=_fetch_next_cme_arrival(utc_now()),
+        sep_row=_fetch_latest_sep(),
+    )
+    if not ids:
+        return context
+
+    global_context = fetch_global_signal_context(day, definition=definition)
+    states_by_payload: Dict[Any, List[Dict[str, Any]]] = {}
+    for uid, (zip_code, local_payload) in get_local_payloads(ids, day).items():
+        context.local_payloads[uid] = local_payload or {}
+        # Users on the same ZIP share the cached payload, so they resolve to the same states.
+        payload_key = zip_code if zip_code is not None else (("user", uid) if local_payload else None)
+        if payload_key not in states_by_payload:
+            states = resolve_signals(
+                uid,
+                day,
+                local_payload=local_payload or {},
+                definition=definition,
+                global_context=global_context,
+            )
+            states_by_payload[payload_key] = states if isinstance(states, list) else []
+        context.active_states[uid] = states_by_payload[payload_key]
+
+    context.gauges_rows = _fetch_gauges_rows(ids, day)
+    context.deltas = _fetch_gauge_deltas_for_users(ids, day)
+    tags_by_user = fetch_user_tags_for_users(ids)
+    context.profiles = {uid: build_personalization_profile(tags_by_user.get(uid, [])) for uid in ids}
+    context.latest_events = _latest_events_for_users(ids)
+    for prompt_type in ("symptom_follow_up", "daily_check_in"):
+        for uid, rows in _feedback_prompt_rows_for_users(ids, prompt_type).items():
+            context.prompt_rows.setdefault(uid, {})[prompt_type] = rows
+    logger.info(
+        "[push-eval] cohort users=%d signal_payloads=%d",
+        len(ids),
+        len(states_by_payload),
+    )
+    return context
+
+
+def _assemble_candidates(
+    *,
+    preferences: Dict[str, Any],
+    space_daily: Dict[str, Any],
+    cme_row: Dict[str, Any],
+    sep_row: Dict[str, Any],
+    active_states: List[Dict[str, Any]],
+    local_payload: Optional[Dict[str, Any]],
+    gauges_row: Dict[str, Any],
+    deltas: Dict[str, int],
+    profile,
+    prompt_candidates: List[NotificationCandidate],
+) -> List[NotificationCandidate]:
     local_data = _normalize_local_payload(local_payload)
     local_asof = local_data.get("asof") or local_data.get("as_of")
     gauge_day = gauges_row.get("day")
@@ -1186,14 +1367,61 @@ def _build_candidates_for_user(user_id: str, day: date, preferences: Dict[str, A
             asof=local_asof or gauge_asof,
         )
     )
-    candidates.extend(_build_prompt_candidates(user_id))
+    candidates.extend(prompt_candidates)
     return _collapse_candidates_by_family(candidates)
 
 
-def evaluate_user_notifications(user_id: str, day: date, preferences: Dict[str, Any]) -> Dict[str, int]:
+def _build_candidates_for_user(
+    user_id: str,
+    day: date,
+    preferences: Dict[str, Any],
+    cohort: Optional[CohortContext] = None,
+) -> List[NotificationCandidate]:
+    if cohort is not None:
+        return _assemble_candidates(
+            preferences=preferences,
+            space_daily=cohort.space_daily,
+            cme_row=cohort.cme_row,
+            sep_row=cohort.sep_row,
+            active_states=cohort.active_states.get(user_id, []),
+            local_payload=cohort.local_payloads.get(user_id),
+            gauges_row=cohort.gauges_rows.get(user_id, {}),
+            deltas=cohort.deltas.get(user_id) or _gauge_deltas_from_json(None),
+            profile=cohort.profiles.get(user_id) or build_personalization_profile([]),
+            prompt_candidates=_build_prompt_candidates(user_id, cohort.prompt_rows.get(user_id, {})),
+        )
+
+    definition, _ = load_definition_base()
+    local_payload = get_local_payload(user_id, day)
+    active_states = resolve_signals(user_id, day, local_payload=local_payload, definition=definition)
+    active_states = active_states if isinstance(active_states, list) else []
+
+    return _assemble_candidates(
+        preferences=preferences,
+        space_daily=_fetch_space_weather_daily(day),
+        cme_row=_fetch_next_cme_arrival(utc_now()),
+        sep_row=_fetch_latest_sep(),
+        active_states=active_states,
+        local_payload=local_payload,
+        gauges_row=_fetch_gauges_row(user_id, day),
+        deltas=_fetch_gauge_deltas(user_id, day),
+        profile=build_personalization_profile(fetch_user_tags(user_id)),
+        prompt_candidates=_build_prompt_candidates(user_id),
+    )
+
+
+def evaluate_user_notifications(
+    user_id: str,
+    day: date,
+    preferences: Dict[str, Any],
+    cohort: Optional[CohortContext] = None,
+) -> Dict[str, int]:
     now_utc = utc_now()
-    candidates = _build_candidates_for_user(user_id, day, preferences)
-    latest_events = _latest_events_by_family(user_id)
+    candidates = _build_candidates_for_user(user_id, day, preferences, cohort)
+    if cohort is not None:
+        latest_events = dict(cohort.latest_events.get(user_id, {}))
+    else:
+        latest_events = _latest_events_by_family(user_id)
     deliverable_candidates: List[NotificationCandidate] = []
     queued = 0
     skipped = 0
@@ -1327,17 +1555,81 @@ def _iter_user_rows(rows: Iterable[Dict[str, Any]], limit: int | None) -> Iterab
             break
 
 
+def evaluate_cohort(
+    user_rows: Iterable[Dict[str, Any]],
+    day: date,
+    *,
+    workers: int = DEFAULT_WORKERS,
+) -> Dict[str, int]:
+    """Evaluate every user against one CohortContext, `workers` users at a time."""
+    users = [
+        (str(row.get("user_id") or "").strip(), normalize_preferences(row))
+        for row in user_rows
+        if str(row.get("user_id") or "").strip()
+    ]
+    totals = {"users": len(users), "queued": 0, "skipped": 0, "failed": 0}
+    if not users:
+        return totals
+    cohort = load_cohort_context([user_id for user_id, _ in users], day)
+
+    def _evaluate(item):
+        user_id, preferences = item
+        try:
+            return user_id, evaluate_user_notifications(user_id, day, preferences, cohort), None
+        except Exception as exc:
+            logger.exception("[push-eval] user=%s failed: %s", user_id, exc)
+            return user_id, None, exc
+
+    worker_count = max(1, min(workers, len(users)))
+    with ThreadPoolExecutor(max_workers=worker_count, thread_name_prefix="push-eval") as executor:
+        for user_id, result, error in executor.map(_evaluate, users):
+            if error is not None:
+                totals["failed"] += 1
+                continue
+            totals["queued"] += result["queued"]
+            totals["skipped"] += result["skipped"]
+            logger.info(
+                "[push-eval] user=%s queued=%d skipped=%d candidates=%d",
+                user_id,
+                result["queued"],
+                result["skipped"],
+                result["candidates"],
+            )
+    return totals
+
+
 def main() -> None:
     parser = argparse.ArgumentParser(description="Evaluate push notification candidates for Gaia Eyes users.")
     parser.add_argument("--day", default=_today_utc(), help="Day in YYYY-MM-DD (UTC).")
     parser.add_argument("--user-id", default=None, help="Optional single user_id override.")
     parser.add_argument("--limit", type=int, default=None, help="Limit number of users processed.")
+    parser.add_argument("--workers", type=int, default=DEFAULT_WORKERS, help="Users evaluated concurrently.")
+    parser.add_argument(
+        "--per-user",
+        action="store_true",
+        help="Load every input per user, sequentially, instead of one cohort prefetch.",
+    )
     args = parser.parse_args()
 
     day = _coerce_day(args.day)
     user_rows = _fetch_notification_users(limit=args.limit, user_id=args.user_id)
     logger.info("[push-eval] users=%d day=%s", len(user_rows), day.isoformat())
 
+    if not args.per_user:
+        started = time.perf_counter()
+        totals = evaluate_cohort(_iter_user_rows(user_rows, args.limit), day, workers=max(1, min(8, args.workers)))
+        elapsed = time.perf_counter() - started
+        logger.info(
+            "[push-eval] done users=%d queued=%d skipped=%d failed=%d elapsed=%.2fs rate=%.1f users/s",
+            totals["users"],
+            totals["queued"],
+            totals["skipped"],
+            totals["failed"],
+            elapsed,
+            totals["users"] / elapsed if elapsed > 0 else 0.0,
+        )
+        return
+
     total_queued = 0
     total_skipped = 0
     for row in _iter_user_rows(user_rows, args.limit):
@@ -1,21 +1,66 @@
 from __future__ import annotations
 
+import asyncio
 import json
 import os
-from typing import Any, Dict
+import threading
+from dataclasses import dataclass
+from datetime import datetime, timedelta, timezone
+from typing import Any, Dict, Iterable, List
 
 import requests
 from google.auth.transport.requests import Request
 from google.oauth2 import service_account
 
+try:
+    import httpx
+except ModuleNotFoundError:  # pragma: no cover - optional in minimal test environments
+    httpx = None
+
+try:
+    import h2  # noqa: F401  # lets httpx speak HTTP/2 to FCM
+except ModuleNotFoundError:  # pragma: no cover
+    h2 = None
+
 
 _FCM_SCOPE = "https://www.googleapis.com/auth/firebase.messaging"
+_FCM_URL = "https://fcm.googleapis.com/v1/projects/{project_id}/messages:send"
+# Refresh the OAuth access token this long before Google says it expires.
+TOKEN_REFRESH_MARGIN = timedelta(minutes=5)
+DEFAULT_MAX_CONCURRENCY = 32
+
+
+def _utcnow() -> datetime:
+    # google-auth reports `expiry` as naive UTC.
+    return datetime.now(timezone.utc).replace(tzinfo=None)
+
+
+@dataclass(frozen=True)
+class FcmMessage:
+    device_token: str
+    title: str
+    body: str
+    data: Dict[str, Any]
 
 
 class FcmClient:
-    def __init__(self, project_id: str, credentials) -> None:
+    def __init__(
+        self,
+        project_id: str,
+        credentials,
+        *,
+        max_concurrency: int = DEFAULT_MAX_CONCURRENCY,
+        clock=_utcnow,
+        transport: Any = None,
+    ) -> None:
         self.project_id = project_id
         self.credentials = credentials
+        self.max_concurrency = max(1, max_concurrency)
+        self._clock = clock
+        self._transport = transport
+        self._token_lock = threading.Lock()
+        self._session: requests.Session | None = None
+        self.token_refreshes = 0
 
     @classmethod
     def from_environment(cls) -> "FcmClient":
@@ -30,44 +75,105 @@ class FcmClient:
             info,
             scopes=[_FCM_SCOPE],
         )
-        return cls(project_id=project_id, credentials=credentials)
+        max_concurrency = int(os.getenv("FCM_MAX_CONCURRENCY", str(DEFAULT_MAX_CONCURRENCY)))
+        return cls(project_id=project_id, credentials=credentials, max_concurrency=max_concurrency)
 
-    def send(
-        self,
-        *,
-        device_token: str,
-        title: str,
-        body: str,
-        data: Dict[str, Any],
-    ) -> Dict[str, Any]:
-        self.credentials.refresh(Request())
-        response = requests.post(
-            f"https://fcm.googleapis.com/v1/projects/{self.project_id}/messages:send",
-            headers={
-                "Authorization": f"Bearer {self.credentials.token}",
+    def _needs_refresh(self, stale: str | None) -> bool:
+        token = self.credentials.token
+        expiry = getattr(self.credentials, "expiry", None)
+        return not token or token == stale or (expiry is not None and self._clock() >= expiry - TOKEN_REFRESH_MARGIN)
+
+    def access_token(self, *, stale: str | None = None) -> str:
+        """OAuth token for FCM, refreshed only when missing, close to expiry, or equal to `stale`."""
+        with self._token_lock:
+            if self._needs_refresh(stale):
+                self.credentials.refresh(Request())
+                self.token_refreshes += 1
+            return self.credentials.token
+
+    async def _access_token_async(self, stale: str | None = None) -> str:
+        if not self._needs_refresh(stale):
+            return self.credentials.token
+        return await asyncio.to_thread(self.access_token, stale=stale)
+
+    @property
+    def session(self) -> requests.Session:
+        if self._session is None:
+            session = requests.Session()
+            adapter = requests.adapters.HTTPAdapter(pool_maxsize=self.max_concurrency)
+            session.mount("https://", adapter)
+            self._session = session
+        return self._session
+
+    def _request(self, message: FcmMessage, access_token: str) -> Dict[str, Any]:
+        return {
+            "url": _FCM_URL.format(project_id=self.project_id),
+            "headers": {
+                "Authorization": f"Bearer {access_token}",
                 "Content-Type": "application/json; UTF-8",
             },
-            json={
+            "json": {
                 "message": {
-                    "token": device_token,
+                    "token": message.device_token,
                     "data": {
-                        "title": title,
-                        "body": body,
-                        **{str(key): str(value) for key, value in data.items() if value is not None},
+                        "title": message.title,
+                        "body": message.body,
+                        **{str(key): str(value) for key, value in message.data.items() if value is not None},
                     },
                     "android": {"priority": "high"},
                 }
             },
-            timeout=20,
-        )
-        raw_body = response.text
-        try:
-            parsed = response.json()
-        except ValueError:
-            parsed = {}
-        return {
-            "ok": response.ok,
-            "status_code": response.status_code,
-            "body": parsed,
-            "raw_body": raw_body,
         }
+
+    def send(
+        self,
+        *,
+        device_token: str,
+        title: str,
+        body: str,
+        data: Dict[str, Any],
+    ) -> Dict[str, Any]:
+        message = FcmMessage(device_token=device_token, title=title, body=body, data=data)
+        response = self.session.post(**self._request(message, self.access_token()), timeout=20)
+        return _result(response.status_code, response.text)
+
+    async def send_many(self, messages: Iterable[FcmMessage]) -> List[Dict[str, Any]]:
+        """Send messages over one pooled async client, at most `max_concurrency` at a time.
+
+        Results are per message, in input order; transport errors become `ok=False` results.
+        """
+        messages = list(messages)
+        if not messages:
+            return []
+        semaphore = asyncio.Semaphore(self.max_concurrency)
+        limits = httpx.Limits(max_connections=self.max_concurrency, max_keepalive_connections=self.max_concurrency)
+        async with httpx.AsyncClient(
+            http2=h2 is not None, limits=limits, timeout=20, transport=self._transport
+        ) as client:
+
+            async def _one(message: FcmMessage) -> Dict[str, Any]:
+                async with semaphore:
+                    try:
+                        access_token = await self._access_token_async()
+                        response = await client.post(**self._request(message, access_token))
+                        if response.status_code == 401:
+                            access_token = await self._access_token_async(stale=access_token)
+                            response = await client.post(**self._request(message, access_token))
+                    except Exception as exc:
+                        return {"ok": False, "status_code": 0, "body": {}, "raw_body": "", "error": str(exc) or type(exc).__name__}
+                return _result(response.status_code, response.text)
+
+            return list(await asyncio.gather(*(_one(message) for message in messages)))
+
+
+def _result(status_code: int, raw_body: str) -> Dict[str, Any]:
+    try:
+        parsed = json.loads(raw_body) if raw_body else {}
+    except ValueError:
+        parsed = {}
+    return {
+        "ok": 200 <= status_code < 300,
+        "status_code": status_code,
+        "body": parsed,
+        "raw_body": raw_body,
+    }
@@ -2,14 +2,17 @@
 from __future__ import annotations
 
 import argparse
+import asyncio
 import json
 import logging
 import os
+import time
+from dataclasses import dataclass, field
 from datetime import datetime, timezone
-from typing import Any, Dict, Iterable, List
+from typing import Any, Collection, Dict, Iterable, List
 
-from bots.notifications.apns import create_provider_token, send_apns_notification
-from bots.notifications.fcm import FcmClient
+from bots.notifications.apns import ApnsClient, ApnsMessage
+from bots.notifications.fcm import FcmClient, FcmMessage
 from bots.notifications.push_logic import utc_now
 from services.db import pg
 
@@ -26,7 +29,8 @@ _INVALID_TOKEN_REASONS = {
 _INVALID_FCM_REASONS = {"UNREGISTERED", "registration-token-not-registered"}
 
 
-def _fetch_queued_events(limit: int | None = None, user_id: str | None = None) -> List[Dict[str, Any]]:
+def _fetch_send_batch(limit: int | None = None, user_id: str | None = None) -> List[Dict[str, Any]]:
+    """Queued events with the user's preference flag and enabled tokens, in one query."""
     params: List[Any] = []
     where = ["status = 'queued'"]
     if user_id:
@@ -39,79 +43,95 @@ def _fetch_queued_events(limit: int | None = None, user_id: str | None = None) -
         params.append(limit)
 
     sql = f"""
-        select id,
-               user_id,
-               family,
-               event_key,
-               severity,
-               title,
-               body,
-               payload,
-               dedupe_key,
-               created_at
-          from content.push_notification_events
-         where {' and '.join(where)}
-         order by created_at asc
-         {limit_sql}
+        with queued as (
+            select id,
+                   user_id,
+                   family,
+                   event_key,
+                   severity,
+                   title,
+                   body,
+                   payload,
+                   dedupe_key,
+                   created_at
+              from content.push_notification_events
+             where {' and '.join(where)}
+             order by created_at asc
+             {limit_sql}
+        ),
+        tokens as (
+            select t.user_id,
+                   jsonb_agg(
+                       jsonb_build_object(
+                           'id', t.id,
+                           'platform', t.platform,
+                           'device_token', t.device_token,
+                           'environment', t.environment
+                       )
+                       order by t.updated_at desc, t.created_at desc
+                   ) as tokens
+              from app.user_push_tokens t
+             where t.enabled = true
+               and t.user_id in (select distinct user_id from queued)
+             group by t.user_id
+        )
+        select q.*,
+               coalesce(p.enabled, false) as notifications_enabled,
+               coalesce(tk.tokens, '[]'::jsonb) as tokens
+          from queued q
+          left join app.user_notification_preferences p on p.user_id = q.user_id
+          left join tokens tk on tk.user_id = q.user_id
+         order by q.created_at asc
     """
     return pg.fetch(sql, *params)
 
 
-def _fetch_user_tokens(user_id: str) -> List[Dict[str, Any]]:
-    return pg.fetch(
-        """
-        select id, platform, device_token, environment
-          from app.user_push_tokens
-         where user_id = %s
-           and enabled = true
-         order by updated_at desc, created_at desc
-        """,
-        user_id,
-    )
-
-
-def _notifications_enabled(user_id: str) -> bool:
-    row = pg.fetchrow(
-        """
-        select enabled
-          from app.user_notification_preferences
-         where user_id = %s
-         limit 1
-        """,
-        user_id,
-    )
-    return bool((row or {}).get("enabled"))
-
-
-def _disable_token(token_id: str, reason: str, now_utc: datetime) -> None:
-    pg.execute(
-        """
-        update app.user_push_tokens
-           set enabled = false,
-               updated_at = %s
-         where id = %s
-        """,
-        now_utc,
-        token_id,
-    )
-    logger.info("[push-send] disabled token=%s reason=%s", token_id, reason)
-
-
-def _mark_event_status(event_id: str, status: str, now_utc: datetime, error_text: str | None = None) -> None:
-    sent_at = now_utc if status == "sent" else None
-    pg.execute(
-        """
-        update content.push_notification_events
-           set status = %s,
-               sent_at = %s,
-               error_text = %s
-         where id = %s
-        """,
-        status,
-        sent_at,
-        error_text,
-        event_id,
-    )
+@dataclass
+class _Transitions:
+    """Status changes collected during a chunk and written back in bulk."""
+
+    events: Dict[str, List[tuple[str, str | None]]] = field(default_factory=dict)
+    disabled_tokens: Dict[str, str] = field(default_factory=dict)
+
+    def mark(self, event_id: str, status: str, error_text: str | None = None) -> None:
+        self.events.setdefault(status, []).append((event_id, error_text))
+
+    def disable(self, token_id: str, reason: str) -> None:
+        self.disabled_tokens.setdefault(token_id, reason)
+
+    def __len__(self) -> int:
+        return sum(len(rows) for rows in self.events.values()) + len(self.disabled_tokens)
+
+
+def _write_transitions(transitions: _Transitions, now_utc: datetime) -> None:
+    """One update per event status plus one for disabled tokens, pipelined together."""
+    with pg.pipeline():
+        for status, rows in transitions.events.items():
+            pg.execute(
+                """
+                update content.push_notification_events e
+                   set status = %s,
+                       sent_at = %s,
+                       error_text = u.error_text
+                  from unnest(%s::uuid[], %s::text[]) as u(id, error_text)
+                 where e.id = u.id
+                """,
+                status,
+                now_utc if status == "sent" else None,
+                [event_id for event_id, _ in rows],
+                [error_text for _, error_text in rows],
+            )
+        if transitions.disabled_tokens:
+            pg.execute(
+                """
+                update app.user_push_tokens
+                   set enabled = false,
+                       updated_at = %s
+                 where id = any(%s::uuid[])
+                """,
+                now_utc,
+                list(transitions.disabled_tokens),
+            )
 
 
 def _normalized_payload(raw: Any) -> Dict[str, Any]:
@@ -165,200 +185,265 @@ def _iter_events(rows: Iterable[Dict[str, Any]], limit: int | None) -> Iterable[
             break
 
 
-def _required_env(name: str) -> str:
-    value = os.getenv(name, "").strip()
-    if not value:
-        raise RuntimeError(f"Missing required environment variable: {name}")
-    return value
-
-
-def _missing_apns_env() -> List[str]:
-    required = [
-        "APNS_TEAM_ID",
-        "APNS_KEY_ID",
-        "APNS_BUNDLE_ID",
-        "APNS_PRIVATE_KEY",
-    ]
-    return [name for name in required if not os.getenv(name, "").strip()]
+def _apns_reason(result: Dict[str, Any]) -> str:
+    return str(
+        _normalized_payload(result.get("body")).get("reason")
+        or result.get("raw_body")
+        or result.get("error")
+        or f"http_{result.get('status_code') or 0}"
+    )
 
 
 def main() -> None:
     parser = argparse.ArgumentParser(description="Send queued Gaia Eyes push notifications through APNs or FCM.")
     parser.add_argument("--limit", type=int, default=None, help="Limit number of queued events processed.")
     parser.add_argument("--user-id", default=None, help="Optional single user_id override.")
+    parser.add_argument(
+        "--chunk-size",
+        type=int,
+        default=int(os.getenv("PUSH_SEND_CHUNK_SIZE", "500")),
+        help="Events sent per batch; statuses are written back after each batch.",
+    )
     args = parser.parse_args()
 
-    queued_events = _fetch_queued_events(limit=args.limit, user_id=args.user_id)
+    started = time.perf_counter()
+    queued_events = _fetch_send_batch(limit=args.limit, user_id=args.user_id)
     if not queued_events:
         logger.info("[push-send] no queued events")
         return
 
-    apns_config: Dict[str, str] | None = None
-    fcm_client: FcmClient | None = None
-    fcm_config_error: str | None = None
-    logger.info("[push-send] queued=%d", len(queued_events))
-
-    sent = 0
-    skipped = 0
-    failed = 0
-    now_utc = utc_now()
-    notifications_enabled_cache: Dict[str, bool] = {}
-
-    for event in _iter_events(queued_events, args.limit):
-        event_id = str(event.get("id") or "").strip()
-        user_id = str(event.get("user_id") or "").strip()
-        if not event_id or not user_id:
-            continue
-
-        notifications_enabled = notifications_enabled_cache.get(user_id)
-        if notifications_enabled is None:
-            notifications_enabled = _notifications_enabled(user_id)
-            notifications_enabled_cache[user_id] = notifications_enabled
-        if not notifications_enabled:
-            _mark_event_status(event_id, "skipped", now_utc, "notifications_disabled")
-            logger.info(
-                "[push-send] skipped event=%s user=%s family=%s reason=notifications_disabled",
-                event_id,
-                user_id,
-                str(event.get("family") or "").strip() or "unknown",
-            )
-            skipped += 1
+    asyncio.run(_send_events(queued_events, args.limit, chunk_size=args.chunk_size, started=started))
+
+
+@dataclass
+class _Delivery:
+    provider: str  # "apns" or "fcm"
+    token_id: str
+    message: Any
+    result: Dict[str, Any] = field(default_factory=dict)
+
+
+@dataclass
+class _PendingEvent:
+    event_id: str
+    user_id: str
+    family: str
+    deliveries: List[_Delivery] = field(default_factory=list)
+    errors: List[str] = field(default_factory=list)
+
+
+class _Providers:
+    """Provider clients created on first use; a configuration error is remembered for the run."""
+
+    def __init__(self) -> None:
+        self.apns_client: ApnsClient | None = None
+        self.fcm_client: FcmClient | None = None
+        self._errors: Dict[str, str] = {}
+
+    def client(self, provider: str) -> tuple[Any, str | None]:
+        attr, factory = ("fcm_client", FcmClient) if provider == "fcm" else ("apns_client", ApnsClient)
+        client = getattr(self, attr)
+        if client is None and provider not in self._errors:
+            try:
+                client = factory.from_environment()
+                setattr(self, attr, client)
+            except Exception as exc:
+                self._errors[provider] = str(exc)
+        return client, self._errors.get(provider)
+
+    async def aclose(self) -> None:
+        if self.apns_client is not None:
+            await self.apns_client.aclose()
+
+
+def _plan_event(
+    event: Dict[str, Any],
+    providers: _Providers,
+    transitions: _Transitions,
+    disabled_tokens: Collection[str] = (),
+) -> _PendingEvent | None:
+    event_id = str(event.get("id") or "").strip()
+    user_id = str(event.get("user_id") or "").strip()
+    if not event_id or not user_id:
+        return None
+    family = str(event.get("family") or "").strip() or "unknown"
+
+    if not event.get("notifications_enabled"):
+        transitions.mark(event_id, "skipped", "notifications_disabled")
+        logger.info(
+            "[push-send] skipped event=%s user=%s family=%s reason=notifications_disabled",
+            event_id,
+            user_id,
+            family,
+        )
+        return None
+
+    tokens = event.get("tokens")
+    if isinstance(tokens, str):
+        tokens = json.loads(tokens)
+    # The batch was read before this run disabled anything; drop tokens rejected since.
+    tokens = [token_row for token_row in tokens or [] if str(token_row.get("id") or "").strip() not in disabled_tokens]
+    if not tokens:
+        transitions.mark(event_id, "skipped", "no_enabled_tokens")
+        logger.info(
+            "[push-send] skipped event=%s user=%s family=%s reason=no_enabled_tokens",
+            event_id,
+            user_id,
+            family,
+        )
+        return None
+
+    body = _apns_body(event)
+    collapse_id = str(event.get("dedupe_key") or event_id)
+    planned = _PendingEvent(event_id=event_id, user_id=user_id, family=family)
+    for token_row in tokens:
+        token_id = str(token_row.get("id") or "").strip()
+        device_token = str(token_row.get("device_token") or "").strip()
+        environment = str(token_row.get("environment") or "prod").strip().lower() or "prod"
+        platform = str(token_row.get("platform") or "ios").strip().lower() or "ios"
+        provider = "fcm" if platform == "android" else "apns"
+        client, config_error = providers.client(provider)
+        if client is None:
+            planned.errors.append(config_error or f"{provider}_not_configured")
             continue
-
-        tokens = _fetch_user_tokens(user_id)
-        if not tokens:
-            _mark_event_status(event_id, "skipped", now_utc, "no_enabled_tokens")
-            logger.info(
-                "[push-send] skipped event=%s user=%s family=%s reason=no_enabled_tokens",
-                event_id,
-                user_id,
-                str(event.get("family") or "").strip() or "unknown",
+        if provider == "fcm":
+            payload = _normalized_payload(event.get("payload"))
+            payload.setdefault("family", str(event.get("family") or ""))
+            payload.setdefault("event_id", event_id)
+            message: Any = FcmMessage(
+                device_token=device_token,
+                title=str(event.get("title") or "").strip(),
+                body=str(event.get("body") or "").strip(),
+                data=payload,
             )
-            skipped += 1
-            continue
-
-        body = _apns_body(event)
-        collapse_id = str(event.get("dedupe_key") or event_id)
-
-        any_success = False
-        any_attempt = False
-        errors: List[str] = []
-        for token_row in tokens:
-            token_id = str(token_row.get("id") or "").strip()
-            device_token = str(token_row.get("device_token") or "").strip()
-            environment = str(token_row.get("environment") or "prod").strip().lower() or "prod"
-            platform = str(token_row.get("platform") or "ios").strip().lower() or "ios"
-            if platform == "android":
-                if fcm_client is None and fcm_config_error is None:
-                    try:
-                        fcm_client = FcmClient.from_environment()
-                    except Exception as exc:
-                        fcm_config_error = str(exc)
-                if fcm_client is None:
-                    errors.append(fcm_config_error or "fcm_not_configured")
-                    continue
-                any_attempt = True
-                payload = _normalized_payload(event.get("payload"))
-                payload.setdefault("family", str(event.get("family") or ""))
-                payload.setdefault("event_id", event_id)
-                result = fcm_client.send(
-                    device_token=device_token,
-                    title=str(event.get("title") or "").strip(),
-                    body=str(event.get("body") or "").strip(),
-                    data=payload,
-                )
-                if result.get("ok"):
-                    any_success = True
-                    continue
-                reason = _fcm_reason(result)
-                errors.append(reason)
-                logger.warning(
-                    "[push-send] fcm rejected event=%s user=%s family=%s token=%s status=%s reason=%s",
-                    event_id,
-                    user_id,
-                    str(event.get("family") or "").strip() or "unknown",
-                    token_id or "<missing>",
-                    result.get("status_code") or 0,
-                    reason,
-                )
-                if reason in _INVALID_FCM_REASONS and token_id:
-                    _disable_token(token_id, reason, now_utc)
-                continue
-
-            if apns_config is None:
-                missing_env = _missing_apns_env()
-                if missing_env:
-                    errors.append("missing_apns_env:" + ",".join(missing_env))
-                    continue
-                apns_config = {
-                    "bundle_id": _required_env("APNS_BUNDLE_ID"),
-                    "auth_token": create_provider_token(
-                        team_id=_required_env("APNS_TEAM_ID"),
-                        key_id=_required_env("APNS_KEY_ID"),
-                        private_key_pem=_required_env("APNS_PRIVATE_KEY"),
-                    ),
-                }
-            any_attempt = True
-            result = send_apns_notification(
+        else:
+            message = ApnsMessage(
                 device_token=device_token,
                 body=body,
-                auth_token=apns_config["auth_token"],
-                topic=apns_config["bundle_id"],
                 sandbox=environment == "dev",
                 collapse_id=collapse_id,
             )
-            if result.get("ok"):
-                any_success = True
-                continue
-
-            reason = (
-                (_normalized_payload(result.get("body")).get("reason"))
-                or result.get("raw_body")
-                or result.get("stderr")
-                or f"http_{result.get('status_code') or 0}"
-            )
-            errors.append(str(reason))
-            logger.warning(
-                "[push-send] apns rejected event=%s user=%s family=%s token=%s status=%s reason=%s",
-                event_id,
-                user_id,
-                str(event.get("family") or "").strip() or "unknown",
-                token_id or "<missing>",
-                result.get("status_code") or 0,
-                str(reason),
-            )
-            if str(reason) in _INVALID_TOKEN_REASONS and token_id:
-                _disable_token(token_id, str(reason), now_utc)
-
-        if any_success:
-            _mark_event_status(event_id, "sent", now_utc, None)
-            logger.info(
-                "[push-send] sent event=%s user=%s family=%s",
-                event_id,
-                user_id,
-                str(event.get("family") or "").strip() or "unknown",
-            )
-            sent += 1
-        elif not any_attempt:
-            logger.warning(
-                "[push-send] no provider configured event=%s user=%s; leaving queued error=%s",
-                event_id,
-                user_id,
-                "; ".join(errors[:3]) or "provider_not_configured",
-            )
+        planned.deliveries.append(_Delivery(provider, token_id, message))
+    return planned
+
+
+async def _send_batch(client: Any, deliveries: List[_Delivery]) -> None:
+    if not deliveries:
+        return
+    results = await client.send_many(delivery.message for delivery in deliveries)
+    for delivery, result in zip(deliveries, results):
+        delivery.result = result
+
+
+def _resolve_event(planned: _PendingEvent, transitions: _Transitions) -> str | None:
+    """Record token and event transitions from delivery results; returns the event status."""
+    any_success = False
+    errors = list(planned.errors)
+    for delivery in planned.deliveries:
+        result = delivery.result
+        if result.get("ok"):
+            any_success = True
+            continue
+        if delivery.provider == "fcm":
+            reason = _fcm_reason(result)
+            invalid = reason in _INVALID_FCM_REASONS
         else:
-            error_text = "; ".join(errors[:3]) or "push_send_failed"
-            _mark_event_status(event_id, "failed", now_utc, error_text)
-            logger.warning(
-                "[push-send] failed event=%s user=%s family=%s error=%s",
-                event_id,
-                user_id,
-                str(event.get("family") or "").strip() or "unknown",
-                error_text,
-            )
-            failed += 1
+            reason = _apns_reason(result)
+            invalid = reason in _INVALID_TOKEN_REASONS
+        errors.append(reason)
+        logger.warning(
+            "[push-send] %s rejected event=%s user=%s family=%s token=%s status=%s reason=%s",
+            delivery.provider,
+            planned.event_id,
+            planned.user_id,
+            planned.family,
+            delivery.token_id or "<missing>",
+            result.get("status_code") or 0,
+            reason,
+        )
+        if invalid and delivery.token_id:
+            transitions.disable(delivery.token_id, reason)
+            logger.info("[push-send] disabled token=%s reason=%s", delivery.token_id, reason)
+
+    if any_success:
+        transitions.mark(planned.event_id, "sent")
+        logger.info("[push-send] sent event=%s user=%s family=%s", planned.event_id, planned.user_id, planned.family)
+        return "sent"
+    if not planned.deliveries:
+        logger.warning(
+            "[push-send] no provider configured event=%s user=%s; leaving queued error=%s",
+            planned.event_id,
+            planned.user_id,
+            "; ".join(errors[:3]) or "provider_not_configured",
+        )
+        return None
+    error_text = "; ".join(errors[:3]) or "push_send_failed"
+    transitions.mark(planned.event_id, "failed", error_text)
+    logger.warning(
+        "[push-send] failed event=%s user=%s family=%s error=%s",
+        planned.event_id,
+        planned.user_id,
+        planned.family,
+        error_text,
+    )
+    return "failed"
+
 
-    logger.info("[push-send] done sent=%d skipped=%d failed=%d", sent, skipped, failed)
+async def _send_events(
+    queued_events: List[Dict[str, Any]],
+    limit: int | None,
+    *,
+    chunk_size: int = 500,
+    started: float | None = None,
+) -> None:
+    started = time.perf_counter() if started is None else started
+    logger.info("[push-send] queued=%d", len(queued_events))
+    events = list(_iter_events(queued_events, limit))
+    chunk_size = max(1, chunk_size)
+    now_utc = utc_now()
+    counts = {"sent": 0, "skipped": 0, "failed": 0}
+    providers = _Providers()
+    disabled_tokens: Dict[str, str] = {}
+
+    try:
+        for offset in range(0, len(events), chunk_size):
+            transitions = _Transitions()
+            pending = [
+                planned
+                for planned in (
+                    _plan_event(event, providers, transitions, disabled_tokens)
+                    for event in events[offset : offset + chunk_size]
+                )
+                if planned is not None
+            ]
+
+            # All APNs and all FCM deliveries in the chunk go out as two concurrent batches.
+            deliveries = [delivery for planned in pending for delivery in planned.deliveries]
+            await asyncio.gather(
+                _send_batch(providers.apns_client, [d for d in deliveries if d.provider == "apns"]),
+                _send_batch(providers.fcm_client, [d for d in deliveries if d.provider == "fcm"]),
+            )
+            for planned in pending:
+                _resolve_event(planned, transitions)
+            disabled_tokens.update(transitions.disabled_tokens)
+
+            for status, rows in transitions.events.items():
+                counts[status] = counts.get(status, 0) + len(rows)
+            if len(transitions):
+                _write_transitions(transitions, now_utc)
+    finally:
+        await providers.aclose()
+
+    elapsed = max(time.perf_counter() - started, 1e-9)
+    logger.info(
+        "[push-send] done sent=%d skipped=%d failed=%d events=%d elapsed=%.2fs rate=%.1f events/s",
+        counts["sent"],
+        counts["skipped"],
+        counts["failed"],
+        len(events),
+        elapsed,
+        len(events) / elapsed,
+    )
 
 
 if __name__ == "__main__":
@@ -3,13 +3,17 @@
 from __future__ import annotations
 
 import argparse
+import hashlib
 import json
 import logging
 import math
 import sys
 import time as time_module
+import uuid
 from collections import defaultdict, deque
+from concurrent.futures import ProcessPoolExecutor, as_completed
 from datetime import date, datetime, time, timedelta, timezone
+from decimal import Decimal
 from pathlib import Path
 from statistics import median
 from typing import Any, Iterable, Sequence
@@ -21,6 +25,11 @@ except ModuleNotFoundError:  # pragma: no cover - exercised in environments with
     psycopg = None
     dict_row = None
 
+try:
+    import numpy as np
+except ModuleNotFoundError:  # pragma: no cover - the pure-Python association engine still works without it.
+    np = None
+
 
 _REPO_ROOT = Path(__file__).resolve().parents[2]
 if str(_REPO_ROOT) not in sys.path:
@@ -405,6 +414,21 @@ LAG_SPECS = {
     48: 2,
 }
 
+# Longest trailing history `build_user_daily_outcomes` reads for biometric baselines.
+OUTCOME_BASELINE_DAYS = 30
+
+# Incremental mode always re-derives the trailing days for every tracked user so
+# inputs without dirty tracking (local signals cache, Schumann variability) land.
+INCREMENTAL_RECENT_DAYS = 2
+# Above this many users needing older days, fetch their inputs in one window
+# query instead of one scoped fetch per user.
+INCREMENTAL_PER_USER_FETCH_LIMIT = 25
+
+# Mart writes at or above this size go through binary COPY into a staging
+# table; smaller writes (and servers that refuse COPY) use batched executemany.
+COPY_WRITER_MIN_ROWS = 500
+INSERT_BATCH_SIZE = 1000
+
 
 def _resolve_dsn() -> str:
     import os
@@ -783,12 +807,37 @@ def _fetch_rows(
         return [dict(row) for row in cur.fetchall()]
 
 
+def _shard_predicate(column: str, shard: tuple[int, int]) -> tuple[str, list[Any]]:
+    shard_count, shard_index = shard
+    # hashtext() is a signed int4; shift it into the non-negative range so the
+    # modulo is stable for every user id.
+    return f"mod(hashtext({column}::text)::bigint + 2147483648, %s) = %s", [shard_count, shard_index]
+
+
+def _append_user_scope(
+    where: list[str],
+    params: list[Any],
+    *,
+    column: str,
+    user_id: str | None,
+    shard: tuple[int, int] | None = None,
+) -> None:
+    if user_id:
+        where.append(f"{column} = %s")
+        params.append(user_id)
+    if shard is not None:
+        clause, shard_params = _shard_predicate(column, shard)
+        where.append(clause)
+        params.extend(shard_params)
+
+
 def _fetch_base_daily_features(
     conn: psycopg.Connection,
     *,
     since_day: date,
     as_of_day: date,
     user_id: str | None,
+    shard: tuple[int, int] | None = None,
 ) -> list[dict[str, Any]]:
     columns = _table_columns(conn, "marts", "daily_features")
     summary_columns = _table_columns(conn, "gaia", "daily_summary")
@@ -872,9 +921,7 @@ def _fetch_base_daily_features(
 
     params: list[Any] = [since_day, as_of_day]
     where = ["df.day >= %s", "df.day <= %s"]
-    if user_id:
-        where.append("df.user_id = %s")
-        params.append(user_id)
+    _append_user_scope(where, params, column="df.user_id", user_id=user_id, shard=shard)
 
     sql = f"""
         select {", ".join(final_columns)}
@@ -894,6 +941,7 @@ def _fetch_daily_exposure_context(
     since_day: date,
     as_of_day: date,
     user_id: str | None,
+    shard: tuple[int, int] | None = None,
 ) -> dict[tuple[str, date], dict[str, bool]]:
     if not _table_exists(conn, "raw", "user_exposure_events"):
         return {}
@@ -908,9 +956,7 @@ def _fetch_daily_exposure_context(
         "event_ts_utc < %s",
         "exposure_key = any(%s)",
     ]
-    if user_id:
-        where.append("user_id = %s")
-        params.append(user_id)
+    _append_user_scope(where, params, column="user_id", user_id=user_id, shard=shard)
 
     sql = f"""
         with normalized as (
@@ -956,6 +1002,7 @@ def _fetch_gauges(
     since_day: date,
     as_of_day: date,
     user_id: str | None,
+    shard: tuple[int, int] | None = None,
 ) -> dict[tuple[str, date], dict[str, Any]]:
     if not _table_exists(conn, "marts", "user_gauges_day"):
         return {}
@@ -966,9 +1013,7 @@ def _fetch_gauges(
 
     params: list[Any] = [since_day, as_of_day]
     where = ["day >= %s", "day <= %s"]
-    if user_id:
-        where.append("user_id = %s")
-        params.append(user_id)
+    _append_user_scope(where, params, column="user_id", user_id=user_id, shard=shard)
 
     sql = f"""
         select {", ".join(selected)}
@@ -985,15 +1030,14 @@ def _fetch_gauge_deltas(
     since_day: date,
     as_of_day: date,
     user_id: str | None,
+    shard: tuple[int, int] | None = None,
 ) -> dict[tuple[str, date], dict[str, int]]:
     if not _table_exists(conn, "marts", "user_gauges_delta_day"):
         return {}
 
     params: list[Any] = [since_day, as_of_day]
     where = ["day >= %s", "day <= %s"]
-    if user_id:
-        where.append("user_id = %s")
-        params.append(user_id)
+    _append_user_scope(where, params, column="user_id", user_id=user_id, shard=shard)
 
     sql = f"""
         select user_id, day, deltas_json
@@ -1046,14 +1090,16 @@ def _fetch_symptom_rows(
     since_day: date,
     as_of_day: date,
     user_id: str | None,
+    shard: tuple[int, int] | None = None,
+    prefer_raw: bool = False,
 ) -> dict[tuple[str, date], dict[str, Any]]:
     params: list[Any] = [since_day, as_of_day]
     where = ["day >= %s", "day <= %s"]
-    if user_id:
-        where.append("user_id = %s")
-        params.append(user_id)
+    _append_user_scope(where, params, column="user_id", user_id=user_id, shard=shard)
 
-    if _table_exists(conn, "marts", "symptom_daily"):
+    # marts.symptom_daily is a materialized view refreshed by a separate job, so
+    # incremental runs read raw events to match the dirty-day triggers.
+    if not prefer_raw and _table_exists(conn, "marts", "symptom_daily"):
         sql = f"""
             select user_id, day, symptom_code, events
               from marts.symptom_daily
@@ -1067,9 +1113,7 @@ def _fetch_symptom_rows(
 
     raw_params: list[Any] = [since_day, as_of_day + timedelta(days=1)]
     raw_where = ["ts_utc >= %s", "ts_utc < %s"]
-    if user_id:
-        raw_where.append("user_id = %s")
-        raw_params.append(user_id)
+    _append_user_scope(raw_where, raw_params, column="user_id", user_id=user_id, shard=shard)
 
     sql = f"""
         select
@@ -1091,15 +1135,14 @@ def _fetch_camera_rows(
     since_day: date,
     as_of_day: date,
     user_id: str | None,
+    shard: tuple[int, int] | None = None,
 ) -> dict[tuple[str, date], dict[str, Any]]:
     if not _table_exists(conn, "marts", "camera_health_daily"):
         return {}
 
     params: list[Any] = [since_day, as_of_day]
     where = ["day >= %s", "day <= %s"]
-    if user_id:
-        where.append("user_id = %s")
-        params.append(user_id)
+    _append_user_scope(where, params, column="user_id", user_id=user_id, shard=shard)
 
     sql = f"""
         select
@@ -1213,6 +1256,7 @@ def _fetch_day_zip_map(
     since_day: date,
     as_of_day: date,
     user_id: str | None,
+    shard: tuple[int, int] | None = None,
 ) -> dict[tuple[str, date], str]:
     if not _table_exists(conn, "marts", "user_location_context_day"):
         return {}
@@ -1222,9 +1266,7 @@ def _fetch_day_zip_map(
 
     params: list[Any] = [since_day, as_of_day]
     where = ["day >= %s", "day <= %s", "zip is not null"]
-    if user_id:
-        where.append("user_id = %s")
-        params.append(user_id)
+    _append_user_scope(where, params, column="user_id", user_id=user_id, shard=shard)
 
     sql = f"""
         select user_id, day, zip
@@ -1682,6 +1724,114 @@ def _is_outcome_confounded(feature_row: dict[str, Any] | None, outcome_key: str)
     return any(bool(feature_row.get(flag)) for flag in flags)
 
 
+def _association_row(
+    *,
+    user_id: str,
+    signal_key: str,
+    outcome_key: str,
+    lag_hours: int,
+    lag_offset: int,
+    a: int,
+    b: int,
+    c: int,
+    d: int,
+    observed_weeks: int,
+    threshold_median: float | None,
+    first_outcome_day: date | None,
+    last_outcome_day: date | None,
+    as_of_day: date,
+    updated_at: datetime,
+) -> dict[str, Any]:
+    signal_meta = SIGNAL_DEFINITIONS[signal_key]
+    outcome_kind = OUTCOME_KIND.get(outcome_key, "symptom")
+
+    exposed_n = a + b
+    unexposed_n = c + d
+    exposed_rate = (a / exposed_n) if exposed_n else 0.0
+    unexposed_rate = (c / unexposed_n) if unexposed_n else 0.0
+    relative_lift = exposed_rate / max(unexposed_rate, 0.01)
+    rate_diff = exposed_rate - unexposed_rate
+
+    odds_a = a
+    odds_b = b
+    odds_c = c
+    odds_d = d
+    if 0 in {odds_a, odds_b, odds_c, odds_d}:
+        odds_a += 0.5
+        odds_b += 0.5
+        odds_c += 0.5
+        odds_d += 0.5
+    odds_ratio = (odds_a / max(odds_b, 0.5)) / (odds_c / max(odds_d, 0.5))
+
+    confidence = pair_confidence_bucket(
+        signal_key=signal_key,
+        outcome_key=outcome_key,
+        exposed_n=exposed_n,
+        unexposed_n=unexposed_n,
+        exposed_outcome_n=a,
+        relative_lift=relative_lift,
+        rate_diff=rate_diff,
+        observed_weeks=observed_weeks,
+        last_outcome_day=last_outcome_day,
+        as_of_day=as_of_day,
+    )
+    pair_surface_rule = PAIR_SURFACE_RULES.get((signal_key, outcome_key))
+    if pair_surface_rule:
+        surfaceable = bool(
+            exposed_n >= int(pair_surface_rule.get("exposed_n") or 0)
+            and unexposed_n >= int(pair_surface_rule.get("unexposed_n") or 0)
+            and a >= int(pair_surface_rule.get("exposed_outcome_n") or 0)
+            and relative_lift >= float(pair_surface_rule.get("relative_lift") or 0.0)
+            and rate_diff >= float(pair_surface_rule.get("rate_diff") or 0.0)
+            and observed_weeks >= int(pair_surface_rule.get("observed_weeks") or 0)
+            and confidence is not None
+        )
+    else:
+        surfaceable = bool(
+            exposed_n >= 8
+            and unexposed_n >= 8
+            and a >= 4
+            and relative_lift >= 1.6
+            and rate_diff >= 0.12
+            and confidence is not None
+        )
+
+    threshold_to_store = threshold_median
+    if threshold_to_store is None and signal_meta.get("threshold") is not None:
+        threshold_to_store = float(signal_meta["threshold"])
+
+    return {
+        "user_id": user_id,
+        "signal_key": signal_key,
+        "signal_family": signal_meta["family"],
+        "outcome_key": outcome_key,
+        "outcome_kind": outcome_kind,
+        "lag_hours": lag_hours,
+        "lag_day_offset": lag_offset,
+        "exposure_operator": signal_meta["operator"],
+        "exposure_threshold": threshold_to_store,
+        "exposure_threshold_text": signal_meta["threshold_text"],
+        "exposed_n": exposed_n,
+        "unexposed_n": unexposed_n,
+        "exposed_outcome_n": a,
+        "unexposed_outcome_n": c,
+        "exposed_rate": round(exposed_rate, 6),
+        "unexposed_rate": round(unexposed_rate, 6),
+        "relative_lift": round(relative_lift, 6),
+        "odds_ratio": round(odds_ratio, 6),
+        "rate_diff": round(rate_diff, 6),
+        "observed_weeks": observed_weeks,
+        "confidence": confidence,
+        "confidence_rank": confidence_rank(confidence),
+        "surfaceable": surfaceable,
+        "first_outcome_day": first_outcome_day,
+        "last_outcome_day": last_outcome_day,
+        "first_seen_at": _utc_midnight(first_outcome_day) or updated_at,
+        "last_seen_at": _utc_midnight(last_outcome_day),
+        "updated_at": updated_at,
+    }
+
+
 def build_associations(
     feature_rows: Sequence[dict[str, Any]],
     outcome_rows: Sequence[dict[str, Any]],
@@ -1705,8 +1855,6 @@ def build_associations(
 
         ordered_days = sorted(feature_map.keys())
         for signal_key, outcome_key in ASSOCIATION_PAIRS:
-            signal_meta = SIGNAL_DEFINITIONS[signal_key]
-            outcome_kind = OUTCOME_KIND.get(outcome_key, "symptom")
             allowed_lag_hours = PAIR_LAG_HOURS.get((signal_key, outcome_key))
 
             for lag_hours, lag_offset in LAG_SPECS.items():
@@ -1756,99 +1904,428 @@ def build_associations(
                         else:
                             d += 1
 
-                exposed_n = a + b
-                unexposed_n = c + d
-                exposed_rate = (a / exposed_n) if exposed_n else 0.0
-                unexposed_rate = (c / unexposed_n) if unexposed_n else 0.0
-                relative_lift = exposed_rate / max(unexposed_rate, 0.01)
-                rate_diff = exposed_rate - unexposed_rate
-
-                odds_a = a
-                odds_b = b
-                odds_c = c
-                odds_d = d
-                if 0 in {odds_a, odds_b, odds_c, odds_d}:
-                    odds_a += 0.5
-                    odds_b += 0.5
-                    odds_c += 0.5
-                    odds_d += 0.5
-                odds_ratio = (odds_a / max(odds_b, 0.5)) / (odds_c / max(odds_d, 0.5))
-
-                confidence = pair_confidence_bucket(
-                    signal_key=signal_key,
-                    outcome_key=outcome_key,
-                    exposed_n=exposed_n,
-                    unexposed_n=unexposed_n,
-                    exposed_outcome_n=a,
-                    relative_lift=relative_lift,
-                    rate_diff=rate_diff,
-                    observed_weeks=len(observed_weeks),
-                    last_outcome_day=last_outcome_day,
-                    as_of_day=as_of_day,
-                )
-                pair_surface_rule = PAIR_SURFACE_RULES.get((signal_key, outcome_key))
-                if pair_surface_rule:
-                    surfaceable = bool(
-                        exposed_n >= int(pair_surface_rule.get("exposed_n") or 0)
-                        and unexposed_n >= int(pair_surface_rule.get("unexposed_n") or 0)
-                        and a >= int(pair_surface_rule.get("exposed_outcome_n") or 0)
-                        and relative_lift >= float(pair_surface_rule.get("relative_lift") or 0.0)
-                        and rate_diff >= float(pair_surface_rule.get("rate_diff") or 0.0)
-                        and len(observed_weeks) >= int(pair_surface_rule.get("observed_weeks") or 0)
-                        and confidence is not None
+                association_rows.append(
+                    _association_row(
+                        user_id=user_id,
+                        signal_key=signal_key,
+                        outcome_key=outcome_key,
+                        lag_hours=lag_hours,
+                        lag_offset=lag_offset,
+                        a=a,
+                        b=b,
+                        c=c,
+                        d=d,
+                        observed_weeks=len(observed_weeks),
+                        threshold_median=median(threshold_values) if threshold_values else None,
+                        first_outcome_day=first_outcome_day,
+                        last_outcome_day=last_outcome_day,
+                        as_of_day=as_of_day,
+                        updated_at=updated_at,
                     )
+                )
+
+    return association_rows
+
+
+def _group_rows_by_user_day(rows: Sequence[dict[str, Any]]) -> dict[str, dict[date, dict[str, Any]]]:
+    grouped: dict[str, dict[date, dict[str, Any]]] = defaultdict(dict)
+    for row in rows:
+        grouped[str(row["user_id"])][row["day"]] = row
+    return grouped
+
+
+def _association_lag_plan() -> dict[int, list[tuple[int, int, int]]]:
+    """Group (pair index, lag hours) work by day offset so shared offsets are computed once."""
+    plan: dict[int, list[tuple[int, int, int]]] = defaultdict(list)
+    for pair_index, (signal_key, outcome_key) in enumerate(ASSOCIATION_PAIRS):
+        allowed_lag_hours = PAIR_LAG_HOURS.get((signal_key, outcome_key))
+        for lag_hours, lag_offset in LAG_SPECS.items():
+            if allowed_lag_hours is not None and lag_hours not in allowed_lag_hours:
+                continue
+            plan[lag_offset].append((pair_index, lag_hours, lag_offset))
+    return plan
+
+
+def _user_association_counts(
+    feature_map: dict[date, dict[str, Any]],
+    outcome_map: dict[date, dict[str, Any]],
+    *,
+    signal_keys: Sequence[str],
+    outcome_keys: Sequence[str],
+    pair_signal_index: Any,
+    pair_outcome_index: Any,
+    lag_plan: dict[int, list[tuple[int, int, int]]],
+) -> dict[tuple[int, int], dict[str, Any]]:
+    """Fill the 2x2 contingency counts for one user with day x signal/outcome matrices.
+
+    Codes are -1 for missing, 0 for false and 1 for true. The day axis is dense from the
+    first feature day through the last feature day plus the widest lag, so a lag is a
+    plain slice offset between the source and target columns.
+    """
+    start = min(day.toordinal() for day in feature_map)
+    span = max(day.toordinal() for day in feature_map) - start + 1
+    width = span + max(lag_plan)
+
+    signal_codes = np.full((len(signal_keys), width), -1, dtype=np.int8)
+    thresholds = np.full((len(signal_keys), width), np.nan, dtype=np.float64)
+    has_threshold = np.zeros((len(signal_keys), width), dtype=bool)
+    confounder_flags = sorted({flag for key in outcome_keys for flag in OUTCOME_CONFOUNDER_FLAGS.get(key) or ()})
+    flag_values = np.zeros((len(confounder_flags), width), dtype=bool)
+    outcome_codes = np.full((len(outcome_keys), width), -1, dtype=np.int8)
+
+    for day_value, feature_row in feature_map.items():
+        index = day_value.toordinal() - start
+        for signal_index, signal_key in enumerate(signal_keys):
+            exposed = feature_row.get(signal_key)
+            if exposed is not None:
+                signal_codes[signal_index, index] = 1 if bool(exposed) else 0
+            _, threshold_value = signal_exposure(feature_row, signal_key)
+            if threshold_value is not None:
+                thresholds[signal_index, index] = threshold_value
+                has_threshold[signal_index, index] = True
+        for flag_index, flag in enumerate(confounder_flags):
+            flag_values[flag_index, index] = bool(feature_row.get(flag))
+
+    confounded = np.zeros((len(outcome_keys), width), dtype=bool)
+    for outcome_index, outcome_key in enumerate(outcome_keys):
+        for flag in OUTCOME_CONFOUNDER_FLAGS.get(outcome_key) or ():
+            confounded[outcome_index] |= flag_values[confounder_flags.index(flag)]
+
+    for day_value, outcome_row in outcome_map.items():
+        index = day_value.toordinal() - start
+        if index < 0 or index >= width or not outcome_row:
+            continue
+        for outcome_index, outcome_key in enumerate(outcome_keys):
+            outcome_value = outcome_row.get(outcome_key)
+            if outcome_value is not None:
+                outcome_codes[outcome_index, index] = 1 if bool(outcome_value) else 0
+
+    # ISO weeks start on Monday; date.fromordinal(1) is a Monday, so the Monday
+    # ordinal identifies the (iso_year, iso_week) pair uniquely.
+    ordinals = np.arange(start, start + width, dtype=np.int64)
+    week_starts = ordinals - (ordinals - 1) % 7
+    week_index = (week_starts - week_starts[0]) // 7
+    week_onehot = np.zeros((width, int(week_index[-1]) + 1), dtype=np.int32)
+    week_onehot[np.arange(width), week_index] = 1
+
+    counts: dict[tuple[int, int], dict[str, Any]] = {}
+    for lag_offset, specs in lag_plan.items():
+        pair_indexes = np.array(sorted({pair_index for pair_index, _, _ in specs}), dtype=np.int64)
+        source_width = width - lag_offset
+        source = signal_codes[pair_signal_index[pair_indexes], :source_width]
+        target = outcome_codes[pair_outcome_index[pair_indexes], lag_offset:]
+        target_confounded = confounded[pair_outcome_index[pair_indexes], lag_offset:]
+
+        included = (source >= 0) & (target >= 0) & ~target_confounded
+        exposed = source == 1
+        hit = target == 1
+        a_mask = included & exposed & hit
+        a = a_mask.sum(axis=1)
+        b = (included & exposed & ~hit).sum(axis=1)
+        c = (included & ~exposed & hit).sum(axis=1)
+        d = (included & ~exposed & ~hit).sum(axis=1)
+        observed_weeks = ((a_mask.astype(np.int32) @ week_onehot[lag_offset:]) > 0).sum(axis=1)
+        any_outcome = a_mask.any(axis=1)
+        first_index = a_mask.argmax(axis=1)
+        last_index = source_width - 1 - a_mask[:, ::-1].argmax(axis=1)
+
+        threshold_mask = included & has_threshold[pair_signal_index[pair_indexes], :source_width]
+        threshold_values = thresholds[pair_signal_index[pair_indexes], :source_width]
+        threshold_n = threshold_mask.sum(axis=1)
+        threshold_min = np.where(threshold_mask, threshold_values, np.inf).min(axis=1)
+        threshold_max = np.where(threshold_mask, threshold_values, -np.inf).max(axis=1)
+
+        for row_index, pair_index in enumerate(pair_indexes.tolist()):
+            threshold_median: float | None = None
+            if threshold_n[row_index]:
+                if threshold_min[row_index] == threshold_max[row_index]:
+                    threshold_median = float(threshold_min[row_index])
                 else:
-                    surfaceable = bool(
-                        exposed_n >= 8
-                        and unexposed_n >= 8
-                        and a >= 4
-                        and relative_lift >= 1.6
-                        and rate_diff >= 0.12
-                        and confidence is not None
-                    )
+                    threshold_median = float(np.median(threshold_values[row_index][threshold_mask[row_index]]))
+            first_outcome_day = last_outcome_day = None
+            if any_outcome[row_index]:
+                first_outcome_day = date.fromordinal(start + lag_offset + int(first_index[row_index]))
+                last_outcome_day = date.fromordinal(start + lag_offset + int(last_index[row_index]))
+            counts[(pair_index, lag_offset)] = {
+                "a": int(a[row_index]),
+                "b": int(b[row_index]),
+                "c": int(c[row_index]),
+                "d": int(d[row_index]),
+                "observed_weeks": int(observed_weeks[row_index]),
+                "threshold_median": threshold_median,
+                "first_outcome_day": first_outcome_day,
+                "last_outcome_day": last_outcome_day,
+            }
+    return counts
 
-                threshold_to_store = None
-                if threshold_values:
-                    threshold_to_store = median(threshold_values)
-                elif signal_meta.get("threshold") is not None:
-                    threshold_to_store = float(signal_meta["threshold"])
 
+def build_associations_columnar(
+    feature_rows: Sequence[dict[str, Any]],
+    outcome_rows: Sequence[dict[str, Any]],
+    *,
+    as_of_day: date,
+    updated_at: datetime,
+) -> list[dict[str, Any]]:
+    """NumPy-backed equivalent of `build_associations`.
+
+    Produces the same rows in the same order; falls back to the pure-Python engine
+    when NumPy is not installed.
+    """
+    if np is None:
+        return build_associations(feature_rows, outcome_rows, as_of_day=as_of_day, updated_at=updated_at)
+
+    features_by_user = _group_rows_by_user_day(feature_rows)
+    outcomes_by_user = _group_rows_by_user_day(outcome_rows)
+
+    signal_keys = list(dict.fromkeys(signal_key for signal_key, _ in ASSOCIATION_PAIRS))
+    outcome_keys = list(dict.fromkeys(outcome_key for _, outcome_key in ASSOCIATION_PAIRS))
+    pair_signal_index = np.array([signal_keys.index(signal_key) for signal_key, _ in ASSOCIATION_PAIRS], dtype=np.int64)
+    pair_outcome_index = np.array([outcome_keys.index(outcome_key) for _, outcome_key in ASSOCIATION_PAIRS], dtype=np.int64)
+    lag_plan = _association_lag_plan()
+    pair_lags: dict[int, list[tuple[int, int]]] = defaultdict(list)
+    for lag_offset, specs in lag_plan.items():
+        for pair_index, lag_hours, _ in specs:
+            pair_lags[pair_index].append((lag_hours, lag_offset))
+    lag_order = {lag_hours: position for position, lag_hours in enumerate(LAG_SPECS)}
+
+    association_rows: list[dict[str, Any]] = []
+    for user_id, feature_map in features_by_user.items():
+        outcome_map = outcomes_by_user.get(user_id, {})
+        if not feature_map or not outcome_map:
+            continue
+
+        counts = _user_association_counts(
+            feature_map,
+            outcome_map,
+            signal_keys=signal_keys,
+            outcome_keys=outcome_keys,
+            pair_signal_index=pair_signal_index,
+            pair_outcome_index=pair_outcome_index,
+            lag_plan=lag_plan,
+        )
+        for pair_index, (signal_key, outcome_key) in enumerate(ASSOCIATION_PAIRS):
+            for lag_hours, lag_offset in sorted(pair_lags[pair_index], key=lambda item: lag_order[item[0]]):
+                stats = counts[(pair_index, lag_offset)]
                 association_rows.append(
-                    {
-                        "user_id": user_id,
-                        "signal_key": signal_key,
-                        "signal_family": signal_meta["family"],
-                        "outcome_key": outcome_key,
-                        "outcome_kind": outcome_kind,
-                        "lag_hours": lag_hours,
-                        "lag_day_offset": lag_offset,
-                        "exposure_operator": signal_meta["operator"],
-                        "exposure_threshold": threshold_to_store,
-                        "exposure_threshold_text": signal_meta["threshold_text"],
-                        "exposed_n": exposed_n,
-                        "unexposed_n": unexposed_n,
-                        "exposed_outcome_n": a,
-                        "unexposed_outcome_n": c,
-                        "exposed_rate": round(exposed_rate, 6),
-                        "unexposed_rate": round(unexposed_rate, 6),
-                        "relative_lift": round(relative_lift, 6),
-                        "odds_ratio": round(odds_ratio, 6),
-                        "rate_diff": round(rate_diff, 6),
-                        "observed_weeks": len(observed_weeks),
-                        "confidence": confidence,
-                        "confidence_rank": confidence_rank(confidence),
-                        "surfaceable": surfaceable,
-                        "first_outcome_day": first_outcome_day,
-                        "last_outcome_day": last_outcome_day,
-                        "first_seen_at": _utc_midnight(first_outcome_day) or updated_at,
-                        "last_seen_at": _utc_midnight(last_outcome_day),
-                        "updated_at": updated_at,
-                    }
+                    _association_row(
+                        user_id=user_id,
+                        signal_key=signal_key,
+                        outcome_key=outcome_key,
+                        lag_hours=lag_hours,
+                        lag_offset=lag_offset,
+                        as_of_day=as_of_day,
+                        updated_at=updated_at,
+                        **stats,
+                    )
                 )
 
     return association_rows
 
 
+def _pattern_state_version() -> str:
+    """Fingerprint of the association layout; stored state is rebuilt when it changes."""
+    layout = {
+        "pairs": [list(pair) for pair in ASSOCIATION_PAIRS],
+        "lags": sorted(LAG_SPECS.items()),
+        "pair_lags": sorted((list(pair), sorted(lags)) for pair, lags in PAIR_LAG_HOURS.items()),
+        "signals": {key: meta.get("threshold_text") for key, meta in SIGNAL_DEFINITIONS.items()},
+        "confounders": {key: sorted(flags) for key, flags in OUTCOME_CONFOUNDER_FLAGS.items()},
+    }
+    return hashlib.sha1(json.dumps(layout, sort_keys=True).encode("utf-8")).hexdigest()[:16]
+
+
+def _association_state_keys() -> list[tuple[str, str, int, int]]:
+    """(signal_key, outcome_key, lag_hours, lag_offset) in `build_associations` row order."""
+    keys: list[tuple[str, str, int, int]] = []
+    for signal_key, outcome_key in ASSOCIATION_PAIRS:
+        allowed_lag_hours = PAIR_LAG_HOURS.get((signal_key, outcome_key))
+        for lag_hours, lag_offset in LAG_SPECS.items():
+            if allowed_lag_hours is not None and lag_hours not in allowed_lag_hours:
+                continue
+            keys.append((signal_key, outcome_key, lag_hours, lag_offset))
+    return keys
+
+
+def pattern_day_state(
+    feature_row: dict[str, Any] | None,
+    outcome_row: dict[str, Any] | None,
+) -> dict[str, Any]:
+    """Compact per-day encoding of everything a day contributes to the association counts.
+
+    `signals` maps signal key to `[exposed_code, threshold]` for non-null exposures,
+    `outcomes` maps outcome key to `0`/`1` for non-null outcomes, and `confounded`
+    lists the outcome keys excluded on this day by self-reported context.
+    """
+    signal_keys = dict.fromkeys(signal_key for signal_key, _ in ASSOCIATION_PAIRS)
+    outcome_keys = dict.fromkeys(outcome_key for _, outcome_key in ASSOCIATION_PAIRS)
+
+    signals: dict[str, list[Any]] = {}
+    confounded: list[str] = []
+    if feature_row:
+        for signal_key in signal_keys:
+            exposed = feature_row.get(signal_key)
+            if exposed is None:
+                continue
+            _, threshold_value = signal_exposure(feature_row, signal_key)
+            signals[signal_key] = [1 if bool(exposed) else 0, threshold_value]
+        confounded = [key for key in outcome_keys if _is_outcome_confounded(feature_row, key)]
+
+    outcomes: dict[str, int] = {}
+    if outcome_row:
+        for outcome_key in outcome_keys:
+            outcome_value = outcome_row.get(outcome_key)
+            if outcome_value is not None:
+                outcomes[outcome_key] = 1 if bool(outcome_value) else 0
+
+    return {"signals": signals, "outcomes": outcomes, "confounded": confounded}
+
+
+def _empty_association_stats() -> dict[str, Any]:
+    return {"a": 0, "b": 0, "c": 0, "d": 0, "outcome_days": set(), "threshold_counts": {}}
+
+
+def fold_association_days(
+    stats_by_key: dict[tuple[str, str, int], dict[str, Any]],
+    day_states: dict[date, dict[str, Any]],
+    source_days: Iterable[date],
+    *,
+    sign: int,
+) -> None:
+    """Add (`sign=1`) or remove (`sign=-1`) the contributions of `source_days`.
+
+    `day_states` must hold every day of the window the counts describe; targets
+    outside it do not contribute, matching the full `build_associations` pass.
+    """
+    keys = _association_state_keys()
+    for source_day in source_days:
+        source = day_states.get(source_day)
+        if not source or not source.get("signals"):
+            continue
+        for signal_key, outcome_key, lag_hours, lag_offset in keys:
+            signal = source["signals"].get(signal_key)
+            if signal is None:
+                continue
+            target_day = source_day + timedelta(days=lag_offset)
+            target = day_states.get(target_day)
+            if not target or outcome_key in target.get("confounded", ()):
+                continue
+            outcome_value = target.get("outcomes", {}).get(outcome_key)
+            if outcome_value is None:
+                continue
+
+            stats = stats_by_key.setdefault((signal_key, outcome_key, lag_hours), _empty_association_stats())
+            exposed_code, threshold_value = signal
+            if threshold_value is not None:
+                threshold_key = repr(float(threshold_value))
+                stats["threshold_counts"][threshold_key] = stats["threshold_counts"].get(threshold_key, 0) + sign
+                if stats["threshold_counts"][threshold_key] <= 0:
+                    del stats["threshold_counts"][threshold_key]
+            if exposed_code:
+                if outcome_value:
+                    stats["a"] += sign
+                    if sign > 0:
+                        stats["outcome_days"].add(target_day)
+                    else:
+                        stats["outcome_days"].discard(target_day)
+                else:
+                    stats["b"] += sign
+            elif outcome_value:
+                stats["c"] += sign
+            else:
+                stats["d"] += sign
+
+
+def _median_from_counts(counts: dict[str, int]) -> float | None:
+    values = sorted(float(key) for key, count in counts.items() for _ in range(max(int(count), 0)))
+    return median(values) if values else None
+
+
+def association_rows_from_state(
+    user_id: str,
+    stats_by_key: dict[tuple[str, str, int], dict[str, Any]],
+    *,
+    as_of_day: date,
+    updated_at: datetime,
+) -> list[dict[str, Any]]:
+    rows: list[dict[str, Any]] = []
+    for signal_key, outcome_key, lag_hours, lag_offset in _association_state_keys():
+        stats = stats_by_key.get((signal_key, outcome_key, lag_hours)) or _empty_association_stats()
+        outcome_days = stats["outcome_days"]
+        rows.append(
+            _association_row(
+                user_id=user_id,
+                signal_key=signal_key,
+                outcome_key=outcome_key,
+                lag_hours=lag_hours,
+                lag_offset=lag_offset,
+                a=stats["a"],
+                b=stats["b"],
+                c=stats["c"],
+                d=stats["d"],
+                observed_weeks=len({day.isocalendar()[:2] for day in outcome_days}),
+                threshold_median=_median_from_counts(stats["threshold_counts"]),
+                first_outcome_day=min(outcome_days) if outcome_days else None,
+                last_outcome_day=max(outcome_days) if outcome_days else None,
+                as_of_day=as_of_day,
+                updated_at=updated_at,
+            )
+        )
+    return rows
+
+
+def refresh_user_association_stats(
+    stats_by_key: dict[tuple[str, str, int], dict[str, Any]],
+    *,
+    old_window: tuple[date, date] | None,
+    old_day_states: dict[date, dict[str, Any]],
+    new_day_states: dict[date, dict[str, Any]],
+    dirty_start: date,
+    since_day: date,
+    as_of_day: date,
+) -> None:
+    """Fold one user's changed days into their stored association counts.
+
+    `old_day_states` holds the stored day states the counts were built from (at
+    least the slid-out days plus `dirty_start - 2` onward); `new_day_states` holds
+    the rebuilt days from `dirty_start` through `as_of_day`. Days before
+    `dirty_start` are unchanged, so only sources whose own day or lagged target
+    moved are removed and re-added.
+    """
+    lag_reach = max(LAG_SPECS.values())
+    new_window = {
+        day_value: state
+        for day_value, state in old_day_states.items()
+        if since_day <= day_value < dirty_start
+    }
+    new_window.update(
+        {
+            day_value: state
+            for day_value, state in new_day_states.items()
+            if dirty_start <= day_value <= as_of_day
+        }
+    )
+
+    if old_window is None:
+        stats_by_key.clear()
+        fold_association_days(stats_by_key, new_window, sorted(new_window), sign=1)
+        return
+
+    old_start, old_end = old_window
+    old_states = {
+        day_value: state
+        for day_value, state in old_day_states.items()
+        if old_start <= day_value <= old_end
+    }
+    removed = [
+        day_value
+        for day_value in sorted(old_states)
+        if day_value < since_day or day_value >= dirty_start - timedelta(days=lag_reach)
+    ]
+    fold_association_days(stats_by_key, old_states, removed, sign=-1)
+    added = [day_value for day_value in sorted(new_window) if day_value >= dirty_start - timedelta(days=lag_reach)]
+    fold_association_days(stats_by_key, new_window, added, sign=1)
+
+
 def _delete_scope(
     conn: psycopg.Connection,
     table_name: str,
@@ -1856,12 +2333,11 @@ def _delete_scope(
     since_day: date | None,
     user_id: str | None,
     day_scoped: bool,
+    shard: tuple[int, int] | None = None,
 ) -> None:
     conditions: list[str] = []
     params: list[Any] = []
-    if user_id:
-        conditions.append("user_id = %s")
-        params.append(user_id)
+    _append_user_scope(conditions, params, column="user_id", user_id=user_id, shard=shard)
     if day_scoped and since_day is not None:
         conditions.append("day >= %s")
         params.append(since_day)
@@ -1874,19 +2350,172 @@ def _delete_scope(
         cur.execute(sql, tuple(params))
 
 
-def _insert_rows(
+def _column_copy_types(
     conn: psycopg.Connection,
     table_name: str,
     columns: Sequence[str],
+) -> list[tuple[int, str, bool]] | None:
+    rows = _fetch_rows(
+        conn,
+        """
+        select a.attname as column_name,
+               a.atttypid::int as type_oid,
+               coalesce(et.typname, t.typname) as base_type,
+               et.oid is not null as is_array
+          from pg_attribute a
+          join pg_type t on t.oid = a.atttypid
+          left join pg_type et on et.oid = t.typelem and t.typcategory = 'A'
+         where a.attrelid = %s::regclass
+           and a.attnum > 0
+           and not a.attisdropped
+        """,
+        [table_name],
+    )
+    by_name = {
+        str(row["column_name"]): (int(row["type_oid"]), str(row["base_type"]), bool(row["is_array"]))
+        for row in rows
+    }
+    if any(column not in by_name for column in columns):
+        return None
+    return [by_name[column] for column in columns]
+
+
+def _copy_scalar(value: Any, base_type: str) -> Any:
+    # Binary COPY does not get the server-side assignment casts a parameterized
+    # INSERT gets, so coerce Python values to what each column's dumper expects.
+    if value is None:
+        return None
+    if base_type == "uuid":
+        return value if isinstance(value, uuid.UUID) else uuid.UUID(str(value))
+    if base_type == "numeric":
+        if isinstance(value, float):
+            # Matches Postgres' float8 -> numeric cast (15 significant digits).
+            return Decimal(f"{value:.15g}")
+        return int(value) if isinstance(value, bool) else value
+    if base_type in {"int2", "int4", "int8"}:
+        return int(round(value)) if isinstance(value, float) else int(value)
+    if base_type in {"float4", "float8"}:
+        return float(value)
+    if base_type == "bool":
+        return bool(value)
+    if base_type in {"json", "jsonb"}:
+        return json.loads(value) if isinstance(value, str) else value
+    if base_type in {"text", "varchar", "bpchar"}:
+        if isinstance(value, (dict, list, tuple, set)):
+            # str() would write a Python repr that executemany would never produce.
+            raise TypeError(f"cannot COPY {type(value).__name__} into a {base_type} column")
+        return value if isinstance(value, str) else str(value)
+    return value
+
+
+def _copy_value(value: Any, base_type: str, is_array: bool) -> Any:
+    if value is None or not is_array:
+        return _copy_scalar(value, base_type)
+    return [_copy_scalar(item, base_type) for item in value]
+
+
+def _copy_rows_via_staging(
+    conn: psycopg.Connection,
+    table_name: str,
+    columns: Sequence[str],
+    column_types: Sequence[tuple[int, str, bool]],
     rows: Sequence[dict[str, Any]],
+    *,
+    key_columns: Sequence[str] | None,
+) -> None:
+    stage = f"{table_name.replace('.', '_')}_stage"
+    column_sql = ", ".join(columns)
+    merge_sql = f"insert into {table_name} ({column_sql}) select {column_sql} from {stage}"
+    if key_columns:
+        updates = ", ".join(f"{column} = excluded.{column}" for column in columns if column not in key_columns)
+        merge_sql += f" on conflict ({', '.join(key_columns)}) do update set {updates}"
+
+    with conn.cursor() as cur:
+        cur.execute(f"drop table if exists pg_temp.{stage}")
+        cur.execute(f"create temp table {stage} on commit drop as select {column_sql} from {table_name} with no data")
+        with cur.copy(f"copy {stage} ({column_sql}) from stdin (format binary)") as copy:
+            copy.set_types([type_oid for type_oid, _, _ in column_types])
+            for row in rows:
+                copy.write_row(
+                    tuple(
+                        _copy_value(row.get(column), base_type, is_array)
+                        for column, (_, base_type, is_array) in zip(columns, column_types)
+                    )
+                )
+        cur.execute(merge_sql)
+        cur.execute(f"drop table {stage}")
+
+
+def _executemany_rows(
+    conn: psycopg.Connection,
+    table_name: str,
+    columns: Sequence[str],
+    rows: Sequence[dict[str, Any]],
+    *,
+    key_columns: Sequence[str] | None,
 ) -> None:
-    if not rows:
-        return
     placeholders = ", ".join(["%s"] * len(columns))
     sql = f"insert into {table_name} ({', '.join(columns)}) values ({placeholders})"
-    values = [tuple(row.get(column) for column in columns) for row in rows]
+    if key_columns:
+        updates = ", ".join(f"{column} = excluded.{column}" for column in columns if column not in key_columns)
+        sql += f" on conflict ({', '.join(key_columns)}) do update set {updates}"
     with conn.cursor() as cur:
-        cur.executemany(sql, values)
+        for start in range(0, len(rows), INSERT_BATCH_SIZE):
+            batch = rows[start : start + INSERT_BATCH_SIZE]
+            cur.executemany(sql, [tuple(row.get(column) for column in columns) for row in batch])
+
+
+def _write_rows(
+    conn: psycopg.Connection,
+    table_name: str,
+    columns: Sequence[str],
+    rows: Sequence[dict[str, Any]],
+    *,
+    key_columns: Sequence[str] | None = None,
+) -> dict[str, Any]:
+    if not rows:
+        return {"rows": 0, "method": "none", "seconds": 0.0}
+
+    started = time_module.perf_counter()
+    method = "executemany"
+    if len(rows) >= COPY_WRITER_MIN_ROWS:
+        try:
+            # The savepoint keeps the surrounding delete+insert transaction
+            # usable when the server (or pooler) refuses COPY.
+            with conn.transaction():
+                column_types = _column_copy_types(conn, table_name, columns)
+                if column_types is not None:
+                    _copy_rows_via_staging(conn, table_name, columns, column_types, rows, key_columns=key_columns)
+                    method = "copy"
+        except psycopg.Error as exc:
+            logger.warning(
+                "[pattern_engine] COPY into %s failed (%s); falling back to batched inserts",
+                table_name,
+                exc,
+            )
+    if method != "copy":
+        _executemany_rows(conn, table_name, columns, rows, key_columns=key_columns)
+
+    seconds = time_module.perf_counter() - started
+    rows_per_sec = len(rows) / seconds if seconds > 0 else float(len(rows))
+    logger.info(
+        "[pattern_engine] wrote table=%s rows=%d method=%s seconds=%.2f rows_per_sec=%.0f",
+        table_name,
+        len(rows),
+        method,
+        seconds,
+        rows_per_sec,
+    )
+    return {"rows": len(rows), "method": method, "seconds": seconds}
+
+
+def _insert_rows(
+    conn: psycopg.Connection,
+    table_name: str,
+    columns: Sequence[str],
+    rows: Sequence[dict[str, Any]],
+) -> dict[str, Any]:
+    return _write_rows(conn, table_name, columns, rows)
 
 
 def _feature_insert_columns() -> list[str]:
@@ -2101,12 +2730,107 @@ def _association_insert_columns() -> list[str]:
     ]
 
 
+def _build_feature_rows_for_scope(
+    conn: psycopg.Connection,
+    *,
+    since_day: date,
+    as_of_day: date,
+    user_id: str | None,
+    updated_at: datetime,
+    shard: tuple[int, int] | None = None,
+    raw_symptoms: bool = False,
+) -> tuple[int, list[dict[str, Any]]]:
+    scope = {"since_day": since_day, "as_of_day": as_of_day, "user_id": user_id, "shard": shard}
+    base_rows = _fetch_base_daily_features(conn, **scope)
+    if not base_rows:
+        return 0, []
+
+    user_ids = {str(row["user_id"]) for row in base_rows if row.get("user_id")}
+    if user_id:
+        user_ids.add(user_id)
+    logger.info("[pattern_engine] base_rows=%d users=%d", len(base_rows), len(user_ids))
+
+    gauges = _fetch_gauges(conn, **scope)
+    gauge_deltas = _fetch_gauge_deltas(conn, **scope)
+    symptom_rows = _fetch_symptom_rows(conn, **scope, prefer_raw=raw_symptoms)
+    camera_rows = _fetch_camera_rows(conn, **scope)
+    exposure_context = _fetch_daily_exposure_context(conn, **scope)
+    tag_flags = _fetch_tag_flags(conn, user_ids=user_ids)
+    day_zip_map = _fetch_day_zip_map(conn, **scope)
+    current_zip_map = _fetch_current_zip_map(conn, user_ids=user_ids)
+    zip_codes = _collect_relevant_zip_codes(day_zip_map, current_zip_map)
+    local_signals_daily = _fetch_local_signals_daily(
+        conn,
+        since_day=since_day,
+        as_of_day=as_of_day,
+        zip_codes=zip_codes,
+    )
+    schumann_daily = _fetch_schumann_variability_daily(
+        conn,
+        since_day=since_day,
+        as_of_day=as_of_day,
+        base_rows=base_rows,
+    )
+    logger.info(
+        "[pattern_engine] fetched gauges=%d deltas=%d symptoms=%d camera=%d exposure_context=%d tag_users=%d day_zips=%d current_zips=%d scoped_zips=%d local_signals=%d schumann=%d",
+        len(gauges),
+        len(gauge_deltas),
+        len(symptom_rows),
+        len(camera_rows),
+        len(exposure_context),
+        len(tag_flags),
+        len(day_zip_map),
+        len(current_zip_map),
+        len(zip_codes),
+        len(local_signals_daily),
+        len(schumann_daily),
+    )
+
+    feature_rows = build_user_daily_features(
+        base_rows=base_rows,
+        gauges=gauges,
+        gauge_deltas=gauge_deltas,
+        symptom_stats=symptom_rows,
+        camera_rows=camera_rows,
+        tag_flags=tag_flags,
+        day_zip_map=day_zip_map,
+        current_zip_map=current_zip_map,
+        local_signals_daily=local_signals_daily,
+        schumann_daily=schumann_daily,
+        updated_at=updated_at,
+        exposure_context=exposure_context,
+    )
+    return len(base_rows), feature_rows
+
+
+def _day_state_insert_columns() -> list[str]:
+    return ["user_id", "day", "signals", "outcomes", "confounded_outcomes", "updated_at"]
+
+
+def _association_state_columns() -> list[str]:
+    return [
+        "user_id",
+        "signal_key",
+        "outcome_key",
+        "lag_hours",
+        "exposed_outcome_n",
+        "exposed_no_outcome_n",
+        "unexposed_outcome_n",
+        "unexposed_no_outcome_n",
+        "outcome_days",
+        "threshold_counts",
+        "updated_at",
+    ]
+
+
 def _run_pattern_engine_once(
     *,
     as_of_day: date,
     days_back: int,
     user_id: str | None,
     dsn: str | None = None,
+    shard: tuple[int, int] | None = None,
+    allow_empty: bool = False,
 ) -> dict[str, int]:
     since_day = as_of_day - timedelta(days=max(days_back - 1, 0))
     updated_at = datetime.now(timezone.utc)
@@ -2114,110 +2838,589 @@ def _run_pattern_engine_once(
     with psycopg.connect(dsn or _resolve_dsn(), **_connect_kwargs()) as conn:
         _configure_connection(conn)
         logger.info(
-            "[pattern_engine] start since=%s as_of=%s user=%s",
+            "[pattern_engine] start since=%s as_of=%s user=%s shard=%s",
             since_day,
             as_of_day,
             user_id or "all",
+            _shard_label(shard),
         )
-        base_rows = _fetch_base_daily_features(conn, since_day=since_day, as_of_day=as_of_day, user_id=user_id)
-        if not base_rows and user_id is None:
+        base_row_count, feature_rows = _build_feature_rows_for_scope(
+            conn,
+            since_day=since_day,
+            as_of_day=as_of_day,
+            user_id=user_id,
+            updated_at=updated_at,
+            shard=shard,
+        )
+        # Sharded runs check the whole window up front (allow_empty), so an empty
+        # shard still clears associations for users who aged out of it.
+        if not base_row_count and user_id is None and not allow_empty:
             logger.warning(
-                "Skipping full pattern-engine refresh because marts.daily_features returned no rows for %s through %s.",
+                "Skipping full pattern-engine refresh because marts.daily_features returned no rows for %s through %s (shard=%s).",
                 since_day,
                 as_of_day,
+                _shard_label(shard),
             )
             return {"features": 0, "outcomes": 0, "associations": 0, "surfaced": 0}
 
-        user_ids = {str(row["user_id"]) for row in base_rows if row.get("user_id")}
-        if user_id:
-            user_ids.add(user_id)
-        logger.info("[pattern_engine] base_rows=%d users=%d", len(base_rows), len(user_ids))
-
-        gauges = _fetch_gauges(conn, since_day=since_day, as_of_day=as_of_day, user_id=user_id)
-        gauge_deltas = _fetch_gauge_deltas(conn, since_day=since_day, as_of_day=as_of_day, user_id=user_id)
-        symptom_rows = _fetch_symptom_rows(conn, since_day=since_day, as_of_day=as_of_day, user_id=user_id)
-        camera_rows = _fetch_camera_rows(conn, since_day=since_day, as_of_day=as_of_day, user_id=user_id)
-        exposure_context = _fetch_daily_exposure_context(
+        # Seed the biometric baselines with the stored days before the window, the
+        # same history the incremental runner reads, so both modes agree.
+        baseline_reach = timedelta(days=OUTCOME_BASELINE_DAYS)
+        history_rows = _fetch_user_day_ranges(
             conn,
-            since_day=since_day,
-            as_of_day=as_of_day,
-            user_id=user_id,
+            "marts.user_daily_features",
+            ["user_id", "day", "hrv_avg", "hr_min", "sleep_total_minutes"],
+            [
+                (key, since_day - baseline_reach, since_day - timedelta(days=1))
+                for key in sorted({str(row["user_id"]) for row in feature_rows})
+            ],
         )
-        tag_flags = _fetch_tag_flags(conn, user_ids=user_ids)
-        day_zip_map = _fetch_day_zip_map(conn, since_day=since_day, as_of_day=as_of_day, user_id=user_id)
-        current_zip_map = _fetch_current_zip_map(conn, user_ids=user_ids)
-        zip_codes = _collect_relevant_zip_codes(day_zip_map, current_zip_map)
-        local_signals_daily = _fetch_local_signals_daily(
-            conn,
-            since_day=since_day,
+        outcome_rows = [
+            row
+            for row in build_user_daily_outcomes(history_rows + feature_rows, updated_at=updated_at)
+            if row["day"] >= since_day
+        ]
+        association_rows = build_associations_columnar(
+            feature_rows,
+            outcome_rows,
             as_of_day=as_of_day,
-            zip_codes=zip_codes,
+            updated_at=updated_at,
         )
-        schumann_daily = _fetch_schumann_variability_daily(
-            conn,
-            since_day=since_day,
-            as_of_day=as_of_day,
-            base_rows=base_rows,
+        logger.info(
+            "[pattern_engine] built feature_rows=%d outcome_rows=%d association_rows=%d",
+            len(feature_rows),
+            len(outcome_rows),
+            len(association_rows),
         )
+
+        scope = {"user_id": user_id, "shard": shard}
+        _delete_scope(conn, "marts.user_pattern_associations", since_day=None, day_scoped=False, **scope)
+        if _table_exists(conn, "marts", "user_pattern_engine_state"):
+            # Full refreshes bypass the incremental state, so force the next
+            # incremental run to bootstrap these users again.
+            _delete_scope(conn, "marts.user_pattern_engine_state", since_day=None, day_scoped=False, **scope)
+        _delete_scope(conn, "marts.user_daily_outcomes", since_day=since_day, day_scoped=True, **scope)
+        _delete_scope(conn, "marts.user_daily_features", since_day=since_day, day_scoped=True, **scope)
+
+        writes = [
+            _insert_rows(conn, "marts.user_daily_features", _feature_insert_columns(), feature_rows),
+            _insert_rows(conn, "marts.user_daily_outcomes", _outcome_insert_columns(), outcome_rows),
+            _insert_rows(conn, "marts.user_pattern_associations", _association_insert_columns(), association_rows),
+        ]
+        conn.commit()
+        written_rows = sum(item["rows"] for item in writes)
+        write_seconds = sum(item["seconds"] for item in writes)
+        write_rows_per_sec = int(written_rows / write_seconds) if write_seconds > 0 else written_rows
         logger.info(
-            "[pattern_engine] fetched gauges=%d deltas=%d symptoms=%d camera=%d exposure_context=%d tag_users=%d day_zips=%d current_zips=%d scoped_zips=%d local_signals=%d schumann=%d",
-            len(gauges),
-            len(gauge_deltas),
-            len(symptom_rows),
-            len(camera_rows),
-            len(exposure_context),
-            len(tag_flags),
-            len(day_zip_map),
-            len(current_zip_map),
-            len(zip_codes),
-            len(local_signals_daily),
-            len(schumann_daily),
+            "[pattern_engine] commit complete rows=%d write_seconds=%.2f rows_per_sec=%d",
+            written_rows,
+            write_seconds,
+            write_rows_per_sec,
         )
 
-        feature_rows = build_user_daily_features(
-            base_rows=base_rows,
-            gauges=gauges,
-            gauge_deltas=gauge_deltas,
-            symptom_stats=symptom_rows,
-            camera_rows=camera_rows,
-            tag_flags=tag_flags,
-            day_zip_map=day_zip_map,
-            current_zip_map=current_zip_map,
-            local_signals_daily=local_signals_daily,
-            schumann_daily=schumann_daily,
-            updated_at=updated_at,
-            exposure_context=exposure_context,
+    surfaced = sum(1 for row in association_rows if row.get("surfaceable"))
+    return {
+        "features": len(feature_rows),
+        "outcomes": len(outcome_rows),
+        "associations": len(association_rows),
+        "surfaced": surfaced,
+        "write_rows_per_sec": write_rows_per_sec,
+    }
+
+
+def _fetch_user_day_ranges(
+    conn: psycopg.Connection,
+    table_name: str,
+    columns: Sequence[str],
+    ranges: Sequence[tuple[str, date, date]],
+) -> list[dict[str, Any]]:
+    if not ranges:
+        return []
+    select_list = ", ".join(f"t.{column}" for column in columns)
+    sql = f"""
+        select distinct on (t.user_id, t.day) {select_list}
+          from {table_name} t
+          join unnest(%s::uuid[], %s::date[], %s::date[]) as r(user_id, start_day, end_day)
+            on t.user_id = r.user_id
+           and t.day between r.start_day and r.end_day
+         order by t.user_id, t.day
+    """
+    return _fetch_rows(
+        conn,
+        sql,
+        (
+            [user for user, _, _ in ranges],
+            [start for _, start, _ in ranges],
+            [end for _, _, end in ranges],
+        ),
+    )
+
+
+def _delete_user_days_from(
+    conn: psycopg.Connection,
+    table_name: str,
+    start_days: dict[str, date],
+    *,
+    before: bool = False,
+) -> None:
+    if not start_days:
+        return
+    comparison = "<" if before else ">="
+    sql = f"""
+        delete from {table_name} t
+         using unnest(%s::uuid[], %s::date[]) as r(user_id, start_day)
+         where t.user_id = r.user_id
+           and t.day {comparison} r.start_day
+    """
+    with conn.cursor() as cur:
+        cur.execute(sql, (list(start_days.keys()), list(start_days.values())))
+
+
+def _delete_users(conn: psycopg.Connection, table_name: str, user_ids: Iterable[str]) -> None:
+    scoped = sorted(set(user_ids))
+    if not scoped:
+        return
+    with conn.cursor() as cur:
+        cur.execute(f"delete from {table_name} where user_id = any(%s::uuid[])", (scoped,))
+
+
+def _upsert_rows(
+    conn: psycopg.Connection,
+    table_name: str,
+    columns: Sequence[str],
+    key_columns: Sequence[str],
+    rows: Sequence[dict[str, Any]],
+) -> dict[str, Any]:
+    return _write_rows(conn, table_name, columns, rows, key_columns=key_columns)
+
+
+def _claim_dirty_days(conn: psycopg.Connection, *, user_id: str | None, as_of_day: date) -> dict[str, date]:
+    """Drain the dirty-day queue through `as_of_day` and return the earliest changed day per user.
+
+    Days after `as_of_day` stay queued for a later run. The delete is part of the
+    run transaction, so a failed run leaves the queue intact.
+    """
+    sql = "delete from marts.user_pattern_dirty_days where day <= %s"
+    params: list[Any] = [as_of_day]
+    if user_id:
+        sql += " and user_id = %s"
+        params.append(user_id)
+    sql += " returning user_id, day"
+    earliest: dict[str, date] = {}
+    for row in _fetch_rows(conn, sql, params):
+        key = str(row["user_id"])
+        day_value = row["day"]
+        if key not in earliest or day_value < earliest[key]:
+            earliest[key] = day_value
+    return earliest
+
+
+def _fetch_window_user_ids(
+    conn: psycopg.Connection,
+    *,
+    since_day: date,
+    as_of_day: date,
+    user_id: str | None,
+) -> set[str]:
+    """Users with base rows anywhere in the window, so users without recent rows still bootstrap."""
+    params: list[Any] = [since_day, as_of_day]
+    where = ["day >= %s", "day <= %s"]
+    _append_user_scope(where, params, column="user_id", user_id=user_id)
+    sql = f"select distinct user_id from marts.daily_features where {' and '.join(where)}"
+    return {str(row["user_id"]) for row in _fetch_rows(conn, sql, params)}
+
+
+def _fetch_engine_states(conn: psycopg.Connection, *, user_id: str | None) -> dict[str, dict[str, Any]]:
+    sql = "select user_id, window_start, as_of_day, engine_version from marts.user_pattern_engine_state"
+    params: list[Any] = []
+    if user_id:
+        sql += " where user_id = %s"
+        params.append(user_id)
+    return {str(row["user_id"]): row for row in _fetch_rows(conn, sql, params)}
+
+
+def _fetch_association_stats(
+    conn: psycopg.Connection,
+    user_ids: Sequence[str],
+) -> dict[str, dict[tuple[str, str, int], dict[str, Any]]]:
+    stats: dict[str, dict[tuple[str, str, int], dict[str, Any]]] = defaultdict(dict)
+    if not user_ids:
+        return stats
+    rows = _fetch_rows(
+        conn,
+        """
+        select user_id, signal_key, outcome_key, lag_hours,
+               exposed_outcome_n, exposed_no_outcome_n, unexposed_outcome_n, unexposed_no_outcome_n,
+               outcome_days, threshold_counts
+          from marts.user_pattern_association_state
+         where user_id = any(%s::uuid[])
+        """,
+        (list(user_ids),),
+    )
+    for row in rows:
+        stats[str(row["user_id"])][(row["signal_key"], row["outcome_key"], int(row["lag_hours"]))] = {
+            "a": int(row["exposed_outcome_n"]),
+            "b": int(row["exposed_no_outcome_n"]),
+            "c": int(row["unexposed_outcome_n"]),
+            "d": int(row["unexposed_no_outcome_n"]),
+            "outcome_days": set(row.get("outcome_days") or []),
+            "threshold_counts": {str(key): int(value) for key, value in _parse_json_map(row.get("threshold_counts")).items()},
+        }
+    return stats
+
+
+def _association_stats_rows(
+    user_id: str,
+    stats_by_key: dict[tuple[str, str, int], dict[str, Any]],
+    *,
+    updated_at: datetime,
+) -> list[dict[str, Any]]:
+    rows: list[dict[str, Any]] = []
+    for (signal_key, outcome_key, lag_hours), stats in stats_by_key.items():
+        rows.append(
+            {
+                "user_id": user_id,
+                "signal_key": signal_key,
+                "outcome_key": outcome_key,
+                "lag_hours": lag_hours,
+                "exposed_outcome_n": stats["a"],
+                "exposed_no_outcome_n": stats["b"],
+                "unexposed_outcome_n": stats["c"],
+                "unexposed_no_outcome_n": stats["d"],
+                "outcome_days": sorted(stats["outcome_days"]),
+                "threshold_counts": json.dumps(stats["threshold_counts"], sort_keys=True),
+                "updated_at": updated_at,
+            }
         )
-        outcome_rows = build_user_daily_outcomes(feature_rows, updated_at=updated_at)
-        association_rows = build_associations(
-            feature_rows,
-            outcome_rows,
+    return rows
+
+
+def _association_stats_snapshot(stats: dict[str, Any]) -> tuple[Any, ...]:
+    return (
+        stats["a"],
+        stats["b"],
+        stats["c"],
+        stats["d"],
+        tuple(sorted(stats["outcome_days"])),
+        tuple(sorted(stats["threshold_counts"].items())),
+    )
+
+
+def _association_row_changed(old: dict[str, Any] | None, new: dict[str, Any]) -> bool:
+    if old is None:
+        return True
+    ignored = {"updated_at"}
+    if old.get("first_outcome_day") is None and new.get("first_outcome_day") is None:
+        # first_seen_at falls back to the run timestamp when there is no outcome day yet.
+        ignored.add("first_seen_at")
+    return any(old.get(column) != new.get(column) for column in new if column not in ignored)
+
+
+def _day_state_row(user_id: str, day_value: date, state: dict[str, Any], updated_at: datetime) -> dict[str, Any]:
+    return {
+        "user_id": user_id,
+        "day": day_value,
+        "signals": json.dumps(state["signals"], sort_keys=True),
+        "outcomes": json.dumps(state["outcomes"], sort_keys=True),
+        "confounded_outcomes": list(state["confounded"]),
+        "updated_at": updated_at,
+    }
+
+
+def _day_state_from_row(row: dict[str, Any]) -> dict[str, Any]:
+    return {
+        "signals": _parse_json_map(row.get("signals")),
+        "outcomes": _parse_json_map(row.get("outcomes")),
+        "confounded": list(row.get("confounded_outcomes") or []),
+    }
+
+
+def _run_pattern_engine_incremental_once(
+    *,
+    as_of_day: date,
+    days_back: int,
+    user_id: str | None,
+    dsn: str | None = None,
+    recent_days: int = INCREMENTAL_RECENT_DAYS,
+) -> dict[str, int]:
+    """Fold changed user-days into stored association state instead of rebuilding the window.
+
+    Each user is rebuilt from a contiguous `dirty_start` through `as_of_day`, where
+    `dirty_start` is the earliest of their drained dirty days, the trailing
+    `recent_days` (for untracked inputs such as local signals and Schumann), and the
+    first day after their previous run. Users without compatible state are
+    bootstrapped over the whole window.
+    """
+    since_day = as_of_day - timedelta(days=max(days_back - 1, 0))
+    recent_start = max(since_day, as_of_day - timedelta(days=max(recent_days, 1) - 1))
+    lag_reach = timedelta(days=max(LAG_SPECS.values()))
+    baseline_reach = timedelta(days=OUTCOME_BASELINE_DAYS)
+    updated_at = datetime.now(timezone.utc)
+    version = _pattern_state_version()
+
+    with psycopg.connect(dsn or _resolve_dsn(), **_connect_kwargs()) as conn:
+        _configure_connection(conn)
+        logger.info(
+            "[pattern_engine] incremental start since=%s recent=%s as_of=%s user=%s",
+            since_day,
+            recent_start,
+            as_of_day,
+            user_id or "all",
+        )
+        dirty = _claim_dirty_days(conn, user_id=user_id, as_of_day=as_of_day)
+        engine_states = _fetch_engine_states(conn, user_id=user_id)
+        _, recent_features = _build_feature_rows_for_scope(
+            conn,
+            since_day=recent_start,
             as_of_day=as_of_day,
+            user_id=user_id,
             updated_at=updated_at,
+            raw_symptoms=True,
+        )
+        features_by_user: dict[str, list[dict[str, Any]]] = defaultdict(list)
+        for row in recent_features:
+            features_by_user[str(row["user_id"])].append(row)
+
+        user_ids = (
+            set(engine_states)
+            | set(dirty)
+            | set(features_by_user)
+            | _fetch_window_user_ids(conn, since_day=since_day, as_of_day=as_of_day, user_id=user_id)
         )
+        if user_id:
+            user_ids.add(user_id)
+
+        dirty_starts: dict[str, date] = {}
+        old_windows: dict[str, tuple[date, date] | None] = {}
+        for key in user_ids:
+            state = engine_states.get(key)
+            if (
+                state is None
+                or state.get("engine_version") != version
+                or state["window_start"] > since_day
+                or state["as_of_day"] > as_of_day
+                or state["as_of_day"] < since_day
+            ):
+                old_windows[key] = None
+                dirty_starts[key] = since_day
+                continue
+            old_windows[key] = (state["window_start"], state["as_of_day"])
+            start = min(recent_start, state["as_of_day"] + timedelta(days=1), dirty.get(key, recent_start))
+            dirty_starts[key] = max(start, since_day)
+
+        deep_users = sorted(key for key, start in dirty_starts.items() if start < recent_start)
+        if len(deep_users) > INCREMENTAL_PER_USER_FETCH_LIMIT and not user_id:
+            deep_since = min(dirty_starts[key] for key in deep_users)
+            _, deep_features = _build_feature_rows_for_scope(
+                conn,
+                since_day=deep_since,
+                as_of_day=as_of_day,
+                user_id=None,
+                updated_at=updated_at,
+                raw_symptoms=True,
+            )
+            deep_set = set(deep_users)
+            for key in deep_users:
+                features_by_user[key] = []
+            for row in deep_features:
+                key = str(row["user_id"])
+                if key in deep_set and row["day"] >= dirty_starts[key]:
+                    features_by_user[key].append(row)
+        else:
+            for key in deep_users:
+                _, features_by_user[key] = _build_feature_rows_for_scope(
+                    conn,
+                    since_day=dirty_starts[key],
+                    as_of_day=as_of_day,
+                    user_id=key,
+                    updated_at=updated_at,
+                    raw_symptoms=True,
+                )
+
+        history_rows = _fetch_user_day_ranges(
+            conn,
+            "marts.user_daily_features",
+            ["user_id", "day", "hrv_avg", "hr_min", "sleep_total_minutes"],
+            [(key, start - baseline_reach, start - timedelta(days=1)) for key, start in dirty_starts.items()],
+        )
+        history_by_user: dict[str, list[dict[str, Any]]] = defaultdict(list)
+        for row in history_rows:
+            history_by_user[str(row["user_id"])].append(row)
+
+        state_ranges: list[tuple[str, date, date]] = []
+        for key, window in old_windows.items():
+            if window is None:
+                continue
+            state_ranges.append((key, window[0], since_day + lag_reach))
+            state_ranges.append((key, dirty_starts[key] - lag_reach, window[1]))
+        old_day_states: dict[str, dict[date, dict[str, Any]]] = defaultdict(dict)
+        for row in _fetch_user_day_ranges(
+            conn,
+            "marts.user_pattern_day_state",
+            ["user_id", "day", "signals", "outcomes", "confounded_outcomes"],
+            state_ranges,
+        ):
+            old_day_states[str(row["user_id"])][row["day"]] = _day_state_from_row(row)
+
+        stats_by_user = _fetch_association_stats(
+            conn,
+            [key for key, window in old_windows.items() if window is not None],
+        )
+
+        feature_rows: list[dict[str, Any]] = []
+        outcome_rows: list[dict[str, Any]] = []
+        day_state_rows: list[dict[str, Any]] = []
+        stats_rows: list[dict[str, Any]] = []
+        changed_associations: list[dict[str, Any]] = []
+        all_associations: dict[str, list[dict[str, Any]]] = {}
+        for key in sorted(user_ids):
+            start = dirty_starts[key]
+            user_features = [row for row in features_by_user.get(key, []) if start <= row["day"] <= as_of_day]
+            user_outcomes = [
+                row
+                for row in build_user_daily_outcomes(history_by_user.get(key, []) + user_features, updated_at=updated_at)
+                if row["day"] >= start
+            ]
+            feature_map = {row["day"]: row for row in user_features}
+            outcome_map = {row["day"]: row for row in user_outcomes}
+            new_day_states = {
+                day_value: pattern_day_state(feature_map.get(day_value), outcome_map.get(day_value))
+                for day_value in sorted(set(feature_map) | set(outcome_map))
+            }
+
+            stats_by_key = stats_by_user.get(key, {})
+            old_snapshot = {
+                stats_key: _association_stats_snapshot(stats) for stats_key, stats in stats_by_key.items()
+            }
+            old_window = old_windows[key]
+            previous_rows: dict[tuple[str, str, int], dict[str, Any]] = {}
+            if old_window is not None:
+                for row in association_rows_from_state(key, stats_by_key, as_of_day=old_window[1], updated_at=updated_at):
+                    previous_rows[(row["signal_key"], row["outcome_key"], row["lag_hours"])] = row
+
+            refresh_user_association_stats(
+                stats_by_key,
+                old_window=old_window,
+                old_day_states=old_day_states.get(key, {}),
+                new_day_states=new_day_states,
+                dirty_start=start,
+                since_day=since_day,
+                as_of_day=as_of_day,
+            )
+
+            feature_rows.extend(user_features)
+            outcome_rows.extend(user_outcomes)
+            day_state_rows.extend(
+                _day_state_row(key, day_value, state, updated_at) for day_value, state in new_day_states.items()
+            )
+            changed_stats = {
+                stats_key: stats
+                for stats_key, stats in stats_by_key.items()
+                if old_snapshot.get(stats_key) != _association_stats_snapshot(stats)
+            }
+            stats_rows.extend(_association_stats_rows(key, changed_stats, updated_at=updated_at))
+
+            rows = association_rows_from_state(key, stats_by_key, as_of_day=as_of_day, updated_at=updated_at)
+            all_associations[key] = rows
+            changed_associations.extend(
+                row
+                for row in rows
+                if _association_row_changed(
+                    previous_rows.get((row["signal_key"], row["outcome_key"], row["lag_hours"])),
+                    row,
+                )
+            )
+
+        bootstrapped = sorted(key for key, window in old_windows.items() if window is None)
         logger.info(
-            "[pattern_engine] built feature_rows=%d outcome_rows=%d association_rows=%d",
+            "[pattern_engine] incremental users=%d bootstrapped=%d dirty_users=%d feature_rows=%d outcome_rows=%d changed_associations=%d",
+            len(user_ids),
+            len(bootstrapped),
+            len(dirty),
             len(feature_rows),
             len(outcome_rows),
-            len(association_rows),
+            len(changed_associations),
         )
 
-        _delete_scope(conn, "marts.user_pattern_associations", since_day=None, user_id=user_id, day_scoped=False)
-        _delete_scope(conn, "marts.user_daily_outcomes", since_day=since_day, user_id=user_id, day_scoped=True)
-        _delete_scope(conn, "marts.user_daily_features", since_day=since_day, user_id=user_id, day_scoped=True)
+        _delete_user_days_from(conn, "marts.user_daily_outcomes", dirty_starts)
+        _delete_user_days_from(conn, "marts.user_daily_features", dirty_starts)
+        _delete_user_days_from(conn, "marts.user_pattern_day_state", dirty_starts)
+        _delete_user_days_from(conn, "marts.user_pattern_day_state", {key: since_day for key in user_ids}, before=True)
+        _delete_users(conn, "marts.user_pattern_association_state", bootstrapped)
+        _delete_users(conn, "marts.user_pattern_associations", bootstrapped)
 
         _insert_rows(conn, "marts.user_daily_features", _feature_insert_columns(), feature_rows)
         _insert_rows(conn, "marts.user_daily_outcomes", _outcome_insert_columns(), outcome_rows)
-        _insert_rows(conn, "marts.user_pattern_associations", _association_insert_columns(), association_rows)
+        _insert_rows(conn, "marts.user_pattern_day_state", _day_state_insert_columns(), day_state_rows)
+
+        # Mirror the full refresh: users without both features and outcomes in the
+        # window get no association rows.
+        covered = {
+            str(row["user_id"])
+            for row in _fetch_rows(
+                conn,
+                """
+                select u.user_id
+                  from unnest(%s::uuid[]) as u(user_id)
+                 where exists (
+                         select 1 from marts.user_daily_features f
+                          where f.user_id = u.user_id and f.day between %s and %s
+                       )
+                   and exists (
+                         select 1 from marts.user_daily_outcomes o
+                          where o.user_id = u.user_id and o.day between %s and %s
+                       )
+                """,
+                (sorted(user_ids), since_day, as_of_day, since_day, as_of_day),
+            )
+        }
+        uncovered = sorted(user_ids - covered)
+        _delete_users(conn, "marts.user_pattern_associations", uncovered)
+        changed_associations = [row for row in changed_associations if row["user_id"] in covered]
+        _upsert_rows(
+            conn,
+            "marts.user_pattern_association_state",
+            _association_state_columns(),
+            ["user_id", "signal_key", "outcome_key", "lag_hours"],
+            stats_rows,
+        )
+        _upsert_rows(
+            conn,
+            "marts.user_pattern_associations",
+            _association_insert_columns(),
+            ["user_id", "signal_key", "outcome_key", "lag_hours"],
+            changed_associations,
+        )
+        _upsert_rows(
+            conn,
+            "marts.user_pattern_engine_state",
+            ["user_id", "window_start", "as_of_day", "engine_version", "updated_at"],
+            ["user_id"],
+            [
+                {
+                    "user_id": key,
+                    "window_start": since_day,
+                    "as_of_day": as_of_day,
+                    "engine_version": version,
+                    "updated_at": updated_at,
+                }
+                for key in sorted(user_ids)
+            ],
+        )
         conn.commit()
-        logger.info("[pattern_engine] commit complete")
+        logger.info("[pattern_engine] incremental commit complete")
 
-    surfaced = sum(1 for row in association_rows if row.get("surfaceable"))
+    surfaced = sum(
+        1 for key in covered for row in all_associations.get(key, []) if row.get("surfaceable")
+    )
     return {
         "features": len(feature_rows),
         "outcomes": len(outcome_rows),
-        "associations": len(association_rows),
+        "associations": len(changed_associations),
         "surfaced": surfaced,
+        "users": len(user_ids),
+        "bootstrapped": len(bootstrapped),
+        "dirty_users": len(dirty),
     }
 
 
@@ -2227,16 +3430,36 @@ def run_pattern_engine(
     days_back: int,
     user_id: str | None,
     dsn: str | None = None,
+    mode: str = "full",
+    recent_days: int = INCREMENTAL_RECENT_DAYS,
+    shard: tuple[int, int] | None = None,
+    allow_empty: bool = False,
 ) -> dict[str, int]:
     _require_psycopg()
+    if shard is not None:
+        _validate_shard(shard)
+        if mode != "full":
+            raise ValueError("Sharded runs are only supported in full mode")
+        if user_id:
+            raise ValueError("Sharded runs cannot be combined with a single user_id scope")
 
     for attempt in range(1, DB_RETRY_ATTEMPTS + 1):
         try:
+            if mode == "incremental":
+                return _run_pattern_engine_incremental_once(
+                    as_of_day=as_of_day,
+                    days_back=days_back,
+                    user_id=user_id,
+                    dsn=dsn,
+                    recent_days=recent_days,
+                )
             return _run_pattern_engine_once(
                 as_of_day=as_of_day,
                 days_back=days_back,
                 user_id=user_id,
                 dsn=dsn,
+                shard=shard,
+                allow_empty=allow_empty,
             )
         except Exception as exc:
             if not _is_transient_db_error(exc) or attempt >= DB_RETRY_ATTEMPTS:
@@ -2254,6 +3477,159 @@ def run_pattern_engine(
     raise RuntimeError("Pattern engine retry loop exited unexpectedly")
 
 
+def _validate_shard(shard: tuple[int, int]) -> None:
+    shard_count, shard_index = shard
+    if shard_count < 1 or not 0 <= shard_index < shard_count:
+        raise ValueError(f"Invalid pattern-engine shard {shard_index}/{shard_count}")
+
+
+def _shard_label(shard: tuple[int, int] | None) -> str:
+    if shard is None:
+        return "all"
+    shard_count, shard_index = shard
+    return f"{shard_index + 1}/{shard_count}"
+
+
+def _run_pattern_engine_shard(
+    *,
+    as_of_day: date,
+    days_back: int,
+    shard: tuple[int, int],
+    dsn: str | None,
+) -> dict[str, Any]:
+    started = time_module.perf_counter()
+    result: dict[str, Any] = {"shard": shard[1], "features": 0, "outcomes": 0, "associations": 0, "surfaced": 0}
+    try:
+        result.update(
+            run_pattern_engine(
+                as_of_day=as_of_day,
+                days_back=days_back,
+                user_id=None,
+                dsn=dsn,
+                shard=shard,
+                allow_empty=True,
+            )
+        )
+    except Exception as exc:
+        logger.exception("[pattern_engine] shard %s failed", _shard_label(shard))
+        result["error"] = f"{type(exc).__name__}: {exc}"
+    result["seconds"] = round(time_module.perf_counter() - started, 3)
+    return result
+
+
+def _window_has_base_rows(dsn: str, *, since_day: date, as_of_day: date) -> bool:
+    with psycopg.connect(dsn, **_connect_kwargs()) as conn:
+        _configure_connection(conn)
+        rows = _fetch_rows(
+            conn,
+            "select exists (select 1 from marts.daily_features where day >= %s and day <= %s) as has_rows",
+            (since_day, as_of_day),
+        )
+    return bool(rows and rows[0].get("has_rows"))
+
+
+def run_pattern_engine_sharded(
+    *,
+    as_of_day: date,
+    days_back: int,
+    shards: int,
+    workers: int,
+    dsn: str | None = None,
+    shard_indexes: Sequence[int] | None = None,
+) -> dict[str, Any]:
+    """Run a full refresh split into hash shards of users.
+
+    Each shard fetches, builds, and commits its own users on a separate
+    connection, so a failed shard leaves the other shards' results in place
+    and can be re-run on its own via `shard_indexes`.
+    """
+    _require_psycopg()
+    shards = max(shards, 1)
+    indexes = sorted(set(range(shards) if shard_indexes is None else shard_indexes))
+    for index in indexes:
+        _validate_shard((shards, index))
+    workers = max(min(workers, len(indexes)), 1)
+    dsn = dsn or _resolve_dsn()
+    started = time_module.perf_counter()
+    since_day = as_of_day - timedelta(days=max(days_back - 1, 0))
+    summary: dict[str, Any] = {
+        "features": 0,
+        "outcomes": 0,
+        "associations": 0,
+        "surfaced": 0,
+        "failed_shards": 0,
+        "seconds": 0.0,
+        "shards": [],
+    }
+    # The empty-data guard applies to the whole window, not per shard: an empty
+    # shard must still clear its scope, but an empty window means the source is broken.
+    if not _window_has_base_rows(dsn, since_day=since_day, as_of_day=as_of_day):
+        logger.warning(
+            "Skipping sharded pattern-engine refresh because marts.daily_features returned no rows for %s through %s.",
+            since_day,
+            as_of_day,
+        )
+        return summary
+    logger.info(
+        "[pattern_engine] sharded start as_of=%s shards=%d indexes=%s workers=%d",
+        as_of_day,
+        shards,
+        ",".join(str(index) for index in indexes),
+        workers,
+    )
+
+    tasks = [
+        {"as_of_day": as_of_day, "days_back": days_back, "shard": (shards, index), "dsn": dsn}
+        for index in indexes
+    ]
+    shard_results: list[dict[str, Any]] = []
+
+    def _record(result: dict[str, Any]) -> None:
+        shard_results.append(result)
+        logger.info(
+            "[pattern_engine] shard %d/%d %s in %.1fs features=%d outcomes=%d associations=%d (%d/%d complete)",
+            result["shard"] + 1,
+            shards,
+            "failed" if result.get("error") else "done",
+            result["seconds"],
+            result["features"],
+            result["outcomes"],
+            result["associations"],
+            len(shard_results),
+            len(tasks),
+        )
+
+    if workers == 1:
+        for task in tasks:
+            _record(_run_pattern_engine_shard(**task))
+    else:
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            futures = [executor.submit(_run_pattern_engine_shard, **task) for task in tasks]
+            for future in as_completed(futures):
+                _record(future.result())
+
+    shard_results.sort(key=lambda item: item["shard"])
+    summary.update(
+        {
+            "features": sum(item["features"] for item in shard_results),
+            "outcomes": sum(item["outcomes"] for item in shard_results),
+            "associations": sum(item["associations"] for item in shard_results),
+            "surfaced": sum(item["surfaced"] for item in shard_results),
+            "failed_shards": sum(1 for item in shard_results if item.get("error")),
+            "seconds": round(time_module.perf_counter() - started, 3),
+            "shards": shard_results,
+        }
+    )
+    for item in shard_results:
+        if item.get("error"):
+            logger.error(
+                "[pattern_engine] re-run failed shard with --shards %d --shard-index %d",
+                shards,
+                item["shard"],
+            )
+    return summary
+
+
 def main() -> None:
     parser = argparse.ArgumentParser(description="Build the deterministic personal pattern engine marts.")
     parser.add_argument("--day", default=_today_utc().isoformat(), help="As-of day in YYYY-MM-DD (UTC).")
@@ -2264,17 +3640,82 @@ def main() -> None:
         help="History window used for the deterministic v1 analysis. Default 180 days.",
     )
     parser.add_argument("--user-id", default=None, help="Optional single user_id scope.")
+    parser.add_argument(
+        "--mode",
+        choices=("full", "incremental"),
+        default="full",
+        help="full rebuilds the window; incremental folds changed user-days into stored association state.",
+    )
+    parser.add_argument(
+        "--recent-days",
+        type=int,
+        default=INCREMENTAL_RECENT_DAYS,
+        help="Incremental mode: trailing days always re-derived for every tracked user.",
+    )
+    parser.add_argument(
+        "--shards",
+        type=int,
+        default=1,
+        help="Full mode: split users into N hash shards, each refreshed and committed on its own connection.",
+    )
+    parser.add_argument(
+        "--shard-index",
+        type=int,
+        action="append",
+        default=None,
+        help="With --shards N: only refresh shard K (0-based). Repeat to run several shards.",
+    )
+    parser.add_argument(
+        "--workers",
+        type=int,
+        default=1,
+        help="Number of worker processes used to run shards in parallel.",
+    )
     args = parser.parse_args()
+    if args.shards > 1 and (args.mode != "full" or args.user_id):
+        parser.error("--shards requires --mode full and no --user-id")
+    if args.shard_index is not None:
+        if args.shards <= 1:
+            parser.error("--shard-index requires --shards N with N > 1")
+        if any(not 0 <= index < args.shards for index in args.shard_index):
+            parser.error("--shard-index must be between 0 and --shards - 1")
 
     as_of_day = _coerce_day(args.day)
+    if args.shards > 1:
+        summary = run_pattern_engine_sharded(
+            as_of_day=as_of_day,
+            days_back=max(args.days_back, 1),
+            shards=args.shards,
+            workers=max(args.workers, 1),
+            shard_indexes=args.shard_index,
+        )
+        logger.info(
+            "[pattern_engine] day=%s mode=full shards=%d workers=%d seconds=%.1f features=%d outcomes=%d associations=%d surfaced=%d failed_shards=%d",
+            as_of_day.isoformat(),
+            args.shards,
+            min(max(args.workers, 1), args.shards),
+            summary["seconds"],
+            summary["features"],
+            summary["outcomes"],
+            summary["associations"],
+            summary["surfaced"],
+            summary["failed_shards"],
+        )
+        if summary["failed_shards"]:
+            raise SystemExit(1)
+        return
+
     summary = run_pattern_engine(
         as_of_day=as_of_day,
         days_back=max(args.days_back, 1),
         user_id=args.user_id,
+        mode=args.mode,
+        recent_days=max(args.recent_days, 1),
     )
     logger.info(
-        "[pattern_engine] day=%s user=%s features=%d outcomes=%d associations=%d surfaced=%d",
+        "[pattern_engine] day=%s mode=%s user=%s features=%d outcomes=%d associations=%d surfaced=%d",
         as_of_day.isoformat(),
+        args.mode,
         args.user_id or "all",
         summary["features"],
         summary["outcomes"],
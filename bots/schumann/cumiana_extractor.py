@@ -481,7 +481,7 @@ def draw_overlay(img_bgr, roi, x_now, traces_pos=None, fvals=None, draw_debug=Fa
 
 # -------------------------- main --------------------------
 
-def main():
+def build_arg_parser():
     ap = argparse.ArgumentParser(description="Cumiana Schumann extractor")
     ap.add_argument("--out", required=True)
     ap.add_argument("--overlay")
@@ -526,16 +526,14 @@ def main():
     ap.add_argument("--db-bottom", type=float, default=DB_BOTTOM_DEFAULT,
                     help="Bottom of left dB axis (default -120)")
 
-    args = ap.parse_args()
+    return ap
 
+
+def extract(img, last_mod, args):
+    """Run the Cumiana extraction on a decoded image; returns (payload, overlay_img)."""
     # Until we refine Cumiana's non-SR channels, skip Geophone/ULF/ELF sampling
     SKIP_TRACES = True
 
-    img, last_mod = fetch_image(CUMIANA_IMG, insecure=args.insecure)
-    if img is None:
-        print("Failed to fetch Cumiana image", file=sys.stderr)
-        return 3
-
     # ---- "now" anchoring
     x_now_source = "frontier"
     if args.anchor == "fixed":
@@ -646,8 +644,6 @@ def main():
         fvals=fvals, draw_debug=args.draw_debug,
         f2_band=(f2_band if args.show_f2_band else None)
     )
-    if args.overlay:
-        cv2.imwrite(args.overlay, overlay_img)
 
     payload = {
         "status": "ok",
@@ -691,6 +687,21 @@ def main():
         }
     }
 
+    return payload, overlay_img
+
+
+def main(argv=None):
+    args = build_arg_parser().parse_args(argv)
+
+    img, last_mod = fetch_image(CUMIANA_IMG, insecure=args.insecure)
+    if img is None:
+        print("Failed to fetch Cumiana image", file=sys.stderr)
+        return 3
+
+    payload, overlay_img = extract(img, last_mod, args)
+    if args.overlay:
+        cv2.imwrite(args.overlay, overlay_img)
+
     with open(args.out, "w", encoding="utf-8") as f:
         json.dump(payload, f, ensure_ascii=False, indent=2)
 
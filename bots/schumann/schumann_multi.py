@@ -6,13 +6,36 @@ schumann_multi.py
 - Saves two overlays: tomsk_overlay.png and cumiana_overlay.png (in the overlay dir you pass)
 - Writes a combined JSON with both sources under "sources", and selects a "primary"
 - Honors preference order for primary selection: first OK source in --prefer list
+- --in-process: downloads both spectrograms concurrently, decodes each once, and runs the
+  extractors as library functions in a process pool instead of one subprocess per source
 """
 
-import os, sys, json, argparse, tempfile, subprocess, shutil
+import os, sys, json, argparse, tempfile, subprocess, shutil, importlib, time
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor, as_completed
 from datetime import datetime, timezone
 
 HERE = os.path.abspath(os.path.dirname(__file__))
 
+# source name -> (extractor module, image URL attribute)
+EXTRACTORS = {
+    "tomsk": ("tomsk_extractor", "TOMSK_IMG"),
+    "cumiana": ("cumiana_extractor", "CUMIANA_IMG"),
+}
+
+
+def extractor_argv(out_json_path, overlay_path, insecure, verbose, extra_args=None) -> list[str]:
+    """CLI arguments shared by the subprocess and in-process runners."""
+    argv = ["--out", out_json_path, "--overlay", overlay_path]
+    if insecure:
+        argv.append("--insecure")
+    if verbose:
+        argv.append("--verbose")
+    if extra_args:
+        argv.extend(extra_args)
+    return argv
+
+
 def run_extractor(
     name: str,
     script: str,
@@ -26,13 +49,7 @@ def run_extractor(
     Run a single extractor script, return (returncode, parsed_json_or_error_payload).
     The extractor writes directly to out_json_path and overlay_path.
     """
-    cmd = [sys.executable, script, "--out", out_json_path, "--overlay", overlay_path]
-    if insecure:
-        cmd.append("--insecure")
-    if verbose:
-        cmd.append("--verbose")
-    if extra_args:
-        cmd.extend(extra_args)
+    cmd = [sys.executable, script] + extractor_argv(out_json_path, overlay_path, insecure, verbose, extra_args)
 
     try:
         proc = subprocess.run(
@@ -76,6 +93,132 @@ def run_extractor(
     except Exception as e:
         return 1, {"status": "error", "message": f"Failed to run {name}: {e}"}
 
+# --- In-process runner ---
+
+def _ms(started: float) -> float:
+    return round((time.perf_counter() - started) * 1000.0, 1)
+
+
+def load_extractor(name: str):
+    """Import an extractor module by source name (works when run as a script or a package)."""
+    if HERE not in sys.path:
+        sys.path.insert(0, HERE)
+    return importlib.import_module(EXTRACTORS[name][0])
+
+
+def fetch_decoded(name: str, insecure: bool) -> dict:
+    """Download one spectrogram and decode it once; never raises."""
+    import numpy as np
+    import cv2
+    import requests
+
+    url = getattr(load_extractor(name), EXTRACTORS[name][1])
+    kw = dict(timeout=30)
+    if insecure:
+        kw["verify"] = False
+    started = time.perf_counter()
+    try:
+        r = requests.get(url, **kw)
+        r.raise_for_status()
+    except Exception as e:
+        return {"error": f"Failed to fetch {name} image: {e}", "timings": {"download": _ms(started)}}
+    download_ms = _ms(started)
+
+    started = time.perf_counter()
+    img = cv2.imdecode(np.frombuffer(r.content, dtype=np.uint8), cv2.IMREAD_COLOR)
+    timings = {"download": download_ms, "decode": _ms(started)}
+    if img is None:
+        return {"error": f"Failed to decode {name} image", "timings": timings}
+    return {"img": img, "last_modified": r.headers.get("Last-Modified"), "timings": timings}
+
+
+def _warm_worker(names) -> None:
+    for name in names:
+        load_extractor(name)
+
+
+def _extract_worker(name: str, img, last_modified, argv: list[str]):
+    module = load_extractor(name)
+    args = module.build_arg_parser().parse_args(argv)
+    started = time.perf_counter()
+    payload, overlay_img = module.extract(img, last_modified, args)
+    return payload, overlay_img, _ms(started)
+
+
+def _pool_context():
+    # fork reuses the numpy/cv2 imports already loaded in this process.
+    if "fork" in multiprocessing.get_all_start_methods():
+        return multiprocessing.get_context("fork")
+    return None
+
+
+def run_in_process(jobs: dict, overlays: dict, insecure: bool) -> tuple[dict, dict]:
+    """
+    Run extractors in-process. jobs: name -> extractor argv, overlays: name -> overlay path.
+    Returns (payloads by name, timings_ms). Each source's extraction starts as soon as its
+    own download is decoded; overlays are written here from the arrays the workers return.
+    """
+    import cv2
+
+    started_total = time.perf_counter()
+    for name in jobs:
+        load_extractor(name)
+    payloads: dict = {}
+    per_source: dict = {name: {} for name in jobs}
+
+    started = time.perf_counter()
+    with ProcessPoolExecutor(max_workers=len(jobs), mp_context=_pool_context()) as pool:
+        # Start the workers before any download threads exist, so fork never copies a live thread.
+        pool.submit(_warm_worker, list(jobs)).result()
+        pool_ms = _ms(started)
+
+        started = time.perf_counter()
+        pending = {}
+        with ThreadPoolExecutor(max_workers=len(jobs)) as fetchers:
+            fetches = {fetchers.submit(fetch_decoded, name, insecure): name for name in jobs}
+            for fut in as_completed(fetches):
+                name = fetches[fut]
+                fetched = fut.result()
+                per_source[name].update(fetched["timings"])
+                if "error" in fetched:
+                    payloads[name] = {"status": "error", "message": fetched["error"]}
+                    continue
+                pending[name] = pool.submit(_extract_worker, name, fetched["img"], fetched["last_modified"], jobs[name])
+        fetch_ms = _ms(started)
+
+        started = time.perf_counter()
+        results = {}
+        for name, fut in pending.items():
+            try:
+                payload, overlay_img, extract_ms = fut.result()
+            except Exception as e:
+                payloads[name] = {"status": "error", "message": f"{name} extractor failed: {e}"}
+                continue
+            per_source[name]["extract"] = extract_ms
+            payloads[name] = payload
+            results[name] = overlay_img
+        extract_ms = _ms(started)
+
+    started = time.perf_counter()
+    for name, overlay_img in results.items():
+        write_started = time.perf_counter()
+        cv2.imwrite(overlays[name], overlay_img)
+        per_source[name]["overlay_write"] = _ms(write_started)
+    overlay_ms = _ms(started)
+
+    # Stage walls are sequential; extraction overlaps the slower download, so per-source
+    # extract times can exceed the "extract" stage (which only counts the wait after downloads).
+    timings = {
+        "pool_start": pool_ms,
+        "download_decode": fetch_ms,
+        "extract": extract_ms,
+        "overlay_write": overlay_ms,
+        "total": _ms(started_total),
+        "sources": per_source,
+    }
+    return payloads, timings
+
+
 def pick_primary(prefer_order, statuses):
     """
     prefer_order: list like ["tomsk", "cumiana"]
@@ -204,7 +347,7 @@ def infer_quality_and_usable(name: str, payload: dict, peer_payload: dict | None
 
     return qs, usable, reasons
 
-def main():
+def main(argv=None):
     ap = argparse.ArgumentParser(description="Run Tomsk + Cumiana and merge outputs")
     ap.add_argument("--out", required=True, help="Combined JSON output path (e.g. runs/schumann_now.json)")
     ap.add_argument("--overlay", required=True, help="Overlay *directory or file*. We'll write tomsk_overlay.png & cumiana_overlay.png in this dir.")
@@ -221,7 +364,9 @@ def main():
     ap.add_argument("--draw-debug", action="store_true", help="Pass to Tomsk extractor")
     # Cumiana fixed offset (columns from right edge); if set, pass to Cumiana
     ap.add_argument("--cumiana-fixed-offset", type=int, default=None, help="Pass to Cumiana extractor as --fixed-offset")
-    args = ap.parse_args()
+    ap.add_argument("--in-process", action="store_true",
+                    help="Fetch both images concurrently and run extractors in a process pool instead of subprocesses")
+    args = ap.parse_args(argv)
 
     # Normalize overlay dir
     overlay_dir = args.overlay
@@ -267,27 +412,47 @@ def main():
         if args.cumiana_fixed_offset is not None:
             cumiana_extra += ["--fixed-offset", str(args.cumiana_fixed_offset)]
 
-        # Run Tomsk
-        rc_tomsk, payload_tomsk = run_extractor(
-            "tomsk",
-            tomsk_script,
-            tomsk_json_tmp,
-            tomsk_overlay,
-            insecure=args.insecure,
-            verbose=args.verbose,
-            extra_args=tomsk_extra,
-        )
-
-        # Run Cumiana
-        rc_cumiana, payload_cumiana = run_extractor(
-            "cumiana",
-            cumiana_script,
-            cumiana_json_tmp,
-            cumiana_overlay,
-            insecure=args.insecure,
-            verbose=args.verbose,
-            extra_args=cumiana_extra,
-        )
+        started = time.perf_counter()
+        if args.in_process:
+            jobs = {
+                "tomsk": extractor_argv(tomsk_json_tmp, tomsk_overlay, args.insecure, args.verbose, tomsk_extra),
+                "cumiana": extractor_argv(cumiana_json_tmp, cumiana_overlay, args.insecure, args.verbose, cumiana_extra),
+            }
+            payloads, timings = run_in_process(
+                jobs, {"tomsk": tomsk_overlay, "cumiana": cumiana_overlay}, insecure=args.insecure
+            )
+            payload_tomsk = payloads.get("tomsk")
+            payload_cumiana = payloads.get("cumiana")
+        else:
+            # Run Tomsk
+            rc_tomsk, payload_tomsk = run_extractor(
+                "tomsk",
+                tomsk_script,
+                tomsk_json_tmp,
+                tomsk_overlay,
+                insecure=args.insecure,
+                verbose=args.verbose,
+                extra_args=tomsk_extra,
+            )
+            tomsk_ms = _ms(started)
+
+            # Run Cumiana
+            rc_cumiana, payload_cumiana = run_extractor(
+                "cumiana",
+                cumiana_script,
+                cumiana_json_tmp,
+                cumiana_overlay,
+                insecure=args.insecure,
+                verbose=args.verbose,
+                extra_args=cumiana_extra,
+            )
+            timings = {
+                "sources": {
+                    "tomsk": {"subprocess": tomsk_ms},
+                    "cumiana": {"subprocess": round(_ms(started) - tomsk_ms, 1)},
+                },
+            }
+        timings.setdefault("total", _ms(started))
 
         # Collect
         sources = {}
@@ -338,6 +503,8 @@ def main():
         "primary_quality_reasons": (sources.get(primary, {}).get("quality_reasons") if primary else None),
         "overlay_path": overlay_path,
         "sources": sources,
+        "extraction_mode": "in_process" if args.in_process else "subprocess",
+        "timings_ms": timings,
     }
 
     with open(args.out, "w", encoding="utf-8") as f:
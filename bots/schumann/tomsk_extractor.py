@@ -608,7 +608,7 @@ def repair_harmonics(peaks):
 # --------------------------
 # Main
 # --------------------------
-def main():
+def build_arg_parser():
     ap = argparse.ArgumentParser(description="Tomsk Schumann extractor")
     ap.add_argument("--out", required=False, help="Output JSON path (optional when --self-test is used).")
     ap.add_argument("--overlay", required=False)
@@ -634,15 +634,11 @@ def main():
                     help="Draw extra guide lines: day splits, frontier and guard rails, plus pph source label.")
     ap.add_argument("--stale-hours", type=float, default=6.0,
                     help="Mark Tomsk as stale_source if Last-Modified age exceeds this many hours.")
-    args = ap.parse_args()
-    if not args.out and not args.self_test:
-        ap.error("--out is required unless --self-test is set")
+    return ap
 
-    img, last_mod_h = fetch_image(TOMSK_IMG, insecure=args.insecure)
-    if img is None:
-        print("Failed to fetch image", file=sys.stderr)
-        return 3
 
+def extract(img, last_mod_h, args):
+    """Run the Tomsk extraction on a decoded image; returns (payload, overlay_img)."""
     last_mod = parse_last_modified(last_mod_h)
     if args.verbose and last_mod:
         print(f"[dates] Last-Modified={last_mod.isoformat()}")
@@ -773,8 +769,6 @@ def main():
         debug_lines=dbg,
         pph=pph, pph_source=pph_source,
     )
-    if args.overlay:
-        cv2.imwrite(args.overlay, overlay_img)
 
     status_val = "ok"
     if age_hours is not None and age_hours > float(args.stale_hours):
@@ -864,6 +858,24 @@ def main():
         }
     }
 
+    return out, overlay_img
+
+
+def main(argv=None):
+    ap = build_arg_parser()
+    args = ap.parse_args(argv)
+    if not args.out and not args.self_test:
+        ap.error("--out is required unless --self-test is set")
+
+    img, last_mod_h = fetch_image(TOMSK_IMG, insecure=args.insecure)
+    if img is None:
+        print("Failed to fetch image", file=sys.stderr)
+        return 3
+
+    out, overlay_img = extract(img, last_mod_h, args)
+    if args.overlay:
+        cv2.imwrite(args.overlay, overlay_img)
+
     if args.out:
         with open(args.out, "w", encoding="utf-8") as f:
             json.dump(out, f, ensure_ascii=False, indent=2)
@@ -0,0 +1,109 @@
+#!/usr/bin/env python3
+"""
+Synthetic benchmark for the pattern-engine association builders.
+
+Generates random user/day feature and outcome rows, runs the pure-Python
+`build_associations` and the NumPy-backed `build_associations_columnar`
+over the same input, checks that both produce identical rows, and prints
+wall time for each. No database access is needed.
+
+Example:
+    python scripts/bench_pattern_associations.py --users 200 --days 180
+"""
+
+from __future__ import annotations
+
+import argparse
+import random
+import sys
+import time
+from datetime import date, datetime, timedelta, timezone
+from pathlib import Path
+from typing import Any
+
+_REPO_ROOT = Path(__file__).resolve().parents[1]
+if str(_REPO_ROOT) not in sys.path:
+    sys.path.insert(0, str(_REPO_ROOT))
+
+from bots.patterns.pattern_engine_job import (  # noqa: E402
+    ASSOCIATION_PAIRS,
+    OUTCOME_CONFOUNDER_FLAGS,
+    build_associations,
+    build_associations_columnar,
+)
+
+
+def synthetic_rows(
+    *,
+    users: int,
+    days: int,
+    as_of_day: date,
+    seed: int,
+    missing_rate: float = 0.15,
+) -> tuple[list[dict[str, Any]], list[dict[str, Any]]]:
+    rng = random.Random(seed)
+    signal_keys = sorted({signal_key for signal_key, _ in ASSOCIATION_PAIRS})
+    outcome_keys = sorted({outcome_key for _, outcome_key in ASSOCIATION_PAIRS})
+    confounder_flags = sorted({flag for flags in OUTCOME_CONFOUNDER_FLAGS.values() for flag in flags})
+
+    feature_rows: list[dict[str, Any]] = []
+    outcome_rows: list[dict[str, Any]] = []
+    for user_index in range(users):
+        user_id = f"bench-user-{user_index:05d}"
+        for offset in range(days):
+            day_value = as_of_day - timedelta(days=days - 1 - offset)
+            if rng.random() < missing_rate:
+                continue
+            feature_row: dict[str, Any] = {"user_id": user_id, "day": day_value}
+            for signal_key in signal_keys:
+                feature_row[signal_key] = None if rng.random() < missing_rate else rng.random() < 0.3
+            for flag in confounder_flags:
+                feature_row[flag] = rng.random() < 0.03
+            feature_row["schumann_variability_proxy"] = rng.uniform(0.0, 1.0)
+            feature_row["schumann_variability_p80"] = rng.choice([None, 0.6, 0.65, 0.7])
+            feature_rows.append(feature_row)
+
+            outcome_row: dict[str, Any] = {"user_id": user_id, "day": day_value}
+            for outcome_key in outcome_keys:
+                outcome_row[outcome_key] = None if rng.random() < missing_rate else rng.random() < 0.25
+            outcome_rows.append(outcome_row)
+    return feature_rows, outcome_rows
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Benchmark pattern-engine association builders.")
+    parser.add_argument("--users", type=int, default=50)
+    parser.add_argument("--days", type=int, default=180)
+    parser.add_argument("--seed", type=int, default=7)
+    parser.add_argument("--repeat", type=int, default=1)
+    args = parser.parse_args()
+
+    as_of_day = date(2026, 3, 31)
+    updated_at = datetime(2026, 3, 31, tzinfo=timezone.utc)
+    feature_rows, outcome_rows = synthetic_rows(
+        users=max(args.users, 1),
+        days=max(args.days, 1),
+        as_of_day=as_of_day,
+        seed=args.seed,
+    )
+    print(f"users={args.users} days={args.days} feature_rows={len(feature_rows)} outcome_rows={len(outcome_rows)}")
+
+    results: dict[str, list[dict[str, Any]]] = {}
+    for name, builder in (("python", build_associations), ("columnar", build_associations_columnar)):
+        timings: list[float] = []
+        for _ in range(max(args.repeat, 1)):
+            started = time.perf_counter()
+            results[name] = builder(feature_rows, outcome_rows, as_of_day=as_of_day, updated_at=updated_at)
+            timings.append(time.perf_counter() - started)
+        best = min(timings)
+        print(f"{name:<9} rows={len(results[name])} best={best:.3f}s")
+
+    if results["python"] != results["columnar"]:
+        print("parity=FAILED")
+        return 1
+    print("parity=ok")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,82 @@
+#!/usr/bin/env python3
+"""
+Benchmark the offline ZIP centroid index.
+
+Builds a `ZipCentroidIndex` from data/zip_centroids.csv (or a synthetic set of
+`--synthetic` random US-range centroids), then reports forward ZIP lookups and
+nearest-ZIP reverse lookups per second. Reverse results are spot-checked
+against a brute-force scan. No database or network access is needed.
+
+Example:
+    python scripts/bench_zip_lookup.py --synthetic 42000 --lookups 200000
+"""
+
+from __future__ import annotations
+
+import argparse
+import random
+import sys
+import time
+from pathlib import Path
+
+_REPO_ROOT = Path(__file__).resolve().parents[1]
+if str(_REPO_ROOT) not in sys.path:
+    sys.path.insert(0, str(_REPO_ROOT))
+
+from services.geo.zip_lookup import DATA_CSV, ZipCentroidIndex, haversine_km  # noqa: E402
+
+
+def synthetic_index(count: int, seed: int) -> ZipCentroidIndex:
+    rng = random.Random(seed)
+    zips = rng.sample(range(501, 99951), count)
+    return ZipCentroidIndex([(zip_int, rng.uniform(24.5, 49.0), rng.uniform(-124.7, -67.0)) for zip_int in zips])
+
+
+def brute_force_nearest(index: ZipCentroidIndex, lat: float, lon: float) -> str:
+    best = min(range(len(index)), key=lambda idx: haversine_km(lat, lon, index.lats[idx], index.lons[idx]))
+    return f"{index.zips[best]:05d}"
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Benchmark ZIP centroid index lookups.")
+    parser.add_argument("--synthetic", type=int, default=0, help="Use N random centroids instead of the CSV")
+    parser.add_argument("--lookups", type=int, default=100_000)
+    parser.add_argument("--reverse-lookups", type=int, default=20_000)
+    parser.add_argument("--check", type=int, default=200, help="Reverse lookups verified by brute force")
+    parser.add_argument("--seed", type=int, default=7)
+    args = parser.parse_args()
+
+    started = time.perf_counter()
+    index = synthetic_index(args.synthetic, args.seed) if args.synthetic else ZipCentroidIndex.from_csv(DATA_CSV)
+    build_seconds = time.perf_counter() - started
+    if not len(index):
+        print("index is empty; pass --synthetic N or populate data/zip_centroids.csv")
+        return 1
+
+    rng = random.Random(args.seed + 1)
+    queries = [f"{index.zips[rng.randrange(len(index))]:05d}" for _ in range(args.lookups)]
+    started = time.perf_counter()
+    for zip_code in queries:
+        index.lookup(zip_code)
+    forward_seconds = time.perf_counter() - started
+
+    points = [(rng.uniform(24.5, 49.0), rng.uniform(-124.7, -67.0)) for _ in range(args.reverse_lookups)]
+    started = time.perf_counter()
+    results = [index.nearest(lat, lon) for lat, lon in points]
+    reverse_seconds = time.perf_counter() - started
+
+    mismatches = sum(
+        1
+        for (lat, lon), hit in zip(points[: args.check], results[: args.check])
+        if hit is None or hit[0] != brute_force_nearest(index, lat, lon)
+    )
+
+    print(f"centroids={len(index)} build={build_seconds * 1000:.1f}ms")
+    print(f"forward lookups={args.lookups} rate={args.lookups / forward_seconds:,.0f}/s")
+    print(f"reverse lookups={args.reverse_lookups} rate={args.reverse_lookups / reverse_seconds:,.0f}/s")
+    print(f"reverse brute-force check={min(args.check, len(points))} mismatches={mismatches}")
+    return 1 if mismatches else 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
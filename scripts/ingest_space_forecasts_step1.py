@@ -56,6 +56,7 @@ import os
 import re
 import sys
 from collections import defaultdict
+from contextvars import ContextVar
 from dataclasses import dataclass
 from datetime import UTC, date, datetime, timedelta
 from pathlib import Path
@@ -558,6 +559,12 @@ class SupabaseWriter:
     dsn: str | None
     dry_run: bool = False
     _conn: asyncpg.Connection | None = None
+    # asyncpg connections run one operation at a time; feeds share this one.
+    _lock: asyncio.Lock | None = None
+
+    def __post_init__(self) -> None:
+        if self._lock is None:
+            self._lock = asyncio.Lock()
 
     async def __aenter__(self) -> "SupabaseWriter":
         if not self.dsn or self.dry_run:
@@ -570,23 +577,16 @@ class SupabaseWriter:
             await self._conn.close()
         self._conn = None
 
-    async def upsert_many(
-        self,
+    @staticmethod
+    def upsert_statement(
         schema: str,
         table: str,
-        rows: Sequence[dict[str, Any]],
+        cols: Sequence[str],
         conflict_cols: Sequence[str] | None = None,
         *,
         constraint: str | None = None,
         skip_update_cols: Sequence[str] | None = None,
-    ) -> int:
-        if not rows:
-            return 0
-        if self.dry_run or not self._conn:
-            logger.info("[dry-run] would upsert %s rows into %s.%s", len(rows), schema, table)
-            return len(rows)
-
-        cols = list(rows[0].keys())
+    ) -> str:
         quoted_cols = ", ".join(f'"{c}"' for c in cols)
         placeholders = ", ".join(f"${idx}" for idx in range(1, len(cols) + 1))
         skip_cols = set(skip_update_cols or [])
@@ -611,16 +611,233 @@ class SupabaseWriter:
                 conflict_clause = f"on conflict ({conflict}) do nothing"
         else:
             conflict_clause = ""
-        sql = f"""
+        return f"""
             insert into {schema}.{table} ({quoted_cols})
             values ({placeholders})
             {conflict_clause}
         """
-        values = [tuple(row[col] for col in cols) for row in rows]
-        async with self._conn.transaction():
-            await self._conn.executemany(sql, values)
+
+    async def upsert_many(
+        self,
+        schema: str,
+        table: str,
+        rows: Sequence[dict[str, Any]],
+        conflict_cols: Sequence[str] | None = None,
+        *,
+        constraint: str | None = None,
+        skip_update_cols: Sequence[str] | None = None,
+    ) -> int:
+        if not rows:
+            return 0
+        if self.dry_run or not self._conn:
+            logger.info("[dry-run] would upsert %s rows into %s.%s", len(rows), schema, table)
+            return len(rows)
+
+        cols = list(rows[0].keys())
+        sql = self.upsert_statement(
+            schema,
+            table,
+            cols,
+            conflict_cols,
+            constraint=constraint,
+            skip_update_cols=skip_update_cols,
+        )
+        await self.executemany(sql, [tuple(row[col] for col in cols) for row in rows])
         return len(rows)
 
+    async def executemany(self, sql: str, values: Sequence[tuple[Any, ...]]) -> None:
+        async with self._lock:
+            async with self._conn.transaction():
+                await self._conn.executemany(sql, values)
+
+    async def fetch(self, sql: str, *args: Any) -> list[asyncpg.Record]:
+        async with self._lock:
+            return await self._conn.fetch(sql, *args)
+
+    async def fetchrow(self, sql: str, *args: Any) -> asyncpg.Record | None:
+        async with self._lock:
+            return await self._conn.fetchrow(sql, *args)
+
+
+@dataclass(slots=True)
+class _Upsert:
+    schema: str
+    table: str
+    sql: str | None
+    values: list[tuple[Any, ...]]
+    future: asyncio.Future
+
+
+class BatchedWriter:
+    """Funnels every feed's upserts through one writer task.
+
+    Whatever is queued while a write is in flight goes out next as one
+    executemany per statement. If a combined batch fails, its requests are
+    retried one by one so a bad feed cannot fail another feed's rows.
+    """
+
+    def __init__(self, db: SupabaseWriter) -> None:
+        self.db = db
+        self.batches = 0
+        self._queue: asyncio.Queue[_Upsert | None] = asyncio.Queue()
+        self._task: asyncio.Task | None = None
+
+    @property
+    def _conn(self) -> asyncpg.Connection | None:
+        return self.db._conn
+
+    async def __aenter__(self) -> "BatchedWriter":
+        self._task = asyncio.create_task(self._drain())
+        return self
+
+    async def __aexit__(self, exc_type, exc, tb) -> None:  # type: ignore[override]
+        await self._queue.put(None)
+        if self._task is not None:
+            await self._task
+
+    async def upsert_many(
+        self,
+        schema: str,
+        table: str,
+        rows: Sequence[dict[str, Any]],
+        conflict_cols: Sequence[str] | None = None,
+        *,
+        constraint: str | None = None,
+        skip_update_cols: Sequence[str] | None = None,
+    ) -> int:
+        if not rows:
+            return 0
+        cols = list(rows[0].keys())
+        sql = None
+        if not self.db.dry_run and self.db._conn is not None:
+            sql = self.db.upsert_statement(
+                schema,
+                table,
+                cols,
+                conflict_cols,
+                constraint=constraint,
+                skip_update_cols=skip_update_cols,
+            )
+        request = _Upsert(
+            schema=schema,
+            table=table,
+            sql=sql,
+            values=[tuple(row[col] for col in cols) for row in rows],
+            future=asyncio.get_running_loop().create_future(),
+        )
+        await self._queue.put(request)
+        written = await request.future
+        stats = _FEED_STATS.get(None)
+        if stats is not None:
+            stats.rows += written
+        return written
+
+    async def fetch(self, sql: str, *args: Any) -> list[asyncpg.Record]:
+        return await self.db.fetch(sql, *args)
+
+    async def fetchrow(self, sql: str, *args: Any) -> asyncpg.Record | None:
+        return await self.db.fetchrow(sql, *args)
+
+    async def _drain(self) -> None:
+        stopping = False
+        while not stopping:
+            pending: list[_Upsert] = []
+            item = await self._queue.get()
+            while True:
+                if item is None:
+                    stopping = True
+                else:
+                    pending.append(item)
+                if self._queue.empty():
+                    break
+                item = self._queue.get_nowait()
+            if pending:
+                await self._write(pending)
+
+    async def _write(self, pending: list[_Upsert]) -> None:
+        groups: dict[tuple[str, str, str | None], list[_Upsert]] = defaultdict(list)
+        for request in pending:
+            groups[(request.schema, request.table, request.sql)].append(request)
+        for (schema, table, sql), requests in groups.items():
+            self.batches += 1
+            if sql is None:
+                count = sum(len(request.values) for request in requests)
+                logger.info("[dry-run] would upsert %s rows into %s.%s", count, schema, table)
+                for request in requests:
+                    _resolve(request.future, len(request.values))
+                continue
+            try:
+                await self.db.executemany(sql, [value for request in requests for value in request.values])
+            except Exception as exc:
+                if len(requests) == 1:
+                    _resolve(requests[0].future, exc)
+                    continue
+                logger.warning("[writer] batch into %s.%s failed (%s); retrying per feed", schema, table, exc)
+                for request in requests:
+                    try:
+                        await self.db.executemany(sql, request.values)
+                    except Exception as retry_exc:
+                        _resolve(request.future, retry_exc)
+                    else:
+                        _resolve(request.future, len(request.values))
+            else:
+                for request in requests:
+                    _resolve(request.future, len(request.values))
+
+
+def _resolve(future: asyncio.Future, outcome: int | BaseException) -> None:
+    # A feed that hit its timeout has already given up on its future.
+    if future.done():
+        return
+    if isinstance(outcome, BaseException):
+        future.set_exception(outcome)
+    else:
+        future.set_result(outcome)
+
+
+class _HostLimitedTransport(httpx.AsyncBaseTransport):
+    """Caps concurrent requests per upstream host; the slot is held until the body is closed."""
+
+    def __init__(self, per_host: int, transport: httpx.AsyncBaseTransport | None = None) -> None:
+        self.per_host = max(1, per_host)
+        self._transport = transport or httpx.AsyncHTTPTransport()
+        self._slots: dict[str, asyncio.Semaphore] = {}
+
+    async def handle_async_request(self, request: httpx.Request) -> httpx.Response:
+        slot = self._slots.setdefault(request.url.host, asyncio.Semaphore(self.per_host))
+        await slot.acquire()
+        try:
+            response = await self._transport.handle_async_request(request)
+        except BaseException:
+            slot.release()
+            raise
+        return httpx.Response(
+            status_code=response.status_code,
+            headers=response.headers,
+            stream=_SlotReleasingStream(response.stream, slot),
+            extensions=response.extensions,
+        )
+
+    async def aclose(self) -> None:
+        await self._transport.aclose()
+
+
+class _SlotReleasingStream(httpx.AsyncByteStream):
+    def __init__(self, stream: Any, slot: asyncio.Semaphore) -> None:
+        self._stream = stream
+        self._slot: asyncio.Semaphore | None = slot
+
+    async def __aiter__(self):
+        async for chunk in self._stream:
+            yield chunk
+
+    async def aclose(self) -> None:
+        try:
+            await self._stream.aclose()
+        finally:
+            if self._slot is not None:
+                self._slot.release()
+                self._slot = None
 
 
 async def fetch_json(client: httpx.AsyncClient, url: str, params: dict[str, Any] | None = None) -> Any:
@@ -778,17 +995,23 @@ async def ingest_enlil(
         "endDate": now.strftime("%Y-%m-%d"),
         "api_key": os.getenv("NASA_API_KEY"),
     }
+    # Prefetch CME plane‑of‑sky speeds by activityID as a robust fallback,
+    # alongside the simulations request rather than after it.
+    speeds_task = asyncio.create_task(
+        _fetch_donki_cme_speed_map(client, params["startDate"], params["endDate"], os.getenv("NASA_API_KEY"))
+    )
     try:
         data = await fetch_json(client, "https://api.nasa.gov/DONKI/WSAEnlilSimulations", params)
     except Exception as exc:
+        speeds_task.cancel()
         logger.warning("WSA–Enlil fetch failed after retries (%s); skipping ENLIL ingest for this run", exc)
         return
+    except asyncio.CancelledError:
+        speeds_task.cancel()
+        raise
 
-    # Prefetch CME plane‑of‑sky speeds by activityID as a robust fallback
     try:
-        speeds_map = await _fetch_donki_cme_speed_map(
-            client, params["startDate"], params["endDate"], os.getenv("NASA_API_KEY")
-        )
+        speeds_map = await speeds_task
     except Exception as exc:
         logger.debug("CME speeds map fetch failed: %s", exc)
         speeds_map = {}
@@ -867,7 +1090,7 @@ async def ingest_enlil(
             # Fallback: if Kp is missing, try to infer from ext.cme_scoreboard around the arrival window
             if kp_est is None and arrival is not None and writer._conn is not None:
                 try:
-                    row = await writer._conn.fetchrow(
+                    row = await writer.fetchrow(
                         """
                         select max(kp_predicted) as kp
                         from ext.cme_scoreboard
@@ -884,7 +1107,7 @@ async def ingest_enlil(
             # Confidence fallback via number of Scoreboard predictions near the arrival window
             if confidence is None and arrival is not None and writer._conn is not None:
                 try:
-                    rowc = await writer._conn.fetchrow(
+                    rowc = await writer.fetchrow(
                         """
                         select count(*) as n
                         from ext.cme_scoreboard
@@ -2174,6 +2397,31 @@ _FEED_NAMES = (
     "magnetometer",
 )
 
+# Feeds that read another feed's rows wait for that feed (when it is selected).
+# enlil falls back to ext.cme_scoreboard for Kp and confidence, so it runs on
+# fresh scoreboard rows; its DONKI CME speed map is fetched inside the feed.
+_FEED_DEPENDENCIES: dict[str, tuple[str, ...]] = {
+    "enlil": ("scoreboard",),
+}
+# DONKI retries on the shared DEMO_KEY are slow; give those feeds more room.
+_FEED_TIMEOUTS: dict[str, float] = {
+    "enlil": 420.0,
+    "scoreboard": 420.0,
+}
+FEED_TIMEOUT_SECS = float(os.getenv("FORECAST_FEED_TIMEOUT_SECS", "240"))
+HTTP_PER_HOST_LIMIT = max(1, int(os.getenv("FORECAST_HTTP_PER_HOST", "4")))
+
+
+@dataclass(slots=True)
+class _FeedStats:
+    status: str = "pending"
+    ms: float = 0.0
+    rows: int = 0
+    error: str | None = None
+
+
+_FEED_STATS: ContextVar[_FeedStats] = ContextVar("feed_stats")
+
 
 async def _run_feed(
     name: str,
@@ -2213,23 +2461,68 @@ async def _run_selected_feeds(
     selected: set[str],
     *,
     client: httpx.AsyncClient,
-    writer: SupabaseWriter,
+    writer: SupabaseWriter | BatchedWriter,
     days: int,
-) -> None:
-    succeeded: list[str] = []
-    failed: list[str] = []
+    timeout: float | None = None,
+) -> dict[str, _FeedStats]:
+    """Run the selected feeds concurrently and return per-feed status, latency and rows.
 
-    for name in _FEED_NAMES:
-        if name not in selected:
-            continue
+    Each feed gets its own timeout and starts once the selected feeds it
+    depends on have finished (whether or not they succeeded).
+    """
+    names = [name for name in _FEED_NAMES if name in selected]
+    stats = {name: _FeedStats() for name in names}
+    finished = {name: asyncio.Event() for name in names}
+
+    async def _scheduled(name: str) -> None:
         try:
-            await _run_feed(name, client, writer, days)
-        except Exception:
-            failed.append(name)
-            logger.exception("[feed] failed name=%s", name)
-        else:
-            succeeded.append(name)
-            logger.info("[feed] completed name=%s", name)
+            for dependency in _FEED_DEPENDENCIES.get(name, ()):
+                if dependency in finished:
+                    await finished[dependency].wait()
+            _FEED_STATS.set(stats[name])
+            feed_timeout = timeout or _FEED_TIMEOUTS.get(name, FEED_TIMEOUT_SECS)
+            started = loop.time()
+            try:
+                await asyncio.wait_for(_run_feed(name, client, writer, days), feed_timeout)
+            except asyncio.TimeoutError:
+                stats[name].status = "timeout"
+                stats[name].error = f"timed out after {feed_timeout:.0f}s"
+                logger.error("[feed] timed out name=%s after=%.0fs", name, feed_timeout)
+            except Exception as exc:
+                stats[name].status = "failed"
+                stats[name].error = str(exc) or type(exc).__name__
+                logger.exception("[feed] failed name=%s", name)
+            else:
+                stats[name].status = "ok"
+                logger.info("[feed] completed name=%s", name)
+            stats[name].ms = (loop.time() - started) * 1000.0
+        finally:
+            finished[name].set()
+
+    loop = asyncio.get_running_loop()
+    run_started = loop.time()
+    await asyncio.gather(*(_scheduled(name) for name in names))
+    elapsed_ms = (loop.time() - run_started) * 1000.0
+
+    succeeded = [name for name in names if stats[name].status == "ok"]
+    failed = [name for name in names if stats[name].status != "ok"]
+    for name in names:
+        logger.info(
+            "[feed] summary name=%s status=%s ms=%.0f rows=%d",
+            name,
+            stats[name].status,
+            stats[name].ms,
+            stats[name].rows,
+        )
+    logger.info(
+        "[feed] run done feeds=%d ok=%d failed=%d rows=%d elapsed_ms=%.0f serial_ms=%.0f",
+        len(names),
+        len(succeeded),
+        len(failed),
+        sum(stat.rows for stat in stats.values()),
+        elapsed_ms,
+        sum(stat.ms for stat in stats.values()),
+    )
 
     if failed and not succeeded:
         raise RuntimeError(f"all selected space forecast feeds failed: {', '.join(failed)}")
@@ -2239,6 +2532,7 @@ async def _run_selected_feeds(
             ",".join(failed),
             ",".join(succeeded),
         )
+    return stats
 
 
 async def run_ingestion(args: argparse.Namespace) -> None:
@@ -2252,13 +2546,14 @@ async def run_ingestion(args: argparse.Namespace) -> None:
     if not args.dry_run and not dsn:
         raise SystemExit("SUPABASE_DB_URL is required unless --dry-run is supplied")
 
-    async with SupabaseWriter(dsn, dry_run=args.dry_run) as writer:
-        async with httpx.AsyncClient() as client:
+    async with SupabaseWriter(dsn, dry_run=args.dry_run) as db, BatchedWriter(db) as writer:
+        async with httpx.AsyncClient(transport=_HostLimitedTransport(args.per_host)) as client:
             await _run_selected_feeds(
                 selected,
                 client=client,
                 writer=writer,
                 days=args.days,
+                timeout=args.feed_timeout,
             )
 
 
@@ -2271,6 +2566,18 @@ def build_arg_parser() -> argparse.ArgumentParser:
         help="subset of feeds to run (enlil, sep, radiation, xray, aurora, coronal, scoreboard, drap, solar, bulletins, alerts, magnetometer)",
     )
     parser.add_argument("--dry-run", action="store_true", help="skip Supabase writes")
+    parser.add_argument(
+        "--feed-timeout",
+        type=float,
+        default=None,
+        help=f"per-feed timeout in seconds (default {FEED_TIMEOUT_SECS:.0f}, longer for DONKI feeds)",
+    )
+    parser.add_argument(
+        "--per-host",
+        type=int,
+        default=HTTP_PER_HOST_LIMIT,
+        help="max concurrent requests per upstream host",
+    )
     return parser
 
 
@@ -2303,7 +2610,7 @@ async def ingest_magnetometer_proxy(
     end_ts = datetime.now(tz=UTC)
     start_ts = end_ts - timedelta(days=days)
 
-    rows = await writer._conn.fetch(
+    rows = await writer.fetch(
         """
         select ts, bz_nt, v_kms, n_cm3
         from ext.magnetosphere_pulse
@@ -11,11 +11,17 @@ Key environment variables:
 - GAIA_LOAD_AUTH_BEARER, GAIA_MONITOR_AUTH_BEARER, DEV_BEARER, or WRITE_TOKENS:
   bearer token used for authenticated writes.
 - GAIA_LOAD_TZ: timezone query parameter, defaults to America/Chicago.
+
+`--compare-insert-modes` skips HTTP and instead writes the same synthetic
+samples through both `/v1/samples/batch` insert modes (`rows` and `copy`)
+directly against `DATABASE_URL`. This mode imports the API package and needs its
+dependencies.
 """
 
 from __future__ import annotations
 
 import argparse
+import asyncio
 import concurrent.futures
 import json
 import os
@@ -26,6 +32,7 @@ import urllib.error
 import urllib.parse
 import urllib.request
 from dataclasses import dataclass
+from pathlib import Path
 from datetime import datetime, timedelta, timezone
 from typing import Any, Iterable
 from uuid import NAMESPACE_DNS, uuid5
@@ -316,6 +323,92 @@ def _print_summary(results: list[RequestResult], started: float, *, allow_deferr
     return 0
 
 
+async def _insert_mode_pass(
+    ingest: Any,
+    pool: Any,
+    args: argparse.Namespace,
+    mode: str,
+) -> dict[str, Any]:
+    semaphore = asyncio.Semaphore(args.concurrency)
+    latencies: list[float] = []
+
+    async def _write(rows: list[tuple[Any, int]], user_id: str) -> tuple[int, int, list[dict[str, Any]]]:
+        async with semaphore:
+            started = time.perf_counter()
+            result = await ingest._insert_batch_once(pool, rows, user_id, mode=mode)
+            latencies.append((time.perf_counter() - started) * 1000.0)
+            return result
+
+    chunks: list[tuple[list[tuple[Any, int]], str]] = []
+    for user_index in range(args.users):
+        user_id = str(uuid5(NAMESPACE_DNS, f"gaiaeyes-loadtest:{args.run_id}:{mode}:{user_index}"))
+        samples = [ingest.SampleIn(**sample) for sample in _make_samples(user_id, args.rows_per_user, user_index)]
+        for offset in range(0, len(samples), args.chunk_size):
+            chunk = samples[offset : offset + args.chunk_size]
+            chunks.append(([(sample, offset + index) for index, sample in enumerate(chunk)], user_id))
+
+    started = time.perf_counter()
+    first = await asyncio.gather(*(_write(rows, user_id) for rows, user_id in chunks))
+    elapsed = time.perf_counter() - started
+    first_latencies = list(latencies)
+    # Re-sending the same chunks measures the all-conflict path that client retries hit.
+    replay_started = time.perf_counter()
+    replay = await asyncio.gather(*(_write(rows, user_id) for rows, user_id in chunks))
+    replay_elapsed = time.perf_counter() - replay_started
+
+    rows_total = args.users * args.rows_per_user
+    return {
+        "requests": len(chunks),
+        "inserted": sum(inserted for inserted, _, _ in first),
+        "skipped": sum(skipped for _, skipped, _ in first),
+        "errors": sum(len(errors) for _, _, errors in first),
+        "rows": rows_total,
+        "seconds": round(elapsed, 3),
+        "rows_per_second": round(rows_total / elapsed, 1) if elapsed > 0 else 0,
+        "latency_ms": {
+            "p50": round(statistics.median(first_latencies), 1) if first_latencies else 0,
+            "p95": round(_percentile(first_latencies, 95), 1),
+        },
+        "replay_seconds": round(replay_elapsed, 3),
+        "replay_inserted": sum(inserted for inserted, _, _ in replay),
+        "replay_skipped": sum(skipped for _, skipped, _ in replay),
+    }
+
+
+async def _compare_insert_modes(args: argparse.Namespace) -> int:
+    root = Path(__file__).resolve().parents[1]
+    if str(root) not in sys.path:
+        sys.path.insert(0, str(root))
+    from app.db import close_pool, get_pool
+    from app.routers import ingest
+
+    pool = await get_pool()
+    try:
+        results = {mode: await _insert_mode_pass(ingest, pool, args, mode) for mode in ("rows", "copy")}
+    finally:
+        await close_pool()
+
+    print(json.dumps(
+        {
+            "users": args.users,
+            "rows_per_user": args.rows_per_user,
+            "chunk_size": args.chunk_size,
+            "copy_min_rows": ingest.INGEST_COPY_MIN_ROWS,
+            "modes": results,
+        },
+        indent=2,
+        sort_keys=True,
+    ))
+    counts = {
+        mode: (result["inserted"], result["skipped"], result["replay_inserted"], result["replay_skipped"])
+        for mode, result in results.items()
+    }
+    if counts["rows"] != counts["copy"]:
+        print(f"FAIL: insert modes disagree on counts {counts}", file=sys.stderr)
+        return 1
+    return 0
+
+
 def _parse_args() -> argparse.Namespace:
     parser = argparse.ArgumentParser(description="Synthetic Gaia Eyes ingest load test.")
     parser.add_argument("--base-url", default=_default_base_url(), help="API base URL; defaults to localhost.")
@@ -334,11 +427,16 @@ def _parse_args() -> argparse.Namespace:
         action="store_true",
         help="Exit successfully when queue-enabled ingest buffers/dequeues requests instead of writing immediately.",
     )
+    parser.add_argument(
+        "--compare-insert-modes",
+        action="store_true",
+        help="Write directly to DATABASE_URL with the per-row and COPY insert modes and compare them.",
+    )
     parser.add_argument("--dry-run", action="store_true", help="Print plan and first sample without writing.")
     parser.add_argument(
         "--allow-non-local-write",
         action="store_true",
-        help="Required when base URL is not localhost/127.0.0.1/::1.",
+        help="Required when base URL (or DATABASE_URL with --compare-insert-modes) is not local.",
     )
     return parser.parse_args()
 
@@ -371,6 +469,19 @@ def main() -> int:
         ))
         return 0
 
+    if args.compare_insert_modes:
+        database_url = os.getenv("DATABASE_URL", "").strip()
+        if not database_url:
+            print("Missing DATABASE_URL for --compare-insert-modes.", file=sys.stderr)
+            return 2
+        if not _is_local_url(database_url) and not args.allow_non_local_write:
+            print(
+                "Refusing to write to a non-local DATABASE_URL without --allow-non-local-write.",
+                file=sys.stderr,
+            )
+            return 2
+        return asyncio.run(_compare_insert_modes(args))
+
     if not args.bearer:
         print("Missing bearer. Set GAIA_LOAD_AUTH_BEARER, DEV_BEARER, or WRITE_TOKENS.", file=sys.stderr)
         return 2
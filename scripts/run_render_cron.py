@@ -20,8 +20,12 @@ from pathlib import Path
 from typing import Iterable
 from urllib.parse import parse_qsl, urlencode, urlsplit, urlunsplit
 
-
 ROOT = Path(__file__).resolve().parents[1]
+if str(ROOT) not in sys.path:
+    sys.path.insert(0, str(ROOT))
+
+from services.features_cache_invalidation import publish_global_invalidation
+
 PYTHON = sys.executable
 LOG = logging.getLogger("gaiaeyes.render_cron")
 _ASYNC_DRIVER_UNSUPPORTED_DSN_PARAMS = {"hostaddr", "pgbouncer"}
@@ -33,6 +37,8 @@ class Step:
     command: tuple[str, ...]
     timeout_seconds: int
     env: dict[str, str] = field(default_factory=dict)
+    # Global /v1/features/today sections to invalidate after a successful run.
+    invalidates: tuple[str, ...] = ()
 
 
 def _python(*parts: str) -> tuple[str, ...]:
@@ -46,6 +52,7 @@ LANES: dict[str, tuple[Step, ...]] = {
             _python("scripts/ingest_space_weather_swpc.py"),
             240,
             {"SINCE_HOURS": "24", "MAX_SOURCE_AGE_MINUTES": "90"},
+            ("current_wx",),
         ),
         Step(
             "space_live_context",
@@ -62,7 +69,7 @@ LANES: dict[str, tuple[Step, ...]] = {
             ),
             360,
         ),
-        Step("ulf", _python("bots/geomag_ulf/ingest_ulf.py"), 300),
+        Step("ulf", _python("bots/geomag_ulf/ingest_ulf.py"), 300, invalidates=("ulf",)),
         Step(
             "schumann_extract",
             _python(
@@ -74,6 +81,7 @@ LANES: dict[str, tuple[Step, ...]] = {
                 "--overlay",
                 "/tmp/gaiaeyes-schumann/schumann_overlay.png",
                 "--insecure",
+                "--in-process",
             ),
             360,
         ),
@@ -82,6 +90,7 @@ LANES: dict[str, tuple[Step, ...]] = {
             _python("scripts/ingest_schumann_github.py"),
             180,
             {"SCHUMANN_JSON_PATH": "/tmp/gaiaeyes-schumann/schumann_now.json"},
+            ("sch",),
         ),
         Step(
             "local_current",
@@ -93,6 +102,7 @@ LANES: dict[str, tuple[Step, ...]] = {
             _python("scripts/rollup_space_weather_daily.py"),
             240,
             {"DAYS_BACK": "3"},
+            ("daily_wx",),
         ),
         Step("gauges", _python("bots/gauges/gauge_scoring_job.py"), 900),
     ),
@@ -258,6 +268,8 @@ def run_lane(
             )
         else:
             LOG.info("[cron] done lane=%s step=%s seconds=%.1f", lane, step.name, elapsed)
+            if step.invalidates:
+                publish_global_invalidation(*step.invalidates)
 
     elapsed = time.monotonic() - lane_started
     if failures:
@@ -1,11 +1,20 @@
+import atexit
 import os
+import re
+import threading
+import time
 from contextlib import contextmanager
 from contextvars import ContextVar
-from typing import Any, Iterator
+from typing import Any, Iterator, Sequence
 
 import psycopg
 from psycopg.rows import dict_row
 
+try:
+    from psycopg_pool import ConnectionPool
+except ImportError:  # pragma: no cover - pooling is skipped when psycopg_pool is missing or psycopg is stubbed.
+    ConnectionPool = None
+
 
 def _resolve_dsn() -> str:
     dsn = os.getenv("SUPABASE_DB_URL") or os.getenv("DIRECT_URL") or os.getenv("DATABASE_URL")
@@ -14,9 +23,33 @@ def _resolve_dsn() -> str:
     return dsn
 
 
+def _env_int(name: str, default: int) -> int:
+    try:
+        return int(os.getenv(name, str(default)))
+    except ValueError:
+        return default
+
+
+def _pool_enabled() -> bool:
+    return os.getenv("GAIA_PG_POOL", "1").strip().lower() not in {"0", "false", "no", "off"}
+
+
+_WHITESPACE_RE = re.compile(r"\s+")
+_QUERY_KEY_MAX_CHARS = 200
+
+
+def _query_key(query: str) -> str:
+    return _WHITESPACE_RE.sub(" ", query).strip()[:_QUERY_KEY_MAX_CHARS]
+
+
 class PgClient:
-    def __init__(self, dsn: str | None = None) -> None:
+    def __init__(self, dsn: str | None = None, *, pool: bool | None = None) -> None:
         self._dsn = dsn or _resolve_dsn()
+        self._use_pool = (_pool_enabled() if pool is None else pool) and ConnectionPool is not None
+        self._pool: Any = None
+        self._pool_lock = threading.Lock()
+        self._stats: dict[str, dict[str, float]] = {}
+        self._stats_lock = threading.Lock()
         self._scoped_connection: ContextVar[psycopg.Connection | None] = ContextVar(
             f"gaia_pg_connection_{id(self)}",
             default=None,
@@ -25,6 +58,67 @@ class PgClient:
     def _connect(self, *, autocommit: bool = False) -> psycopg.Connection:
         return psycopg.connect(self._dsn, row_factory=dict_row, autocommit=autocommit)
 
+    def _get_pool(self) -> Any:
+        if self._pool is not None:
+            return self._pool
+        with self._pool_lock:
+            if self._pool is None:
+                # Probe once so an unreachable database fails fast, as an unpooled
+                # connect would, instead of waiting out the pool timeout.
+                self._connect().close()
+                self._pool = ConnectionPool(
+                    self._dsn,
+                    min_size=max(0, _env_int("GAIA_PG_POOL_MIN_SIZE", 1)),
+                    max_size=max(1, _env_int("GAIA_PG_POOL_MAX_SIZE", 8)),
+                    timeout=float(max(1, _env_int("GAIA_PG_POOL_TIMEOUT_SECONDS", 10))),
+                    max_idle=float(max(30, _env_int("GAIA_PG_POOL_MAX_IDLE_SECONDS", 300))),
+                    max_lifetime=float(max(60, _env_int("GAIA_PG_POOL_MAX_LIFETIME_SECONDS", 1800))),
+                    check=ConnectionPool.check_connection,
+                    # Pooled connections may sit behind pgBouncer (transaction mode),
+                    # which cannot keep server-side prepared statements.
+                    kwargs={"row_factory": dict_row, "prepare_threshold": None},
+                    name="gaia_pg",
+                    open=True,
+                )
+                atexit.register(self.close)
+        return self._pool
+
+    def close(self) -> None:
+        with self._pool_lock:
+            pool, self._pool = self._pool, None
+        if pool is not None:
+            pool.close()
+
+    def pool_stats(self) -> dict[str, int]:
+        return dict(self._pool.get_stats()) if self._pool is not None else {}
+
+    @contextmanager
+    def _acquire(self, *, autocommit: bool) -> Iterator[psycopg.Connection]:
+        if not self._use_pool:
+            conn = self._connect(autocommit=autocommit)
+            if autocommit:
+                try:
+                    yield conn
+                finally:
+                    conn.close()
+            else:
+                with conn:
+                    yield conn
+            return
+
+        # The pool commits (or rolls back on error) when the block exits and
+        # discards connections that fail the health check or outlive max_lifetime.
+        with self._get_pool().connection() as conn:
+            if not autocommit:
+                yield conn
+                return
+            conn.autocommit = True
+            try:
+                yield conn
+            finally:
+                if not conn.closed:
+                    conn.autocommit = False
+
     @contextmanager
     def connection_scope(self) -> Iterator[psycopg.Connection]:
         """Reuse one autocommit connection for a bounded sequential work unit."""
@@ -33,13 +127,26 @@ class PgClient:
             yield existing
             return
 
-        conn = self._connect(autocommit=True)
-        token = self._scoped_connection.set(conn)
-        try:
-            yield conn
-        finally:
-            self._scoped_connection.reset(token)
-            conn.close()
+        with self._acquire(autocommit=True) as conn:
+            token = self._scoped_connection.set(conn)
+            try:
+                yield conn
+            finally:
+                self._scoped_connection.reset(token)
+
+    @contextmanager
+    def pipeline(self) -> Iterator[psycopg.Connection]:
+        """Opt-in pipeline mode for a work unit.
+
+        `execute` calls inside the block are queued and sent together; a
+        `fetch`/`fetchrow` forces a sync so its result is returned as usual.
+        """
+        with self.connection_scope() as conn:
+            if not psycopg.Pipeline.is_supported():
+                yield conn
+                return
+            with conn.pipeline():
+                yield conn
 
     @contextmanager
     def _connection(self) -> Iterator[psycopg.Connection]:
@@ -48,27 +155,103 @@ class PgClient:
             yield scoped
             return
 
-        with self._connect() as conn:
+        with self._acquire(autocommit=False) as conn:
             yield conn
 
+    def _record(self, query: str, elapsed: float) -> None:
+        key = _query_key(query)
+        with self._stats_lock:
+            entry = self._stats.get(key)
+            if entry is None:
+                entry = self._stats[key] = {"calls": 0, "total_ms": 0.0, "max_ms": 0.0}
+            elapsed_ms = elapsed * 1000.0
+            entry["calls"] += 1
+            entry["total_ms"] += elapsed_ms
+            entry["max_ms"] = max(entry["max_ms"], elapsed_ms)
+
+    def query_stats(self, top: int | None = 10) -> list[dict[str, Any]]:
+        """Per-statement timing, slowest total first.
+
+        Times are wall-clock per call, including pool checkout and result
+        fetching, so a slow entry can also mean pool contention.
+        """
+        with self._stats_lock:
+            rows = [
+                {
+                    "query": key,
+                    "calls": int(entry["calls"]),
+                    "total_ms": round(entry["total_ms"], 2),
+                    "avg_ms": round(entry["total_ms"] / entry["calls"], 2) if entry["calls"] else 0.0,
+                    "max_ms": round(entry["max_ms"], 2),
+                }
+                for key, entry in self._stats.items()
+            ]
+        rows.sort(key=lambda row: row["total_ms"], reverse=True)
+        return rows[:top] if top else rows
+
+    def reset_query_stats(self) -> None:
+        with self._stats_lock:
+            self._stats.clear()
+
     def fetchrow(self, query: str, *params: Any) -> dict | None:
-        with self._connection() as conn:
-            with conn.cursor() as cur:
-                cur.execute(query, params)
-                row = cur.fetchone()
-                return dict(row) if row else None
+        started = time.perf_counter()
+        try:
+            with self._connection() as conn:
+                with conn.cursor() as cur:
+                    cur.execute(query, params)
+                    row = cur.fetchone()
+                    return dict(row) if row else None
+        finally:
+            self._record(query, time.perf_counter() - started)
 
     def fetch(self, query: str, *params: Any) -> list[dict]:
-        with self._connection() as conn:
-            with conn.cursor() as cur:
-                cur.execute(query, params)
-                rows = cur.fetchall()
-                return [dict(r) for r in rows]
+        started = time.perf_counter()
+        try:
+            with self._connection() as conn:
+                with conn.cursor() as cur:
+                    cur.execute(query, params)
+                    rows = cur.fetchall()
+                    return [dict(r) for r in rows]
+        finally:
+            self._record(query, time.perf_counter() - started)
+
+    def fetch_many(self, queries: Sequence[tuple[str, Sequence[Any]]]) -> list[list[dict]]:
+        """Run independent queries in one pipeline round trip; results keep input order."""
+        started = time.perf_counter()
+        try:
+            with self._connection() as conn:
+                pipelined = psycopg.Pipeline.is_supported()
+                with conn.pipeline() if pipelined else _null_context():
+                    cursors = []
+                    for query, params in queries:
+                        cur = conn.cursor()
+                        cur.execute(query, tuple(params))
+                        cursors.append(cur)
+                    results = []
+                    for cur in cursors:
+                        results.append([dict(r) for r in cur.fetchall()])
+                        cur.close()
+            return results
+        finally:
+            # Pipelined statements share one round trip, so the batch is timed as a whole.
+            self._record(
+                f"fetch_many[{len(queries)}] " + "; ".join(query for query, _ in queries),
+                time.perf_counter() - started,
+            )
 
     def execute(self, query: str, *params: Any) -> None:
-        with self._connection() as conn:
-            with conn.cursor() as cur:
-                cur.execute(query, params)
+        started = time.perf_counter()
+        try:
+            with self._connection() as conn:
+                with conn.cursor() as cur:
+                    cur.execute(query, params)
+        finally:
+            self._record(query, time.perf_counter() - started)
+
+
+@contextmanager
+def _null_context() -> Iterator[None]:
+    yield None
 
 
 pg = PgClient()
@@ -3,6 +3,8 @@ from typing import Any, Dict, List
 
 import httpx
 
+from .http_pool import current_client
+
 API_KEY = os.getenv("AIRNOW_API_KEY", "")
 ZIP_BASE = "https://www.airnowapi.org/aq/observation/zipCode/current/"
 LATLON_BASE = "https://www.airnowapi.org/aq/observation/latLong/current/"
@@ -14,6 +16,11 @@ async def _request(base: str, params: Dict[str, Any]) -> List[Dict[str, Any]]:
     if not API_KEY:
         return []
     payload = {"format": "application/json", "API_KEY": API_KEY, **params}
+    pooled = current_client()
+    if pooled is not None:
+        r = await pooled.get(base, params=payload, timeout=REQUEST_TIMEOUT_SECONDS)
+        r.raise_for_status()
+        return r.json() if r.text.strip() else []
     async with httpx.AsyncClient(timeout=REQUEST_TIMEOUT_SECONDS) as cx:
         r = await cx.get(base, params=payload)
         r.raise_for_status()
@@ -0,0 +1,77 @@
+"""Shared pooled async HTTP client for batch jobs that call several providers.
+
+Provider helpers (NWS, AirNow, pollen) open a short-lived client per request by
+default. Inside `pooled_client()` they reuse one keep-alive client instead, and
+each host gets its own concurrency limit so a batch refresh cannot flood a
+single upstream.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import contextlib
+from contextvars import ContextVar
+from typing import Any, AsyncIterator, Mapping
+from urllib.parse import urlsplit
+
+try:
+    import httpx
+except ModuleNotFoundError:  # pragma: no cover - local unit tests can run without httpx installed.
+    httpx = None
+
+
+_CURRENT: ContextVar["PooledClient | None"] = ContextVar("external_http_pool", default=None)
+
+
+class PooledClient:
+    """One `httpx.AsyncClient` with a per-host request limit."""
+
+    def __init__(self, client: Any, *, per_host_limit: int) -> None:
+        self._client = client
+        self.per_host_limit = max(1, per_host_limit)
+        self._limits: dict[str, asyncio.Semaphore] = {}
+        self.requests: dict[str, int] = {}
+
+    async def get(
+        self,
+        url: str,
+        *,
+        params: Mapping[str, Any] | None = None,
+        headers: Mapping[str, str] | None = None,
+        timeout: float | None = None,
+    ) -> Any:
+        host = urlsplit(url).netloc
+        limit = self._limits.setdefault(host, asyncio.Semaphore(self.per_host_limit))
+        kwargs: dict[str, Any] = {"params": params, "headers": headers}
+        if timeout is not None:
+            kwargs["timeout"] = timeout
+        async with limit:
+            self.requests[host] = self.requests.get(host, 0) + 1
+            return await self._client.get(url, **kwargs)
+
+
+def current_client() -> PooledClient | None:
+    return _CURRENT.get()
+
+
+@contextlib.asynccontextmanager
+async def pooled_client(
+    *,
+    per_host_limit: int = 4,
+    max_connections: int = 32,
+    timeout: float = 30.0,
+) -> AsyncIterator[PooledClient]:
+    """Install a shared client for provider calls made in this task and its children."""
+    existing = _CURRENT.get()
+    if existing is not None:
+        yield existing
+        return
+
+    limits = httpx.Limits(max_connections=max_connections, max_keepalive_connections=max_connections)
+    async with httpx.AsyncClient(timeout=timeout, limits=limits) as client:
+        pooled = PooledClient(client, per_host_limit=per_host_limit)
+        token = _CURRENT.set(pooled)
+        try:
+            yield pooled
+        finally:
+            _CURRENT.reset(token)
@@ -2,10 +2,15 @@
 import asyncio
 import datetime as dt
 import os
-from typing import Any, Dict, Optional
+from contextlib import contextmanager
+from contextvars import ContextVar
+from dataclasses import dataclass, field
+from typing import Any, Dict, Iterator, Optional
 
 import httpx
 
+from .http_pool import current_client
+
 BASE = "https://api.weather.gov"
 WEATHER_UA = os.getenv("WEATHER_UA", "(gaiaeyes.com, help@gaiaeyes.com)")
 HEADERS = {
@@ -14,9 +19,46 @@ HEADERS = {
 }
 MAX_OBSERVATION_AGE = dt.timedelta(minutes=15)
 NEARBY_STATION_LIMIT = 5
+# /points resolves to a ~2.5 km forecast grid; 0.01 degree cells stay inside one grid square.
+METADATA_CELL_DECIMALS = 2
+
+
+@dataclass
+class PointMetadataCache:
+    """/points documents per lat/lon cell and nearby station ids per stations URL.
+
+    Both change only when NWS re-grids an office, so batch jobs load them once,
+    reuse them for every ZIP in a cell, and persist whatever they had to fetch.
+    """
+
+    points: Dict[str, Dict[str, Any]] = field(default_factory=dict)
+    stations: Dict[str, list[str]] = field(default_factory=dict)
+    fetched_points: set[str] = field(default_factory=set)
+    fetched_stations: set[str] = field(default_factory=set)
+
+
+_METADATA: ContextVar[Optional[PointMetadataCache]] = ContextVar("nws_point_metadata", default=None)
+
+
+def metadata_cell(lat: float, lon: float) -> str:
+    return f"{round(float(lat), METADATA_CELL_DECIMALS):.{METADATA_CELL_DECIMALS}f},{round(float(lon), METADATA_CELL_DECIMALS):.{METADATA_CELL_DECIMALS}f}"
+
+
+@contextmanager
+def use_point_metadata(cache: PointMetadataCache) -> Iterator[PointMetadataCache]:
+    token = _METADATA.set(cache)
+    try:
+        yield cache
+    finally:
+        _METADATA.reset(token)
 
 
 async def _get_json(url: str) -> Dict[str, Any]:
+    pooled = current_client()
+    if pooled is not None:
+        r = await pooled.get(url, headers=HEADERS, timeout=30.0)
+        r.raise_for_status()
+        return r.json()
     async with httpx.AsyncClient(timeout=30.0, headers=HEADERS) as cx:
         r = await cx.get(url)
         r.raise_for_status()
@@ -25,7 +67,14 @@ async def _get_json(url: str) -> Dict[str, Any]:
 
 async def _points(lat: float, lon: float) -> Dict[str, Any]:
     """Return NWS /points doc for the given coordinates."""
-    return await _get_json(f"{BASE}/points/{lat:.4f},{lon:.4f}")
+    cache = _METADATA.get()
+    if cache is None:
+        return await _get_json(f"{BASE}/points/{lat:.4f},{lon:.4f}")
+    cell = metadata_cell(lat, lon)
+    if cell not in cache.points:
+        cache.points[cell] = await _get_json(f"{BASE}/points/{lat:.4f},{lon:.4f}")
+        cache.fetched_points.add(cell)
+    return cache.points[cell]
 
 
 async def _gridpoints(pts_or_lat: Any, maybe_lon: Optional[float] = None) -> Dict[str, Any]:
@@ -80,13 +129,21 @@ async def _nearby_station_ids(points: Dict[str, Any], *, limit: int = 3) -> list
     stations_url = points.get("properties", {}).get("observationStations")
     if not stations_url:
         return []
+    cache = _METADATA.get()
+    if cache is not None and stations_url in cache.stations:
+        return cache.stations[stations_url][:limit]
     data = await _get_json(stations_url)
     stations = data.get("features") or []
-    return [
+    keep = max(limit, NEARBY_STATION_LIMIT) if cache is not None else limit
+    station_ids = [
         str(station.get("properties", {}).get("stationIdentifier"))
-        for station in stations[:limit]
+        for station in stations[:keep]
         if station.get("properties", {}).get("stationIdentifier")
     ]
+    if cache is not None:
+        cache.stations[stations_url] = station_ids
+        cache.fetched_stations.add(stations_url)
+    return station_ids[:limit]
 
 
 async def _nearest_station_id(points: Dict[str, Any]) -> Optional[str]:
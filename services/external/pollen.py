@@ -9,6 +9,8 @@ try:
 except ModuleNotFoundError:  # pragma: no cover - local unit tests can run without httpx installed.
     httpx = None
 
+from .http_pool import current_client
+
 
 API_KEY = os.getenv("GOOGLE_POLLEN_API_KEY", "")
 BASE = "https://pollen.googleapis.com/v1/forecast:lookup"
@@ -225,6 +227,11 @@ async def forecast_by_latlon(lat: float, lon: float, *, days: int = 3, language_
         "plantsDescription": "false",
         "key": API_KEY,
     }
+    pooled = current_client()
+    if pooled is not None:
+        response = await pooled.get(BASE, params=params, timeout=30.0)
+        response.raise_for_status()
+        return response.json() if response.text.strip() else {}
     async with httpx.AsyncClient(timeout=30.0) as cx:
         response = await cx.get(BASE, params=params)
         response.raise_for_status()
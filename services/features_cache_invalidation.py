@@ -0,0 +1,49 @@
+"""Publish invalidations for the global sections of `/v1/features/today`.
+
+The API caches the sections that are identical for every user (space weather
+daily/current, ULF context, Schumann, the daily EarthScope post) per process.
+Ingest jobs call `publish_global_invalidation` after writing new data. This
+bumps a Redis version counter per section, and API workers drop their cached
+copy the next time they poll the versions. Without `REDIS_URL` this is a no-op
+and the API relies on its TTL alone.
+"""
+
+from __future__ import annotations
+
+import logging
+import os
+
+try:
+    import redis
+except ModuleNotFoundError:  # pragma: no cover - redis is optional for cron jobs
+    redis = None
+
+logger = logging.getLogger(__name__)
+
+GLOBAL_SECTIONS = ("daily_wx", "current_wx", "ulf", "sch", "post")
+VERSION_KEY_PREFIX = "gaia:features_global_version:"
+
+
+def version_key(section: str) -> str:
+    return f"{VERSION_KEY_PREFIX}{section}"
+
+
+def publish_global_invalidation(*sections: str) -> bool:
+    """Bump the version of each section; returns False when nothing was published."""
+    unknown = sorted(set(sections) - set(GLOBAL_SECTIONS))
+    if unknown:
+        raise ValueError(f"unknown features global sections: {', '.join(unknown)}")
+    url = (os.getenv("REDIS_URL") or "").strip()
+    if not sections or not url or redis is None:
+        return False
+    try:
+        client = redis.Redis.from_url(url, socket_timeout=2, socket_connect_timeout=2)
+        pipe = client.pipeline(transaction=False)
+        for section in sections:
+            pipe.incr(version_key(section))
+        pipe.execute()
+    except Exception as exc:
+        logger.warning("[features-cache] invalidation publish failed sections=%s: %s", ",".join(sections), exc)
+        return False
+    logger.info("[features-cache] invalidated sections=%s", ",".join(sections))
+    return True
@@ -1,13 +1,140 @@
 from pathlib import Path
+from array import array
+from bisect import bisect_left
 import csv
-from typing import Tuple, Optional
+import math
+import threading
+from typing import Dict, List, Tuple, Optional
 
 import requests
 
 from ..db import pg
 
-DATA_CSV = Path("data/zip_centroids.csv")
+DATA_CSV = Path(__file__).resolve().parents[2] / "data" / "zip_centroids.csv"
 USER_AGENT = "gaiaeyes-local/zip-fallback (+https://gaiaeyes.com)"
+EARTH_RADIUS_KM = 6371.0088
+
+
+class ZipCentroidIndex:
+    """
+    Read-only ZIP centroid index: a sorted array of ZIP ints with parallel
+    lat/lon float arrays (binary search for forward lookups) plus a coarse
+    lat/lon grid of row indexes for nearest-ZIP reverse lookups.
+    """
+
+    CELL_DEGREES = 0.25
+
+    def __init__(self, rows: List[Tuple[int, float, float]]):
+        # Later rows win for duplicate ZIPs, matching an upsert.
+        by_zip: Dict[int, Tuple[float, float]] = {}
+        for zip_int, lat, lon in rows:
+            by_zip[zip_int] = (lat, lon)
+        ordered = sorted(by_zip.items())
+        self.zips = array("i", (zip_int for zip_int, _ in ordered))
+        self.lats = array("d", (lat for _, (lat, _) in ordered))
+        self.lons = array("d", (lon for _, (_, lon) in ordered))
+        self._grid: Dict[Tuple[int, int], List[int]] = {}
+        for idx, (lat, lon) in enumerate(zip(self.lats, self.lons)):
+            self._grid.setdefault(self._cell(lat, lon), []).append(idx)
+
+    @classmethod
+    def _cell(cls, lat: float, lon: float) -> Tuple[int, int]:
+        return math.floor(lat / cls.CELL_DEGREES), math.floor(lon / cls.CELL_DEGREES)
+
+    def __len__(self) -> int:
+        return len(self.zips)
+
+    @classmethod
+    def from_csv(cls, path: Path) -> "ZipCentroidIndex":
+        rows: List[Tuple[int, float, float]] = []
+        with path.open(newline="", encoding="utf-8") as f:
+            for r in csv.DictReader(f):
+                z = _normalize_zip(r.get("zip", ""))
+                try:
+                    lat, lon = float(r["lat"]), float(r["lon"])
+                except (KeyError, TypeError, ValueError):
+                    continue
+                if z and math.isfinite(lat) and math.isfinite(lon):
+                    rows.append((int(z), lat, lon))
+        return cls(rows)
+
+    def lookup(self, zip_code: str) -> Optional[Tuple[float, float]]:
+        z = _normalize_zip(zip_code)
+        if not z:
+            return None
+        key = int(z)
+        idx = bisect_left(self.zips, key)
+        if idx < len(self.zips) and self.zips[idx] == key:
+            return self.lats[idx], self.lons[idx]
+        return None
+
+    def nearest(self, lat: float, lon: float, max_km: Optional[float] = None) -> Optional[Tuple[str, float]]:
+        """
+        Return (zip, distance_km) for the closest centroid, or None when the index
+        is empty or nothing lies within max_km. Searches grid rings outward and
+        stops once no unvisited cell can hold a closer centroid.
+        """
+        if not self._grid:
+            return None
+        cell_lat, cell_lon = self._cell(lat, lon)
+        best_idx = -1
+        best_km = math.inf
+        km_per_degree = 2 * math.pi * EARTH_RADIUS_KM / 360.0
+        for ring in range(int(180 / self.CELL_DEGREES) + 1):
+            reach_km = min(best_km, max_km if max_km is not None else math.inf)
+            if ring > 1 and math.isfinite(reach_km):
+                # Anything closer than reach_km sits within reach_km of our latitude, and
+                # cells in this ring are at least ring - 1 whole cells away in lat or lon.
+                gap_deg = (ring - 1) * self.CELL_DEGREES
+                max_lat = min(90.0, abs(lat) + reach_km / km_per_degree + self.CELL_DEGREES)
+                lon_floor_km = 2 * EARTH_RADIUS_KM * math.asin(
+                    min(1.0, math.cos(math.radians(max_lat)) * math.sin(math.radians(gap_deg) / 2))
+                )
+                if min(gap_deg * km_per_degree, lon_floor_km) > reach_km:
+                    break
+            for dlat in range(-ring, ring + 1):
+                for dlon in range(-ring, ring + 1):
+                    if max(abs(dlat), abs(dlon)) != ring:
+                        continue
+                    for idx in self._grid.get((cell_lat + dlat, cell_lon + dlon), ()):
+                        km = haversine_km(lat, lon, self.lats[idx], self.lons[idx])
+                        if km < best_km:
+                            best_idx, best_km = idx, km
+        if best_idx < 0 or (max_km is not None and best_km > max_km):
+            return None
+        return f"{self.zips[best_idx]:05d}", best_km
+
+
+def haversine_km(lat1: float, lon1: float, lat2: float, lon2: float) -> float:
+    p1, p2 = math.radians(lat1), math.radians(lat2)
+    dp = p2 - p1
+    dl = math.radians(lon2 - lon1)
+    h = math.sin(dp / 2) ** 2 + math.cos(p1) * math.cos(p2) * math.sin(dl / 2) ** 2
+    return 2 * EARTH_RADIUS_KM * math.asin(min(1.0, math.sqrt(h)))
+
+
+_INDEX: Optional[ZipCentroidIndex] = None
+_INDEX_LOCK = threading.Lock()
+
+
+def zip_index() -> ZipCentroidIndex:
+    """Load data/zip_centroids.csv once per process (call at startup to pre-warm)."""
+    global _INDEX
+    if _INDEX is None:
+        with _INDEX_LOCK:
+            if _INDEX is None:
+                try:
+                    _INDEX = ZipCentroidIndex.from_csv(DATA_CSV) if DATA_CSV.exists() else ZipCentroidIndex([])
+                except Exception as e:
+                    print(f"[zip_lookup] centroid index load failed: {e}")
+                    _INDEX = ZipCentroidIndex([])
+    return _INDEX
+
+
+def latlon_to_zip(lat: float, lon: float, max_km: Optional[float] = 50.0) -> Optional[str]:
+    """Reverse-map coordinates to the nearest indexed ZIP centroid (None beyond max_km)."""
+    hit = zip_index().nearest(float(lat), float(lon), max_km=max_km)
+    return hit[0] if hit else None
 
 
 def _normalize_zip(z: str) -> str:
@@ -106,35 +233,27 @@ def _cache_zip(zip_code: str, lat: float, lon: float) -> None:
 def zip_to_latlon(zip_code: str) -> Tuple[float, float]:
     """
     Resolve a US ZIP to (lat, lon), with fallback order:
-    1) ext.zip_centroids
-    2) data/zip_centroids.csv (legacy)
+    1) in-memory index of data/zip_centroids.csv
+    2) ext.zip_centroids
     3) Zippopotam.us
     4) US Census Geocoder
 
-    On success via (2-4) we upsert back into ext.zip_centroids.
+    On success via (3-4) we upsert back into ext.zip_centroids.
     """
     z = _normalize_zip(zip_code)
     if not z:
         raise ValueError(f"Invalid ZIP: {zip_code}")
 
-    # 1) DB cache
+    # 1) Offline index (no I/O after the first load)
+    hit = zip_index().lookup(z)
+    if hit:
+        return hit
+
+    # 2) DB cache
     row = pg.fetchrow("select lat, lon from ext.zip_centroids where zip = %s", z)
     if row:
         return float(row["lat"]), float(row["lon"])
 
-    # 2) Legacy CSV fallback
-    if DATA_CSV.exists():
-        try:
-            with DATA_CSV.open(newline="", encoding="utf-8") as f:
-                for r in csv.DictReader(f):
-                    if _normalize_zip(r.get("zip", "")) == z:
-                        lat, lon = float(r["lat"]), float(r["lon"])
-                        _cache_zip(z, lat, lon)
-                        return lat, lon
-        except Exception:
-            # Continue to network fallbacks
-            pass
-
     # 3) Zippopotam.us
     hit = _zippopotam_latlon(z)
     if hit:
@@ -1,11 +1,27 @@
 import asyncio
-from typing import Dict, Any, Optional
+import os
+from contextlib import asynccontextmanager
+from contextvars import ContextVar
+from typing import Dict, Any, Iterable, Optional, AsyncIterator
 from datetime import datetime, timedelta, timezone
-from .cache import latest_and_ref, get_previous_approx, nearest_row_to
+from .cache import (
+    latest_and_ref,
+    get_previous_approx,
+    nearest_row_to,
+    load_nws_point_metadata,
+    save_nws_point_metadata,
+)
 from services.geo.zip_lookup import zip_to_latlon
 from ..external import nws, airnow, pollen
+from ..external.http_pool import pooled_client
 from ..time.moon import moon_phase
 
+BATCH_CONCURRENCY = int(os.getenv("LOCAL_SIGNALS_BATCH_CONCURRENCY", "8"))
+PER_HOST_LIMIT = int(os.getenv("LOCAL_SIGNALS_PER_HOST_LIMIT", "4"))
+
+# Inside batch_fetch_context: provider fetches in flight or done, keyed by NWS metadata cell.
+_CELL_FETCHES: ContextVar[Optional[Dict[str, "asyncio.Future"]]] = ContextVar("local_signals_cell_fetches", default=None)
+
 def _delta(curr, prev):
     try:
         if curr is None or prev is None:
@@ -208,6 +224,96 @@ def ensure_weather_fields(zip_code: str, payload: Dict[str, Any]) -> Dict[str, A
 
     return payload
 
+async def _fetch_provider_data(zip_code: str, lat: float, lon: float) -> tuple[dict, list, Any]:
+    """NWS hourly snapshot, AirNow observations, and pollen forecast for one location."""
+
+    async def _nws_snapshot() -> dict:
+        try:
+            return await nws.hourly_by_latlon(lat, lon) or {}
+        except Exception as e:
+            print(f"[local_signals] NWS hourly error for zip={zip_code}: {e}")
+            return {}
+
+    nws_snap, aq_list, pollen_payload = await asyncio.gather(
+        _nws_snapshot(),
+        _fetch_air_quality(zip_code, lat, lon),
+        _fetch_pollen_forecast(zip_code, lat, lon, days=3),
+        return_exceptions=True,
+    )
+    if isinstance(nws_snap, Exception):
+        nws_snap = {}
+    if isinstance(aq_list, Exception):
+        print(f"[local_signals] AirNow error for zip={zip_code}: {aq_list}")
+        aq_list = []
+    if isinstance(pollen_payload, Exception):
+        print(f"[local_signals] pollen forecast error for zip={zip_code}: {pollen_payload}")
+        pollen_payload = {}
+    return nws_snap, aq_list, pollen_payload
+
+
+async def _provider_data(zip_code: str, lat: float, lon: float) -> tuple[dict, list, Any]:
+    fetches = _CELL_FETCHES.get()
+    if fetches is None:
+        return await _fetch_provider_data(zip_code, lat, lon)
+    # ZIPs sharing an NWS metadata cell get identical provider responses; fetch once.
+    cell = nws.metadata_cell(lat, lon)
+    fetch = fetches.get(cell)
+    if fetch is None:
+        fetch = asyncio.ensure_future(_fetch_provider_data(zip_code, lat, lon))
+        fetches[cell] = fetch
+    return await asyncio.shield(fetch)
+
+
+@asynccontextmanager
+async def batch_fetch_context(*, per_host_limit: int | None = None) -> AsyncIterator[None]:
+    """
+    Share provider work across every assemble_for_zip call made inside the block:
+    one pooled HTTP client with per-host limits, persisted NWS /points + station
+    metadata, and one provider fetch per metadata cell.
+    """
+    metadata = load_nws_point_metadata()
+    fetches: Dict[str, asyncio.Future] = {}
+    async with pooled_client(per_host_limit=per_host_limit or PER_HOST_LIMIT) as client:
+        token = _CELL_FETCHES.set(fetches)
+        try:
+            with nws.use_point_metadata(metadata):
+                yield
+        finally:
+            _CELL_FETCHES.reset(token)
+            for fetch in fetches.values():
+                fetch.cancel()
+            print(
+                f"[local_signals] batch cells={len(fetches)} nws_cells_cached={len(metadata.points)} "
+                f"nws_points_fetched={len(metadata.fetched_points)} requests={client.requests}"
+            )
+            if metadata.fetched_points or metadata.fetched_stations:
+                try:
+                    save_nws_point_metadata(metadata)
+                except Exception as e:
+                    print(f"[local_signals] NWS metadata save failed: {e}")
+
+
+async def assemble_for_zips(
+    zip_codes: Iterable[str],
+    *,
+    concurrency: int | None = None,
+) -> Dict[str, Dict[str, Any] | Exception]:
+    """
+    Batch form of assemble_for_zip with bounded concurrency. Results are keyed by
+    ZIP; a failed ZIP maps to its exception so callers can account per location.
+    """
+    unique = list(dict.fromkeys(str(z).strip() for z in zip_codes if str(z or "").strip()))
+    semaphore = asyncio.Semaphore(max(1, concurrency or BATCH_CONCURRENCY))
+
+    async def _one(zip_code: str) -> Dict[str, Any]:
+        async with semaphore:
+            return await assemble_for_zip(zip_code)
+
+    async with batch_fetch_context():
+        results = await asyncio.gather(*(_one(z) for z in unique), return_exceptions=True)
+    return dict(zip(unique, results))
+
+
 async def assemble_for_zip(zip_code: str) -> Dict[str, Any]:
     """
     Assemble a compact local-health snapshot for a ZIP.
@@ -217,12 +323,7 @@ async def assemble_for_zip(zip_code: str) -> Dict[str, Any]:
     ~24h ago exists, compute 24h deltas (temp and pressure) using the cache.
     """
     lat, lon = zip_to_latlon(zip_code)
-
-    try:
-        nws_snap = await nws.hourly_by_latlon(lat, lon) or {}
-    except Exception as e:
-        print(f"[local_signals] NWS hourly error for zip={zip_code}: {e}")
-        nws_snap = {}
+    nws_snap, aq_list, pollen_payload = await _provider_data(zip_code, lat, lon)
 
     obs_iso = nws_snap.get("obs_time")
 
@@ -282,15 +383,6 @@ async def assemble_for_zip(zip_code: str) -> Dict[str, Any]:
     temp_trend_3h = _trend(temp_delta_3h, tol=1.5)  # ≈ ±1.5°C ~ meaningful perceived change
     baro_trend_3h = _trend(baro_delta_3h, tol=1.5)  # ≈ ±1.5 hPa over 3h
 
-    aq_list, pollen_payload = await asyncio.gather(
-        _fetch_air_quality(zip_code, lat, lon),
-        _fetch_pollen_forecast(zip_code, lat, lon, days=3),
-        return_exceptions=True,
-    )
-    if isinstance(pollen_payload, Exception):
-        print(f"[local_signals] pollen forecast error for zip={zip_code}: {pollen_payload}")
-        pollen_payload = {}
-
     # Air quality (pick the highest AQI among any pollutants returned)
     aqi = category = pollutant = None
     if aq_list:
@@ -4,9 +4,11 @@ import re
 from datetime import datetime, timedelta, timezone
 
 from ..db import pg
+from ..external import nws
 
 
 TTL_MIN = int(os.getenv("LOCAL_SIGNALS_TTL_MINUTES", "60"))
+NWS_METADATA_TTL_DAYS = int(os.getenv("NWS_METADATA_TTL_DAYS", "30"))
 
 _HAS_EXPIRES_AT: bool | None = None
 
@@ -31,14 +33,14 @@ def _has_expires_at() -> bool:
     return _HAS_EXPIRES_AT
 
 
-def _norm_zip(z: str) -> str:
+def normalize_zip(z: str) -> str:
     """Normalize ZIP: strip non-alphanumerics and upper-case."""
     return re.sub(r"[^0-9A-Za-z]", "", (z or "")).upper()
 
 
 def upsert_zip_payload(zip_code: str, payload: dict, asof: datetime | None = None) -> None:
     asof = asof or datetime.now(timezone.utc)
-    z = _norm_zip(zip_code)
+    z = normalize_zip(zip_code)
 
     if _has_expires_at():
         ttl = int(os.getenv("LOCAL_SIGNALS_TTL_MINUTES", str(TTL_MIN)))
@@ -71,7 +73,7 @@ def upsert_zip_payload(zip_code: str, payload: dict, asof: datetime | None = Non
 
 
 def latest_for_zip(zip_code: str) -> dict | None:
-    z = _norm_zip(zip_code)
+    z = normalize_zip(zip_code)
     if _has_expires_at():
         row = pg.fetchrow(
             """
@@ -98,13 +100,38 @@ def latest_for_zip(zip_code: str) -> dict | None:
     return payload
 
 
+def latest_for_zips(zip_codes) -> dict[str, dict]:
+    """Batch form of latest_for_zip keyed by normalized ZIP; ZIPs without a live row are omitted."""
+    zips = sorted({normalize_zip(z) for z in zip_codes if normalize_zip(z)})
+    if not zips:
+        return {}
+    expires_filter = "and expires_at > now()" if _has_expires_at() else ""
+    rows = pg.fetch(
+        f"""
+        select distinct on (zip) zip, payload
+        from ext.local_signals_cache
+        where zip = any(%s) {expires_filter}
+        order by zip, asof desc
+        """,
+        zips,
+    )
+    out: dict[str, dict] = {}
+    for row in rows or []:
+        payload = row["payload"]
+        if isinstance(payload, str):
+            payload = json.loads(payload)
+        if isinstance(payload, dict):
+            out[row["zip"]] = payload
+    return out
+
+
 # New helper functions
 def latest_row(zip_code: str) -> dict | None:
     """
     Return the newest row for a ZIP with both asof and payload.
     Payload is JSON-decoded into a dict.
     """
-    z = _norm_zip(zip_code)
+    z = normalize_zip(zip_code)
     if _has_expires_at():
         row = pg.fetchrow(
             """
@@ -141,7 +168,7 @@ def nearest_row_to(zip_code: str, target_asof: datetime, window_hours: int = 3)
 
     This is useful to compute 24h deltas: call with target_asof = latest_asof - 24h.
     """
-    z = _norm_zip(zip_code)
+    z = normalize_zip(zip_code)
     lower = target_asof - timedelta(hours=window_hours)
     upper = target_asof + timedelta(hours=window_hours)
     row = pg.fetchrow(
@@ -171,7 +198,7 @@ def upsert_snapshot(zip_code: str, asof: datetime, payload: dict, ttl_minutes: i
     Convenience wrapper that mirrors upsert_zip_payload but takes explicit asof.
     ttl_minutes is respected when expires_at exists; otherwise ignored.
     """
-    z = _norm_zip(zip_code)
+    z = normalize_zip(zip_code)
 
     if _has_expires_at():
         ttl = TTL_MIN if ttl_minutes is None else int(ttl_minutes)
@@ -208,7 +235,7 @@ def get_previous_approx(zip_code: str, asof: datetime, min_hours: int = 18, max_
     Return the snapshot closest to *asof* within (asof - max_hours .. asof - min_hours),
     or None if none exists. Payload is JSON-decoded into a dict.
     """
-    z = _norm_zip(zip_code)
+    z = normalize_zip(zip_code)
     row = pg.fetchrow(
         """
         select asof, payload
@@ -265,6 +292,67 @@ def purge_old(retain_days: int = 14) -> None:
     )
 
 
+def load_nws_point_metadata(max_age_days: int | None = None) -> nws.PointMetadataCache:
+    """
+    Load persisted NWS /points and nearby-station metadata for batch refreshes.
+    Soft-fails to an empty cache so a refresh never depends on this table.
+    """
+    days = max_age_days if max_age_days is not None else NWS_METADATA_TTL_DAYS
+    cache = nws.PointMetadataCache()
+    try:
+        rows = pg.fetch(
+            """
+            select cell, points, station_ids
+            from ext.nws_point_metadata
+            where fetched_at > now() - make_interval(days => %s)
+            """,
+            days,
+        )
+    except Exception as e:
+        print(f"[local_signals] NWS metadata load failed: {e}")
+        return cache
+    for row in rows or []:
+        cell = row.get("cell")
+        points = row.get("points")
+        if isinstance(points, str):
+            points = json.loads(points)
+        if not cell or not isinstance(points, dict):
+            continue
+        cache.points[cell] = points
+        station_ids = row.get("station_ids")
+        if isinstance(station_ids, str):
+            station_ids = json.loads(station_ids)
+        stations_url = (points.get("properties") or {}).get("observationStations")
+        if stations_url and isinstance(station_ids, list):
+            cache.stations[stations_url] = [str(item) for item in station_ids]
+    return cache
+
+
+def save_nws_point_metadata(cache: nws.PointMetadataCache) -> int:
+    """Persist cells whose /points doc or station list was fetched during this run."""
+    saved = 0
+    with pg.pipeline():
+        for cell, points in cache.points.items():
+            stations_url = (points.get("properties") or {}).get("observationStations")
+            if cell not in cache.fetched_points and stations_url not in cache.fetched_stations:
+                continue
+            pg.execute(
+                """
+                insert into ext.nws_point_metadata (cell, points, station_ids, fetched_at)
+                values (%s, %s::jsonb, %s::jsonb, now())
+                on conflict (cell) do update
+                set points = excluded.points,
+                    station_ids = excluded.station_ids,
+                    fetched_at = excluded.fetched_at
+                """,
+                cell,
+                json.dumps(points),
+                json.dumps(cache.stations.get(stations_url)) if stations_url in cache.stations else None,
+            )
+            saved += 1
+    return saved
+
+
 # ---- Back-compat aliases & explicit exports ---------------------------------
 
 # Some code paths / older routers expect alternative symbol names.
@@ -287,6 +375,8 @@ __all__ = [
     "get_previous_approx",
     "latest_and_ref",
     "purge_old",
+    "load_nws_point_metadata",
+    "save_nws_point_metadata",
     # Back-compat alias symbols:
     "get_latest_for_zip",
     "put_zip_payload",
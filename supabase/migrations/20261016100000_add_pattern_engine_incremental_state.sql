@@ -0,0 +1,136 @@
+-- Incremental refresh support for the pattern engine.
+--
+-- marts.user_pattern_dirty_days records user/days whose pattern inputs changed
+-- since the last run. marts.user_pattern_day_state keeps the compact per-day
+-- exposure/outcome codes, and marts.user_pattern_association_state holds the
+-- per-user sufficient statistics (2x2 counts, outcome days, threshold counts),
+-- so `--mode incremental` can fold in only the changed days instead of
+-- rebuilding the full window.
+
+create schema if not exists marts;
+
+create table if not exists marts.user_pattern_dirty_days (
+  user_id uuid not null,
+  day date not null,
+  source text not null,
+  marked_at timestamptz not null default now(),
+  primary key (user_id, day, source)
+);
+
+create index if not exists user_pattern_dirty_days_marked_idx
+  on marts.user_pattern_dirty_days (marked_at);
+
+comment on table marts.user_pattern_dirty_days is
+  'User/days whose pattern-engine inputs changed since the last incremental run. Drained by bots/patterns/pattern_engine_job.py.';
+
+create table if not exists marts.user_pattern_engine_state (
+  user_id uuid primary key,
+  window_start date not null,
+  as_of_day date not null,
+  engine_version text not null,
+  updated_at timestamptz not null default now()
+);
+
+comment on table marts.user_pattern_engine_state is
+  'Window covered by marts.user_pattern_association_state for each user.';
+
+create table if not exists marts.user_pattern_day_state (
+  user_id uuid not null,
+  day date not null,
+  signals jsonb not null default '{}'::jsonb,
+  outcomes jsonb not null default '{}'::jsonb,
+  confounded_outcomes text[] not null default '{}',
+  updated_at timestamptz not null default now(),
+  primary key (user_id, day)
+);
+
+comment on table marts.user_pattern_day_state is
+  'Per-day exposure codes/thresholds, outcome codes, and confounded outcomes that each day contributes to the association counts.';
+
+create table if not exists marts.user_pattern_association_state (
+  user_id uuid not null,
+  signal_key text not null,
+  outcome_key text not null,
+  lag_hours integer not null,
+  exposed_outcome_n integer not null default 0,
+  exposed_no_outcome_n integer not null default 0,
+  unexposed_outcome_n integer not null default 0,
+  unexposed_no_outcome_n integer not null default 0,
+  outcome_days date[] not null default '{}',
+  threshold_counts jsonb not null default '{}'::jsonb,
+  updated_at timestamptz not null default now(),
+  primary key (user_id, signal_key, outcome_key, lag_hours)
+);
+
+comment on table marts.user_pattern_association_state is
+  'Sufficient statistics behind marts.user_pattern_associations: contingency counts, exposed outcome days, and exposure threshold counts.';
+
+alter table marts.user_pattern_dirty_days enable row level security;
+alter table marts.user_pattern_engine_state enable row level security;
+alter table marts.user_pattern_day_state enable row level security;
+alter table marts.user_pattern_association_state enable row level security;
+
+create or replace function marts.tg_mark_pattern_dirty_day()
+returns trigger
+language plpgsql
+as $$
+declare
+  source_name text := tg_table_schema || '.' || tg_table_name;
+begin
+  if tg_op in ('UPDATE', 'DELETE') then
+    insert into marts.user_pattern_dirty_days (user_id, day, source)
+    values (old.user_id, old.day, source_name)
+    on conflict (user_id, day, source) do update set marked_at = now();
+  end if;
+  if tg_op in ('INSERT', 'UPDATE') then
+    insert into marts.user_pattern_dirty_days (user_id, day, source)
+    values (new.user_id, new.day, source_name)
+    on conflict (user_id, day, source) do update set marked_at = now();
+  end if;
+  return null;
+end;
+$$;
+
+create or replace function marts.tg_mark_pattern_dirty_symptom_day()
+returns trigger
+language plpgsql
+as $$
+begin
+  if tg_op in ('UPDATE', 'DELETE') then
+    insert into marts.user_pattern_dirty_days (user_id, day, source)
+    values (old.user_id, (old.ts_utc at time zone 'utc')::date, 'raw.user_symptom_events')
+    on conflict (user_id, day, source) do update set marked_at = now();
+  end if;
+  if tg_op in ('INSERT', 'UPDATE') then
+    insert into marts.user_pattern_dirty_days (user_id, day, source)
+    values (new.user_id, (new.ts_utc at time zone 'utc')::date, 'raw.user_symptom_events')
+    on conflict (user_id, day, source) do update set marked_at = now();
+  end if;
+  return null;
+end;
+$$;
+
+do $$
+begin
+  if to_regclass('marts.daily_features') is not null then
+    drop trigger if exists trg_pattern_dirty_daily_features on marts.daily_features;
+    create trigger trg_pattern_dirty_daily_features
+      after insert or update or delete on marts.daily_features
+      for each row execute function marts.tg_mark_pattern_dirty_day();
+  end if;
+
+  if to_regclass('marts.user_gauges_day') is not null then
+    drop trigger if exists trg_pattern_dirty_user_gauges_day on marts.user_gauges_day;
+    create trigger trg_pattern_dirty_user_gauges_day
+      after insert or update or delete on marts.user_gauges_day
+      for each row execute function marts.tg_mark_pattern_dirty_day();
+  end if;
+
+  if to_regclass('raw.user_symptom_events') is not null then
+    drop trigger if exists trg_pattern_dirty_symptom_events on raw.user_symptom_events;
+    create trigger trg_pattern_dirty_symptom_events
+      after insert or update or delete on raw.user_symptom_events
+      for each row execute function marts.tg_mark_pattern_dirty_symptom_day();
+  end if;
+end
+$$;
@@ -0,0 +1,135 @@
+-- Dirty-day tracking for the remaining pattern-engine inputs.
+--
+-- The incremental refresh only rebuilds from the earliest queued day (plus a
+-- short trailing window), so every input that build_user_daily_features reads
+-- needs to queue the user/days it changes:
+--   * raw.user_exposure_events  -> check-in day from note_text, else the Chicago-local event day
+--   * marts.user_gauges_delta_day / marts.user_location_context_day -> the row day
+--   * raw.camera_health_checks (behind the marts.camera_health_daily view) -> the UTC day
+--   * app.user_tags / app.user_locations -> apply to every day, so the whole window
+--     is queued via the 0001-01-01 sentinel (clamped to the run window by the job).
+
+create or replace function marts.tg_mark_pattern_dirty_ts_day()
+returns trigger
+language plpgsql
+as $$
+declare
+  source_name text := tg_table_schema || '.' || tg_table_name;
+begin
+  if tg_op in ('UPDATE', 'DELETE') then
+    insert into marts.user_pattern_dirty_days (user_id, day, source)
+    values (old.user_id, (old.ts_utc at time zone 'utc')::date, source_name)
+    on conflict (user_id, day, source) do update set marked_at = now();
+  end if;
+  if tg_op in ('INSERT', 'UPDATE') then
+    insert into marts.user_pattern_dirty_days (user_id, day, source)
+    values (new.user_id, (new.ts_utc at time zone 'utc')::date, source_name)
+    on conflict (user_id, day, source) do update set marked_at = now();
+  end if;
+  return null;
+end;
+$$;
+
+create or replace function marts.pattern_exposure_day(note_text text, event_ts_utc timestamptz)
+returns date
+language sql
+immutable
+as $$
+  -- Must match the day expression in _fetch_daily_exposure_context.
+  select coalesce(
+    nullif(substring(coalesce(note_text, '') from 'daily_check_in:([0-9]{4}-[0-9]{2}-[0-9]{2})'), '')::date,
+    (event_ts_utc at time zone 'America/Chicago')::date
+  );
+$$;
+
+create or replace function marts.tg_mark_pattern_dirty_exposure_day()
+returns trigger
+language plpgsql
+as $$
+begin
+  if tg_op in ('UPDATE', 'DELETE') then
+    insert into marts.user_pattern_dirty_days (user_id, day, source)
+    values (old.user_id, marts.pattern_exposure_day(old.note_text, old.event_ts_utc), 'raw.user_exposure_events')
+    on conflict (user_id, day, source) do update set marked_at = now();
+  end if;
+  if tg_op in ('INSERT', 'UPDATE') then
+    insert into marts.user_pattern_dirty_days (user_id, day, source)
+    values (new.user_id, marts.pattern_exposure_day(new.note_text, new.event_ts_utc), 'raw.user_exposure_events')
+    on conflict (user_id, day, source) do update set marked_at = now();
+  end if;
+  return null;
+end;
+$$;
+
+create or replace function marts.tg_mark_pattern_dirty_user()
+returns trigger
+language plpgsql
+as $$
+declare
+  source_name text := tg_table_schema || '.' || tg_table_name;
+begin
+  if tg_op in ('UPDATE', 'DELETE') and old.user_id is not null then
+    insert into marts.user_pattern_dirty_days (user_id, day, source)
+    values (old.user_id, date '0001-01-01', source_name)
+    on conflict (user_id, day, source) do update set marked_at = now();
+  end if;
+  if tg_op in ('INSERT', 'UPDATE') and new.user_id is not null then
+    insert into marts.user_pattern_dirty_days (user_id, day, source)
+    values (new.user_id, date '0001-01-01', source_name)
+    on conflict (user_id, day, source) do update set marked_at = now();
+  end if;
+  return null;
+end;
+$$;
+
+do $$
+begin
+  if to_regclass('marts.user_gauges_delta_day') is not null then
+    drop trigger if exists trg_pattern_dirty_user_gauges_delta_day on marts.user_gauges_delta_day;
+    create trigger trg_pattern_dirty_user_gauges_delta_day
+      after insert or update or delete on marts.user_gauges_delta_day
+      for each row execute function marts.tg_mark_pattern_dirty_day();
+  end if;
+
+  if to_regclass('marts.user_location_context_day') is not null then
+    drop trigger if exists trg_pattern_dirty_user_location_context_day on marts.user_location_context_day;
+    create trigger trg_pattern_dirty_user_location_context_day
+      after insert or update or delete on marts.user_location_context_day
+      for each row execute function marts.tg_mark_pattern_dirty_day();
+  end if;
+
+  if to_regclass('raw.camera_health_checks') is not null then
+    drop trigger if exists trg_pattern_dirty_camera_health_checks on raw.camera_health_checks;
+    create trigger trg_pattern_dirty_camera_health_checks
+      after insert or update or delete on raw.camera_health_checks
+      for each row execute function marts.tg_mark_pattern_dirty_ts_day();
+  end if;
+
+  if to_regclass('raw.user_exposure_events') is not null then
+    drop trigger if exists trg_pattern_dirty_exposure_events on raw.user_exposure_events;
+    create trigger trg_pattern_dirty_exposure_events
+      after insert or update or delete on raw.user_exposure_events
+      for each row execute function marts.tg_mark_pattern_dirty_exposure_day();
+  end if;
+
+  if exists (
+    select 1 from information_schema.columns
+     where table_schema = 'app' and table_name = 'user_tags' and column_name = 'user_id'
+  ) then
+    drop trigger if exists trg_pattern_dirty_user_tags on app.user_tags;
+    create trigger trg_pattern_dirty_user_tags
+      after insert or update or delete on app.user_tags
+      for each row execute function marts.tg_mark_pattern_dirty_user();
+  end if;
+
+  if exists (
+    select 1 from information_schema.columns
+     where table_schema = 'app' and table_name = 'user_locations' and column_name = 'user_id'
+  ) then
+    drop trigger if exists trg_pattern_dirty_user_locations on app.user_locations;
+    create trigger trg_pattern_dirty_user_locations
+      after insert or update or delete on app.user_locations
+      for each row execute function marts.tg_mark_pattern_dirty_user();
+  end if;
+end
+$$;
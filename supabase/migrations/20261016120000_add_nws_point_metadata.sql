@@ -0,0 +1,10 @@
+-- Persisted NWS /points + nearby-station metadata per ~1 km lat/lon cell.
+-- Written by the local-signals batch refresh so repeat runs skip the lookups.
+create schema if not exists ext;
+
+create table if not exists ext.nws_point_metadata (
+    cell text primary key,
+    points jsonb not null,
+    station_ids jsonb,
+    fetched_at timestamptz not null default now()
+);
@@ -1,5 +1,5 @@
 import asyncio
-from datetime import date, datetime, timezone
+from datetime import date, datetime, timedelta, timezone
 from typing import List
 from uuid import uuid4
 
@@ -21,6 +21,7 @@ pytestmark = pytest.mark.anyio("asyncio")
 from app.main import app
 from app.db import settings
 from app.routers import ingest, summary
+from psycopg import errors as pg_errors
 from psycopg_pool import PoolTimeout
 
 
@@ -45,6 +46,15 @@ def _reset_ingest_queue_state():
         ingest._ingest_active_writes = 0
 
 
+@pytest.fixture(autouse=True)
+def _reset_global_section_cache():
+    summary._global_section_cache.clear()
+    try:
+        yield
+    finally:
+        summary._global_section_cache.clear()
+
+
 @pytest.fixture
 def client():
     transport = ASGITransport(app=app)
@@ -316,7 +326,7 @@ def test_sleeping_wrist_temperature_validation_rejects_implausible_value():
 @pytest.mark.anyio
 async def test_refresh_scheduled_on_ingest(monkeypatch, client: AsyncClient):
     ingest._refresh_registry.clear()
-    ingest._recent_refresh_requests.clear()
+    ingest._refresh_scheduler._pending.clear()
     monkeypatch.setattr(summary, "_REFRESH_DELAY_RANGE", (0.0, 0.0))
 
     fake_pool = _FakePool()
@@ -725,6 +735,115 @@ async def test_insert_batch_provisions_gaia_user_before_samples():
     assert pool.cursor.calls[1][1][0] == user_id
 
 
+class _CopyRecordingCursor(_RecordingCursor):
+    def __init__(self, *, copy_error: Exception | None = None, merged: int = 0):
+        super().__init__()
+        self.copied: List[tuple] = []
+        self._copy_error = copy_error
+        self._merged = merged
+
+    async def execute(self, query, values=None, **kwargs):  # noqa: ARG002
+        await super().execute(query, values)
+        if "from samples_batch_stage" in str(query):
+            self.rowcount = self._merged
+        elif "insert into gaia.samples" in str(query):
+            self.rowcount = 1
+
+    def copy(self, statement):
+        cursor = self
+        cursor.calls.append((str(statement), ()))
+
+        class _Copy:
+            async def __aenter__(self_inner):
+                return self_inner
+
+            async def __aexit__(self_inner, exc_type, exc, tb):
+                return False
+
+            async def write_row(self_inner, row):
+                if cursor._copy_error is not None:
+                    raise cursor._copy_error
+                cursor.copied.append(tuple(row))
+
+        return _Copy()
+
+
+class _TransactionConn(_RecordingConn):
+    def transaction(self):
+        class _Savepoint:
+            async def __aenter__(self_inner):
+                return self_inner
+
+            async def __aexit__(self_inner, exc_type, exc, tb):
+                return False
+
+        return _Savepoint()
+
+
+class _CopyRecordingPool(_RecordingPool):
+    def __init__(self, cursor: _CopyRecordingCursor):
+        self.cursor = cursor
+
+    def connection(self):
+        pool = self
+
+        class _Ctx:
+            async def __aenter__(self_inner):
+                return _TransactionConn(pool.cursor)
+
+            async def __aexit__(self_inner, exc_type, exc, tb):
+                return False
+
+        return _Ctx()
+
+
+def _heart_rate_rows(user_id: str, count: int) -> list[tuple[ingest.SampleIn, int]]:
+    return [
+        (
+            ingest.SampleIn(
+                user_id=user_id,
+                device_os="ios",
+                source="watch",
+                type="heart_rate",
+                start_time=datetime(2024, 4, 3, 12, minute, tzinfo=timezone.utc),
+                end_time=datetime(2024, 4, 3, 12, minute, 30, tzinfo=timezone.utc),
+                value=60 + minute,
+            ),
+            minute,
+        )
+        for minute in range(count)
+    ]
+
+
+@pytest.mark.anyio
+async def test_insert_batch_copy_mode_inserts_with_one_statement(monkeypatch):
+    monkeypatch.setattr(ingest, "INGEST_COPY_MIN_ROWS", 2)
+    user_id = str(uuid4())
+    pool = _CopyRecordingPool(_CopyRecordingCursor(merged=2))
+
+    inserted, skipped, errors = await ingest._insert_batch_once(pool, _heart_rate_rows(user_id, 3), user_id, mode="copy")
+
+    assert (inserted, skipped, errors) == (2, 0, [])
+    assert [row[0] for row in pool.cursor.copied] == [0, 1, 2]
+    assert all(row[1] == user_id for row in pool.cursor.copied)
+    statements = [query for query, _ in pool.cursor.calls]
+    assert not any("insert into gaia.samples" in query and "values" in query for query in statements)
+    assert sum("from samples_batch_stage" in query for query in statements) == 1
+
+
+@pytest.mark.anyio
+async def test_insert_batch_copy_failure_falls_back_to_per_row_inserts(monkeypatch):
+    monkeypatch.setattr(ingest, "INGEST_COPY_MIN_ROWS", 2)
+    user_id = str(uuid4())
+    pool = _CopyRecordingPool(_CopyRecordingCursor(copy_error=pg_errors.FeatureNotSupported("copy refused")))
+
+    inserted, skipped, errors = await ingest._insert_batch_once(pool, _heart_rate_rows(user_id, 3), user_id, mode="copy")
+
+    assert (inserted, skipped, errors) == (3, 0, [])
+    row_inserts = [values for query, values in pool.cursor.calls if "insert into gaia.samples" in query and "values" in query]
+    assert [values[6] for values in row_inserts] == [60, 61, 62]
+
+
 @pytest.mark.anyio
 async def test_features_fallback_to_yesterday(monkeypatch, client: AsyncClient):
     def _fake_acquire():
@@ -1427,6 +1546,227 @@ async def test_features_pool_timeout_uses_cache(monkeypatch, client: AsyncClient
     assert payload["diagnostics"]["pool_timeout"] is True
 
 
+@pytest.mark.anyio
+async def test_features_serves_fresh_cache_and_revalidates_stale(monkeypatch, client: AsyncClient):
+    from app.cache import CachedFeatures
+
+    monkeypatch.setattr(summary, "_acquire_features_conn", lambda: _FakeConnContext())
+    collect_calls: list[str] = []
+    revalidated: list[str] = []
+
+    async def _fake_collect(conn, user_id, tz_name, tzinfo, cached_payload=None):  # noqa: ARG001
+        collect_calls.append(user_id)
+        return {}, summary._init_diag_info(user_id, tz_name), "unexpected collect"
+
+    async def _fake_revalidate(key, loader):  # noqa: ARG001
+        revalidated.append(key)
+        return True
+
+    state = {"value": "fresh"}
+
+    async def _fake_entry(key: str):
+        today = datetime.now(timezone.utc).date().isoformat()
+        payload = {"user_id": key.split(":")[0], "day": today, "source": "snapshot", "steps_total": 4321}
+        return CachedFeatures(payload=payload, age_seconds=5.0, state=state["value"])
+
+    monkeypatch.setattr(summary, "_collect_features", _fake_collect)
+    monkeypatch.setattr(summary, "revalidate_features", _fake_revalidate)
+    monkeypatch.setattr(summary, "get_last_good_entry", _fake_entry)
+
+    user_id = str(uuid4())
+    headers = {"Authorization": "Bearer test-token", "X-Dev-UserId": user_id}
+    fresh = (await client.get("/v1/features/today", headers=headers, params={"tz": "UTC"})).json()
+    state["value"] = "stale"
+    stale = (await client.get("/v1/features/today", headers=headers, params={"tz": "UTC"})).json()
+
+    assert collect_calls == []
+    assert fresh["data"]["steps_total"] == stale["data"]["steps_total"] == 4321
+    assert fresh["diagnostics"]["cache_state"] == "fresh"
+    assert fresh["diagnostics"]["cache_revalidating"] is False
+    assert stale["diagnostics"]["cache_state"] == "stale"
+    assert stale["diagnostics"]["cache_revalidating"] is True
+    assert revalidated == [f"{user_id}:UTC"]
+    assert "hits" in fresh["diagnostics"]["cache_stats"]
+
+
+
+def _collect_today(collect_calls: list[str]):
+    async def _fake_collect(conn, user_id, tz_name, tzinfo, cached_payload=None):  # noqa: ARG001
+        collect_calls.append(f"{user_id}:{tz_name}")
+        day = datetime.now(tzinfo).date()
+        diag = summary._init_diag_info(user_id, tz_name)
+        diag["day"] = day
+        diag["day_used"] = day
+        return {"user_id": user_id, "day": day.isoformat(), "source": "snapshot", "steps_total": 99}, diag, None
+
+    return _fake_collect
+
+
+@pytest.mark.anyio
+async def test_features_cache_from_previous_local_day_is_a_miss(monkeypatch, client: AsyncClient):
+    from app.cache import CachedFeatures
+
+    monkeypatch.setattr(summary, "_acquire_features_conn", lambda: _FakeConnContext())
+    collect_calls: list[str] = []
+
+    async def _fake_entry(key: str):
+        yesterday = (datetime.now(timezone.utc) - timedelta(days=1)).date().isoformat()
+        payload = {"user_id": key.split(":")[0], "day": yesterday, "source": "snapshot", "steps_total": 4321}
+        return CachedFeatures(payload=payload, age_seconds=5.0, state="fresh")
+
+    monkeypatch.setattr(summary, "_collect_features", _collect_today(collect_calls))
+    monkeypatch.setattr(summary, "get_last_good_entry", _fake_entry)
+
+    user_id = str(uuid4())
+    headers = {"Authorization": "Bearer test-token", "X-Dev-UserId": user_id}
+    body = (await client.get("/v1/features/today", headers=headers, params={"tz": "UTC"})).json()
+
+    assert collect_calls == [f"{user_id}:UTC"]
+    assert body["data"]["steps_total"] == 99
+    assert body["data"]["day"] == datetime.now(timezone.utc).date().isoformat()
+
+
+@pytest.mark.anyio
+async def test_features_cache_is_keyed_by_timezone(monkeypatch, client: AsyncClient):
+    from app.cache import CachedFeatures
+
+    monkeypatch.setattr(summary, "_acquire_features_conn", lambda: _FakeConnContext())
+    collect_calls: list[str] = []
+    looked_up: list[str] = []
+    user_id = str(uuid4())
+    entries = {
+        f"{user_id}:UTC": {
+            "user_id": user_id,
+            "day": datetime.now(timezone.utc).date().isoformat(),
+            "source": "snapshot",
+            "steps_total": 4321,
+        }
+    }
+
+    async def _fake_entry(key: str):
+        looked_up.append(key)
+        payload = entries.get(key)
+        return CachedFeatures(payload=payload, age_seconds=5.0, state="fresh") if payload else None
+
+    monkeypatch.setattr(summary, "_collect_features", _collect_today(collect_calls))
+    monkeypatch.setattr(summary, "get_last_good_entry", _fake_entry)
+
+    headers = {"Authorization": "Bearer test-token", "X-Dev-UserId": user_id}
+    utc = (await client.get("/v1/features/today", headers=headers, params={"tz": "UTC"})).json()
+    chicago = (await client.get("/v1/features/today", headers=headers, params={"tz": "America/Chicago"})).json()
+
+    assert looked_up == [f"{user_id}:UTC", f"{user_id}:America/Chicago"]
+    assert utc["data"]["steps_total"] == 4321
+    assert collect_calls == [f"{user_id}:America/Chicago"]
+    assert chicago["data"]["steps_total"] == 99
+
+
+
+@pytest.mark.anyio
+async def test_gather_enrichment_runs_global_branches_on_borrowed_connections(monkeypatch):
+    request_conn = object()
+    borrowed: list[object] = []
+
+    class _BorrowCtx:
+        async def __aenter__(self):
+            conn = object()
+            borrowed.append(conn)
+            return conn
+
+        async def __aexit__(self, exc_type, exc, tb):
+            return False
+
+    class _OpenPool:
+        def get_stats(self):
+            return {"pool_available": 5}
+
+        def connection(self, timeout=None):  # noqa: ARG002
+            return _BorrowCtx()
+
+    seen: dict[str, object] = {}
+
+    def _fake(name, result, delay=0.05):
+        async def _fetch(conn, *args):  # noqa: ARG001
+            seen[name] = conn
+            await asyncio.sleep(delay)
+            if isinstance(result, Exception):
+                raise result
+            return result
+
+        return _fetch
+
+    monkeypatch.setattr(summary, "get_open_pool", lambda: _OpenPool())
+    monkeypatch.setattr(summary, "FEATURES_ENRICH_CONNECTIONS", 2)
+    monkeypatch.setattr(summary, "_fetch_sleep_aggregate", _fake("sleep", {"rem_m": 30}))
+    monkeypatch.setattr(summary, "_fetch_space_weather_daily", _fake("daily_wx", {"kp_max": 4}))
+    monkeypatch.setattr(summary, "_fetch_current_space_weather", _fake("current_wx", {"kp_current": 3}))
+    monkeypatch.setattr(summary, "_fetch_latest_ulf_context", _fake("ulf", RuntimeError("ulf down")))
+    monkeypatch.setattr(summary, "_fetch_schumann_row", _fake("sch", {"sch_f0_hz": 7.8}))
+    monkeypatch.setattr(summary, "_fetch_daily_post", _fake("post", {"post_title": "T"}))
+
+    timings: dict[str, float] = {}
+    started = asyncio.get_running_loop().time()
+    components, errors = await summary._gather_enrichment(
+        request_conn, "user-1", date(2024, 4, 3), ZoneInfo("UTC"), timings=timings
+    )
+    elapsed = asyncio.get_running_loop().time() - started
+
+    assert seen["sleep"] is request_conn
+    assert all(seen[name] is not request_conn for name in ("daily_wx", "current_wx", "ulf", "sch", "post"))
+    assert len(borrowed) == 5
+    assert elapsed < 0.05 * 6
+    assert components["daily_wx"] == {"kp_max": 4}
+    assert components["ulf"] == {}
+    assert errors == ["ulf context failed: ulf down"]
+    assert set(timings) == {"sleep", "daily_wx", "current_wx", "ulf", "sch", "post"}
+
+
+@pytest.mark.anyio
+async def test_gather_enrichment_reuses_global_sections_until_invalidated(monkeypatch):
+    calls: list[str] = []
+
+    def _fake(name, result):
+        async def _fetch(conn, *args):  # noqa: ARG001
+            calls.append(name)
+            return dict(result)
+
+        return _fetch
+
+    versions = {"daily_wx": "1"}
+
+    async def _fake_versions(sections):  # noqa: ARG001
+        return dict(versions)
+
+    monkeypatch.setattr(summary, "get_open_pool", lambda: None)
+    monkeypatch.setattr(summary, "global_section_versions", _fake_versions)
+    monkeypatch.setattr(summary, "_GLOBAL_VERSION_POLL_SECONDS", 0.0)
+    monkeypatch.setattr(summary, "_fetch_sleep_aggregate", _fake("sleep", {"rem_m": 30}))
+    monkeypatch.setattr(summary, "_fetch_space_weather_daily", _fake("daily_wx", {"kp_max": 4}))
+    monkeypatch.setattr(summary, "_fetch_current_space_weather", _fake("current_wx", {"kp_current": 3}))
+    monkeypatch.setattr(summary, "_fetch_latest_ulf_context", _fake("ulf", {"ulf_context_label": "Quiet"}))
+    monkeypatch.setattr(summary, "_fetch_schumann_row", _fake("sch", {"sch_f0_hz": 7.8}))
+    monkeypatch.setattr(summary, "_fetch_daily_post", _fake("post", {}))
+
+    day = date(2024, 4, 3)
+    await summary._gather_enrichment(object(), "user-1", day, ZoneInfo("UTC"))
+    assert sorted(calls) == ["current_wx", "daily_wx", "post", "sch", "sleep", "ulf"]
+
+    calls.clear()
+    cached: list[str] = []
+    components, errors = await summary._gather_enrichment(
+        object(), "user-2", day, ZoneInfo("UTC"), cached_sections=cached
+    )
+    # Only the per-user query and the empty (uncached) post run again.
+    assert sorted(calls) == ["post", "sleep"]
+    assert sorted(cached) == ["current_wx", "daily_wx", "sch", "ulf"]
+    assert components["daily_wx"] == {"kp_max": 4}
+    assert errors == []
+
+    versions["daily_wx"] = "2"
+    calls.clear()
+    await summary._gather_enrichment(object(), "user-3", day, ZoneInfo("UTC"))
+    assert sorted(calls) == ["daily_wx", "post", "sleep"]
+
 
 @pytest.mark.anyio
 async def test_db_ping_retries_pool_timeout(monkeypatch):
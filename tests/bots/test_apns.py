@@ -0,0 +1,180 @@
+from __future__ import annotations
+
+import asyncio
+import json
+
+import pytest
+
+h2_connection = pytest.importorskip("h2.connection")
+pytest.importorskip("cryptography")
+
+import h2.config  # noqa: E402
+import h2.events  # noqa: E402
+import jwt  # noqa: E402
+from cryptography.hazmat.primitives import serialization  # noqa: E402
+from cryptography.hazmat.primitives.asymmetric import ec  # noqa: E402
+
+from bots.notifications.apns import ApnsClient, ApnsMessage, ProviderToken  # noqa: E402
+
+
+pytestmark = pytest.mark.anyio
+
+
+@pytest.fixture
+def anyio_backend():
+    return "asyncio"
+
+
+@pytest.fixture
+def signing_key():
+    key = ec.generate_private_key(ec.SECP256R1())
+    pem = key.private_bytes(
+        serialization.Encoding.PEM,
+        serialization.PrivateFormat.PKCS8,
+        serialization.NoEncryption(),
+    ).decode("ascii")
+    return key, pem
+
+
+class _StandInApns:
+    """Minimal h2c APNs stand-in: answers POST /3/device/<token> after a short delay."""
+
+    def __init__(self, *, delay: float = 0.05, expire_first: bool = False) -> None:
+        self.delay = delay
+        self.expire_first = expire_first
+        self.connections = 0
+        self.requests: list[dict] = []
+        self.in_flight = 0
+        self.max_in_flight = 0
+        self.port = 0
+
+    async def __aenter__(self) -> "_StandInApns":
+        self._server = await asyncio.start_server(self._handle, "127.0.0.1", 0)
+        self.port = self._server.sockets[0].getsockname()[1]
+        return self
+
+    async def __aexit__(self, *exc) -> None:
+        self._server.close()
+        await self._server.wait_closed()
+
+    @property
+    def url(self) -> str:
+        return f"http://127.0.0.1:{self.port}"
+
+    async def _handle(self, reader, writer) -> None:
+        self.connections += 1
+        conn = h2_connection.H2Connection(config=h2.config.H2Configuration(client_side=False, header_encoding="utf-8"))
+        conn.initiate_connection()
+        writer.write(conn.data_to_send())
+        streams: dict[int, dict] = {}
+        tasks = set()
+        while True:
+            data = await reader.read(65535)
+            if not data:
+                break
+            for event in conn.receive_data(data):
+                if isinstance(event, h2.events.RequestReceived):
+                    streams[event.stream_id] = {"headers": dict(event.headers), "body": b""}
+                elif isinstance(event, h2.events.DataReceived):
+                    streams[event.stream_id]["body"] += event.data
+                    conn.acknowledge_received_data(event.flow_controlled_length, event.stream_id)
+                elif isinstance(event, h2.events.StreamEnded):
+                    task = asyncio.ensure_future(self._respond(conn, writer, event.stream_id, streams.pop(event.stream_id)))
+                    tasks.add(task)
+                    task.add_done_callback(tasks.discard)
+            writer.write(conn.data_to_send())
+        writer.close()
+
+    async def _respond(self, conn, writer, stream_id: int, request: dict) -> None:
+        self.in_flight += 1
+        self.max_in_flight = max(self.max_in_flight, self.in_flight)
+        self.requests.append(request)
+        await asyncio.sleep(self.delay)
+        self.in_flight -= 1
+
+        token = request["headers"][":path"].rsplit("/", 1)[-1]
+        if self.expire_first and len(self.requests) == 1:
+            status, body = 403, {"reason": "ExpiredProviderToken"}
+        elif token.startswith("bad"):
+            status, body = 400, {"reason": "BadDeviceToken"}
+        else:
+            status, body = 200, None
+        encoded = json.dumps(body).encode("utf-8") if body else b""
+        conn.send_headers(stream_id, [(":status", str(status)), ("apns-id", f"id-{stream_id}")], end_stream=not encoded)
+        if encoded:
+            conn.send_data(stream_id, encoded, end_stream=True)
+        writer.write(conn.data_to_send())
+
+
+def _provider(pem: str, clock=None) -> ProviderToken:
+    kwargs = {"clock": clock} if clock else {}
+    return ProviderToken(team_id="TEAM123456", key_id="KEY1234567", private_key_pem=pem, **kwargs)
+
+
+async def test_send_many_multiplexes_one_connection_per_environment(signing_key):
+    key, pem = signing_key
+    provider = _provider(pem)
+    messages = [ApnsMessage(device_token=f"tok{i}", body={"aps": {"alert": "hi"}}, collapse_id="c" * 80) for i in range(20)]
+    messages.append(ApnsMessage(device_token="bad-token", body={"aps": {}}))
+    messages.append(ApnsMessage(device_token="sandbox-tok", body={"aps": {}}, sandbox=True))
+
+    async with _StandInApns() as server:
+        hosts = {"prod": server.url, "sandbox": server.url}
+        async with ApnsClient(provider_token=provider, topic="com.example.app", hosts=hosts) as client:
+            results = await client.send_many(messages)
+
+    assert [result["ok"] for result in results] == [True] * 20 + [False, True]
+    assert results[20]["status_code"] == 400
+    assert results[20]["body"] == {"reason": "BadDeviceToken"}
+    assert results[0]["apns_id"].startswith("id-")
+
+    # one connection for prod plus one for sandbox, with streams in flight together
+    assert server.connections == 2
+    assert server.max_in_flight > 1
+    assert provider.signed == 1
+    headers = [request["headers"] for request in server.requests]
+    assert {h["authorization"] for h in headers} == {f"bearer {provider.get()}"}
+    assert {h["apns-topic"] for h in headers} == {"com.example.app"}
+    assert headers[0][":method"] == "POST"
+    assert len(next(h for h in headers if "apns-collapse-id" in h)["apns-collapse-id"]) == 64
+
+    claims = jwt.decode(provider.get(), key.public_key(), algorithms=["ES256"])
+    assert claims["iss"] == "TEAM123456"
+    assert jwt.get_unverified_header(provider.get())["kid"] == "KEY1234567"
+
+
+async def test_expired_provider_token_is_resigned_and_retried(signing_key):
+    _, pem = signing_key
+    provider = _provider(pem)
+
+    async with _StandInApns(delay=0, expire_first=True) as server:
+        async with ApnsClient(provider_token=provider, topic="t", hosts={"prod": server.url}) as client:
+            result = await client.send(ApnsMessage(device_token="tok", body={}))
+
+    assert result["ok"] is True
+    assert provider.signed == 2
+    first, retry = (request["headers"]["authorization"] for request in server.requests)
+    assert first != retry
+
+
+async def test_send_reports_connection_errors_without_raising(signing_key):
+    _, pem = signing_key
+    async with ApnsClient(provider_token=_provider(pem), topic="t", hosts={"prod": "http://127.0.0.1:9"}) as client:
+        result = await client.send(ApnsMessage(device_token="tok", body={}))
+
+    assert result["ok"] is False
+    assert result["status_code"] == 0
+    assert result["error"]
+
+
+def test_provider_token_is_cached_until_refresh_window(signing_key):
+    _, pem = signing_key
+    now = [1_000_000.0]
+    provider = _provider(pem, clock=lambda: now[0])
+
+    token = provider.get()
+    now[0] += 49 * 60
+    assert provider.get() == token
+    now[0] += 60
+    assert provider.get() != token
+    assert provider.signed == 2
@@ -1,15 +1,35 @@
 from __future__ import annotations
 
+import asyncio
+import json
+from datetime import datetime, timedelta
+
+import httpx
+
 from bots.notifications import fcm
 
 
 class _Credentials:
     token = "access-token"
+    expiry = None
 
     def refresh(self, _request) -> None:
         return None
 
 
+class _ExpiringCredentials:
+    def __init__(self, clock) -> None:
+        self.token = None
+        self.expiry = None
+        self.clock = clock
+        self.refreshes = 0
+
+    def refresh(self, _request) -> None:
+        self.refreshes += 1
+        self.token = f"access-{self.refreshes}"
+        self.expiry = self.clock() + timedelta(hours=1)
+
+
 class _Response:
     ok = True
     status_code = 200
@@ -27,8 +47,8 @@ def test_fcm_uses_data_message_for_background_tap_routing(monkeypatch):
         captured.update(kwargs)
         return _Response()
 
-    monkeypatch.setattr(fcm.requests, "post", _post)
     client = fcm.FcmClient(project_id="test-project", credentials=_Credentials())
+    monkeypatch.setattr(client.session, "post", _post)
 
     result = client.send(
         device_token="android-token",
@@ -46,3 +66,51 @@ def test_fcm_uses_data_message_for_background_tap_routing(monkeypatch):
         "deep_link": "gaiaeyes://mission-control?family=gauge_spikes",
     }
     assert message["android"] == {"priority": "high"}
+
+
+def test_access_token_is_reused_until_close_to_expiry():
+    now = [datetime(2026, 10, 16, 12, 0)]
+    credentials = _ExpiringCredentials(lambda: now[0])
+    client = fcm.FcmClient(project_id="p", credentials=credentials, clock=credentials.clock)
+
+    assert client.access_token() == "access-1"
+    now[0] += timedelta(minutes=50)
+    assert client.access_token() == "access-1"
+    now[0] += timedelta(minutes=6)
+    assert client.access_token() == "access-2"
+    assert client.access_token(stale="access-1") == "access-2"
+    assert credentials.refreshes == 2
+
+
+def test_send_many_returns_per_token_results_with_one_token_refresh():
+    now = datetime(2026, 10, 16, 12, 0)
+    credentials = _ExpiringCredentials(lambda: now)
+    seen = []
+
+    def _handler(request: httpx.Request) -> httpx.Response:
+        message = json.loads(request.content)["message"]
+        seen.append((message["token"], request.headers["authorization"]))
+        if message["token"].startswith("stale"):
+            return httpx.Response(404, json={"error": {"status": "NOT_FOUND", "details": [{"errorCode": "UNREGISTERED"}]}})
+        if message["token"] == "boom":
+            raise httpx.ConnectError("connection refused", request=request)
+        return httpx.Response(200, json={"name": f"projects/p/messages/{message['token']}"})
+
+    client = fcm.FcmClient(
+        project_id="p",
+        credentials=credentials,
+        max_concurrency=3,
+        clock=lambda: now,
+        transport=httpx.MockTransport(_handler),
+    )
+    tokens = [f"tok-{i}" for i in range(8)] + ["stale-1", "boom"]
+    messages = [fcm.FcmMessage(device_token=token, title="t", body="b", data={"k": 1}) for token in tokens]
+
+    results = asyncio.run(client.send_many(messages))
+
+    assert [result["ok"] for result in results] == [True] * 8 + [False, False]
+    assert results[0]["body"] == {"name": "projects/p/messages/tok-0"}
+    assert results[8]["status_code"] == 404
+    assert results[9]["status_code"] == 0 and "connection refused" in results[9]["error"]
+    assert credentials.refreshes == 1
+    assert {auth for _, auth in seen} == {"Bearer access-1"}
@@ -44,10 +44,46 @@ def test_main_uses_one_connection_scope_per_bounded_worker(monkeypatch) -> None:
     monkeypatch.setattr(gauge_scoring_job, "_verify_outputs", lambda *args: [])
     monkeypatch.setattr(
         gauge_scoring_job,
-        "score_user_day",
-        lambda user_id, day, force=False: {"ok": True, "skipped": True},
+        "score_users_day",
+        lambda user_ids, day, force=False: {uid: {"ok": True, "skipped": True} for uid in user_ids},
     )
 
     gauge_scoring_job.main()
 
     assert entered == ["entered", "entered"]
+
+
+def test_score_chunk_batches_per_day_and_falls_back_per_user(monkeypatch) -> None:
+    @contextmanager
+    def connection_scope():
+        yield
+
+    day_one = datetime(2026, 7, 11).date()
+    day_two = datetime(2026, 7, 12).date()
+    batches: list[tuple[list[str], object]] = []
+
+    def score_users_day(user_ids, day, force=False):
+        batches.append((list(user_ids), day))
+        if day == day_two:
+            raise RuntimeError("prefetch failed")
+        return {"user-1": {"ok": True, "skipped": False}, "user-2": {"ok": False, "error": "boom"}}
+
+    monkeypatch.setattr(gauge_scoring_job.pg, "connection_scope", connection_scope)
+    monkeypatch.setattr(gauge_scoring_job, "score_users_day", score_users_day)
+    monkeypatch.setattr(
+        gauge_scoring_job,
+        "score_user_day",
+        lambda user_id, day, force=False: {"ok": True, "skipped": True},
+    )
+
+    results = gauge_scoring_job._score_chunk(
+        [("user-1", day_one), ("user-2", day_one), ("user-3", day_two)],
+        force=False,
+    )
+
+    assert batches == [(["user-1", "user-2"], day_one), (["user-3"], day_two)]
+    assert [(key, error) for key, _, error in results] == [
+        (("user-1", day_one), None),
+        (("user-2", day_one), "boom"),
+        (("user-3", day_two), None),
+    ]
@@ -1,16 +1,22 @@
 import unittest
-from datetime import date, datetime, timezone
-from unittest.mock import patch
+import uuid
+from datetime import date, datetime, timedelta, timezone
+from decimal import Decimal
+from unittest.mock import MagicMock, patch
 
 import bots.patterns.pattern_engine_job as pattern_engine_job
 from bots.patterns.pattern_engine_job import (
     ASSOCIATION_PAIRS,
     build_associations,
+    build_associations_columnar,
     build_user_daily_features,
     build_user_daily_outcomes,
     confidence_bucket,
     _collect_relevant_zip_codes,
+    association_rows_from_state,
+    pattern_day_state,
     percentile_nearest_rank,
+    refresh_user_association_stats,
     select_best_lag,
     signal_exposure,
 )
@@ -292,6 +298,100 @@ class PatternEngineJobTests(unittest.TestCase):
         self.assertEqual(pressure_headache["exposed_n"], 4)
         self.assertEqual(pressure_headache["exposed_outcome_n"], 2)
 
+    @unittest.skipIf(pattern_engine_job.np is None, "numpy is not installed")
+    def test_build_associations_columnar_matches_python_engine(self) -> None:
+        from scripts.bench_pattern_associations import synthetic_rows
+
+        as_of_day = date(2026, 3, 31)
+        updated_at = datetime(2026, 3, 31, tzinfo=timezone.utc)
+        feature_rows, outcome_rows = synthetic_rows(users=4, days=75, as_of_day=as_of_day, seed=11)
+        # A user with features but no outcomes is skipped by both engines.
+        feature_rows.append({"user_id": "no-outcomes", "day": as_of_day, "pressure_swing_exposed": True})
+
+        expected = build_associations(feature_rows, outcome_rows, as_of_day=as_of_day, updated_at=updated_at)
+        actual = build_associations_columnar(feature_rows, outcome_rows, as_of_day=as_of_day, updated_at=updated_at)
+
+        self.assertTrue(expected)
+        self.assertEqual(actual, expected)
+
+    def test_build_associations_columnar_skips_temporary_context_days(self) -> None:
+        days = [date(2026, 3, day) for day in range(1, 11)]
+        feature_rows = [
+            {
+                "user_id": "user-1",
+                "day": day,
+                "pressure_swing_exposed": index < 5,
+                "temporary_illness_reported": day == date(2026, 3, 3),
+            }
+            for index, day in enumerate(days)
+        ]
+        outcome_rows = [
+            {"user_id": "user-1", "day": day, "headache_day": day <= date(2026, 3, 3)}
+            for day in days
+        ]
+
+        kwargs = {"as_of_day": date(2026, 3, 10), "updated_at": datetime(2026, 3, 10, tzinfo=timezone.utc)}
+        self.assertEqual(
+            build_associations_columnar(feature_rows, outcome_rows, **kwargs),
+            build_associations(feature_rows, outcome_rows, **kwargs),
+        )
+
+    def test_incremental_state_matches_full_rebuild_after_window_slide(self) -> None:
+        from scripts.bench_pattern_associations import synthetic_rows
+
+        def day_states(feature_rows, outcome_rows):
+            feature_map = {row["day"]: row for row in feature_rows}
+            outcome_map = {row["day"]: row for row in outcome_rows}
+            return {
+                day: pattern_day_state(feature_map.get(day), outcome_map.get(day))
+                for day in set(feature_map) | set(outcome_map)
+            }
+
+        updated_at = datetime(2026, 4, 3, tzinfo=timezone.utc)
+        old_as_of = date(2026, 3, 31)
+        old_since = old_as_of - timedelta(days=44)
+        old_features, old_outcomes = synthetic_rows(users=1, days=45, as_of_day=old_as_of, seed=5)
+        user_id = old_features[0]["user_id"]
+
+        stats = {}
+        refresh_user_association_stats(
+            stats,
+            old_window=None,
+            old_day_states={},
+            new_day_states=day_states(old_features, old_outcomes),
+            dirty_start=old_since,
+            since_day=old_since,
+            as_of_day=old_as_of,
+        )
+        self.assertEqual(
+            association_rows_from_state(user_id, stats, as_of_day=old_as_of, updated_at=updated_at),
+            build_associations(old_features, old_outcomes, as_of_day=old_as_of, updated_at=updated_at),
+        )
+
+        # Slide the window three days and rewrite everything from a week back.
+        as_of = old_as_of + timedelta(days=3)
+        since = old_since + timedelta(days=3)
+        dirty_start = old_as_of - timedelta(days=7)
+        fresh_features, fresh_outcomes = synthetic_rows(users=1, days=45, as_of_day=as_of, seed=6)
+        changed_features = [row for row in fresh_features if row["day"] >= dirty_start]
+        changed_outcomes = [row for row in fresh_outcomes if row["day"] >= dirty_start]
+        refresh_user_association_stats(
+            stats,
+            old_window=(old_since, old_as_of),
+            old_day_states=day_states(old_features, old_outcomes),
+            new_day_states=day_states(changed_features, changed_outcomes),
+            dirty_start=dirty_start,
+            since_day=since,
+            as_of_day=as_of,
+        )
+
+        window_features = [row for row in old_features if since <= row["day"] < dirty_start] + changed_features
+        window_outcomes = [row for row in old_outcomes if since <= row["day"] < dirty_start] + changed_outcomes
+        self.assertEqual(
+            association_rows_from_state(user_id, stats, as_of_day=as_of, updated_at=updated_at),
+            build_associations(window_features, window_outcomes, as_of_day=as_of, updated_at=updated_at),
+        )
+
     def test_collect_relevant_zip_codes_dedupes_and_sorts(self) -> None:
         self.assertEqual(
             _collect_relevant_zip_codes(
@@ -333,6 +433,30 @@ class PatternEngineJobTests(unittest.TestCase):
         self.assertEqual(run_once.call_count, 2)
         sleep_mock.assert_called_once_with(pattern_engine_job.DB_RETRY_BASE_SLEEP_SECONDS)
 
+    def test_run_pattern_engine_dispatches_incremental_mode(self) -> None:
+        expected = {"features": 2, "outcomes": 2, "associations": 3, "surfaced": 0}
+        with (
+            patch.object(pattern_engine_job, "_require_psycopg"),
+            patch.object(pattern_engine_job, "_run_pattern_engine_once") as run_full,
+            patch.object(
+                pattern_engine_job,
+                "_run_pattern_engine_incremental_once",
+                return_value=expected,
+            ) as run_incremental,
+        ):
+            result = pattern_engine_job.run_pattern_engine(
+                as_of_day=date(2026, 3, 29),
+                days_back=180,
+                user_id=None,
+                dsn="postgresql://localhost/test",
+                mode="incremental",
+                recent_days=3,
+            )
+
+        self.assertEqual(result, expected)
+        run_full.assert_not_called()
+        self.assertEqual(run_incremental.call_args.kwargs["recent_days"], 3)
+
     def test_run_pattern_engine_does_not_retry_non_transient_errors(self) -> None:
         with (
             patch.object(pattern_engine_job, "_require_psycopg") as require_psycopg,
@@ -355,6 +479,400 @@ class PatternEngineJobTests(unittest.TestCase):
         self.assertEqual(run_once.call_count, 1)
         sleep_mock.assert_not_called()
 
+    def test_sharded_run_scopes_each_shard_and_aggregates_summary(self) -> None:
+        def fake_once(**kwargs):
+            shard_count, shard_index = kwargs["shard"]
+            if shard_index == 2:
+                raise ValueError("column does not exist")
+            return {"features": 10 + shard_index, "outcomes": 5, "associations": 2, "surfaced": 1}
+
+        with (
+            patch.object(pattern_engine_job, "_require_psycopg"),
+            patch.object(pattern_engine_job, "_window_has_base_rows", return_value=True),
+            patch.object(pattern_engine_job, "_run_pattern_engine_once", side_effect=fake_once) as run_once,
+        ):
+            summary = pattern_engine_job.run_pattern_engine_sharded(
+                as_of_day=date(2026, 3, 29),
+                days_back=180,
+                shards=3,
+                workers=1,
+                dsn="postgresql://localhost/test",
+            )
+
+        self.assertEqual([call.kwargs["shard"] for call in run_once.call_args_list], [(3, 0), (3, 1), (3, 2)])
+        self.assertTrue(all(call.kwargs["user_id"] is None for call in run_once.call_args_list))
+        self.assertTrue(all(call.kwargs["allow_empty"] for call in run_once.call_args_list))
+        self.assertEqual(summary["features"], 21)
+        self.assertEqual(summary["associations"], 4)
+        self.assertEqual(summary["failed_shards"], 1)
+        self.assertEqual([item["shard"] for item in summary["shards"]], [0, 1, 2])
+        self.assertIn("column does not exist", summary["shards"][2]["error"])
+        self.assertIn("seconds", summary["shards"][0])
+
+    def test_sharded_run_can_rerun_selected_shards(self) -> None:
+        with (
+            patch.object(pattern_engine_job, "_require_psycopg"),
+            patch.object(pattern_engine_job, "_window_has_base_rows", return_value=True),
+            patch.object(
+                pattern_engine_job,
+                "_run_pattern_engine_once",
+                return_value={"features": 1, "outcomes": 1, "associations": 1, "surfaced": 0},
+            ) as run_once,
+        ):
+            summary = pattern_engine_job.run_pattern_engine_sharded(
+                as_of_day=date(2026, 3, 29),
+                days_back=180,
+                shards=8,
+                workers=4,
+                dsn="postgresql://localhost/test",
+                shard_indexes=[5],
+            )
+
+        self.assertEqual([call.kwargs["shard"] for call in run_once.call_args_list], [(8, 5)])
+        self.assertEqual([item["shard"] for item in summary["shards"]], [5])
+
+    def test_sharded_run_skips_everything_when_window_is_empty(self) -> None:
+        with (
+            patch.object(pattern_engine_job, "_require_psycopg"),
+            patch.object(pattern_engine_job, "_window_has_base_rows", return_value=False),
+            patch.object(pattern_engine_job, "_run_pattern_engine_once") as run_once,
+        ):
+            summary = pattern_engine_job.run_pattern_engine_sharded(
+                as_of_day=date(2026, 3, 29),
+                days_back=180,
+                shards=4,
+                workers=1,
+                dsn="postgresql://localhost/test",
+            )
+
+        run_once.assert_not_called()
+        self.assertEqual(summary["shards"], [])
+        self.assertEqual(summary["failed_shards"], 0)
+
+    def test_empty_shard_still_clears_its_scope(self) -> None:
+        with (
+            patch.object(pattern_engine_job.psycopg, "connect", MagicMock()),
+            patch.object(pattern_engine_job, "_configure_connection"),
+            patch.object(pattern_engine_job, "_build_feature_rows_for_scope", return_value=(0, [])),
+            patch.object(pattern_engine_job, "_table_exists", return_value=True),
+            patch.object(pattern_engine_job, "_delete_scope") as delete_scope,
+        ):
+            result = pattern_engine_job._run_pattern_engine_once(
+                as_of_day=date(2026, 3, 29),
+                days_back=180,
+                user_id=None,
+                dsn="postgresql://localhost/test",
+                shard=(4, 2),
+                allow_empty=True,
+            )
+
+        cleared = [call.args[1] for call in delete_scope.call_args_list]
+        self.assertIn("marts.user_pattern_associations", cleared)
+        self.assertIn("marts.user_daily_features", cleared)
+        self.assertTrue(all(call.kwargs["shard"] == (4, 2) for call in delete_scope.call_args_list))
+        self.assertEqual(result["associations"], 0)
+
+    def test_delete_scope_applies_shard_predicate(self) -> None:
+        conn = MagicMock()
+        cursor = conn.cursor.return_value.__enter__.return_value
+
+        pattern_engine_job._delete_scope(
+            conn,
+            "marts.user_daily_features",
+            since_day=date(2026, 3, 1),
+            user_id=None,
+            day_scoped=True,
+            shard=(4, 1),
+        )
+
+        sql, params = cursor.execute.call_args.args
+        self.assertIn("mod(hashtext(user_id::text)::bigint + 2147483648, %s) = %s", sql)
+        self.assertEqual(params, (4, 1, date(2026, 3, 1)))
+
+    def test_run_pattern_engine_rejects_sharded_incremental_mode(self) -> None:
+        with patch.object(pattern_engine_job, "_require_psycopg"):
+            with self.assertRaisesRegex(ValueError, "full mode"):
+                pattern_engine_job.run_pattern_engine(
+                    as_of_day=date(2026, 3, 29),
+                    days_back=180,
+                    user_id=None,
+                    mode="incremental",
+                    shard=(2, 0),
+                )
+
+    def test_copy_value_coerces_to_binary_column_types(self) -> None:
+        user_id = "5b3c1d2e-9d7a-4f62-8f43-2a1d7c0b9e11"
+        self.assertEqual(pattern_engine_job._copy_value(user_id, "uuid", False), uuid.UUID(user_id))
+        self.assertEqual(pattern_engine_job._copy_value(0.1 + 0.2, "numeric", False), Decimal("0.3"))
+        self.assertEqual(pattern_engine_job._copy_value(3.0, "int4", False), 3)
+        self.assertEqual(pattern_engine_job._copy_value(2, "float8", False), 2.0)
+        self.assertEqual(pattern_engine_job._copy_value('{"a": 1}', "jsonb", False), {"a": 1})
+        self.assertEqual(pattern_engine_job._copy_value(["x", 1], "text", True), ["x", "1"])
+        self.assertIsNone(pattern_engine_job._copy_value(None, "numeric", False))
+        with self.assertRaises(TypeError):
+            pattern_engine_job._copy_value({"a": 1}, "text", False)
+
+    def test_write_rows_surfaces_coercion_errors_instead_of_falling_back(self) -> None:
+        conn = MagicMock()
+        cursor = conn.cursor.return_value.__enter__.return_value
+        rows = [{"user_id": "5b3c1d2e-9d7a-4f62-8f43-2a1d7c0b9e11", "note": ["not", "text"]}]
+
+        with (
+            patch.object(pattern_engine_job, "COPY_WRITER_MIN_ROWS", 1),
+            patch.object(
+                pattern_engine_job,
+                "_column_copy_types",
+                return_value=[(2950, "uuid", False), (25, "text", False)],
+            ),
+        ):
+            with self.assertRaises(TypeError):
+                pattern_engine_job._write_rows(conn, "marts.example", ["user_id", "note"], rows)
+
+        cursor.executemany.assert_not_called()
+
+    def test_write_rows_falls_back_to_executemany_when_copy_is_refused(self) -> None:
+        import psycopg
+
+        conn = MagicMock()
+        cursor = conn.cursor.return_value.__enter__.return_value
+        cursor.copy.side_effect = psycopg.errors.InsufficientPrivilege("permission denied for COPY")
+        rows = [{"user_id": f"user-{index}", "day": date(2026, 3, 1), "value": index} for index in range(5)]
+        column_types = [(2950, "uuid", False), (1082, "date", False), (1700, "numeric", False)]
+
+        with (
+            patch.object(pattern_engine_job, "COPY_WRITER_MIN_ROWS", 1),
+            patch.object(pattern_engine_job, "INSERT_BATCH_SIZE", 2),
+            patch.object(pattern_engine_job, "_column_copy_types", return_value=column_types),
+        ):
+            stats = pattern_engine_job._write_rows(conn, "marts.example", ["user_id", "day", "value"], rows)
+
+        self.assertEqual(stats["method"], "executemany")
+        self.assertEqual(stats["rows"], 5)
+        conn.transaction.assert_called_once_with()
+        batches = [call.args[1] for call in cursor.executemany.call_args_list]
+        self.assertEqual([len(batch) for batch in batches], [2, 2, 1])
+        self.assertEqual(batches[0][0], ("user-0", date(2026, 3, 1), 0))
+
+
+
+class _IncrementalStore:
+    """In-memory stand-in for the marts tables the incremental runner reads and writes."""
+
+    KEYS = {
+        "marts.user_pattern_association_state": ("user_id", "signal_key", "outcome_key", "lag_hours"),
+        "marts.user_pattern_associations": ("user_id", "signal_key", "outcome_key", "lag_hours"),
+        "marts.user_pattern_engine_state": ("user_id",),
+    }
+
+    def __init__(self, source_features):
+        self.source_features = source_features
+        self.tables = {
+            "marts.user_daily_features": [],
+            "marts.user_daily_outcomes": [],
+            "marts.user_pattern_day_state": [],
+        }
+        self.keyed = {table: {} for table in self.KEYS}
+        self.dirty = []
+
+    def build_features(self, conn, *, since_day, as_of_day, user_id, updated_at, shard=None, raw_symptoms=False):
+        self.raw_symptoms = raw_symptoms
+        rows = [
+            dict(row)
+            for row in self.source_features
+            if since_day <= row["day"] <= as_of_day and (user_id is None or row["user_id"] == user_id)
+        ]
+        return len(rows), rows
+
+    def fetch_rows(self, conn, sql, params=()):
+        if "delete from marts.user_pattern_dirty_days" in sql:
+            as_of_day = params[0]
+            claimed = [row for row in self.dirty if row["day"] <= as_of_day]
+            self.dirty = [row for row in self.dirty if row["day"] > as_of_day]
+            return claimed
+        if "from marts.daily_features" in sql:
+            since_day, as_of_day = params[0], params[1]
+            return [
+                {"user_id": user}
+                for user in sorted({row["user_id"] for row in self.source_features if since_day <= row["day"] <= as_of_day})
+            ]
+        if "from marts.user_pattern_engine_state" in sql:
+            return list(self.keyed["marts.user_pattern_engine_state"].values())
+        if "from marts.user_pattern_association_state" in sql:
+            users = set(params[0])
+            return [row for row in self.keyed["marts.user_pattern_association_state"].values() if row["user_id"] in users]
+        if "as u(user_id)" in sql:
+            users, since_day, as_of_day = params[0], params[1], params[2]
+
+            def has_rows(table, user):
+                return any(
+                    row["user_id"] == user and since_day <= row["day"] <= as_of_day for row in self.tables[table]
+                )
+
+            return [
+                {"user_id": user}
+                for user in users
+                if has_rows("marts.user_daily_features", user) and has_rows("marts.user_daily_outcomes", user)
+            ]
+        if "distinct on (t.user_id, t.day)" in sql:
+            table = sql.split(" from ", 1)[1].split()[0]
+            users, starts, ends = params
+            return sorted(
+                (
+                    row
+                    for row in self.tables[table]
+                    if any(row["user_id"] == u and s <= row["day"] <= e for u, s, e in zip(users, starts, ends))
+                ),
+                key=lambda row: (row["user_id"], row["day"]),
+            )
+        raise AssertionError(f"unexpected query: {sql}")
+
+    def delete_user_days_from(self, conn, table_name, start_days, *, before=False):
+        def keep(row):
+            start = start_days.get(row["user_id"])
+            if start is None:
+                return True
+            return row["day"] >= start if before else row["day"] < start
+
+        self.tables[table_name] = [row for row in self.tables[table_name] if keep(row)]
+
+    def delete_users(self, conn, table_name, user_ids):
+        scoped = set(user_ids)
+        self.keyed[table_name] = {key: row for key, row in self.keyed[table_name].items() if key[0] not in scoped}
+
+    def insert_rows(self, conn, table_name, columns, rows):
+        self.tables[table_name].extend(dict(row) for row in rows)
+        return {"rows": len(rows), "method": "memory", "seconds": 0.0}
+
+    def upsert_rows(self, conn, table_name, columns, key_columns, rows):
+        for row in rows:
+            self.keyed[table_name][tuple(row[column] for column in key_columns)] = dict(row)
+        return {"rows": len(rows), "method": "memory", "seconds": 0.0}
+
+    def run_full(self, as_of_day, days_back):
+        """Run `--mode full` over the same tables; returns the association rows it writes."""
+        written = {}
+
+        def insert_rows(conn, table_name, columns, rows):
+            written[table_name] = [dict(row) for row in rows]
+            return {"rows": len(rows), "method": "memory", "seconds": 0.0}
+
+        with (
+            patch.object(pattern_engine_job.psycopg, "connect", MagicMock()),
+            patch.object(pattern_engine_job, "_configure_connection"),
+            patch.object(pattern_engine_job, "_build_feature_rows_for_scope", side_effect=self.build_features),
+            patch.object(pattern_engine_job, "_fetch_rows", side_effect=self.fetch_rows),
+            patch.object(pattern_engine_job, "_delete_scope"),
+            patch.object(pattern_engine_job, "_table_exists", return_value=False),
+            patch.object(pattern_engine_job, "_insert_rows", side_effect=insert_rows),
+        ):
+            pattern_engine_job._run_pattern_engine_once(
+                as_of_day=as_of_day,
+                days_back=days_back,
+                user_id=None,
+                dsn="postgresql://localhost/test",
+            )
+        return written["marts.user_pattern_associations"]
+
+    def run(self, as_of_day, days_back):
+        with (
+            patch.object(pattern_engine_job.psycopg, "connect", MagicMock()),
+            patch.object(pattern_engine_job, "_configure_connection"),
+            patch.object(pattern_engine_job, "_build_feature_rows_for_scope", side_effect=self.build_features),
+            patch.object(pattern_engine_job, "_fetch_rows", side_effect=self.fetch_rows),
+            patch.object(pattern_engine_job, "_delete_user_days_from", side_effect=self.delete_user_days_from),
+            patch.object(pattern_engine_job, "_delete_users", side_effect=self.delete_users),
+            patch.object(pattern_engine_job, "_insert_rows", side_effect=self.insert_rows),
+            patch.object(pattern_engine_job, "_upsert_rows", side_effect=self.upsert_rows),
+        ):
+            return pattern_engine_job._run_pattern_engine_incremental_once(
+                as_of_day=as_of_day,
+                days_back=days_back,
+                user_id=None,
+                dsn="postgresql://localhost/test",
+            )
+
+
+def _runner_features(users, days, as_of_day, seed, *, user_prefix="user"):
+    import random
+
+    from scripts.bench_pattern_associations import synthetic_rows
+
+    rng = random.Random(seed)
+    feature_rows, _ = synthetic_rows(users=users, days=days, as_of_day=as_of_day, seed=seed)
+    for row in feature_rows:
+        row["user_id"] = row["user_id"].replace("bench-user", user_prefix)
+        for field in ("headache_symptom_events", "fatigue_symptom_events", "poor_sleep_symptom_events"):
+            row[field] = 1 if rng.random() < 0.3 else 0
+        # Biometric outcomes are judged against trailing baselines, so they expose
+        # any history read from before the window.
+        row["hrv_avg"] = rng.uniform(30.0, 80.0)
+        row["hr_min"] = rng.uniform(45.0, 70.0)
+        row["sleep_total_minutes"] = rng.uniform(300.0, 480.0)
+    return feature_rows
+
+
+class PatternEngineIncrementalRunnerTests(unittest.TestCase):
+    def _comparable(self, rows):
+        ignored = {"updated_at", "first_seen_at"}
+        return sorted(
+            ({key: value for key, value in row.items() if key not in ignored} for row in rows),
+            key=lambda row: (row["user_id"], row["signal_key"], row["outcome_key"], row["lag_hours"]),
+        )
+
+    def test_stored_state_plus_incremental_run_matches_full_rebuild(self) -> None:
+        days_back = 40
+        first_as_of = date(2026, 3, 31)
+        second_as_of = first_as_of + timedelta(days=3)
+        dirty_day = first_as_of - timedelta(days=12)
+        first_since = first_as_of - timedelta(days=days_back - 1)
+        second_since = second_as_of - timedelta(days=days_back - 1)
+
+        history = _runner_features(2, days_back + 3, second_as_of, seed=3)
+        # Only has days that slide out of the window before the second run.
+        aging_user = [
+            dict(row, user_id="aging-user")
+            for row in history
+            if row["user_id"] == "user-00000" and row["day"] < second_since
+        ]
+        self.assertTrue(aging_user)
+        store = _IncrementalStore(history + aging_user)
+        store.run(first_as_of, days_back)
+
+        first_rows = list(store.keyed["marts.user_pattern_associations"].values())
+        first_window = [row for row in store.source_features if first_since <= row["day"] <= first_as_of]
+        self.assertEqual(
+            self._comparable(first_rows),
+            self._comparable(
+                build_associations(
+                    first_window,
+                    build_user_daily_outcomes(first_window, updated_at=datetime.now(timezone.utc)),
+                    as_of_day=first_as_of,
+                    updated_at=datetime.now(timezone.utc),
+                )
+            ),
+        )
+
+        # Rewrite one user's history from a backdated day older than --recent-days,
+        # and queue a change after the run day that must stay queued.
+        rewritten = _runner_features(2, days_back + 3, second_as_of, seed=9)
+        store.source_features = [
+            row for row in store.source_features if not (row["user_id"] == "user-00001" and row["day"] >= dirty_day)
+        ] + [row for row in rewritten if row["user_id"] == "user-00001" and row["day"] >= dirty_day]
+        store.dirty = [
+            {"user_id": "user-00001", "day": dirty_day},
+            {"user_id": "user-00000", "day": second_as_of + timedelta(days=1)},
+        ]
+
+        summary = store.run(second_as_of, days_back)
+
+        self.assertTrue(store.raw_symptoms)
+        self.assertEqual(store.dirty, [{"user_id": "user-00000", "day": second_as_of + timedelta(days=1)}])
+        self.assertEqual(summary["bootstrapped"], 0)
+        expected = store.run_full(second_as_of, days_back)
+        actual = list(store.keyed["marts.user_pattern_associations"].values())
+        self.assertNotIn("aging-user", {row["user_id"] for row in actual})
+        self.assertEqual(self._comparable(actual), self._comparable(expected))
+
 
 if __name__ == "__main__":
     unittest.main()
@@ -0,0 +1,104 @@
+import argparse
+import json
+import sys
+import types
+
+import numpy as np
+
+from bots.schumann import schumann_multi
+
+
+def _fake_extractor(source, f1):
+    module = types.ModuleType(f"fake_{source}_extractor")
+    module.IMAGE_URL = f"https://example.test/{source}.jpg"
+
+    def build_arg_parser():
+        ap = argparse.ArgumentParser()
+        ap.add_argument("--out")
+        ap.add_argument("--overlay")
+        ap.add_argument("--insecure", action="store_true")
+        ap.add_argument("--verbose", action="store_true")
+        ap.add_argument("--fixed-offset", type=int, default=None)
+        return ap
+
+    def extract(img, last_mod, args):
+        payload = {
+            "status": "ok",
+            "source": source,
+            "fundamental_hz": f1,
+            "usable": True,
+            "quality_score": 0.9,
+            "last_modified": last_mod,
+            "raw": {"pixels": int(img.sum()), "fixed_offset": args.fixed_offset},
+        }
+        return payload, img + 1
+
+    module.build_arg_parser = build_arg_parser
+    module.extract = extract
+    return module
+
+
+def _install_fakes(monkeypatch, fail=()):
+    written = {}
+    monkeypatch.setitem(
+        sys.modules,
+        "cv2",
+        types.SimpleNamespace(imwrite=lambda path, img: written.setdefault(path, int(img.sum())) is not None),
+    )
+    monkeypatch.setitem(sys.modules, "fake_tomsk_extractor", _fake_extractor("tomsk", 7.8))
+    monkeypatch.setitem(sys.modules, "fake_cumiana_extractor", _fake_extractor("cumiana", 7.9))
+    monkeypatch.setattr(
+        schumann_multi,
+        "EXTRACTORS",
+        {
+            "tomsk": ("fake_tomsk_extractor", "IMAGE_URL"),
+            "cumiana": ("fake_cumiana_extractor", "IMAGE_URL"),
+        },
+    )
+
+    def fetch_decoded(name, insecure):
+        if name in fail:
+            return {"error": f"Failed to fetch {name} image: boom", "timings": {"download": 1.0}}
+        img = np.full((2, 3, 3), 2 if name == "tomsk" else 3, dtype=np.uint8)
+        return {"img": img, "last_modified": f"{name}-lm", "timings": {"download": 1.0, "decode": 0.5}}
+
+    monkeypatch.setattr(schumann_multi, "fetch_decoded", fetch_decoded)
+    return written
+
+
+def test_in_process_runs_both_extractors_and_records_stage_timings(monkeypatch, tmp_path):
+    written = _install_fakes(monkeypatch)
+    out = tmp_path / "schumann_now.json"
+
+    rc = schumann_multi.main(
+        ["--out", str(out), "--overlay", str(tmp_path), "--in-process", "--cumiana-fixed-offset", "22"]
+    )
+
+    combined = json.loads(out.read_text())
+    assert rc == 0
+    assert combined["extraction_mode"] == "in_process"
+    assert combined["primary"] == "tomsk"
+    assert combined["sources"]["tomsk"]["raw"]["pixels"] == 36
+    assert combined["sources"]["cumiana"]["raw"]["fixed_offset"] == 22
+    assert combined["sources"]["cumiana"]["last_modified"] == "cumiana-lm"
+    assert written == {str(tmp_path / "tomsk_overlay.png"): 54, str(tmp_path / "cumiana_overlay.png"): 72}
+
+    timings = combined["timings_ms"]
+    for stage in ("pool_start", "download_decode", "extract", "overlay_write", "total"):
+        assert timings[stage] >= 0
+    assert set(timings["sources"]["tomsk"]) == {"download", "decode", "extract", "overlay_write"}
+
+
+def test_in_process_reports_fetch_failure_per_source(monkeypatch, tmp_path):
+    written = _install_fakes(monkeypatch, fail=("tomsk",))
+    out = tmp_path / "schumann_now.json"
+
+    rc = schumann_multi.main(["--out", str(out), "--overlay", str(tmp_path), "--in-process"])
+
+    combined = json.loads(out.read_text())
+    assert rc == 0
+    assert combined["sources"]["tomsk"]["status"] == "error"
+    assert "boom" in combined["sources"]["tomsk"]["message"]
+    assert combined["primary"] == "cumiana"
+    assert list(written) == [str(tmp_path / "cumiana_overlay.png")]
+    assert "extract" not in combined["timings_ms"]["sources"]["tomsk"]
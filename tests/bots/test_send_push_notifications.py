@@ -1,6 +1,9 @@
 from __future__ import annotations
 
+import contextlib
 import sys
+from dataclasses import asdict
+from datetime import datetime, timezone
 from pathlib import Path
 
 import pytest
@@ -12,7 +15,7 @@ if str(ROOT) not in sys.path:
 from bots.notifications import send_push_notifications as push_send
 
 
-def _queued_event() -> dict[str, object]:
+def _queued_event(**overrides) -> dict[str, object]:
     return {
         "id": "evt-1",
         "user_id": "user-1",
@@ -22,84 +25,61 @@ def _queued_event() -> dict[str, object]:
         "body": "Open Gaia Eyes.",
         "payload": {"route": "local"},
         "dedupe_key": "k1",
+        "notifications_enabled": True,
+        "tokens": [],
+        **overrides,
     }
 
 
-def test_send_push_notifications_skips_when_notifications_are_currently_disabled(monkeypatch):
-    marked: list[tuple[str, str, str | None]] = []
-    fetch_user_tokens_called = False
-
-    def _fake_fetch_queued_events(limit=None, user_id=None):  # noqa: ARG001
-        return [_queued_event()]
+def _install(monkeypatch, events, *, argv=()) -> dict[str, list]:
+    """Patch the batch query and bulk writer; returns what the writer received."""
+    written: dict[str, list] = {"marked": [], "disabled": [], "flushes": []}
 
-    def _fake_notifications_enabled(user_id: str) -> bool:  # noqa: ARG001
-        return False
+    def _write_transitions(transitions, now_utc):  # noqa: ARG001
+        written["flushes"].append(len(transitions))
+        for status, rows in transitions.events.items():
+            written["marked"].extend((event_id, status, error_text) for event_id, error_text in rows)
+        written["disabled"].extend(transitions.disabled_tokens.items())
 
-    def _fake_mark_event_status(event_id: str, status: str, now_utc, error_text: str | None = None):  # noqa: ARG001
-        marked.append((event_id, status, error_text))
+    monkeypatch.setattr(push_send, "_fetch_send_batch", lambda **kwargs: events)
+    monkeypatch.setattr(push_send, "_write_transitions", _write_transitions)
+    monkeypatch.setattr(sys, "argv", ["send_push_notifications.py", *argv])
+    return written
 
-    def _fake_fetch_user_tokens(user_id: str):  # noqa: ARG001
-        nonlocal fetch_user_tokens_called
-        fetch_user_tokens_called = True
-        return []
 
-    monkeypatch.setattr(push_send, "_fetch_queued_events", _fake_fetch_queued_events)
-    monkeypatch.setattr(push_send, "_notifications_enabled", _fake_notifications_enabled)
-    monkeypatch.setattr(push_send, "_mark_event_status", _fake_mark_event_status)
-    monkeypatch.setattr(push_send, "_fetch_user_tokens", _fake_fetch_user_tokens)
-    monkeypatch.setattr(push_send, "_missing_apns_env", lambda: [])
-    monkeypatch.setattr(push_send, "_required_env", lambda name: f"test-{name}")
-    monkeypatch.setattr(push_send, "create_provider_token", lambda **kwargs: "provider-token")
-    monkeypatch.setattr(push_send, "send_apns_notification", lambda **kwargs: {"ok": True})
-    monkeypatch.setattr(sys, "argv", ["send_push_notifications.py"])
+def test_send_push_notifications_skips_when_notifications_are_currently_disabled(monkeypatch):
+    written = _install(
+        monkeypatch,
+        [_queued_event(notifications_enabled=False, tokens=[{"id": "t1", "platform": "ios", "device_token": "x"}])],
+    )
+    monkeypatch.setattr(push_send.ApnsClient, "from_environment", classmethod(lambda cls: pytest.fail("no APNs send")))
 
     push_send.main()
 
-    assert marked == [("evt-1", "skipped", "notifications_disabled")]
-    assert fetch_user_tokens_called is False
+    assert written["marked"] == [("evt-1", "skipped", "notifications_disabled")]
 
 
 def test_send_push_notifications_routes_android_tokens_through_fcm(monkeypatch):
-    marked: list[tuple[str, str, str | None]] = []
     sent: list[dict[str, object]] = []
 
     class _FakeFcmClient:
-        def send(self, **kwargs):
-            sent.append(kwargs)
-            return {"ok": True, "status_code": 200, "body": {"name": "message-1"}}
+        async def send_many(self, messages):
+            messages = list(messages)
+            sent.extend(asdict(message) for message in messages)
+            return [{"ok": True, "status_code": 200, "body": {"name": "message-1"}} for _ in messages]
 
     class _FakeFcmFactory:
         @classmethod
         def from_environment(cls):
             return _FakeFcmClient()
 
-    monkeypatch.setattr(push_send, "_fetch_queued_events", lambda **kwargs: [_queued_event()])
-    monkeypatch.setattr(push_send, "_notifications_enabled", lambda user_id: True)
-    monkeypatch.setattr(
-        push_send,
-        "_fetch_user_tokens",
-        lambda user_id: [
-            {
-                "id": "token-1",
-                "platform": "android",
-                "device_token": "android-token",
-                "environment": "prod",
-            }
-        ],
-    )
-    monkeypatch.setattr(
-        push_send,
-        "_mark_event_status",
-        lambda event_id, status, now_utc, error_text=None: marked.append(
-            (event_id, status, error_text)
-        ),
-    )
+    tokens = [{"id": "token-1", "platform": "android", "device_token": "android-token", "environment": "prod"}]
+    written = _install(monkeypatch, [_queued_event(tokens=tokens)])
     monkeypatch.setattr(push_send, "FcmClient", _FakeFcmFactory)
-    monkeypatch.setattr(sys, "argv", ["send_push_notifications.py"])
 
     push_send.main()
 
-    assert marked == [("evt-1", "sent", None)]
+    assert written["marked"] == [("evt-1", "sent", None)]
     assert sent == [
         {
             "device_token": "android-token",
@@ -111,57 +91,178 @@ def test_send_push_notifications_routes_android_tokens_through_fcm(monkeypatch):
 
 
 def test_send_push_notifications_disables_unregistered_android_token(monkeypatch):
-    marked: list[tuple[str, str, str | None]] = []
-    disabled: list[tuple[str, str]] = []
-
     class _FakeFcmClient:
-        def send(self, **kwargs):  # noqa: ARG002
-            return {
-                "ok": False,
-                "status_code": 404,
-                "body": {
-                    "error": {
-                        "status": "NOT_FOUND",
-                        "details": [{"errorCode": "UNREGISTERED"}],
-                    }
-                },
-            }
+        async def send_many(self, messages):
+            return [
+                {
+                    "ok": False,
+                    "status_code": 404,
+                    "body": {
+                        "error": {
+                            "status": "NOT_FOUND",
+                            "details": [{"errorCode": "UNREGISTERED"}],
+                        }
+                    },
+                }
+                for _ in messages
+            ]
 
     class _FakeFcmFactory:
         @classmethod
         def from_environment(cls):
             return _FakeFcmClient()
 
-    monkeypatch.setattr(push_send, "_fetch_queued_events", lambda **kwargs: [_queued_event()])
-    monkeypatch.setattr(push_send, "_notifications_enabled", lambda user_id: True)
-    monkeypatch.setattr(
-        push_send,
-        "_fetch_user_tokens",
-        lambda user_id: [
-            {
-                "id": "token-1",
-                "platform": "android",
-                "device_token": "expired-token",
-                "environment": "prod",
-            }
-        ],
-    )
-    monkeypatch.setattr(
-        push_send,
-        "_mark_event_status",
-        lambda event_id, status, now_utc, error_text=None: marked.append(
-            (event_id, status, error_text)
-        ),
-    )
-    monkeypatch.setattr(
-        push_send,
-        "_disable_token",
-        lambda token_id, reason, now_utc: disabled.append((token_id, reason)),
-    )
+    tokens = [{"id": "token-1", "platform": "android", "device_token": "expired-token", "environment": "prod"}]
+    written = _install(monkeypatch, [_queued_event(tokens=tokens)])
     monkeypatch.setattr(push_send, "FcmClient", _FakeFcmFactory)
-    monkeypatch.setattr(sys, "argv", ["send_push_notifications.py"])
 
     push_send.main()
 
-    assert disabled == [("token-1", "UNREGISTERED")]
-    assert marked == [("evt-1", "failed", "UNREGISTERED")]
+    assert written["disabled"] == [("token-1", "UNREGISTERED")]
+    assert written["marked"] == [("evt-1", "failed", "UNREGISTERED")]
+
+
+def test_send_push_notifications_batches_every_android_and_ios_token_in_a_run(monkeypatch):
+    batches: dict[str, list[list[str]]] = {"fcm": [], "apns": []}
+
+    def _batch_sender(provider, bad_tokens, reason):
+        async def send_many(messages):
+            tokens = [message.device_token for message in messages]
+            batches[provider].append(tokens)
+            return [
+                {"ok": False, "status_code": 400, "body": {"reason": reason, "error": {"status": reason}}}
+                if token in bad_tokens
+                else {"ok": True, "status_code": 200, "body": {}}
+                for token in tokens
+            ]
+
+        return send_many
+
+    class _FakeFcmClient:
+        send_many = staticmethod(_batch_sender("fcm", {"a-stale"}, "UNREGISTERED"))
+
+    class _FakeApnsClient:
+        send_many = staticmethod(_batch_sender("apns", {"i-bad"}, "BadDeviceToken"))
+
+        async def aclose(self):
+            return None
+
+    events = [
+        _queued_event(
+            tokens=[
+                {"id": "t1", "platform": "android", "device_token": "a-ok"},
+                {"id": "t2", "platform": "ios", "device_token": "i-ok", "environment": "prod"},
+            ]
+        ),
+        _queued_event(
+            id="evt-2",
+            user_id="user-2",
+            dedupe_key="k2",
+            tokens=[
+                {"id": "t3", "platform": "android", "device_token": "a-stale"},
+                {"id": "t4", "platform": "ios", "device_token": "i-bad", "environment": "dev"},
+            ],
+        ),
+        _queued_event(id="evt-3", user_id="user-3", tokens=[]),
+    ]
+    written = _install(monkeypatch, events)
+    monkeypatch.setattr(push_send.FcmClient, "from_environment", classmethod(lambda cls: _FakeFcmClient()))
+    monkeypatch.setattr(push_send.ApnsClient, "from_environment", classmethod(lambda cls: _FakeApnsClient()))
+
+    push_send.main()
+
+    assert batches == {"fcm": [["a-ok", "a-stale"]], "apns": [["i-ok", "i-bad"]]}
+    assert written["disabled"] == [("t3", "UNREGISTERED"), ("t4", "BadDeviceToken")]
+    assert sorted(written["marked"]) == [
+        ("evt-1", "sent", None),
+        ("evt-2", "failed", "UNREGISTERED; BadDeviceToken"),
+        ("evt-3", "skipped", "no_enabled_tokens"),
+    ]
+    # one bulk write for the whole run
+    assert written["flushes"] == [5]
+
+
+def test_send_push_notifications_flushes_statuses_per_chunk(monkeypatch, caplog):
+    class _FakeApnsClient:
+        async def send_many(self, messages):
+            return [{"ok": True, "status_code": 200, "body": {}} for _ in messages]
+
+        async def aclose(self):
+            return None
+
+    events = [
+        _queued_event(id=f"evt-{i}", tokens=[{"id": f"t{i}", "platform": "ios", "device_token": f"d{i}"}])
+        for i in range(5)
+    ]
+    written = _install(monkeypatch, events, argv=("--chunk-size", "2"))
+    monkeypatch.setattr(push_send.ApnsClient, "from_environment", classmethod(lambda cls: _FakeApnsClient()))
+
+    with caplog.at_level("INFO", logger=push_send.logger.name):
+        push_send.main()
+
+    assert written["flushes"] == [2, 2, 1]
+    assert [status for _, status, _ in written["marked"]] == ["sent"] * 5
+    assert any("events=5" in message and "events/s" in message for message in caplog.messages)
+
+
+@pytest.mark.parametrize("chunk_size", ["1", "500"])
+def test_send_push_notifications_stops_using_a_token_once_it_is_rejected(monkeypatch, chunk_size):
+    sent: list[str] = []
+
+    class _FakeApnsClient:
+        async def send_many(self, messages):
+            messages = list(messages)
+            sent.extend(message.collapse_id for message in messages)
+            return [{"ok": False, "status_code": 410, "body": {"reason": "Unregistered"}} for _ in messages]
+
+        async def aclose(self):
+            return None
+
+    tokens = [{"id": "t1", "platform": "ios", "device_token": "stale"}]
+    events = [
+        _queued_event(id="evt-1", dedupe_key="k1", tokens=tokens),
+        _queued_event(id="evt-2", dedupe_key="k2", tokens=tokens),
+    ]
+    written = _install(monkeypatch, events, argv=("--chunk-size", chunk_size))
+    monkeypatch.setattr(push_send.ApnsClient, "from_environment", classmethod(lambda cls: _FakeApnsClient()))
+
+    push_send.main()
+
+    assert written["disabled"] == [("t1", "Unregistered")]
+    if chunk_size == "1":
+        # The second chunk is planned after the rejection, so it never reaches the provider.
+        assert sent == ["k1"]
+        assert written["marked"] == [("evt-1", "failed", "Unregistered"), ("evt-2", "skipped", "no_enabled_tokens")]
+    else:
+        assert sent == ["k1", "k2"]
+        assert [status for _, status, _ in written["marked"]] == ["failed", "failed"]
+
+
+def test_write_transitions_issues_one_update_per_status(monkeypatch):
+    executed: list[tuple[str, tuple]] = []
+
+    class _FakePg:
+        @contextlib.contextmanager
+        def pipeline(self):
+            yield None
+
+        def execute(self, sql, *params):
+            executed.append((" ".join(sql.split()), params))
+
+    monkeypatch.setattr(push_send, "pg", _FakePg())
+    now = datetime(2026, 10, 16, tzinfo=timezone.utc)
+    transitions = push_send._Transitions()
+    transitions.mark("e1", "sent")
+    transitions.mark("e2", "sent")
+    transitions.mark("e3", "failed", "BadDeviceToken")
+    transitions.disable("t1", "BadDeviceToken")
+    transitions.disable("t1", "Unregistered")
+
+    push_send._write_transitions(transitions, now)
+
+    assert len(executed) == 3
+    sent_sql, sent_params = executed[0]
+    assert sent_sql.startswith("update content.push_notification_events e set status = %s")
+    assert sent_params == ("sent", now, ["e1", "e2"], [None, None])
+    assert executed[1][1] == ("failed", None, ["e3"], ["BadDeviceToken"])
+    assert executed[2][1] == (now, ["t1"])
@@ -1,5 +1,5 @@
 import asyncio
-from datetime import UTC, datetime
+from datetime import UTC, datetime, timedelta
 
 import pytest
 
@@ -13,6 +13,7 @@ from bots.geomag_ulf.ingest_ulf import (
     compute_coherence,
     compute_dbdt_rms,
     compute_percentile_index,
+    compute_percentile_index_sorted,
 )
 
 
@@ -33,6 +34,32 @@ def test_compute_percentile_index_returns_none_with_sparse_history() -> None:
     assert compute_percentile_index(1.2, [0.4, 0.8, 1.0]) is None
 
 
+def test_compute_percentile_index_sorted_matches_unsorted_history() -> None:
+    history = [0.9, None, 0.1, 0.5, 0.5, 0.3]
+    valid = sorted(item for item in history if item is not None)
+
+    assert compute_percentile_index_sorted(0.5, valid, min_history_rows=3) == compute_percentile_index(
+        0.5, history, min_history_rows=3
+    )
+    assert compute_percentile_index_sorted(0.5, valid[:2], valid[2:], min_history_rows=3) == 80.0
+
+
+def test_numpy_window_builder_matches_python_builder() -> None:
+    if ingest_ulf.np is None:
+        pytest.skip("numpy not installed")
+    start = datetime(2026, 3, 20, 0, 0, tzinfo=UTC)
+    rows = [
+        {"ts_utc": start + timedelta(minutes=minute, seconds=17 * (minute % 7 == 0)), "H": 20000.0 + (minute % 11) * 0.7}
+        for minute in range(180)
+        if minute % 13 not in {4, 5}
+    ]
+    rows.append({"ts_utc": start + timedelta(minutes=200), "H": None})
+    shuffled = rows[1::2] + rows[::2]
+
+    for candidate in (rows, shuffled):
+        assert ingest_ulf._build_5m_windows_numpy(candidate, "H") == ingest_ulf._build_5m_windows_python(candidate, "H")
+
+
 def test_apply_station_history_bootstraps_index_and_persistence(monkeypatch: pytest.MonkeyPatch) -> None:
     monkeypatch.setattr(ingest_ulf, "ULF_MIN_HISTORY_ROWS", 72)
     monkeypatch.setattr(ingest_ulf, "ULF_BOOTSTRAP_MIN_ROWS", 8)
@@ -101,10 +128,127 @@ def test_require_derived_rows_raises_when_all_station_windows_are_empty() -> Non
         _require_derived_rows({"BOU": 0, "CMO": 0}, [], [])
 
 
+class _DummyPool:
+    def __init__(self) -> None:
+        self.closed = False
+        self.written: list[str] = []
+
+    def acquire(self):
+        pool = self
+
+        class _Acquire:
+            async def __aenter__(self):
+                return pool
+
+            async def __aexit__(self, exc_type, exc, tb):
+                return False
+
+        return _Acquire()
+
+    async def close(self) -> None:
+        self.closed = True
+
+
+def _fake_create_pool(pool: _DummyPool):
+    async def _create_pool(dsn: str, **kwargs):  # noqa: ARG001
+        return pool
+
+    return _create_pool
+
+
+def _station_window(station_id: str) -> StationWindow:
+    return StationWindow(
+        station_id=station_id,
+        ts_utc=datetime(2026, 3, 20, 0, 0, tzinfo=UTC),
+        component_used="H",
+        component_substituted=False,
+        dbdt_rms=0.3,
+        ulf_rms_broad=0.3,
+        ulf_band_proxy=0.1,
+        ulf_index_station=50.0,
+        ulf_index_localtime=50.0,
+        persistence_30m=50.0,
+        persistence_90m=50.0,
+        quality_flags=[],
+    )
+
+
 def test_run_raises_when_no_station_windows(monkeypatch: pytest.MonkeyPatch) -> None:
     monkeypatch.setattr(ingest_ulf, "_resolve_dsn", lambda: "postgresql://example")
     monkeypatch.setattr(ingest_ulf, "ULF_STATIONS", ["BOU", "CMO"])
 
+    class _DummyClient:
+        async def __aenter__(self):
+            return self
+
+        async def __aexit__(self, exc_type, exc, tb):
+            return False
+
+    async def _fake_process_station(pool, client, station_id, start_utc, end_utc):  # noqa: ARG001
+        return []
+
+    monkeypatch.setattr(ingest_ulf.httpx, "AsyncClient", lambda *args, **kwargs: _DummyClient())
+    monkeypatch.setattr(ingest_ulf.asyncpg, "create_pool", _fake_create_pool(_DummyPool()))
+    monkeypatch.setattr(ingest_ulf, "_process_station", _fake_process_station)
+
+    with pytest.raises(RuntimeError, match="ULF ingest produced no fresh derived rows"):
+        asyncio.run(ingest_ulf._run())
+
+
+def test_run_writes_other_stations_when_one_times_out(monkeypatch: pytest.MonkeyPatch, caplog) -> None:
+    monkeypatch.setattr(ingest_ulf, "_resolve_dsn", lambda: "postgresql://example")
+    monkeypatch.setattr(ingest_ulf, "ULF_STATIONS", ["BOU", "CMO", "FRD"])
+    monkeypatch.setattr(ingest_ulf, "ULF_STATION_CONCURRENCY", 3)
+    monkeypatch.setattr(ingest_ulf, "ULF_STATION_TIMEOUT_SECS", 0.05)
+
+    class _DummyClient:
+        async def __aenter__(self):
+            return self
+
+        async def __aexit__(self, exc_type, exc, tb):
+            return False
+
+    pool = _DummyPool()
+    active = {"now": 0, "peak": 0}
+
+    async def _fake_process_station(pool, client, station_id, start_utc, end_utc):  # noqa: ARG001
+        active["now"] += 1
+        active["peak"] = max(active["peak"], active["now"])
+        try:
+            await asyncio.sleep(1.0 if station_id == "CMO" else 0.01)
+        finally:
+            active["now"] -= 1
+        return [_station_window(station_id)]
+
+    async def _fake_upsert_station_rows(conn, rows):  # noqa: ARG001
+        pool.written.extend(row.station_id for row in rows)
+        return len(rows)
+
+    async def _fake_upsert_context_rows(conn, rows):  # noqa: ARG001
+        return len(rows)
+
+    monkeypatch.setattr(ingest_ulf.httpx, "AsyncClient", lambda *args, **kwargs: _DummyClient())
+    monkeypatch.setattr(ingest_ulf.asyncpg, "create_pool", _fake_create_pool(pool))
+    monkeypatch.setattr(ingest_ulf, "_process_station", _fake_process_station)
+    monkeypatch.setattr(ingest_ulf, "upsert_station_rows", _fake_upsert_station_rows)
+    monkeypatch.setattr(ingest_ulf, "upsert_context_rows", _fake_upsert_context_rows)
+
+    with caplog.at_level("INFO", logger="gaiaeyes.geomag_ulf"):
+        asyncio.run(ingest_ulf._run())
+
+    assert pool.written == ["BOU", "FRD"]
+    assert pool.closed is True
+    assert active["peak"] == 3
+    complete = [record.getMessage() for record in caplog.records if "ulf ingest complete" in record.getMessage()]
+    assert complete and "CMO=" in complete[0] and ":timeout" in complete[0] and "BOU=" in complete[0]
+
+
+def _install_backfill_fakes(monkeypatch: pytest.MonkeyPatch, written: list[tuple[str, tuple]]) -> None:
+    monkeypatch.setattr(ingest_ulf, "_resolve_dsn", lambda: "postgresql://example")
+    monkeypatch.setattr(ingest_ulf, "ULF_STATIONS", ["BOU", "CMO"])
+    monkeypatch.setattr(ingest_ulf, "ULF_MIN_HISTORY_ROWS", 24)
+    monkeypatch.setattr(ingest_ulf, "ULF_BOOTSTRAP_MIN_ROWS", 8)
+
     class _DummyClient:
         async def __aenter__(self):
             return self
@@ -113,18 +257,84 @@ def test_run_raises_when_no_station_windows(monkeypatch: pytest.MonkeyPatch) ->
             return False
 
     class _DummyConn:
+        async def fetch(self, *args):  # noqa: ARG002
+            return []
+
         async def close(self) -> None:
             return None
 
     async def _fake_connect(dsn: str):  # noqa: ARG001
         return _DummyConn()
 
-    async def _fake_process_station(conn, client, station_id, start_utc, end_utc):  # noqa: ARG001
-        return []
+    async def _fake_fetch(station_id, start_utc, end_utc, client=None):  # noqa: ARG001
+        offset = 3 if station_id == "CMO" else 0
+        rows = []
+        cursor = start_utc
+        while cursor <= end_utc:
+            minute = int(cursor.timestamp() // 60)
+            rows.append({"ts_utc": cursor, "H": 20000.0 + ((minute * 7 + offset) % 13) * 0.4, "X": None})
+            cursor += timedelta(minutes=1)
+        return rows
+
+    async def _fake_copy_upsert(conn, table_name, columns, key_columns, records):  # noqa: ARG001
+        written.extend((table_name, record) for record in records)
+        return len(records)
 
     monkeypatch.setattr(ingest_ulf.httpx, "AsyncClient", lambda *args, **kwargs: _DummyClient())
     monkeypatch.setattr(ingest_ulf.asyncpg, "connect", _fake_connect)
-    monkeypatch.setattr(ingest_ulf, "_process_station", _fake_process_station)
+    monkeypatch.setattr(ingest_ulf, "fetch_station_series", _fake_fetch)
+    monkeypatch.setattr(ingest_ulf, "copy_upsert_rows", _fake_copy_upsert)
 
-    with pytest.raises(RuntimeError, match="ULF ingest produced no fresh derived rows"):
-        asyncio.run(ingest_ulf._run())
+
+def test_backfill_chunks_match_single_pass(monkeypatch: pytest.MonkeyPatch) -> None:
+    # The sparse-history bootstrap ranks against the whole fetch, so it is chunk-dependent by design.
+    bootstrap_off = 10**6
+    since = datetime(2026, 3, 20, 0, 0, tzinfo=UTC)
+    until = datetime(2026, 3, 20, 6, 0, tzinfo=UTC)
+
+    single: list[tuple[str, tuple]] = []
+    _install_backfill_fakes(monkeypatch, single)
+    monkeypatch.setattr(ingest_ulf, "ULF_BOOTSTRAP_MIN_ROWS", bootstrap_off)
+    asyncio.run(ingest_ulf._backfill(since, until, chunk_hours=6))
+
+    chunked: list[tuple[str, tuple]] = []
+    _install_backfill_fakes(monkeypatch, chunked)
+    monkeypatch.setattr(ingest_ulf, "ULF_BOOTSTRAP_MIN_ROWS", bootstrap_off)
+    asyncio.run(ingest_ulf._backfill(since, until, chunk_hours=1))
+
+    assert len([item for item in single if item[0] == "marts.ulf_activity_5m"]) == 2 * 72
+    assert sorted(chunked, key=repr) == sorted(single, key=repr)
+
+
+def test_backfill_resumes_from_checkpoint(monkeypatch: pytest.MonkeyPatch, tmp_path) -> None:
+    since = datetime(2026, 3, 20, 0, 0, tzinfo=UTC)
+    until = datetime(2026, 3, 20, 3, 0, tzinfo=UTC)
+    checkpoint_path = str(tmp_path / "ulf_backfill.json")
+    ingest_ulf.BackfillCheckpoint(checkpoint_path, since, until, ["BOU", "CMO"]).save(since + timedelta(hours=2))
+
+    written: list[tuple[str, tuple]] = []
+    _install_backfill_fakes(monkeypatch, written)
+    asyncio.run(ingest_ulf._backfill(since, until, chunk_hours=1, checkpoint_path=checkpoint_path))
+
+    context_ts = sorted(record[0] for table, record in written if table == "marts.ulf_context_5m")
+    assert context_ts[0] == since + timedelta(hours=2)
+    assert len(context_ts) == 12
+    assert ingest_ulf.BackfillCheckpoint(checkpoint_path, since, until, ["BOU", "CMO"]).load() == until
+    assert ingest_ulf.BackfillCheckpoint(checkpoint_path, since, until, ["BOU"]).load() is None
+
+
+def test_backfill_resumes_without_until(monkeypatch: pytest.MonkeyPatch, tmp_path) -> None:
+    since = datetime(2026, 3, 20, 0, 0, tzinfo=UTC)
+    until = datetime(2026, 3, 20, 3, 0, tzinfo=UTC)
+    checkpoint_path = str(tmp_path / "ulf_backfill.json")
+    ingest_ulf.BackfillCheckpoint(checkpoint_path, since, until, ["BOU", "CMO"]).save(since + timedelta(hours=2))
+
+    written: list[tuple[str, tuple]] = []
+    _install_backfill_fakes(monkeypatch, written)
+    ingest_ulf.main(["--since", since.isoformat(), "--chunk-hours", "1", "--checkpoint", checkpoint_path])
+
+    context_ts = sorted(record[0] for table, record in written if table == "marts.ulf_context_5m")
+    assert context_ts[0] == since + timedelta(hours=2)
+    assert context_ts[-1] < until
+    assert len(context_ts) == 12
+    assert ingest_ulf.BackfillCheckpoint(checkpoint_path, since, None, ["BOU", "CMO"]).load() == until
@@ -0,0 +1,72 @@
+from __future__ import annotations
+
+import asyncio
+import sys
+from datetime import date
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parents[2]
+if str(ROOT) not in sys.path:
+    sys.path.insert(0, str(ROOT))
+
+from workers import aggregate
+
+
+class _RecordingConn:
+    def __init__(self, calls: list):
+        self.calls = calls
+
+    async def execute(self, query, *args):
+        self.calls.append((query, args))
+
+
+class _RecordingPool:
+    def __init__(self):
+        self.calls: list = []
+        self.active = 0
+        self.peak = 0
+
+    def acquire(self):
+        pool = self
+
+        class _Ctx:
+            async def __aenter__(self_inner):
+                pool.active += 1
+                pool.peak = max(pool.peak, pool.active)
+                await asyncio.sleep(0)
+                return _RecordingConn(pool.calls)
+
+            async def __aexit__(self_inner, exc_type, exc, tb):
+                pool.active -= 1
+                return False
+
+        return _Ctx()
+
+
+def test_grouped_mode_runs_one_statement_per_user_batch():
+    pool = _RecordingPool()
+    users = [f"u{i}" for i in range(5)]
+
+    asyncio.run(
+        aggregate.aggregate_range(
+            pool, users, date(2026, 6, 1), date(2026, 6, 30), mode="grouped", concurrency=2, users_per_batch=2
+        )
+    )
+
+    assert [args[0] for _, args in pool.calls] == [["u0", "u1"], ["u2", "u3"], ["u4"]]
+    assert all(query is aggregate.GROUPED_SQL for query, _ in pool.calls)
+    assert all(args[1:] == (date(2026, 6, 1), date(2026, 6, 30)) for _, args in pool.calls)
+    assert pool.peak == 2
+
+
+def test_per_day_mode_covers_every_user_day():
+    pool = _RecordingPool()
+
+    asyncio.run(
+        aggregate.aggregate_range(pool, ["u0", "u1"], date(2026, 6, 1), date(2026, 6, 3), mode="per-day", concurrency=1)
+    )
+
+    assert sorted((args[0], args[1]) for _, args in pool.calls) == [
+        (user, date(2026, 6, day)) for user in ("u0", "u1") for day in (1, 2, 3)
+    ]
+    assert pool.peak == 1
@@ -1,5 +1,7 @@
 from __future__ import annotations
 
+import asyncio
+import json
 import sys
 from pathlib import Path
 
@@ -17,3 +19,94 @@ def test_worker_retry_delay_env_parsing_falls_back_for_invalid_value(monkeypatch
     args = worker._parse_args()
 
     assert args.retry_delay == 5.0
+
+
+def _entry(user_id: str, minute: int, **extra):
+    return {
+        "samples": [
+            {
+                "user_id": user_id,
+                "device_os": "ios",
+                "source": "watch",
+                "type": "heart_rate",
+                "start_time": f"2026-05-01T12:{minute:02d}:00Z",
+                "end_time": f"2026-05-01T12:{minute:02d}:30Z",
+                "value": 60 + minute,
+            }
+        ],
+        "dev_uid": user_id,
+        "refresh_user": user_id,
+        "tz": "UTC",
+        **extra,
+    }
+
+
+def test_process_batch_merges_entries_per_user_and_dedupes_refreshes(monkeypatch):
+    inserts = []
+    refreshes = []
+
+    async def fake_get_pool():
+        return object()
+
+    async def fake_insert(pool, rows, dev_uid):  # noqa: ARG001
+        inserts.append((dev_uid, len(rows)))
+        return len(rows), 0, []
+
+    async def fake_refresh(user_id, day_local, inserted, tz_name):
+        refreshes.append((user_id, day_local.isoformat(), inserted, tz_name))
+
+    monkeypatch.setattr(worker, "get_pool", fake_get_pool)
+    monkeypatch.setattr(worker, "safe_insert_batch", fake_insert)
+    monkeypatch.setattr(worker, "_maybe_schedule_refresh", fake_refresh)
+
+    entries = [_entry("u1", 0), _entry("u2", 0), _entry("u1", 1), _entry("u1", 2)]
+    inserted, skipped, failures = asyncio.run(worker._process_batch(entries, concurrency=2))
+
+    assert (inserted, skipped, failures) == (4, 0, [])
+    assert sorted(inserts) == [("u1", 3), ("u2", 1)]
+    assert sorted(refreshes) == [("u1", "2026-05-01", 3, "UTC"), ("u2", "2026-05-01", 1, "UTC")]
+
+
+def test_process_batch_isolates_poison_entry_and_dead_letters_it(monkeypatch):
+    async def fake_get_pool():
+        return object()
+
+    async def fake_insert(pool, rows, dev_uid):  # noqa: ARG001
+        if any(sample.value == 99 for sample, _ in rows):
+            raise worker.BatchInsertError("db_unavailable", ValueError("bad row"))
+        return len(rows), 0, []
+
+    async def fake_refresh(*args):  # noqa: ARG001
+        return None
+
+    monkeypatch.setattr(worker, "get_pool", fake_get_pool)
+    monkeypatch.setattr(worker, "safe_insert_batch", fake_insert)
+    monkeypatch.setattr(worker, "_maybe_schedule_refresh", fake_refresh)
+
+    poison = _entry("u1", 39, attempts=4)
+    inserted, _, failures = asyncio.run(worker._process_batch([_entry("u1", 0), poison], concurrency=2))
+
+    assert inserted == 1
+    assert [entry for entry, _ in failures] == [poison]
+
+    class _FakeRedis:
+        def __init__(self):
+            self.lists = {}
+
+        async def rpush(self, key, value):
+            self.lists.setdefault(key, []).append(json.loads(value))
+
+        async def lpush(self, key, value):
+            self.lists.setdefault(key, []).insert(0, json.loads(value))
+
+    client = _FakeRedis()
+    transient = (_entry("u2", 0), worker.BatchInsertError("db_timeout", worker.PoolTimeout("timeout")))
+    retry = (_entry("u3", 0), ValueError("bad"))
+    asyncio.run(
+        worker._requeue_failures(client, "q", "q:dead", [*failures, transient, retry], max_attempts=5)
+    )
+
+    assert [entry["attempts"] for entry in client.lists["q:dead"]] == [5]
+    assert client.lists["q:dead"][0]["last_error"] == "db_unavailable"
+    assert client.lists["q"][0] == transient[0]
+    assert client.lists["q"][1]["attempts"] == 1
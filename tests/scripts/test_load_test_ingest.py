@@ -25,3 +25,32 @@ def test_synthetic_samples_use_allowed_device_os():
 
     assert sample["device_os"] == "ios"
     assert sample["source"] == "loadtest"
+
+
+def test_insert_mode_pass_replays_chunks_through_the_requested_mode():
+    module = _load_module()
+    calls = []
+    seen = set()
+
+    class _Sample:
+        def __init__(self, **fields):
+            self.key = (fields["user_id"], fields["type"], fields["start_time"])
+
+    class _Ingest:
+        SampleIn = _Sample
+
+        @staticmethod
+        async def _insert_batch_once(pool, rows, user_id, mode=None):  # noqa: ARG004
+            calls.append((mode, user_id, len(rows)))
+            fresh = [sample for sample, _ in rows if sample.key not in seen]
+            seen.update(sample.key for sample in fresh)
+            return len(fresh), 0, []
+
+    args = module.argparse.Namespace(users=2, rows_per_user=5, chunk_size=2, concurrency=2, run_id="t")
+    result = module.asyncio.run(module._insert_mode_pass(_Ingest, object(), args, "copy"))
+
+    assert result["requests"] == 6
+    assert result["inserted"] == 10
+    assert result["replay_inserted"] == 0
+    assert {mode for mode, _, _ in calls} == {"copy"}
+    assert len(calls) == 12
@@ -31,6 +31,24 @@ def test_lane_continues_after_failure_and_returns_nonzero(monkeypatch) -> None:
     assert calls == [("first",), ("second",)]
 
 
+def test_lane_publishes_features_invalidation_only_after_success(monkeypatch) -> None:
+    published: list[tuple[str, ...]] = []
+    steps = (
+        run_render_cron.Step("space_current", ("space_current",), 10, invalidates=("current_wx",)),
+        run_render_cron.Step("ulf", ("ulf",), 10, invalidates=("ulf",)),
+        run_render_cron.Step("local_current", ("local_current",), 10),
+    )
+
+    def fake_run(command, **kwargs):  # noqa: ANN001, ARG001
+        return subprocess.CompletedProcess(command, 1 if command[0] == "ulf" else 0)
+
+    monkeypatch.setattr(run_render_cron.subprocess, "run", fake_run)
+    monkeypatch.setattr(run_render_cron, "publish_global_invalidation", lambda *s: published.append(s))
+
+    assert run_render_cron.run_lane("critical", steps=steps) == 1
+    assert published == [("current_wx",)]
+
+
 def test_dry_run_does_not_spawn_processes(monkeypatch) -> None:
     def fail_run(*args, **kwargs):  # noqa: ANN002, ANN003, ARG001
         raise AssertionError("subprocess should not run")
@@ -1,5 +1,10 @@
 from __future__ import annotations
 
+from contextlib import contextmanager
+
+import pytest
+
+import services.db as db_module
 from services.db import PgClient
 
 
@@ -41,7 +46,7 @@ class _Connection:
 
 
 def test_connection_scope_reuses_one_autocommit_connection(monkeypatch) -> None:
-    client = PgClient("postgresql://example.invalid/test")
+    client = PgClient("postgresql://example.invalid/test", pool=False)
     connections: list[_Connection] = []
 
     def connect(*, autocommit: bool = False):
@@ -65,3 +70,113 @@ def test_connection_scope_reuses_one_autocommit_connection(monkeypatch) -> None:
     assert client.fetchrow("select 1") == {"value": 1}
     assert len(connections) == 2
     assert connections[1].autocommit is False
+
+
+class _Pool:
+    def __init__(self) -> None:
+        self.connection_obj = _Connection(autocommit=False)
+        self.checkouts = 0
+        self.closed = False
+
+    @contextmanager
+    def connection(self):
+        self.checkouts += 1
+        yield self.connection_obj
+
+    def get_stats(self):
+        return {"pool_size": 1, "requests_num": self.checkouts}
+
+    def close(self):
+        self.closed = True
+
+
+def _pooled_client(monkeypatch) -> tuple[PgClient, _Pool]:
+    client = PgClient("postgresql://example.invalid/test", pool=True)
+    pool = _Pool()
+    client._use_pool = True
+    monkeypatch.setattr(client, "_get_pool", lambda: pool)
+    monkeypatch.setattr(client, "_connect", lambda **_: (_ for _ in ()).throw(AssertionError("unpooled connect")))
+    return client, pool
+
+
+def test_pooled_client_borrows_connections_instead_of_connecting(monkeypatch) -> None:
+    client, pool = _pooled_client(monkeypatch)
+
+    assert client.fetchrow("select 1") == {"value": 1}
+    client.execute("select 1")
+    assert pool.checkouts == 2
+
+    with client.connection_scope() as conn:
+        assert conn.autocommit is True
+        client.fetch("select 1")
+        client.fetch("select 1")
+    assert pool.checkouts == 3
+    # Connections go back to the pool in their default transactional mode.
+    assert pool.connection_obj.autocommit is False
+    assert pool.connection_obj.closed is False
+
+
+def test_pool_can_be_disabled_from_env(monkeypatch) -> None:
+    monkeypatch.setenv("GAIA_PG_POOL", "0")
+    client = PgClient("postgresql://example.invalid/test")
+    assert client._use_pool is False
+
+
+def test_query_stats_rank_statements_by_total_time(monkeypatch) -> None:
+    client, _ = _pooled_client(monkeypatch)
+    ticks = iter([0.0, 0.010, 1.0, 1.200, 2.0, 2.030])
+    monkeypatch.setattr(db_module.time, "perf_counter", lambda: next(ticks))
+
+    client.fetch("select   *\n from a")
+    client.fetch("select * from b")
+    client.fetch("select * from a")
+
+    stats = client.query_stats()
+    assert [row["query"] for row in stats] == ["select * from b", "select * from a"]
+    assert stats[1]["calls"] == 2
+    assert stats[1]["total_ms"] == 40.0
+    assert stats[1]["max_ms"] == 30.0
+
+    client.reset_query_stats()
+    assert client.query_stats() == []
+
+
+def test_fetch_many_records_the_batch_as_one_entry(monkeypatch) -> None:
+    client, _ = _pooled_client(monkeypatch)
+    monkeypatch.setattr(db_module.psycopg.Pipeline, "is_supported", staticmethod(lambda: False))
+
+    class _BatchConnection(_Connection):
+        def cursor(self):
+            cursor = _Cursor()
+            cursor.close = lambda: None
+            return cursor
+
+    client._get_pool().connection_obj = _BatchConnection(autocommit=False)
+
+    results = client.fetch_many([("select 1", ()), ("select 2", ())])
+
+    assert results == [[{"value": 1}], [{"value": 1}]]
+    stats = client.query_stats()
+    assert [row["query"] for row in stats] == ["fetch_many[2] select 1; select 2"]
+    assert stats[0]["calls"] == 1
+
+
+def test_fetch_many_records_a_failed_batch(monkeypatch) -> None:
+    client, _ = _pooled_client(monkeypatch)
+    monkeypatch.setattr(db_module.psycopg.Pipeline, "is_supported", staticmethod(lambda: False))
+
+    class _FailingCursor(_Cursor):
+        def execute(self, query, params):
+            raise RuntimeError("statement timeout")
+
+    class _BatchConnection(_Connection):
+        def cursor(self):
+            return _FailingCursor()
+
+    client._get_pool().connection_obj = _BatchConnection(autocommit=False)
+
+    with pytest.raises(RuntimeError, match="statement timeout"):
+        client.fetch_many([("select 1", ()), ("select 2", ())])
+
+    stats = client.query_stats()
+    assert [row["query"] for row in stats] == ["fetch_many[2] select 1; select 2"]
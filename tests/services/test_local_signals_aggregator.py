@@ -1,3 +1,4 @@
+import asyncio
 import os
 import sys
 from pathlib import Path
@@ -121,3 +122,30 @@ async def test_fetch_pollen_forecast_tries_nearby_coordinates_when_exact_centroi
     assert payload == pollen_payload
     assert calls[0] == (30.3316, -97.7004)
     assert len(calls) == 2
+
+
+async def test_assemble_for_zips_fetches_providers_once_per_grid_cell(monkeypatch):
+    coords = {"78701": (30.2711, -97.7437), "78702": (30.2712, -97.7441), "49001": (42.2734, -85.5891)}
+    provider_calls: list[str] = []
+    saved: list[object] = []
+
+    async def _fake_fetch_provider_data(zip_code: str, lat: float, lon: float):  # noqa: ARG001
+        provider_calls.append(zip_code)
+        await asyncio.sleep(0.01)
+        return {"temp_c": 21.0, "pressure_hpa": 1012.0, "obs_time": "2026-07-30T20:00:00Z"}, [{"AQI": 40}], {}
+
+    monkeypatch.setattr(aggregator, "zip_to_latlon", lambda zip_code: coords[zip_code])
+    monkeypatch.setattr(aggregator, "_fetch_provider_data", _fake_fetch_provider_data)
+    monkeypatch.setattr(aggregator, "latest_and_ref", lambda *args, **kwargs: (None, None))
+    monkeypatch.setattr(aggregator, "nearest_row_to", lambda *args, **kwargs: None)
+    monkeypatch.setattr(aggregator, "get_previous_approx", lambda *args, **kwargs: None)
+    monkeypatch.setattr(aggregator, "load_nws_point_metadata", lambda: aggregator.nws.PointMetadataCache())
+    monkeypatch.setattr(aggregator, "save_nws_point_metadata", saved.append)
+
+    results = await aggregator.assemble_for_zips(["78701", "78702", "49001", "78701"], concurrency=3)
+
+    assert list(results) == ["78701", "78702", "49001"]
+    assert sorted(provider_calls) == ["49001", "78701"]
+    assert results["78702"]["where"] == {"zip": "78702", "lat": 30.2712, "lon": -97.7441}
+    assert results["78702"]["air"]["aqi"] == 40
+    assert saved == []
@@ -109,3 +109,30 @@ async def test_station_conditions_choose_newest_rolling_observation_regardless_o
     assert result["temp_c"] == 21.0
     assert result["obs_time"] == newer["properties"]["timestamp"]
     assert requested_urls[-1] == f"{nws.BASE}/stations/NEAREST/observations?limit=24"
+
+
+@pytest.mark.anyio
+async def test_point_metadata_cache_reuses_points_and_stations_per_cell(monkeypatch):
+    urls: list[str] = []
+
+    async def _fake_get_json(url: str):
+        urls.append(url)
+        if "/points/" in url:
+            return {"properties": {"observationStations": "stations-url"}}
+        return {"features": [{"properties": {"stationIdentifier": f"K{index}"}} for index in range(6)]}
+
+    monkeypatch.setattr(nws, "_get_json", _fake_get_json)
+    cache = nws.PointMetadataCache()
+
+    with nws.use_point_metadata(cache):
+        first = await nws._points(30.2711, -97.7437)
+        second = await nws._points(30.2714, -97.7441)
+        nearest = await nws._nearby_station_ids(first, limit=1)
+        nearby = await nws._nearby_station_ids(second, limit=nws.NEARBY_STATION_LIMIT)
+
+    assert first is second
+    assert nearest == ["K0"]
+    assert nearby == ["K0", "K1", "K2", "K3", "K4"]
+    assert urls == [f"{nws.BASE}/points/30.2711,-97.7437", "stations-url"]
+    assert cache.fetched_points == {"30.27,-97.74"}
+    assert cache.fetched_stations == {"stations-url"}
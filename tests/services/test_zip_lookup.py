@@ -0,0 +1,63 @@
+import os
+import random
+
+import pytest
+
+os.environ.setdefault("DATABASE_URL", "postgresql://localhost/test")
+
+from services.geo import zip_lookup
+from services.geo.zip_lookup import ZipCentroidIndex, haversine_km
+
+
+def _index() -> ZipCentroidIndex:
+    return ZipCentroidIndex(
+        [
+            (78209, 29.4888, -98.4560),
+            (73301, 30.3072, -97.7550),
+            (501, 40.8154, -73.0451),
+            (99501, 61.2167, -149.8767),
+            (73301, 30.2672, -97.7431),
+        ]
+    )
+
+
+def test_index_lookup_uses_sorted_zip_ints() -> None:
+    index = _index()
+
+    assert list(index.zips) == [501, 73301, 78209, 99501]
+    assert index.lookup("00501") == (40.8154, -73.0451)
+    assert index.lookup("73301-1234") == (30.2672, -97.7431)
+    assert index.lookup("12345") is None
+    assert index.lookup("") is None
+
+
+def test_nearest_reverse_lookup_matches_brute_force() -> None:
+    rng = random.Random(3)
+    rows = [(zip_int, rng.uniform(24.5, 71.0), rng.uniform(-170.0, -67.0)) for zip_int in rng.sample(range(501, 99951), 400)]
+    index = ZipCentroidIndex(rows)
+
+    for _ in range(200):
+        lat, lon = rng.uniform(24.5, 71.0), rng.uniform(-170.0, -67.0)
+        expected = min(rows, key=lambda row: haversine_km(lat, lon, row[1], row[2]))
+        assert index.nearest(lat, lon)[0] == f"{expected[0]:05d}"
+
+
+def test_nearest_respects_max_km() -> None:
+    index = _index()
+
+    assert index.nearest(30.30, -97.75, max_km=10)[0] == "73301"
+    assert index.nearest(35.0, -106.0, max_km=50) is None
+    assert ZipCentroidIndex([]).nearest(30.0, -97.0) is None
+
+
+def test_zip_to_latlon_prefers_offline_index(monkeypatch) -> None:
+    def _no_db(*args, **kwargs):  # noqa: ARG001
+        raise AssertionError("indexed ZIPs should not hit the database")
+
+    monkeypatch.setattr(zip_lookup, "_INDEX", _index())
+    monkeypatch.setattr(zip_lookup.pg, "fetchrow", _no_db)
+
+    assert zip_lookup.zip_to_latlon("78209") == (29.4888, -98.4560)
+    assert zip_lookup.latlon_to_zip(61.2, -149.9) == "99501"
+    with pytest.raises(ValueError):
+        zip_lookup.zip_to_latlon("abc")
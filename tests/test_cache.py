@@ -22,3 +22,78 @@ async def test_feature_cache_serializes_decimal_values():
 
     restored = await cache.get(user_id)
     assert restored == {"value": 1.25, "nested": {"score": 2.5}}
+
+
+async def test_feature_cache_stores_encoded_bytes_and_returns_fresh_copies():
+    cache = FeatureCache()
+    await cache.set("user-a", {"steps_total": 10})
+
+    raw = cache._memory_cache.get("features_last_good:user-a")
+    assert isinstance(raw, bytes)
+
+    first = await cache.get("user-a")
+    first["steps_total"] = 99
+    assert await cache.get("user-a") == {"steps_total": 10}
+
+
+async def test_feature_cache_classifies_fresh_stale_and_expired(monkeypatch):
+    import app.cache as cache_module
+
+    now = [1_000.0]
+    monkeypatch.setattr(cache_module.time, "time", lambda: now[0])
+    cache = FeatureCache(fresh_seconds=30, stale_seconds=300)
+    await cache.set("user-b", {"steps_total": 1})
+
+    assert (await cache.get_entry("user-b")).state == "fresh"
+    now[0] += 60
+    assert (await cache.get_entry("user-b")).state == "stale"
+    now[0] += 600
+    assert (await cache.get_entry("user-b")).state == "expired"
+    assert await cache.get_entry("user-missing") is None
+
+    stats = cache.stats()
+    assert (stats["hits"], stats["stale"], stats["misses"]) == (1, 1, 2)
+
+
+async def test_feature_cache_coalesces_concurrent_loads():
+    import asyncio
+
+    cache = FeatureCache()
+    calls = []
+    release = asyncio.Event()
+
+    async def _load():
+        calls.append(1)
+        await release.wait()
+        return {"steps_total": 5}
+
+    leader = asyncio.ensure_future(cache.coalesce("user-c:UTC", _load))
+    await asyncio.sleep(0)
+    follower = asyncio.ensure_future(cache.coalesce("user-c:UTC", _load))
+    await asyncio.sleep(0)
+    release.set()
+
+    first, second = await asyncio.gather(leader, follower)
+    assert calls == [1]
+    assert first == second == {"steps_total": 5}
+    assert first is not second
+    assert cache.stats()["coalesced"] == 1
+    assert cache.stats()["inflight"] == 0
+
+
+async def test_feature_cache_revalidates_once_per_key():
+    import asyncio
+
+    cache = FeatureCache()
+    release = asyncio.Event()
+
+    async def _load():
+        await release.wait()
+
+    assert await cache.revalidate("user-d:UTC", _load) is True
+    assert await cache.revalidate("user-d:UTC", _load) is False
+    release.set()
+    await asyncio.sleep(0.01)
+
+    stats = cache.stats()
+    assert (stats["refreshes"], stats["coalesced"], stats["inflight"]) == (1, 1, 0)
@@ -0,0 +1,78 @@
+import asyncio
+from datetime import date
+
+import pytest
+
+import app.refresh_scheduler as scheduler_module
+from app.refresh_scheduler import RefreshScheduler
+
+
+pytestmark = pytest.mark.anyio
+
+
+@pytest.fixture
+def anyio_backend():
+    return "asyncio"
+
+
+async def test_burst_of_requests_runs_one_refresh():
+    calls = []
+
+    async def runner(user_id, day_local, tz_name):
+        calls.append((user_id, day_local, tz_name))
+
+    scheduler = RefreshScheduler(runner, debounce_seconds=0.05, max_latency_seconds=1.0, poll_seconds=0.01)
+    day = date(2026, 7, 9)
+
+    assert await scheduler.request("u1", day, "UTC") is True
+    assert await scheduler.request("u1", day, "UTC") is False
+    assert await scheduler.request("u1", day, "America/Chicago") is False
+    assert await scheduler.request("u2", day, "UTC") is True
+    await asyncio.sleep(0.2)
+
+    assert sorted(calls) == [("u1", day, "America/Chicago"), ("u2", day, "UTC")]
+    status = await scheduler.status()
+    assert status["backend"] == "memory"
+    assert status["depth"] == 0
+    assert (status["requests"], status["coalesced"], status["refreshes"]) == (4, 2, 2)
+    assert status["coalesce_ratio"] == 0.5
+    assert status["latency_ms"]["max"] is not None
+
+
+async def test_debounce_is_capped_by_max_latency(monkeypatch):
+    async def runner(user_id, day_local, tz_name):  # noqa: ARG001
+        return None
+
+    now = [1000.0]
+    monkeypatch.setattr(scheduler_module.time, "time", lambda: now[0])
+    scheduler = RefreshScheduler(runner, debounce_seconds=10, max_latency_seconds=25)
+    monkeypatch.setattr(scheduler, "_ensure_flusher", lambda: None)
+    day = date(2026, 7, 9)
+
+    await scheduler.request("u1", day, "UTC")
+    assert scheduler._pending[("u1", day)].due == 1010.0
+    now[0] = 1008.0
+    await scheduler.request("u1", day, "UTC")
+    assert scheduler._pending[("u1", day)].due == 1018.0
+    now[0] = 1020.0
+    await scheduler.request("u1", day, "UTC")
+    assert scheduler._pending[("u1", day)].due == 1025.0
+
+    assert scheduler._claim_local(1024.0) == []
+    assert scheduler._claim_local(1025.0) == [("u1", day, "UTC", 1000.0)]
+
+
+async def test_redis_claim_decodes_claimed_entries():
+    class _FakeRedis:
+        async def eval(self, script, numkeys, *args):  # noqa: ARG002
+            assert args[:3] == ("gaia:mart_refresh:due", "gaia:mart_refresh:first", "gaia:mart_refresh:tz")
+            return [b"user-1|2026-07-09", b"990.5", b"UTC"]
+
+    async def runner(user_id, day_local, tz_name):  # noqa: ARG001
+        return None
+
+    scheduler = RefreshScheduler(runner, debounce_seconds=5, max_latency_seconds=60)
+
+    claimed = await scheduler._claim_redis(_FakeRedis(), 1000.0)
+
+    assert claimed == [("user-1", date(2026, 7, 9), "UTC", 990.5)]
@@ -13,6 +13,7 @@ import pytest
 import httpx
 
 from scripts.ingest_space_forecasts_step1 import (
+    SupabaseWriter,
     _aurora_headline,
     _parse_dt,
     _parse_float,
@@ -182,6 +183,126 @@ def test_selected_feeds_fail_when_every_feed_fails(monkeypatch):
         )
 
 
+def test_selected_feeds_run_concurrently_with_dependencies_and_timeouts(monkeypatch):
+    from scripts import ingest_space_forecasts_step1 as module
+
+    events: list[str] = []
+    in_flight = {"now": 0, "max": 0}
+
+    async def fake_run_feed(name, client, writer, days):  # noqa: ARG001
+        events.append(f"start:{name}")
+        in_flight["now"] += 1
+        in_flight["max"] = max(in_flight["max"], in_flight["now"])
+        try:
+            await asyncio.sleep(1.0 if name == "drap" else 0.02)
+            await writer.upsert_many("ext", name, [{"id": 1}, {"id": 2}], ["id"])
+        finally:
+            in_flight["now"] -= 1
+        events.append(f"end:{name}")
+
+    monkeypatch.setattr(module, "_run_feed", fake_run_feed)
+    monkeypatch.setattr(module, "_FEED_TIMEOUTS", {"drap": 0.1})
+
+    async def runner():
+        db = module.SupabaseWriter(None, dry_run=True)
+        async with module.BatchedWriter(db) as writer:
+            stats = await _run_selected_feeds(
+                {"enlil", "scoreboard", "sep", "drap"},
+                client=None,  # type: ignore[arg-type]
+                writer=writer,
+                days=1,
+            )
+        return stats
+
+    stats = asyncio.run(runner())
+
+    assert in_flight["max"] == 3
+    assert events.index("start:enlil") > events.index("end:scoreboard")
+    assert {name: stat.status for name, stat in stats.items()} == {
+        "enlil": "ok",
+        "sep": "ok",
+        "scoreboard": "ok",
+        "drap": "timeout",
+    }
+    assert stats["sep"].rows == 2 and stats["drap"].rows == 0
+    assert stats["sep"].ms > 0
+
+
+class _FakeDb:
+    dry_run = False
+    _conn = object()
+    upsert_statement = staticmethod(SupabaseWriter.upsert_statement)
+
+    def __init__(self, bad_id=None) -> None:
+        self.bad_id = bad_id
+        self.calls: list[list[tuple]] = []
+
+    async def executemany(self, sql, values):  # noqa: ARG002
+        self.calls.append(list(values))
+        if any(value[0] == self.bad_id for value in values):
+            raise ValueError("bad row")
+
+
+def test_batched_writer_combines_queued_upserts_and_isolates_failures():
+    from scripts import ingest_space_forecasts_step1 as module
+
+    db = _FakeDb(bad_id=99)
+
+    async def runner():
+        async with module.BatchedWriter(db) as writer:
+            return await asyncio.gather(
+                writer.upsert_many("ext", "sep_flux", [{"id": 1}], ["id"]),
+                writer.upsert_many("ext", "sep_flux", [{"id": 2}, {"id": 3}], ["id"]),
+                writer.upsert_many("ext", "sep_flux", [{"id": 99}], ["id"]),
+                return_exceptions=True,
+            )
+
+    results = asyncio.run(runner())
+
+    assert results[:2] == [1, 2]
+    assert isinstance(results[2], ValueError)
+    # one combined write, then one retry per request after it failed
+    assert db.calls[0] == [(1,), (2,), (3,), (99,)]
+    assert db.calls[1:] == [[(1,)], [(2,), (3,)], [(99,)]]
+
+
+def test_host_limited_transport_caps_requests_per_host():
+    from scripts import ingest_space_forecasts_step1 as module
+
+    in_flight: dict[str, int] = {}
+    peak: dict[str, int] = {}
+
+    class _SlowStream(httpx.AsyncByteStream):
+        def __init__(self, host):
+            self.host = host
+
+        async def __aiter__(self):
+            await asyncio.sleep(0.02)
+            yield b"{}"
+
+        async def aclose(self):
+            in_flight[self.host] -= 1
+
+    async def handler(request):
+        host = request.url.host
+        in_flight[host] = in_flight.get(host, 0) + 1
+        peak[host] = max(peak.get(host, 0), in_flight[host])
+        return httpx.Response(200, stream=_SlowStream(host))
+
+    async def runner():
+        transport = module._HostLimitedTransport(2, httpx.MockTransport(handler))
+        async with httpx.AsyncClient(transport=transport) as client:
+            responses = await asyncio.gather(
+                *(client.get(f"https://{host}/x") for host in ["a.test"] * 6 + ["b.test"] * 3)
+            )
+        return responses
+
+    responses = asyncio.run(runner())
+
+    assert all(response.json() == {} for response in responses)
+    assert peak == {"a.test": 2, "b.test": 2}
+
+
 def test_ingest_aurora_parses_summary(monkeypatch):
     from scripts import ingest_space_forecasts_step1 as module
 
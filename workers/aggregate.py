@@ -1,12 +1,12 @@
 # workers/aggregate.py
 import os
+import argparse
 import asyncio
+import time
 import asyncpg
 from datetime import date, datetime, timedelta, timezone
 
 DSN = os.environ.get("DATABASE_URL")
-if not DSN:
-    raise SystemExit("Set DATABASE_URL in environment/.env")
 
 def day_bounds_utc(d: date):
     start = datetime(d.year, d.month, d.day, tzinfo=timezone.utc)
@@ -160,19 +160,186 @@ async def run_for_user_day(conn: asyncpg.Connection, user_id: str, d: date):
 
     await conn.execute(q, user_id, d, start, end)
 
+# Same metrics as run_for_user_day for every user in $1 and every UTC day in
+# [$2, $3], from one grouped scan of the point samples and one of the sleep
+# stages. Sleep segments are clipped to each day they overlap, as above.
+GROUPED_SQL = r"""
+with days as (
+  select g.d::date as day,
+         (g.d::date)::timestamp at time zone 'utc' as start_ts,
+         (g.d::date + 1)::timestamp at time zone 'utc' as end_ts
+  from generate_series($2::date, $3::date, interval '1 day') as g(d)
+),
+span as (
+  select min(start_ts) as start_ts, max(end_ts) as end_ts from days
+),
+point_metrics as (
+  select
+    s.user_id,
+    (s.start_time at time zone 'utc')::date as day,
+    min(s.value) filter (where s.type = 'heart_rate')::float8 as hr_min,
+    max(s.value) filter (where s.type = 'heart_rate')::float8 as hr_max,
+    avg(s.value) filter (where s.type = 'hrv_sdnn')::float8 as hrv_avg,
+    avg(s.value) filter (where s.type = 'spo2')::float8 as spo2_avg,
+    avg(s.value) filter (where s.type = 'blood_pressure_systolic')::float8 as bp_sys_avg,
+    avg(s.value) filter (where s.type = 'blood_pressure_diastolic')::float8 as bp_dia_avg
+  from gaia.samples s, span
+  where s.user_id = any($1::uuid[])
+    and s.type in ('heart_rate', 'hrv_sdnn', 'spo2', 'blood_pressure_systolic', 'blood_pressure_diastolic')
+    and s.start_time >= span.start_ts and s.start_time < span.end_ts
+  group by 1, 2
+),
+sleep_metrics as (
+  select
+    s.user_id,
+    dd.day,
+    sum(extract(epoch from (least(s.end_time, dd.end_ts) - greatest(s.start_time, dd.start_ts))) / 60.0)
+      filter (where s.value_text in ('rem','core','deep','asleep'))::float8 as asleep_min,
+    sum(extract(epoch from (least(s.end_time, dd.end_ts) - greatest(s.start_time, dd.start_ts))) / 60.0)
+      filter (where s.value_text = 'rem')::float8 as rem_min,
+    sum(extract(epoch from (least(s.end_time, dd.end_ts) - greatest(s.start_time, dd.start_ts))) / 60.0)
+      filter (where s.value_text = 'core')::float8 as core_min,
+    sum(extract(epoch from (least(s.end_time, dd.end_ts) - greatest(s.start_time, dd.start_ts))) / 60.0)
+      filter (where s.value_text = 'deep')::float8 as deep_min,
+    sum(extract(epoch from (least(s.end_time, dd.end_ts) - greatest(s.start_time, dd.start_ts))) / 60.0)
+      filter (where s.value_text = 'awake')::float8 as awake_min
+  from gaia.samples s
+  cross join span
+  join days dd on s.start_time < dd.end_ts and s.end_time > dd.start_ts
+  where s.user_id = any($1::uuid[])
+    and s.type = 'sleep_stage'
+    and s.start_time < span.end_ts and s.end_time > span.start_ts
+  group by 1, 2
+)
+insert into gaia.daily_summary as d (
+  user_id, date,
+  hr_min, hr_max,
+  hrv_avg, spo2_avg,
+  bp_sys_avg, bp_dia_avg,
+  sleep_total_minutes,
+  sleep_rem_minutes,
+  sleep_core_minutes,
+  sleep_deep_minutes,
+  sleep_awake_minutes,
+  sleep_efficiency,
+  updated_at
+)
+select
+  u.user_id,
+  days.day,
+  p.hr_min, p.hr_max,
+  p.hrv_avg, p.spo2_avg,
+  p.bp_sys_avg, p.bp_dia_avg,
+  sl.asleep_min,
+  sl.rem_min,
+  sl.core_min,
+  sl.deep_min,
+  sl.awake_min,
+  case when coalesce(sl.asleep_min, 0) + coalesce(sl.awake_min, 0) > 0
+       then coalesce(sl.asleep_min, 0) / (coalesce(sl.asleep_min, 0) + coalesce(sl.awake_min, 0))
+       else null end::float8,
+  now()
+from unnest($1::uuid[]) as u(user_id)
+cross join days
+left join point_metrics p on p.user_id = u.user_id and p.day = days.day
+left join sleep_metrics sl on sl.user_id = u.user_id and sl.day = days.day
+on conflict (user_id, date) do update set
+  hr_min = excluded.hr_min,
+  hr_max = excluded.hr_max,
+  hrv_avg = excluded.hrv_avg,
+  spo2_avg = excluded.spo2_avg,
+  bp_sys_avg = excluded.bp_sys_avg,
+  bp_dia_avg = excluded.bp_dia_avg,
+  sleep_total_minutes = excluded.sleep_total_minutes,
+  sleep_rem_minutes   = excluded.sleep_rem_minutes,
+  sleep_core_minutes  = excluded.sleep_core_minutes,
+  sleep_deep_minutes  = excluded.sleep_deep_minutes,
+  sleep_awake_minutes = excluded.sleep_awake_minutes,
+  sleep_efficiency    = excluded.sleep_efficiency,
+  updated_at = now();
+"""
+
+async def run_for_users_range(conn: asyncpg.Connection, user_ids: list[str], start: date, end: date):
+    await conn.execute(GROUPED_SQL, user_ids, start, end)
+
+async def aggregate_range(
+    pool,
+    user_ids: list[str],
+    start: date,
+    end: date,
+    *,
+    mode: str = "grouped",
+    concurrency: int = 4,
+    users_per_batch: int = 50,
+) -> float:
+    """Aggregate every user/day in [start, end]; returns wall seconds.
+
+    `grouped` runs GROUPED_SQL once per batch of users; `per-day` runs
+    run_for_user_day for each user/day. Either way up to `concurrency` users
+    (or user batches) run at once, each on its own pooled connection.
+    """
+    semaphore = asyncio.Semaphore(max(1, concurrency))
+    days = [start + timedelta(days=i) for i in range((end - start).days + 1)]
+
+    async def _grouped(batch: list[str]):
+        async with semaphore, pool.acquire() as conn:
+            await run_for_users_range(conn, batch, start, end)
+        print(f"Aggregated {start}..{end} for {len(batch)} users")
+
+    async def _per_day(uid: str):
+        async with semaphore, pool.acquire() as conn:
+            for d in days:
+                await run_for_user_day(conn, uid, d)
+        print(f"Aggregated {start}..{end} for {uid}")
+
+    started = time.perf_counter()
+    if mode == "grouped":
+        size = max(1, users_per_batch)
+        await asyncio.gather(*(_grouped(user_ids[i : i + size]) for i in range(0, len(user_ids), size)))
+    else:
+        await asyncio.gather(*(_per_day(uid) for uid in user_ids))
+    return time.perf_counter() - started
+
+def _parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Rebuild gaia.daily_summary for recent days and all users.")
+    parser.add_argument("--days", type=int, default=14, help="Days back from today (UTC) to aggregate.")
+    parser.add_argument("--mode", choices=("grouped", "per-day"), default="grouped")
+    parser.add_argument("--concurrency", type=int, default=4, help="Users (or user batches) aggregated at once.")
+    parser.add_argument("--users-per-batch", type=int, default=50, help="Users per grouped statement.")
+    parser.add_argument(
+        "--benchmark",
+        action="store_true",
+        help="Run the per-day and grouped modes over the same range and print wall time for each.",
+    )
+    return parser.parse_args()
+
 async def main():
-    conn = await asyncpg.connect(dsn=DSN, statement_cache_size=0)
+    args = _parse_args()
+    if not DSN:
+        raise SystemExit("Set DATABASE_URL in environment/.env")
+    end = datetime.now(timezone.utc).date()
+    start = end - timedelta(days=max(1, args.days) - 1)
+    pool = await asyncpg.create_pool(dsn=DSN, statement_cache_size=0, min_size=1, max_size=max(1, args.concurrency))
     try:
-        users = await conn.fetch("select id from gaia.users")
-        days = 14  # aggregate last 14 days for all users
-        for u in users:
-            uid = str(u["id"])
-            for i in range(days):
-                d = (datetime.now(timezone.utc).date() - timedelta(days=i))
-                await run_for_user_day(conn, uid, d)
-                print(f"Aggregated {d} for {uid}")
+        users = await pool.fetch("select id from gaia.users")
+        user_ids = [str(u["id"]) for u in users]
+        modes = ("per-day", "grouped") if args.benchmark else (args.mode,)
+        timings = {}
+        for mode in modes:
+            timings[mode] = await aggregate_range(
+                pool,
+                user_ids,
+                start,
+                end,
+                mode=mode,
+                concurrency=args.concurrency,
+                users_per_batch=args.users_per_batch,
+            )
+            print(f"mode={mode} users={len(user_ids)} days={args.days} seconds={timings[mode]:.2f}")
+        if args.benchmark and timings["grouped"] > 0:
+            print(f"speedup={timings['per-day'] / timings['grouped']:.1f}x")
     finally:
-        await conn.close()
+        await pool.close()
 
 if __name__ == "__main__":
     asyncio.run(main())
@@ -8,9 +8,13 @@ import logging
 import os
 import signal
 import sys
+import time
+from datetime import date
 from pathlib import Path
-from typing import Any, Dict, List
+from typing import Any, Dict, List, Tuple
 
+from psycopg import OperationalError
+from psycopg_pool import PoolTimeout
 from redis.asyncio import Redis
 
 ROOT = Path(__file__).resolve().parents[1]
@@ -62,22 +66,42 @@ def _env_float(name: str, default: float) -> float:
         return default
 
 
-async def _process_entry(entry: Dict[str, Any]) -> tuple[int, int]:
-    samples_data = entry.get("samples") or []
-    dev_uid = entry.get("dev_uid")
-    refresh_user = entry.get("refresh_user")
-    tz_name = str(entry.get("tz") or DEFAULT_TIMEZONE)
-    tz_resolved, tzinfo = _resolve_timezone(tz_name)
+def _env_int(name: str, default: int) -> int:
+    raw = os.getenv(name)
+    if raw is None or raw == "":
+        return default
+    try:
+        return int(raw)
+    except ValueError:
+        logger.warning("Invalid integer env %s=%r; using default %s", name, raw, default)
+        return default
+
+
+RefreshRequests = Dict[Tuple[str, date], Tuple[int, str]]
+
 
+def _entry_models(entry: Dict[str, Any]) -> List[SampleIn]:
     models: List[SampleIn] = []
-    for payload in samples_data:
+    for payload in entry.get("samples") or []:
         try:
             models.append(SampleIn(**payload))
         except Exception as exc:
             logger.warning("[INGEST-WORKER] dropping invalid queued sample: %s", exc)
+    return models
+
+
+def _group_key(entry: Dict[str, Any]) -> Tuple[Any, Any, str]:
+    return entry.get("dev_uid"), entry.get("refresh_user"), str(entry.get("tz") or DEFAULT_TIMEZONE)
+
 
+async def _insert_group(entries: List[Dict[str, Any]]) -> Tuple[int, int, RefreshRequests]:
+    """Insert entries sharing one `_group_key` with a single `safe_insert_batch` call."""
+    dev_uid, refresh_user, tz_name = _group_key(entries[0])
+    tz_resolved, tzinfo = _resolve_timezone(tz_name)
+
+    models = [model for entry in entries for model in _entry_models(entry)]
     if not models:
-        return 0, 0
+        return 0, 0, {}
 
     pool = await get_pool()
     inserted, skipped, _ = await safe_insert_batch(
@@ -86,37 +110,163 @@ async def _process_entry(entry: Dict[str, Any]) -> tuple[int, int]:
         dev_uid,
     )
 
+    refreshes: RefreshRequests = {}
     if refresh_user and inserted > 0:
-        refresh_days = _sample_refresh_days(models, tzinfo) or [_today_local(tzinfo)]
-        for day_local in refresh_days:
-            await _maybe_schedule_refresh(refresh_user, day_local, inserted, tz_resolved)
+        for day_local in _sample_refresh_days(models, tzinfo) or [_today_local(tzinfo)]:
+            refreshes[(refresh_user, day_local)] = (inserted, tz_resolved)
+    return inserted, skipped, refreshes
+
+
+def _merge_refreshes(target: RefreshRequests, refreshes: RefreshRequests) -> None:
+    for refresh_key, (inserted, tz_name) in refreshes.items():
+        previous = target.get(refresh_key)
+        target[refresh_key] = (inserted + previous[0], previous[1]) if previous else (inserted, tz_name)
+
+
+async def _schedule_refreshes(refreshes: RefreshRequests) -> None:
+    for (user_id, day_local), (inserted, tz_name) in refreshes.items():
+        await _maybe_schedule_refresh(user_id, day_local, inserted, tz_name)
+
 
+async def _process_entry(entry: Dict[str, Any]) -> tuple[int, int]:
+    inserted, skipped, refreshes = await _insert_group([entry])
+    await _schedule_refreshes(refreshes)
     return inserted, skipped
 
 
-async def _worker_loop(client: Redis, key: str, stop_event: asyncio.Event, *, retry_delay: float) -> None:
+def _is_transient(exc: BaseException) -> bool:
+    """DB pressure is not the entry's fault, so it never counts toward dead-lettering."""
+    cause = exc.exc if isinstance(exc, BatchInsertError) else exc
+    return isinstance(cause, (OperationalError, PoolTimeout))
+
+
+async def _process_batch(
+    entries: List[Dict[str, Any]],
+    *,
+    concurrency: int,
+) -> Tuple[int, int, List[Tuple[Dict[str, Any], BaseException]]]:
+    """Insert a drained batch with one merged call per user, at most `concurrency` at a time.
+
+    Refreshes are scheduled once per (user, day) across the whole batch. Returns the
+    totals plus the entries that failed, each with its error.
+    """
+    groups: Dict[Tuple[Any, Any, str], List[Dict[str, Any]]] = {}
+    for entry in entries:
+        groups.setdefault(_group_key(entry), []).append(entry)
+
+    semaphore = asyncio.Semaphore(max(1, concurrency))
+    refreshes: RefreshRequests = {}
+    failures: List[Tuple[Dict[str, Any], BaseException]] = []
+    totals = [0, 0]
+
+    async def _run_group(group: List[Dict[str, Any]]) -> None:
+        async with semaphore:
+            try:
+                results = [await _insert_group(group)]
+            except Exception as exc:
+                if _is_transient(exc) or len(group) == 1:
+                    failures.extend((entry, exc) for entry in group)
+                    return
+                # Retry one entry at a time so a poison entry only fails itself.
+                results = []
+                for entry in group:
+                    try:
+                        results.append(await _insert_group([entry]))
+                    except Exception as entry_exc:
+                        failures.append((entry, entry_exc))
+        for inserted, skipped, group_refreshes in results:
+            totals[0] += inserted
+            totals[1] += skipped
+            _merge_refreshes(refreshes, group_refreshes)
+
+    await asyncio.gather(*(_run_group(group) for group in groups.values()))
+    await _schedule_refreshes(refreshes)
+    return totals[0], totals[1], failures
+
+
+async def _pop_batch(client: Redis, key: str, batch_size: int) -> List[str]:
+    item = await client.blpop(key, timeout=5)
+    if not item:
+        return []
+    raws = [item[1]]
+    if batch_size > 1:
+        raws.extend(await client.lpop(key, batch_size - 1) or [])
+    return raws
+
+
+async def _requeue_failures(
+    client: Redis,
+    key: str,
+    dead_letter_key: str,
+    failures: List[Tuple[Dict[str, Any], BaseException]],
+    *,
+    max_attempts: int,
+) -> None:
+    for entry, exc in failures:
+        if _is_transient(exc):
+            await client.lpush(key, json.dumps(entry))
+            continue
+        attempts = int(entry.get("attempts") or 0) + 1
+        if attempts >= max_attempts:
+            dead = {**entry, "attempts": attempts, "last_error": str(exc)[:200], "dead_at": time.time()}
+            await client.rpush(dead_letter_key, json.dumps(dead))
+            logger.error(
+                "[INGEST-WORKER] dead-lettered entry key=%s attempts=%d error=%s",
+                dead_letter_key,
+                attempts,
+                exc,
+            )
+            continue
+        # Failing entries go to the tail so they cannot block newer batches.
+        await client.rpush(key, json.dumps({**entry, "attempts": attempts}))
+
+
+async def _worker_loop(
+    client: Redis,
+    key: str,
+    stop_event: asyncio.Event,
+    *,
+    retry_delay: float,
+    batch_size: int = 1,
+    concurrency: int = 1,
+    max_attempts: int = 5,
+    dead_letter_key: str | None = None,
+) -> None:
+    dead_letter_key = dead_letter_key or f"{key}:dead"
     while not stop_event.is_set():
-        item = await client.blpop(key, timeout=5)
-        if not item:
+        raws = await _pop_batch(client, key, batch_size)
+        if not raws:
             continue
 
-        _, raw = item
-        try:
-            entry = json.loads(raw)
-        except Exception:
-            logger.warning("[INGEST-WORKER] dropping corrupt queue payload")
+        entries: List[Dict[str, Any]] = []
+        for raw in raws:
+            try:
+                entry = json.loads(raw)
+            except Exception:
+                logger.warning("[INGEST-WORKER] dropping corrupt queue payload")
+                continue
+            entries.append(entry if isinstance(entry, dict) else {})
+        if not entries:
             continue
 
         try:
-            inserted, skipped = await _process_entry(entry if isinstance(entry, dict) else {})
-            logger.info("[INGEST-WORKER] processed key=%s inserted=%d skipped=%d", key, inserted, skipped)
-        except BatchInsertError as exc:
-            logger.warning("[INGEST-WORKER] db unavailable; requeueing reason=%s", exc.reason)
-            await client.lpush(key, raw)
-            await asyncio.sleep(retry_delay)
+            inserted, skipped, failures = await _process_batch(entries, concurrency=concurrency)
         except Exception as exc:
             logger.exception("[INGEST-WORKER] unexpected failure; requeueing: %s", exc)
-            await client.lpush(key, raw)
+            failures = [(entry, exc) for entry in entries]
+            inserted = skipped = 0
+        logger.info(
+            "[INGEST-WORKER] processed key=%s entries=%d inserted=%d skipped=%d failed=%d",
+            key,
+            len(entries),
+            inserted,
+            skipped,
+            len(failures),
+        )
+        if failures:
+            if any(_is_transient(exc) for _, exc in failures):
+                logger.warning("[INGEST-WORKER] db unavailable; requeueing entries=%d", len(failures))
+            await _requeue_failures(client, key, dead_letter_key, failures, max_attempts=max_attempts)
             await asyncio.sleep(retry_delay)
 
 
@@ -136,10 +286,25 @@ async def _run(args: argparse.Namespace) -> int:
     logging.basicConfig(level=getattr(logging, args.log_level.upper(), logging.INFO))
     client = Redis.from_url(redis_url, decode_responses=True)
     await client.ping()
-    logger.info("[INGEST-WORKER] started key=%s", args.queue_key)
+    logger.info(
+        "[INGEST-WORKER] started key=%s batch_size=%d concurrency=%d max_attempts=%d",
+        args.queue_key,
+        args.batch_size,
+        args.concurrency,
+        args.max_attempts,
+    )
 
     try:
-        await _worker_loop(client, args.queue_key, stop_event, retry_delay=args.retry_delay)
+        await _worker_loop(
+            client,
+            args.queue_key,
+            stop_event,
+            retry_delay=args.retry_delay,
+            batch_size=max(1, args.batch_size),
+            concurrency=max(1, args.concurrency),
+            max_attempts=max(1, args.max_attempts),
+            dead_letter_key=args.dead_letter_key or None,
+        )
     finally:
         await client.aclose()
         await close_pool()
@@ -151,6 +316,10 @@ def _parse_args() -> argparse.Namespace:
     parser.add_argument("--redis-url", default="")
     parser.add_argument("--queue-key", default=_queue_key())
     parser.add_argument("--retry-delay", type=float, default=_env_float("GAIA_INGEST_WORKER_RETRY_DELAY", 5.0))
+    parser.add_argument("--batch-size", type=int, default=_env_int("GAIA_INGEST_WORKER_BATCH_SIZE", 50))
+    parser.add_argument("--concurrency", type=int, default=_env_int("GAIA_INGEST_WORKER_CONCURRENCY", 4))
+    parser.add_argument("--max-attempts", type=int, default=_env_int("GAIA_INGEST_WORKER_MAX_ATTEMPTS", 5))
+    parser.add_argument("--dead-letter-key", default=os.getenv("GAIA_INGEST_DEAD_LETTER_KEY", ""))
     parser.add_argument("--log-level", default=os.getenv("GAIA_LOG_LEVEL", "INFO"))
     return parser.parse_args()
 